@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Archivo y depuración en línea de inscripciones y videos antiguos.
+
+Las inscripciones rechazadas y los videos no aprobados conservan para siempre
+sus columnas LONGTEXT (comprobante_pago, video_data, varios MB por fila). Un
+DELETE de todas ellas con sus resultados y videos bloquearía las tablas y
+crecería el undo log en plena temporada. Este módulo las mueve a archivos
+JSONL comprimidos (gzip) y las borra en lotes pequeños por llave primaria:
+
+    1. tomar las siguientes TAMAÑO_LOTE_ARCHIVO filas de la política con
+       id > último id procesado (ORDER BY id) y releerlas con FOR UPDATE
+       repitiendo la condición, junto con sus dependientes: una fila que dejó
+       de cumplir la política entre las dos lecturas se omite
+    2. escribir el lote completo (con sus dependientes) a
+       lote-{primer id}-{último id}.jsonl.gz
+    3. borrar dependientes y filas por las llaves primarias escritas en el
+       archivo y confirmar: una transacción corta por lote
+    4. mover a la carpeta del archivo los archivos de video del lote
+    5. guardar el avance en progreso.json y pausar PAUSA_ARCHIVO segundos
+
+Políticas:
+    rechazadas  inscripciones rechazadas sin cambios en los últimos --dias,
+                con sus videos, resultados, puntajes y subidas
+    videos      videos revisados y no aprobados hace más de --dias
+    temporada   inscripciones registradas antes de --antes-de (toda una
+                temporada), con sus dependientes; recalcula los cupos de sede
+
+Cada ejecución escribe en DIRECTORIO_ARCHIVO/{politica}-{corte}/. Volver a
+ejecutar la misma política y corte reanuda desde el último id de
+progreso.json. Los archivos se nombran por el rango de ids del lote, así que
+nunca se sobrescribe un lote ya borrado de la base: si la ejecución se
+interrumpe antes del commit, el lote se vuelve a escribir con las mismas filas
+(siguen en la base); si se interrumpe después del commit pero antes de guardar
+progreso.json, las filas ya no existen y el siguiente lote tiene otro rango. --dry-run solo estima filas
+y bytes liberados (columnas de texto y archivos de video) sin tocar nada.
+
+Uso:
+    python archivo.py --politica rechazadas [--dias 90] [--dry-run]
+    python archivo.py --politica temporada --antes-de 2025-01-01 [--lote 200] [--pausa 0.5]
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import cupos
+import subidas
+from models import (
+    EstatusInscripcion, EventoSistema, Inscripcion, ParteSubida, PuntajeJurado, Resultado, SubidaVideo, Video
+)
+
+logger = logging.getLogger("archivo")
+
+DIRECTORIO_ARCHIVO = os.getenv(
+    "DIRECTORIO_ARCHIVO", os.path.join(os.path.dirname(os.path.abspath(__file__)), "archivados")
+)
+TAMAÑO_LOTE_ARCHIVO = int(os.getenv("TAMAÑO_LOTE_ARCHIVO", "200"))
+PAUSA_ARCHIVO = float(os.getenv("PAUSA_ARCHIVO", "0.5"))  # segundos entre lotes
+DIAS_ARCHIVO = int(os.getenv("DIAS_ARCHIVO", "90"))
+
+POLITICAS = ("rechazadas", "videos", "temporada")
+
+# Columnas de texto que se cuentan en la estimación de bytes liberados
+_COLUMNAS_TEXTO = {
+    Inscripcion: (Inscripcion.comprobante_pago, Inscripcion.comprobante_miniatura, Inscripcion.observaciones),
+    Video: (Video.video_data, Video.descripcion, Video.observaciones),
+}
+
+
+class Politica:
+    """Tabla raíz, condición y corte de una política de archivo"""
+
+    def __init__(self, nombre: str, dias: int = DIAS_ARCHIVO, antes_de: Optional[datetime] = None):
+        if nombre not in POLITICAS:
+            raise ValueError(f"Política desconocida: {nombre}")
+        if nombre == "temporada" and antes_de is None:
+            raise ValueError("La política temporada requiere una fecha de corte (--antes-de)")
+        self.nombre = nombre
+        self.corte = antes_de if nombre == "temporada" else datetime.utcnow() - timedelta(days=dias)
+        self.modelo = Video if nombre == "videos" else Inscripcion
+
+    @property
+    def directorio(self) -> str:
+        return os.path.join(DIRECTORIO_ARCHIVO, f"{self.nombre}-{self.corte:%Y%m%d}")
+
+    def condicion(self) -> tuple:
+        if self.nombre == "rechazadas":
+            return (Inscripcion.estatus == EstatusInscripcion.rechazado, Inscripcion.fecha_actualizacion < self.corte)
+        if self.nombre == "videos":
+            return (Video.aprobado == False, Video.fecha_revision.isnot(None), Video.fecha_revision < self.corte)
+        return (Inscripcion.fecha_inscripcion < self.corte,)
+
+
+def _filas(db: Session, modelo, *condiciones, bloquear: bool = False) -> List[dict]:
+    """Filas completas de la tabla como diccionarios"""
+    consulta = select(modelo.__table__).where(*condiciones)
+    if bloquear:
+        consulta = consulta.with_for_update()
+    return [dict(fila._mapping) for fila in db.execute(consulta)]
+
+
+def _longitud(db: Session, modelo, ids_raiz) -> int:
+    """Bytes de las columnas de texto de las filas seleccionadas"""
+    columnas = _COLUMNAS_TEXTO[modelo]
+    total = db.query(*[func.coalesce(func.sum(func.length(columna)), 0) for columna in columnas]).filter(
+        ids_raiz
+    ).one()
+    return int(sum(total))
+
+
+def estimar(db: Session, politica: Politica) -> dict:
+    """Filas y bytes que liberaría la política (sin modificar nada)"""
+    raiz = select(politica.modelo.id).where(*politica.condicion()).scalar_subquery()
+    filas = {politica.modelo.__tablename__: db.query(func.count(politica.modelo.id)).filter(
+        *politica.condicion()
+    ).scalar()}
+    if politica.modelo is Video:
+        videos = Video.id.in_(raiz)
+        bytes_base = _longitud(db, Video, videos)
+    else:
+        videos = Video.inscrito_id.in_(raiz)
+        bytes_base = _longitud(db, Inscripcion, Inscripcion.id.in_(raiz)) + _longitud(db, Video, videos)
+        filas["videos"] = db.query(func.count(Video.id)).filter(videos).scalar()
+        for modelo in (Resultado, PuntajeJurado, SubidaVideo):
+            filas[modelo.__tablename__] = db.query(func.count()).select_from(modelo).filter(
+                modelo.inscrito_id.in_(raiz)
+            ).scalar()
+    bytes_archivos = db.query(func.coalesce(func.sum(Video.tamaño_mb), 0)).filter(videos).scalar()
+    return {
+        "politica": politica.nombre,
+        "corte": politica.corte.isoformat(),
+        "filas": filas,
+        "bytes_base": bytes_base,
+        "bytes_archivos": int(float(bytes_archivos) * 1024 * 1024),
+    }
+
+
+def _leer_progreso(politica: Politica) -> dict:
+    try:
+        with open(os.path.join(politica.directorio, "progreso.json"), encoding="utf-8") as archivo:
+            return json.load(archivo)
+    except FileNotFoundError:
+        return {"politica": politica.nombre, "corte": politica.corte.isoformat(), "ultimo_id": None,
+                "lotes": 0, "filas": 0, "bytes": 0, "completado": False}
+
+
+def _guardar(ruta: str, contenido: bytes):
+    """Escribir el archivo completo o nada (temporal + fsync + rename)"""
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(contenido)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(temporal, ruta)
+
+
+def _dependientes(db: Session, inscrito_ids: List[str], video_ids: List[int]) -> Dict[str, List[dict]]:
+    """Filas que dependen de las inscripciones o videos del lote, bloqueadas hasta el commit"""
+    dependientes = {}
+    if inscrito_ids:
+        dependientes["videos"] = _filas(db, Video, Video.inscrito_id.in_(inscrito_ids), bloquear=True)
+        dependientes["resultados"] = _filas(db, Resultado, Resultado.inscrito_id.in_(inscrito_ids), bloquear=True)
+        dependientes["puntajes_jurado"] = _filas(
+            db, PuntajeJurado, PuntajeJurado.inscrito_id.in_(inscrito_ids), bloquear=True
+        )
+        video_ids = [fila["id"] for fila in dependientes["videos"]]
+    condicion = SubidaVideo.video_id.in_(video_ids)
+    if inscrito_ids:
+        condicion = condicion | SubidaVideo.inscrito_id.in_(inscrito_ids)
+    dependientes["subidas_video"] = _filas(db, SubidaVideo, condicion, bloquear=True)
+    return dependientes
+
+
+# Orden de borrado de los dependientes archivados (cada tabla antes de las que referencia)
+_DEPENDIENTES = (
+    ("subidas_video", SubidaVideo), ("puntajes_jurado", PuntajeJurado), ("resultados", Resultado), ("videos", Video),
+)
+
+
+def _borrar(db: Session, politica: Politica, ids: list, dependientes: Dict[str, List[dict]]):
+    """Borrar el lote y sus dependientes por las llaves archivadas, dependientes primero (sin commit)"""
+    subida_ids = [fila["id"] for fila in dependientes["subidas_video"]]
+    if subida_ids:
+        db.query(ParteSubida).filter(ParteSubida.subida_id.in_(subida_ids)).delete(synchronize_session=False)
+    for tabla, modelo in _DEPENDIENTES:
+        archivados = [fila["id"] for fila in dependientes.get(tabla, [])]
+        if archivados:
+            db.query(modelo).filter(modelo.id.in_(archivados)).delete(synchronize_session=False)
+    db.query(politica.modelo).filter(politica.modelo.id.in_(ids)).delete(synchronize_session=False)
+
+
+def _mover_archivos(politica: Politica, videos: List[dict]) -> int:
+    """Mover a la carpeta del archivo los videos en disco del lote; devuelve los bytes movidos"""
+    movidos = 0
+    for video in videos:
+        if not video.get("url_video"):
+            continue
+        origen = subidas.ruta_absoluta(video["url_video"])
+        if not os.path.exists(origen):
+            continue
+        destino = os.path.join(politica.directorio, "archivos", video["url_video"])
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        movidos += os.path.getsize(origen)
+        shutil.move(origen, destino)
+    return movidos
+
+
+def archivar_lote(db: Session, politica: Politica, progreso: dict, tamaño: int = TAMAÑO_LOTE_ARCHIVO) -> int:
+    """Archivar y borrar el siguiente lote de la política; devuelve cuántas filas raíz revisó (0 al terminar)"""
+    modelo = politica.modelo
+    condiciones = list(politica.condicion())
+    if progreso["ultimo_id"] is not None:
+        condiciones.append(modelo.id > progreso["ultimo_id"])
+    candidatos = [fila.id for fila in db.query(modelo.id).filter(*condiciones).order_by(modelo.id).limit(tamaño)]
+    if not candidatos:
+        db.rollback()
+        return 0
+
+    # Lectura bloqueante con la condición de la política: las filas que dejaron de cumplirla se omiten
+    filas = _filas(db, modelo, modelo.id.in_(candidatos), *politica.condicion(), bloquear=True)
+    ids = [fila["id"] for fila in filas]
+    if not ids:
+        db.rollback()
+        progreso["ultimo_id"] = max(candidatos)
+        os.makedirs(politica.directorio, exist_ok=True)
+        _guardar(os.path.join(politica.directorio, "progreso.json"), json.dumps(progreso, indent=2).encode("utf-8"))
+        return len(candidatos)
+    if modelo is Inscripcion:
+        dependientes = _dependientes(db, ids, [])
+        videos = dependientes["videos"]
+    else:
+        dependientes = _dependientes(db, [], ids)
+        videos = filas
+    tamaño_base = sum(
+        len(fila.get(columna.key) or "") for fila in filas for columna in _COLUMNAS_TEXTO[modelo]
+    ) + sum(len(video.get("video_data") or "") for video in dependientes.get("videos", []))
+
+    # Una línea por fila raíz con sus dependientes
+    por_raiz = {fila["id"]: {"tabla": modelo.__tablename__, "fila": fila} for fila in filas}
+    llave = "inscrito_id" if modelo is Inscripcion else "video_id"
+    for tabla, dependientes_tabla in dependientes.items():
+        for fila in dependientes_tabla:
+            if fila.get(llave) in por_raiz:
+                por_raiz[fila[llave]].setdefault(tabla, []).append(fila)
+    contenido = "".join(
+        json.dumps(linea, default=str, ensure_ascii=False) + "\n" for linea in por_raiz.values()
+    ).encode("utf-8")
+    os.makedirs(politica.directorio, exist_ok=True)
+    _guardar(os.path.join(politica.directorio, f"lote-{min(ids)}-{max(ids)}.jsonl.gz"), gzip.compress(contenido))
+
+    _borrar(db, politica, ids, dependientes)
+    if politica.nombre == "temporada":
+        # Las inscripciones de la temporada pueden ocupar lugares de sede
+        for sede_id in sorted({fila["sede_id"] for fila in filas if fila["sede_id"]}):
+            cupos.recalcular(db, sede_id)
+    db.commit()
+
+    progreso["ultimo_id"] = max(candidatos)
+    progreso["lotes"] += 1
+    progreso["filas"] += len(ids)
+    progreso["bytes"] += tamaño_base + _mover_archivos(politica, videos)
+    _guardar(os.path.join(politica.directorio, "progreso.json"), json.dumps(progreso, indent=2).encode("utf-8"))
+    return len(ids)
+
+
+def archivar(db: Session, politica: Politica, tamaño: int = TAMAÑO_LOTE_ARCHIVO, pausa: float = PAUSA_ARCHIVO,
+             max_lotes: Optional[int] = None) -> dict:
+    """Archivar la política lote por lote, reanudando desde progreso.json; devuelve el progreso"""
+    progreso = _leer_progreso(politica)
+    if progreso["completado"]:
+        # Nueva pasada sobre la misma carpeta: filas que cumplieron la política después
+        progreso.update(ultimo_id=None, completado=False)
+    total = estimar(db, politica)["filas"][politica.modelo.__tablename__] + progreso["filas"]
+    db.rollback()
+    lotes = 0
+    while max_lotes is None or lotes < max_lotes:
+        procesadas = archivar_lote(db, politica, progreso, tamaño)
+        if not procesadas:
+            progreso["completado"] = True
+            break
+        lotes += 1
+        logger.info("Lote %s: %s/%s filas (%.1f MB liberados)", progreso["lotes"], progreso["filas"], total,
+                    progreso["bytes"] / 1024 / 1024)
+        time.sleep(pausa)
+    if progreso["completado"] and progreso["lotes"]:
+        _guardar(os.path.join(politica.directorio, "progreso.json"), json.dumps(progreso, indent=2).encode("utf-8"))
+        db.add(EventoSistema(
+            accion=f"Archivo de {politica.nombre}: {progreso['filas']} filas",
+            tabla_afectada=politica.modelo.__tablename__,
+            datos_nuevos=progreso,
+        ))
+        db.commit()
+    return progreso
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    import database
+
+    parser = argparse.ArgumentParser(description="Archivar y depurar inscripciones y videos antiguos")
+    parser.add_argument("--politica", choices=POLITICAS, required=True)
+    parser.add_argument("--dias", type=int, default=DIAS_ARCHIVO, help="antigüedad mínima (rechazadas, videos)")
+    parser.add_argument("--antes-de", type=datetime.fromisoformat, help="fecha de corte de la temporada")
+    parser.add_argument("--lote", type=int, default=TAMAÑO_LOTE_ARCHIVO)
+    parser.add_argument("--pausa", type=float, default=PAUSA_ARCHIVO, help="segundos entre lotes")
+    parser.add_argument("--max-lotes", type=int, help="detenerse después de N lotes (se reanuda después)")
+    parser.add_argument("--dry-run", action="store_true", help="solo estimar filas y bytes liberados")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    try:
+        politica = Politica(args.politica, args.dias, args.antes_de)
+    except ValueError as e:
+        parser.error(str(e))
+
+    db = database.SessionLocal()
+    try:
+        if args.dry_run:
+            print(json.dumps(estimar(db, politica), indent=2))
+            return
+        progreso = archivar(db, politica, args.lote, args.pausa, args.max_lotes)
+        estado = "completado" if progreso["completado"] else "interrumpido (se puede reanudar)"
+        print(f"{progreso['filas']} filas en {progreso['lotes']} lotes, "
+              f"{progreso['bytes'] / 1024 / 1024:.1f} MB liberados: {estado}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
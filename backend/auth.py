@@ -106,4 +106,13 @@ async def get_current_admin_or_jurado_user(current_user: Usuario = Depends(get_c
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def get_current_jurado_user(current_user: Usuario = Depends(get_current_user)) -> Usuario:
+    """Verificar que el usuario actual es jurado"""
+    if current_user.rol != "jurado":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return current_user
@@ -0,0 +1,101 @@
+"""
+Caché en proceso de datos de referencia (sedes y rondas).
+
+Cada caché guarda una instantánea serializada de la tabla completa y un
+contador de versión que incrementan los endpoints que la modifican. Las
+consultas con filtros se resuelven en memoria y las respuestas llevan un ETag
+fuerte derivado del contenido, de modo que una petición con If-None-Match
+vigente recibe 304 sin consultar la tabla ni enviar cuerpo.
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import desc
+from sqlalchemy.orm import Session, joinedload
+
+import models
+import schemas
+from respuestas import RespuestaJSON, codificar_json, formato_respuesta
+
+# Recarga periódica para que otros procesos (workers) vean los cambios
+TTL_CACHE_REFERENCIA = float(os.getenv("TTL_CACHE_REFERENCIA", "300"))
+
+
+class Instantanea:
+    """Filas serializadas de una tabla de referencia y su huella"""
+
+    def __init__(self, filas: List[dict], version: int):
+        self.filas = filas
+        self.version = version
+        self.huella = hashlib.sha256(codificar_json(filas)).hexdigest()[:16]
+        self.cargada_en = time.monotonic()
+
+
+class CacheReferencia:
+    """Instantánea versionada de una tabla de referencia"""
+
+    def __init__(self, nombre: str, cargar: Callable[[Session], List[dict]], ttl: float = TTL_CACHE_REFERENCIA):
+        self.nombre = nombre
+        self.version = 1
+        self._cargar = cargar
+        self._ttl = ttl
+        self._instantanea: Optional[Instantanea] = None
+        self._lock = threading.Lock()
+
+    def invalidar(self):
+        """Incrementar la versión; la siguiente lectura recarga la instantánea"""
+        with self._lock:
+            self.version += 1
+
+    def instantanea(self, db: Session) -> Instantanea:
+        actual = self._instantanea
+        if actual is not None and actual.version == self.version and time.monotonic() - actual.cargada_en < self._ttl:
+            return actual
+        with self._lock:
+            actual = self._instantanea
+            if actual is None or actual.version != self.version or time.monotonic() - actual.cargada_en >= self._ttl:
+                actual = Instantanea(self._cargar(db), self.version)
+                self._instantanea = actual
+            return actual
+
+    def etag(self, instantanea: Instantanea, clave_consulta: str) -> str:
+        consulta = hashlib.sha256(clave_consulta.encode()).hexdigest()[:8]
+        return f'"{self.nombre}-{instantanea.huella}-{consulta}-{formato_respuesta()}"'
+
+    def responder(
+        self,
+        request: Request,
+        db: Session,
+        clave_consulta: str,
+        filtrar: Callable[[List[dict]], List[dict]],
+    ) -> Response:
+        """Responder desde la instantánea: 304 si el ETag coincide, si no el listado filtrado"""
+        instantanea = self.instantanea(db)
+        etag = self.etag(instantanea, clave_consulta)
+        cabeceras = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            candidatos = {valor.strip() for valor in if_none_match.split(",")}
+            if etag in candidatos or "*" in candidatos:
+                return Response(status_code=304, headers=cabeceras)
+
+        return RespuestaJSON(filtrar(instantanea.filas), headers=cabeceras)
+
+
+def _cargar_sedes(db: Session) -> List[dict]:
+    sedes = db.query(models.Sede).order_by(models.Sede.nombre_sede).all()
+    return [schemas.Sede.model_validate(sede).model_dump(mode="json") for sede in sedes]
+
+
+def _cargar_rondas(db: Session) -> List[dict]:
+    rondas = db.query(models.Ronda).options(joinedload(models.Ronda.sede)).order_by(desc(models.Ronda.fecha)).all()
+    return [schemas.Ronda.model_validate(ronda).model_dump(mode="json") for ronda in rondas]
+
+
+cache_sedes = CacheReferencia("sedes", _cargar_sedes)
+cache_rondas = CacheReferencia("rondas", _cargar_rondas)
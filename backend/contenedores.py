@@ -0,0 +1,395 @@
+"""
+Lectura de metadatos de contenedores de video sin decodificar.
+
+Solo se leen las cabeceras del contenedor (cajas ISO BMFF de MP4/MOV,
+elementos EBML de WebM/Matroska y fragmentos RIFF de AVI) saltando los datos
+multimedia con seek, de modo que el costo no depende del tamaño del archivo.
+"""
+import io
+import os
+import struct
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+# Límite de bytes que se leen de una caja/elemento de cabecera (moov, Tracks...)
+TAMAÑO_MAXIMO_CABECERA = 32 * 1024 * 1024
+
+# Familia de contenedor que corresponde a cada extensión declarada
+FAMILIAS_POR_EXTENSION = {
+    "mp4": "isobmff", "m4v": "isobmff", "mov": "isobmff", "3gp": "isobmff",
+    "webm": "matroska", "mkv": "matroska",
+    "avi": "riff",
+}
+
+FAMILIAS_POR_TIPO_CONTENIDO = {
+    "video/mp4": "isobmff", "video/quicktime": "isobmff", "video/3gpp": "isobmff", "video/x-m4v": "isobmff",
+    "video/webm": "matroska", "video/x-matroska": "matroska",
+    "video/x-msvideo": "riff", "video/avi": "riff",
+}
+
+
+class ContenedorInvalido(Exception):
+    """El archivo no es un contenedor de video reconocible o no coincide con el declarado"""
+
+
+class MetadatosVideo:
+    """Datos de un video obtenidos de las cabeceras del contenedor"""
+
+    def __init__(self, familia: str, formato: str, duracion_ms: Optional[int] = None,
+                 ancho: Optional[int] = None, alto: Optional[int] = None, codec: Optional[str] = None):
+        self.familia = familia
+        self.formato = formato
+        self.duracion_ms = duracion_ms
+        self.ancho = ancho
+        self.alto = alto
+        self.codec = codec
+
+    @property
+    def duracion_segundos(self) -> Optional[int]:
+        if self.duracion_ms is None:
+            return None
+        return int(round(self.duracion_ms / 1000))
+
+    def __repr__(self):
+        return (f"MetadatosVideo(formato={self.formato!r}, duracion_ms={self.duracion_ms}, "
+                f"ancho={self.ancho}, alto={self.alto}, codec={self.codec!r})")
+
+
+def _tamaño(archivo: BinaryIO) -> int:
+    actual = archivo.tell()
+    archivo.seek(0, os.SEEK_END)
+    tamaño = archivo.tell()
+    archivo.seek(actual)
+    return tamaño
+
+
+def _leer(archivo: BinaryIO, offset: int, n: int) -> bytes:
+    archivo.seek(offset)
+    return archivo.read(n)
+
+
+# -----------------------------------------------------------------------------
+# ISO BMFF (MP4 / MOV)
+# -----------------------------------------------------------------------------
+
+CONTENEDORES_BMFF = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+
+def _cajas(datos: bytes, inicio: int = 0, fin: Optional[int] = None) -> Iterator[Tuple[bytes, int, int]]:
+    """Recorrer cajas de un buffer: (tipo, inicio del contenido, fin)"""
+    fin = len(datos) if fin is None else fin
+    posicion = inicio
+    while posicion + 8 <= fin:
+        tamaño, tipo = struct.unpack_from(">I4s", datos, posicion)
+        cabecera = 8
+        if tamaño == 1:
+            if posicion + 16 > fin:
+                return
+            tamaño = struct.unpack_from(">Q", datos, posicion + 8)[0]
+            cabecera = 16
+        elif tamaño == 0:
+            tamaño = fin - posicion
+        if tamaño < cabecera or posicion + tamaño > fin:
+            raise ContenedorInvalido(f"Caja '{tipo.decode('latin-1')}' truncada")
+        yield tipo, posicion + cabecera, posicion + tamaño
+        posicion += tamaño
+
+
+def _cajas_archivo(archivo: BinaryIO, tamaño_archivo: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Recorrer las cajas de primer nivel saltando su contenido con seek"""
+    posicion = 0
+    while posicion + 8 <= tamaño_archivo:
+        cabecera = _leer(archivo, posicion, 16)
+        tamaño, tipo = struct.unpack_from(">I4s", cabecera)
+        inicio = 8
+        if tamaño == 1:
+            tamaño = struct.unpack_from(">Q", cabecera, 8)[0]
+            inicio = 16
+        elif tamaño == 0:
+            tamaño = tamaño_archivo - posicion
+        if tamaño < inicio:
+            raise ContenedorInvalido("Caja de tamaño inválido")
+        yield tipo, posicion + inicio, min(posicion + tamaño, tamaño_archivo)
+        posicion += tamaño
+
+
+def _analizar_trak(moov: bytes, inicio: int, fin: int) -> Tuple[Optional[bytes], Optional[str], int, int]:
+    """(tipo de manejador, códec, ancho, alto) de una pista"""
+    manejador = codec = None
+    ancho = alto = 0
+    pendientes = [(b"trak", inicio, fin)]
+    while pendientes:
+        padre, desde, hasta = pendientes.pop()
+        for tipo, contenido, final in _cajas(moov, desde, hasta):
+            if tipo in CONTENEDORES_BMFF:
+                pendientes.append((tipo, contenido, final))
+            elif tipo == b"hdlr" and padre == b"mdia" and final - contenido >= 12:
+                # En MOV minf también tiene un hdlr (de datos); el de la pista es el de mdia
+                manejador = moov[contenido + 8:contenido + 12]
+            elif tipo == b"stsd" and final - contenido >= 16:
+                # version/flags(4) + entradas(4) + primera entrada: tamaño(4) + formato(4)
+                codec = moov[contenido + 12:contenido + 16].decode("latin-1").strip()
+                entrada = contenido + 8
+                if final - entrada >= 36:
+                    ancho, alto = struct.unpack_from(">HH", moov, entrada + 32)
+            elif tipo == b"tkhd" and not ancho and final - contenido >= 84:
+                version = moov[contenido]
+                desplazamiento = contenido + (88 if version == 1 else 76)
+                if desplazamiento + 8 <= final:
+                    ancho, alto = (valor >> 16 for valor in struct.unpack_from(">II", moov, desplazamiento))
+    return manejador, codec, ancho, alto
+
+
+def _analizar_isobmff(archivo: BinaryIO, tamaño_archivo: int) -> MetadatosVideo:
+    formato = "mp4"
+    metadatos = None
+    for tipo, inicio, fin in _cajas_archivo(archivo, tamaño_archivo):
+        if tipo == b"ftyp":
+            marca = _leer(archivo, inicio, 4)
+            formato = "mov" if marca == b"qt  " else "mp4"
+        elif tipo == b"moov":
+            if fin - inicio > TAMAÑO_MAXIMO_CABECERA:
+                raise ContenedorInvalido("Caja moov demasiado grande")
+            moov = _leer(archivo, inicio, fin - inicio)
+            metadatos = MetadatosVideo("isobmff", formato)
+            for caja, contenido, final in _cajas(moov):
+                if caja == b"mvhd" and final - contenido >= 20:
+                    version = moov[contenido]
+                    if version == 1:
+                        escala, duracion = struct.unpack_from(">IQ", moov, contenido + 20)
+                    else:
+                        escala, duracion = struct.unpack_from(">II", moov, contenido + 12)
+                    if escala and duracion not in (0xFFFFFFFF, 0xFFFFFFFFFFFFFFFF):
+                        metadatos.duracion_ms = duracion * 1000 // escala
+                elif caja == b"trak":
+                    manejador, codec, ancho, alto = _analizar_trak(moov, contenido, final)
+                    if manejador == b"vide" and metadatos.codec is None:
+                        metadatos.codec, metadatos.ancho, metadatos.alto = codec, ancho or None, alto or None
+            break
+    if metadatos is None:
+        raise ContenedorInvalido("El archivo MP4/MOV no tiene caja moov")
+    return metadatos
+
+
+# -----------------------------------------------------------------------------
+# EBML (WebM / Matroska)
+# -----------------------------------------------------------------------------
+
+EBML_CABECERA = 0x1A45DFA3
+EBML_DOCTYPE = 0x4282
+MKV_SEGMENTO = 0x18538067
+MKV_INFO = 0x1549A966
+MKV_ESCALA_TIEMPO = 0x2AD7B1
+MKV_DURACION = 0x4489
+MKV_PISTAS = 0x1654AE6B
+MKV_PISTA = 0xAE
+MKV_TIPO_PISTA = 0x83
+MKV_CODEC = 0x86
+MKV_VIDEO = 0xE0
+MKV_ANCHO = 0xB0
+MKV_ALTO = 0xBA
+MKV_CLUSTER = 0x1F43B675
+
+
+def _vint(datos: bytes, posicion: int, marcador: bool) -> Tuple[int, int]:
+    """Entero de longitud variable EBML: (valor, bytes usados); -1 si el tamaño es desconocido"""
+    if posicion >= len(datos):
+        raise ContenedorInvalido("Elemento EBML truncado")
+    primero = datos[posicion]
+    longitud = 1
+    while longitud <= 8 and not primero & (0x80 >> (longitud - 1)):
+        longitud += 1
+    if longitud > 8 or posicion + longitud > len(datos):
+        raise ContenedorInvalido("Entero EBML inválido")
+    valor = primero if marcador else primero & (0xFF >> longitud)
+    for byte in datos[posicion + 1:posicion + longitud]:
+        valor = (valor << 8) | byte
+    if not marcador and valor == (1 << (7 * longitud)) - 1:
+        valor = -1
+    return valor, longitud
+
+
+def _elementos(datos: bytes, inicio: int = 0, fin: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+    """Recorrer elementos EBML de un buffer: (id, inicio del contenido, fin)"""
+    fin = len(datos) if fin is None else fin
+    posicion = inicio
+    while posicion < fin:
+        identificador, n = _vint(datos, posicion, True)
+        tamaño, m = _vint(datos, posicion + n, False)
+        contenido = posicion + n + m
+        final = fin if tamaño < 0 else min(contenido + tamaño, fin)
+        yield identificador, contenido, final
+        posicion = final
+
+
+def _entero(datos: bytes) -> int:
+    return int.from_bytes(datos, "big")
+
+
+def _cabecera_elemento(archivo: BinaryIO, posicion: int) -> Tuple[int, int, int]:
+    cabecera = _leer(archivo, posicion, 12)
+    identificador, n = _vint(cabecera, 0, True)
+    tamaño, m = _vint(cabecera, n, False)
+    return identificador, posicion + n + m, tamaño
+
+
+def _analizar_matroska(archivo: BinaryIO, tamaño_archivo: int) -> MetadatosVideo:
+    identificador, inicio, tamaño = _cabecera_elemento(archivo, 0)
+    if tamaño < 0:
+        raise ContenedorInvalido("Cabecera EBML de tamaño desconocido")
+    cabecera = _leer(archivo, inicio, min(tamaño, 4096))
+    formato = "mkv"
+    for elemento, contenido, final in _elementos(cabecera):
+        if elemento == EBML_DOCTYPE:
+            formato = "webm" if cabecera[contenido:final].rstrip(b"\0") == b"webm" else "mkv"
+    metadatos = MetadatosVideo("matroska", formato)
+
+    identificador, segmento, tamaño = _cabecera_elemento(archivo, inicio + tamaño)
+    if identificador != MKV_SEGMENTO:
+        raise ContenedorInvalido("Matroska sin segmento")
+    fin_segmento = tamaño_archivo if tamaño < 0 else min(segmento + tamaño, tamaño_archivo)
+
+    escala = 1_000_000
+    duracion = None
+    posicion = segmento
+    # Info y Tracks preceden a los clusters; al llegar al primer cluster se termina
+    while posicion < fin_segmento:
+        identificador, contenido, tamaño = _cabecera_elemento(archivo, posicion)
+        if identificador == MKV_CLUSTER or tamaño < 0:
+            break
+        if identificador in (MKV_INFO, MKV_PISTAS):
+            if tamaño > TAMAÑO_MAXIMO_CABECERA:
+                raise ContenedorInvalido("Elemento de cabecera demasiado grande")
+            datos = _leer(archivo, contenido, tamaño)
+            if identificador == MKV_INFO:
+                for elemento, desde, hasta in _elementos(datos):
+                    if elemento == MKV_ESCALA_TIEMPO:
+                        escala = _entero(datos[desde:hasta])
+                    elif elemento == MKV_DURACION:
+                        duracion = struct.unpack(">f" if hasta - desde == 4 else ">d", datos[desde:hasta])[0]
+            else:
+                for elemento, desde, hasta in _elementos(datos):
+                    if elemento != MKV_PISTA:
+                        continue
+                    tipo = codec = None
+                    ancho = alto = None
+                    for campo, a, b in _elementos(datos, desde, hasta):
+                        if campo == MKV_TIPO_PISTA:
+                            tipo = _entero(datos[a:b])
+                        elif campo == MKV_CODEC:
+                            codec = datos[a:b].rstrip(b"\0").decode("ascii", "replace")
+                        elif campo == MKV_VIDEO:
+                            for dimension, c, d in _elementos(datos, a, b):
+                                if dimension == MKV_ANCHO:
+                                    ancho = _entero(datos[c:d])
+                                elif dimension == MKV_ALTO:
+                                    alto = _entero(datos[c:d])
+                    if tipo == 1 and metadatos.codec is None:
+                        metadatos.codec, metadatos.ancho, metadatos.alto = codec, ancho, alto
+        posicion = contenido + tamaño
+
+    if duracion is not None:
+        metadatos.duracion_ms = int(duracion * escala / 1_000_000)
+    return metadatos
+
+
+# -----------------------------------------------------------------------------
+# RIFF (AVI)
+# -----------------------------------------------------------------------------
+
+def _fragmentos(datos: bytes, inicio: int, fin: int) -> Iterator[Tuple[bytes, int, int]]:
+    posicion = inicio
+    while posicion + 8 <= fin:
+        tipo, tamaño = struct.unpack_from("<4sI", datos, posicion)
+        contenido = posicion + 8
+        yield tipo, contenido, min(contenido + tamaño, fin)
+        posicion = contenido + tamaño + (tamaño & 1)
+
+
+def _analizar_avi(archivo: BinaryIO, tamaño_archivo: int) -> MetadatosVideo:
+    metadatos = MetadatosVideo("riff", "avi")
+    posicion = 12
+    while posicion + 12 <= tamaño_archivo:
+        tipo, tamaño = struct.unpack("<4sI", _leer(archivo, posicion, 8))
+        if tipo == b"LIST" and _leer(archivo, posicion + 8, 4) == b"hdrl":
+            if tamaño > TAMAÑO_MAXIMO_CABECERA:
+                raise ContenedorInvalido("Cabecera AVI demasiado grande")
+            hdrl = _leer(archivo, posicion + 12, tamaño - 4)
+            for fragmento, contenido, final in _fragmentos(hdrl, 0, len(hdrl)):
+                if fragmento == b"avih" and final - contenido >= 40:
+                    microsegundos, = struct.unpack_from("<I", hdrl, contenido)
+                    cuadros, = struct.unpack_from("<I", hdrl, contenido + 16)
+                    metadatos.ancho, metadatos.alto = struct.unpack_from("<II", hdrl, contenido + 32)
+                    metadatos.duracion_ms = microsegundos * cuadros // 1000
+                elif fragmento == b"LIST" and hdrl[contenido:contenido + 4] == b"strl":
+                    for sub, a, b in _fragmentos(hdrl, contenido + 4, final):
+                        if sub == b"strh" and hdrl[a:a + 4] == b"vids" and metadatos.codec is None:
+                            metadatos.codec = hdrl[a + 4:a + 8].decode("latin-1").strip("\0 ") or None
+            return metadatos
+        posicion += 8 + tamaño + (tamaño & 1)
+    raise ContenedorInvalido("AVI sin cabecera hdrl")
+
+
+# -----------------------------------------------------------------------------
+# API
+# -----------------------------------------------------------------------------
+
+def detectar_familia(inicio: bytes) -> Optional[str]:
+    """Familia del contenedor según los primeros bytes"""
+    if inicio[4:8] in (b"ftyp", b"moov", b"mdat", b"free", b"wide", b"skip"):
+        return "isobmff"
+    if inicio[:4] == b"\x1a\x45\xdf\xa3":
+        return "matroska"
+    if inicio[:4] == b"RIFF" and inicio[8:12] == b"AVI ":
+        return "riff"
+    return None
+
+
+def analizar(archivo: BinaryIO) -> MetadatosVideo:
+    """Extraer formato, duración, resolución y códec leyendo solo las cabeceras"""
+    tamaño_archivo = _tamaño(archivo)
+    familia = detectar_familia(_leer(archivo, 0, 12))
+    try:
+        if familia == "isobmff":
+            return _analizar_isobmff(archivo, tamaño_archivo)
+        if familia == "matroska":
+            return _analizar_matroska(archivo, tamaño_archivo)
+        if familia == "riff":
+            return _analizar_avi(archivo, tamaño_archivo)
+    except struct.error:
+        raise ContenedorInvalido("Cabecera de contenedor truncada")
+    raise ContenedorInvalido("Formato de video no reconocido. Use MP4, MOV, WebM, MKV o AVI.")
+
+
+def analizar_bytes(contenido: bytes) -> MetadatosVideo:
+    return analizar(io.BytesIO(contenido))
+
+
+def analizar_ruta(ruta: str) -> MetadatosVideo:
+    with open(ruta, "rb") as archivo:
+        return analizar(archivo)
+
+
+def _familias_declaradas(nombre_archivo: Optional[str], tipo_contenido: Optional[str]) -> set:
+    extension = os.path.splitext(nombre_archivo or "")[1].lstrip(".").lower()
+    declaradas = {FAMILIAS_POR_EXTENSION.get(extension), FAMILIAS_POR_TIPO_CONTENIDO.get((tipo_contenido or "").lower())}
+    declaradas.discard(None)
+    return declaradas
+
+
+def verificar_declarado(metadatos: MetadatosVideo, nombre_archivo: Optional[str], tipo_contenido: Optional[str]):
+    """Rechazar archivos cuyo contenido no corresponde a la extensión o Content-Type declarados"""
+    declaradas = _familias_declaradas(nombre_archivo, tipo_contenido)
+    if declaradas and metadatos.familia not in declaradas:
+        raise ContenedorInvalido(
+            f"El contenido es {metadatos.formato.upper()} pero se declaró {nombre_archivo or tipo_contenido}"
+        )
+
+
+def verificar_inicio(inicio: bytes, nombre_archivo: Optional[str], tipo_contenido: Optional[str]):
+    """Comprobación temprana con los primeros bytes (p. ej. la primera parte de una subida)"""
+    familia = detectar_familia(inicio)
+    if familia is None:
+        raise ContenedorInvalido("Formato de video no reconocido. Use MP4, MOV, WebM, MKV o AVI.")
+    declaradas = _familias_declaradas(nombre_archivo, tipo_contenido)
+    if declaradas and familia not in declaradas:
+        raise ContenedorInvalido(f"El contenido no corresponde al formato declarado ({nombre_archivo or tipo_contenido})")
@@ -0,0 +1,202 @@
+"""
+Cubo en memoria de inscripciones: (estado, municipio, sede_id, categoria, estatus) -> conteo.
+
+El panel pide desgloses arbitrarios (por estado, bajar a municipio y sede,
+cruzar con categoría y estatus). En lugar de un GROUP BY por cada desglose,
+cada proceso mantiene el cubo completo (pocas miles de celdas) y responde
+cualquier agregación o corte con pandas sobre esas celdas, sin consultar la
+base.
+
+Mantenimiento incremental: además de las celdas se guarda, por inscripción,
+el código de su celda (ids ordenados en un arreglo numpy y códigos int32,
+~40 bytes por inscripción). Cada INTERVALO_REFRESCO_CUBO segundos se leen
+solo las inscripciones con fecha_actualizacion reciente (índice
+idx_inscripciones_actualizacion), se resta su celda anterior y se suma la
+nueva. La marca de cada refresco es la hora del servidor de base de datos al
+empezarlo (no la fecha más reciente leída: hay filas escritas con
+datetime.utcnow() que la adelantarían horas). Reprocesar una fila ya aplicada
+no cambia nada, así que el refresco relee un margen hacia atrás para no
+perder transacciones que confirman tarde. Los borrados y los cambios de estado de una sede se reflejan en la
+reconstrucción completa (RECONSTRUIR_CUBO_SEGUNDOS o al cambiar las sedes).
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+import series_tiempo
+from cache_referencia import cache_sedes
+from models import Inscripcion, Sede
+
+INTERVALO_REFRESCO_CUBO = float(os.getenv("INTERVALO_REFRESCO_CUBO", "5"))
+RECONSTRUIR_CUBO_SEGUNDOS = float(os.getenv("RECONSTRUIR_CUBO_SEGUNDOS", "900"))
+MARGEN_REFRESCO_CUBO = timedelta(seconds=60)
+TAMAÑO_LOTE_CUBO = 50000
+
+# Jerarquía geográfica y dimensiones planas, en el orden de las celdas
+DIMENSIONES = ("estado", "municipio", "sede_id", "categoria", "estatus")
+
+
+class Instantanea:
+    """Celdas del cubo con conteo > 0, inmutable: las consultas no toman el lock"""
+
+    def __init__(self, celdas: pd.DataFrame, actualizado: datetime):
+        self.celdas = celdas
+        self.actualizado = actualizado
+
+
+class CuboInscripciones:
+    """Cubo de conteos de inscripciones por estado, municipio, sede, categoría y estatus"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instantanea: Optional[Instantanea] = None
+        self._ids = np.array([], dtype="S36")
+        self._codigos = np.array([], dtype=np.int32)
+        self._conteos = np.array([], dtype=np.int64)
+        self._celdas: List[tuple] = []
+        self._codigo_celda: Dict[tuple, int] = {}
+        self._estados: Dict[int, str] = {}
+        self._marca: Optional[datetime] = None
+        self._version_sedes = None
+        self._construido_en = 0.0
+        self._refrescado_en = 0.0
+
+    def invalidar(self):
+        """Forzar una reconstrucción completa en la siguiente consulta"""
+        self._construido_en = 0.0
+
+    def instantanea(self, db: Session) -> Instantanea:
+        ahora = time.monotonic()
+        if self._instantanea is not None and ahora - self._refrescado_en < INTERVALO_REFRESCO_CUBO:
+            return self._instantanea
+        with self._lock:
+            ahora = time.monotonic()
+            if (self._instantanea is None or ahora - self._construido_en >= RECONSTRUIR_CUBO_SEGUNDOS
+                    or self._version_sedes != cache_sedes.version):
+                self._reconstruir(db)
+            elif ahora - self._refrescado_en >= INTERVALO_REFRESCO_CUBO:
+                self._refrescar(db)
+            return self._instantanea
+
+    def _codigo(self, sede_id: Optional[int], municipio: str, categoria, estatus) -> int:
+        celda = (
+            self._estados.get(sede_id, ""), municipio, sede_id or 0,
+            categoria.value if categoria else "", estatus.value if estatus else "",
+        )
+        codigo = self._codigo_celda.get(celda)
+        if codigo is None:
+            codigo = self._codigo_celda[celda] = len(self._celdas)
+            self._celdas.append(celda)
+        return codigo
+
+    def _leer(self, filas) -> tuple:
+        ids, codigos = [], []
+        for id_, municipio, sede_id, categoria, estatus in filas:
+            ids.append(id_)
+            codigos.append(self._codigo(sede_id, municipio, categoria, estatus))
+        return np.array(ids, dtype="S36"), np.array(codigos, dtype=np.int32)
+
+    def _consulta(self, db: Session):
+        return db.query(
+            Inscripcion.id, Inscripcion.municipio, Inscripcion.sede_id, Inscripcion.categoria,
+            Inscripcion.estatus
+        )
+
+    def _reconstruir(self, db: Session):
+        self._version_sedes = cache_sedes.version
+        self._estados = dict(db.query(Sede.id, Sede.estado))
+        self._celdas, self._codigo_celda = [], {}
+        marca = series_tiempo.ahora(db)
+        ids, codigos = self._leer(self._consulta(db).yield_per(TAMAÑO_LOTE_CUBO))
+        orden = np.argsort(ids, kind="stable")
+        self._ids, self._codigos = ids[orden], codigos[orden]
+        self._conteos = np.bincount(self._codigos, minlength=len(self._celdas)).astype(np.int64)
+        self._marca = marca
+        self._construido_en = self._refrescado_en = time.monotonic()
+        self._publicar()
+
+    def _refrescar(self, db: Session):
+        marca = series_tiempo.ahora(db)
+        consulta = self._consulta(db)
+        if self._marca is not None:
+            consulta = consulta.filter(Inscripcion.fecha_actualizacion >= self._marca - MARGEN_REFRESCO_CUBO)
+        ids, codigos = self._leer(consulta)
+        self._refrescado_en = time.monotonic()
+        self._marca = marca
+        if not len(ids):
+            return
+        self._conteos = np.concatenate([
+            self._conteos, np.zeros(len(self._celdas) - len(self._conteos), dtype=np.int64)
+        ])
+        if len(self._ids):
+            posiciones = np.searchsorted(self._ids, ids)
+            acotadas = np.minimum(posiciones, len(self._ids) - 1)
+            existentes = (posiciones < len(self._ids)) & (self._ids[acotadas] == ids)
+        else:
+            posiciones, existentes = np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+
+        # Mover las inscripciones existentes de su celda anterior a la nueva
+        anteriores = self._codigos[posiciones[existentes]]
+        np.subtract.at(self._conteos, anteriores, 1)
+        np.add.at(self._conteos, codigos[existentes], 1)
+        self._codigos[posiciones[existentes]] = codigos[existentes]
+
+        # Agregar las nuevas manteniendo los ids ordenados
+        nuevas = ~existentes
+        if nuevas.any():
+            np.add.at(self._conteos, codigos[nuevas], 1)
+            todos = np.concatenate([self._ids, ids[nuevas]])
+            orden = np.argsort(todos, kind="stable")
+            self._ids = todos[orden]
+            self._codigos = np.concatenate([self._codigos, codigos[nuevas]])[orden]
+
+        self._publicar()
+
+    def _publicar(self):
+        celdas = pd.DataFrame(self._celdas, columns=list(DIMENSIONES))
+        for dimension in ("estado", "municipio", "categoria", "estatus"):
+            celdas[dimension] = celdas[dimension].astype("category")
+        celdas["conteo"] = self._conteos[:len(celdas)]
+        self._instantanea = Instantanea(celdas[celdas["conteo"] > 0].reset_index(drop=True), datetime.utcnow())
+
+
+def consultar(instantanea: Instantanea, por: Sequence[str], filtros: Dict[str, List]) -> dict:
+    """Agregar el cubo por las dimensiones `por` después de filtrar (corte) por valores de dimensión"""
+    celdas = instantanea.celdas
+    mascara = np.ones(len(celdas), dtype=bool)
+    for dimension, valores in filtros.items():
+        if valores:
+            mascara &= celdas[dimension].isin(valores).to_numpy()
+    seleccion = celdas[mascara]
+
+    if por:
+        agrupado = seleccion.groupby(list(por), observed=True, sort=False)["conteo"].sum()
+        agrupado = agrupado[agrupado > 0].sort_values(ascending=False).reset_index()
+        filas = [
+            {**{dimension: _valor(fila[dimension]) for dimension in por}, "conteo": int(fila["conteo"])}
+            for fila in agrupado.to_dict("records")
+        ]
+    else:
+        filas = []
+    return {
+        "por": list(por),
+        "total": int(seleccion["conteo"].sum()),
+        "celdas": filas,
+        "actualizado": instantanea.actualizado,
+    }
+
+
+def _valor(valor):
+    """'' y 0 representan 'sin sede' en el cubo; en la respuesta son null"""
+    if isinstance(valor, np.integer):
+        valor = int(valor)
+    return valor or None
+
+
+cubo_inscripciones = CuboInscripciones()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Cupos por sede: lugares reservados de inscripciones con sede, hasta Sede.capacidad.
+
+Contar las inscripciones de la sede y luego insertar deja pasar a dos
+registros simultáneos con el último lugar; bloquear la tabla serializaría
+todos los registros. En su lugar cada sede tiene un contador en cupos_sede y
+reservar es un único UPDATE condicional:
+
+    UPDATE cupos_sede SET reservados = reservados + 1
+    WHERE sede_id = :sede AND (capacidad = 0 OR reservados < capacidad)
+
+La base aplica el UPDATE de forma atómica sobre la fila de la sede: si afecta
+una fila hay lugar; si no, la inscripción queda en lista de espera
+(Inscripcion.lista_espera). Solo compiten entre sí los registros de la misma
+sede, y solo hasta el commit de la inscripción.
+
+Tienen lugar reservado las inscripciones con sede, fuera de la lista de espera
+y no rechazadas. Al rechazar una se libera su lugar y pasa la siguiente de la
+lista de espera (la más antigua); al aumentar la capacidad pasan tantas como
+lugares nuevos. capacidad 0 es "sin límite" (se cuentan las reservas igual).
+
+El contador de una sede se crea en su primer uso a partir de las inscripciones
+existentes; `python cupos.py --recalcular` lo vuelve a contar (p. ej. después
+de cargas masivas que no pasan por la API).
+"""
+import argparse
+from typing import List, Optional
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from database import upsert
+from models import CupoSede, EstatusInscripcion, Inscripcion, Sede
+
+
+def _con_lugar(sede_id: int):
+    """Condición de las inscripciones de la sede que ocupan un lugar"""
+    return (
+        Inscripcion.sede_id == sede_id,
+        Inscripcion.lista_espera.isnot(True),  # NULL en filas cargadas fuera de la API
+        Inscripcion.estatus != EstatusInscripcion.rechazado,
+    )
+
+
+def asegurar(db: Session, sede_id: int) -> bool:
+    """Crear el contador de la sede si no existe; False si la sede no existe"""
+    capacidad = db.query(Sede.capacidad).filter(Sede.id == sede_id).scalar()
+    if capacidad is None and not db.query(Sede.id).filter(Sede.id == sede_id).first():
+        return False
+    reservados = db.query(func.count(Inscripcion.id)).filter(*_con_lugar(sede_id)).scalar()
+    # Si otro proceso lo creó primero se conserva el suyo
+    upsert(db, CupoSede.__table__, [{"sede_id": sede_id, "capacidad": capacidad or 0, "reservados": reservados}],
+           ("sede_id",))
+    return True
+
+
+def _incrementar(db: Session, sede_id: int) -> int:
+    return db.execute(
+        update(CupoSede).where(
+            CupoSede.sede_id == sede_id,
+            or_(CupoSede.capacidad == 0, CupoSede.reservados < CupoSede.capacidad),
+        ).values(reservados=CupoSede.reservados + 1).execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def reservar(db: Session, sede_id: int) -> bool:
+    """Reservar un lugar en la sede (sin commit); False si está llena"""
+    if _incrementar(db, sede_id):
+        return True
+    existe = db.execute(select(CupoSede.sede_id).where(CupoSede.sede_id == sede_id)).first()
+    if existe:
+        return False
+    if not asegurar(db, sede_id):
+        return True  # sede inexistente: no hay cupo que controlar
+    return bool(_incrementar(db, sede_id))
+
+
+def _admitir_en_espera(db: Session, sede_id: int, maximo: Optional[int] = None) -> List[str]:
+    """Pasar inscripciones de la lista de espera mientras haya lugar; devuelve sus ids"""
+    admitidas = []
+    siguientes = db.query(Inscripcion).filter(
+        Inscripcion.sede_id == sede_id,
+        Inscripcion.lista_espera == True,
+        Inscripcion.estatus != EstatusInscripcion.rechazado,
+    ).order_by(Inscripcion.fecha_inscripcion, Inscripcion.id)
+    if maximo is not None:
+        siguientes = siguientes.limit(maximo)
+    for inscripcion in siguientes.with_for_update():
+        if not reservar(db, sede_id):
+            break
+        inscripcion.lista_espera = False
+        admitidas.append(inscripcion.id)
+    return admitidas
+
+
+def liberar(db: Session, sede_id: int, cantidad: int = 1) -> List[str]:
+    """Liberar lugares de la sede y admitir a los siguientes de la lista de espera (sin commit)"""
+    # max() de dos argumentos en SQLite es GREATEST() en MySQL
+    mayor = func.max if db.get_bind().dialect.name == "sqlite" else func.greatest
+    db.execute(
+        update(CupoSede).where(CupoSede.sede_id == sede_id).values(
+            reservados=mayor(CupoSede.reservados - cantidad, 0)
+        ).execution_options(synchronize_session=False)
+    )
+    return _admitir_en_espera(db, sede_id, cantidad)
+
+
+def ajustar_capacidad(db: Session, sede_id: int, capacidad: int) -> List[str]:
+    """Copiar la nueva capacidad al contador y admitir de la lista de espera los que quepan (sin commit)"""
+    if not asegurar(db, sede_id):
+        return []
+    db.execute(
+        update(CupoSede).where(CupoSede.sede_id == sede_id).values(capacidad=capacidad or 0)
+        .execution_options(synchronize_session=False)
+    )
+    return _admitir_en_espera(db, sede_id)
+
+
+def cambiar_estatus(db: Session, inscripcion: Inscripcion, nuevo) -> List[str]:
+    """Ajustar el cupo por el cambio de estatus de la inscripción (sin commit); devuelve los admitidos de la espera"""
+    anterior = EstatusInscripcion(inscripcion.estatus)
+    nuevo = EstatusInscripcion(nuevo)
+    if not inscripcion.sede_id or (anterior == EstatusInscripcion.rechazado) == (nuevo == EstatusInscripcion.rechazado):
+        return []
+    if nuevo == EstatusInscripcion.rechazado:
+        tenia_lugar = not inscripcion.lista_espera
+        inscripcion.lista_espera = False
+        return liberar(db, inscripcion.sede_id) if tenia_lugar else []
+    # Vuelve de rechazado: ocupa un lugar si lo hay, si no a la lista de espera
+    inscripcion.lista_espera = not reservar(db, inscripcion.sede_id)
+    return []
+
+
+def cambiar_sede(db: Session, inscripcion: Inscripcion, sede_id: Optional[int]) -> List[str]:
+    """Mover la inscripción a otra sede (sin commit): libera su lugar en la anterior y reserva en la nueva"""
+    if sede_id == inscripcion.sede_id:
+        return []
+    rechazada = EstatusInscripcion(inscripcion.estatus) == EstatusInscripcion.rechazado
+    admitidos = []
+    if inscripcion.sede_id and not rechazada and not inscripcion.lista_espera:
+        admitidos = liberar(db, inscripcion.sede_id)
+    inscripcion.sede_id = sede_id
+    # En la sede nueva ocupa un lugar si lo hay, si no pasa a su lista de espera
+    inscripcion.lista_espera = bool(sede_id) and not rechazada and not reservar(db, sede_id)
+    return admitidos
+
+
+def recalcular(db: Session, sede_id: Optional[int] = None) -> int:
+    """Volver a contar los lugares reservados de una sede o de todas (sin commit)"""
+    sedes = [sede_id] if sede_id else [fila.id for fila in db.query(Sede.id)]
+    for id_ in sedes:
+        capacidad = db.query(Sede.capacidad).filter(Sede.id == id_).scalar() or 0
+        reservados = db.query(func.count(Inscripcion.id)).filter(*_con_lugar(id_)).scalar()
+        upsert(db, CupoSede.__table__, [{"sede_id": id_, "capacidad": capacidad, "reservados": reservados}],
+               ("sede_id",), ("capacidad", "reservados"))
+    return len(sedes)
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    import database
+
+    parser = argparse.ArgumentParser(description="Mantener los contadores de cupo por sede")
+    parser.add_argument("--recalcular", action="store_true", help="volver a contar los lugares reservados")
+    parser.add_argument("--sede", type=int, help="solo esta sede")
+    args = parser.parse_args()
+    if not args.recalcular:
+        parser.print_help()
+        return
+
+    db = database.SessionLocal()
+    try:
+        sedes = recalcular(db, args.sede)
+        db.commit()
+        print(f"{sedes} sedes recalculadas")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
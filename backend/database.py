@@ -1,35 +1,86 @@
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import Table, create_engine, func, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+import importlib
 import os
-from dotenv import load_dotenv
+import threading
+from typing import List, Optional, Sequence
 
-load_dotenv()
+# El engine se crea en el primer uso (no al importar): importar los modelos, el
+# servidor o una herramienta de línea de comandos no abre conexiones. Las
+# variables de entorno (.env) las carga el punto de entrada (server.crear_app,
+# worker.py) antes de ese primer uso.
 
-# Configuración de la base de datos MySQL
-MYSQL_USER = os.getenv("MYSQL_USER", "root")
-MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "")
-MYSQL_HOST = os.getenv("MYSQL_HOST", "localhost")
-MYSQL_PORT = os.getenv("MYSQL_PORT", "3306")
-MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "karaoke_senso")
+def url_base_datos() -> str:
+    """URL de conexión: DATABASE_URL (p. ej. SQLite para benchmarks) o MySQL por partes"""
+    if os.getenv("DATABASE_URL"):
+        return os.environ["DATABASE_URL"]
+    # Configuración de la base de datos MySQL
+    usuario = os.getenv("MYSQL_USER", "root")
+    contraseña = os.getenv("MYSQL_PASSWORD", "")
+    host = os.getenv("MYSQL_HOST", "localhost")
+    puerto = os.getenv("MYSQL_PORT", "3306")
+    base = os.getenv("MYSQL_DATABASE", "karaoke_senso")
+    return f"mysql+pymysql://{usuario}:{contraseña}@{host}:{puerto}/{base}"
 
-# URL de conexión a MySQL
-DATABASE_URL = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+def crear_engine(url: str) -> Engine:
+    """Crear un engine de SQLAlchemy con la configuración de la aplicación"""
+    return create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        # SQLite: la sesión se usa desde el hilo del threadpool de FastAPI
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {},
+        echo=False  # Cambiar a True para debug SQL
+    )
 
-# Crear el engine de SQLAlchemy
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=False  # Cambiar a True para debug SQL
-)
+class _FabricaSesiones(sessionmaker):
+    """sessionmaker que crea el engine al abrir la primera sesión"""
 
-# Crear el sessionmaker
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None and "bind" not in local_kw:
+            get_engine()
+        return super().__call__(**local_kw)
+
+# Crear el sessionmaker (se enlaza al engine en configurar_engine)
+SessionLocal = _FabricaSesiones(autocommit=False, autoflush=False)
 
 # Base para los modelos
 Base = declarative_base()
 
+_engine: Optional[Engine] = None
+_lock_engine = threading.Lock()
+
+def get_engine() -> Engine:
+    """Engine de la aplicación; se crea en la primera llamada"""
+    if _engine is None:
+        with _lock_engine:
+            if _engine is None:
+                configurar_engine(crear_engine(url_base_datos()))
+    return _engine
+
+def configurar_engine(engine: Engine):
+    """Usar `engine` en toda la aplicación (pruebas, benchmarks, herramientas)"""
+    global _engine
+    _engine = engine
+    SessionLocal.configure(bind=engine)
+
+def cerrar_engine():
+    """Cerrar el pool de conexiones; el siguiente uso crea un engine nuevo"""
+    global _engine
+    with _lock_engine:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = None
+        SessionLocal.configure(bind=None)
+
+def __getattr__(nombre: str):
+    # Compatibilidad con `from database import engine`
+    if nombre == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
 # Dependencia para obtener la sesión de base de datos
 def get_db():
     db = SessionLocal()
@@ -38,13 +89,31 @@ def get_db():
     finally:
         db.close()
 
+def upsert(db: Session, tabla: Table, filas: List[dict], claves: Sequence[str], actualizar: Sequence[str] = (),
+           expresiones: Optional[dict] = None, sumar: Sequence[str] = ()):
+    """INSERT de varias filas; si ya existe la clave única reemplaza `actualizar`, suma `sumar` y aplica `expresiones`"""
+    dialecto = db.get_bind().dialect.name
+    insert = importlib.import_module(f"sqlalchemy.dialects.{dialecto}").insert
+    sentencia = insert(tabla).values(filas)
+    # ON DUPLICATE KEY UPDATE (MySQL) u ON CONFLICT DO UPDATE (SQLite, PostgreSQL)
+    nuevos = sentencia.inserted if dialecto == "mysql" else sentencia.excluded
+    valores = {columna: nuevos[columna] for columna in actualizar}
+    valores.update({columna: tabla.c[columna] + nuevos[columna] for columna in sumar})
+    valores.update(expresiones or {})
+    if "fecha_actualizacion" in tabla.c:
+        valores["fecha_actualizacion"] = func.now()
+    if dialecto == "mysql":
+        sentencia = sentencia.on_duplicate_key_update(valores)
+    else:
+        sentencia = sentencia.on_conflict_do_update(index_elements=list(claves), set_=valores)
+    db.execute(sentencia)
+
 # Función para probar la conexión
 def test_connection():
     try:
-        with engine.connect() as connection:
-            from sqlalchemy import text
+        with get_engine().connect() as connection:
             result = connection.execute(text("SELECT 1 as test"))
             return True
     except Exception as e:
         print(f"Error de conexión a la base de datos: {e}")
-        return False
\ No newline at end of file
+        return False
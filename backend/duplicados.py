@@ -0,0 +1,139 @@
+"""
+Detección de inscripciones duplicadas por claves de contacto normalizadas.
+
+Cada inscripción guarda un hash de su teléfono (solo dígitos, últimos 10),
+su correo (en minúsculas) y su nombre completo (sin acentos, sin signos, en
+minúsculas). Las columnas hash tienen índice, de modo que buscar duplicados
+al registrar es una búsqueda por índice en lugar de un recorrido de la tabla,
+y el reporte por lotes agrupa por hash.
+
+Coincidencias:
+    exacta    mismo nombre y mismo teléfono o correo (la misma persona)
+    posible   mismo teléfono o correo con otro nombre, o mismo nombre en el
+              mismo municipio con otro contacto (familiares, errores de captura)
+"""
+import hashlib
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from models import Inscripcion
+
+# Dígitos significativos de un teléfono (número nacional sin lada internacional)
+DIGITOS_TELEFONO = 10
+TAMAÑO_LOTE_REPORTE = 1000
+MAXIMO_GRUPOS_REPORTE = 500
+
+
+def normalizar_telefono(telefono: Optional[str]) -> Optional[str]:
+    """Solo dígitos, sin el prefijo de país ('+52 1 442-123-4567' -> '4421234567')"""
+    digitos = re.sub(r"\D", "", telefono or "")
+    return digitos[-DIGITOS_TELEFONO:] or None
+
+
+def normalizar_correo(correo: Optional[str]) -> Optional[str]:
+    return (correo or "").strip().lower() or None
+
+
+def normalizar_nombre(nombre: Optional[str]) -> Optional[str]:
+    """Sin acentos, sin signos y con espacios simples ('  José  Pérez-López' -> 'jose perez lopez')"""
+    sin_acentos = unicodedata.normalize("NFKD", nombre or "").encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", sin_acentos.casefold()).split()) or None
+
+
+def _hash(valor: Optional[str]) -> Optional[str]:
+    return hashlib.sha256(valor.encode()).hexdigest()[:32] if valor else None
+
+
+def claves_contacto(telefono: Optional[str], correo: Optional[str], nombre_completo: Optional[str]) -> Dict[str, Optional[str]]:
+    """Columnas hash de una inscripción"""
+    return {
+        "hash_telefono": _hash(normalizar_telefono(telefono)),
+        "hash_correo": _hash(normalizar_correo(correo)),
+        "hash_nombre": _hash(normalizar_nombre(nombre_completo)),
+    }
+
+
+def asignar_claves(inscripcion: Inscripcion):
+    """Recalcular las columnas hash a partir de los datos de contacto"""
+    for columna, valor in claves_contacto(inscripcion.telefono, inscripcion.correo, inscripcion.nombre_completo).items():
+        setattr(inscripcion, columna, valor)
+
+
+def buscar(db: Session, claves: Dict[str, Optional[str]], municipio: Optional[str] = None,
+           excluir_id: Optional[str] = None) -> List[dict]:
+    """Inscripciones que coinciden con las claves, de la más antigua a la más reciente"""
+    condiciones = [
+        getattr(Inscripcion, columna) == valor
+        for columna, valor in claves.items() if valor is not None
+    ]
+    if not condiciones:
+        return []
+    query = db.query(
+        Inscripcion.id, Inscripcion.municipio, Inscripcion.hash_telefono, Inscripcion.hash_correo,
+        Inscripcion.hash_nombre
+    ).filter(or_(*condiciones))
+    if excluir_id:
+        query = query.filter(Inscripcion.id != excluir_id)
+
+    coincidencias = []
+    for fila in query.order_by(Inscripcion.fecha_inscripcion).limit(50):
+        mismo_nombre = claves["hash_nombre"] is not None and fila.hash_nombre == claves["hash_nombre"]
+        mismo_contacto = (
+            (claves["hash_telefono"] is not None and fila.hash_telefono == claves["hash_telefono"])
+            or (claves["hash_correo"] is not None and fila.hash_correo == claves["hash_correo"])
+        )
+        if mismo_nombre and mismo_contacto:
+            coincidencias.append({"id": fila.id, "tipo": "exacta"})
+        elif mismo_contacto or (mismo_nombre and municipio and fila.municipio == municipio):
+            coincidencias.append({"id": fila.id, "tipo": "posible"})
+    # Las exactas primero
+    return sorted(coincidencias, key=lambda coincidencia: coincidencia["tipo"] != "exacta")
+
+
+def completar_claves(db: Session, lote: int = TAMAÑO_LOTE_REPORTE) -> int:
+    """Calcular las claves de las inscripciones que no las tienen (datos migrados o sembrados)"""
+    total = 0
+    ultimo_id = ""
+    while True:
+        filas = db.query(
+            Inscripcion.id, Inscripcion.telefono, Inscripcion.correo, Inscripcion.nombre_completo
+        ).filter(Inscripcion.hash_telefono.is_(None), Inscripcion.id > ultimo_id).order_by(
+            Inscripcion.id
+        ).limit(lote).all()
+        if not filas:
+            return total
+        db.bulk_update_mappings(Inscripcion, [
+            {"id": fila.id, **claves_contacto(fila.telefono, fila.correo, fila.nombre_completo)} for fila in filas
+        ])
+        db.commit()
+        total += len(filas)
+        ultimo_id = filas[-1].id
+
+
+def reporte(db: Session, maximo_grupos: int = MAXIMO_GRUPOS_REPORTE) -> dict:
+    """Grupos de inscripciones que comparten teléfono, correo o nombre y municipio"""
+    completadas = completar_claves(db)
+    grupos = []
+    resumen = {}
+    criterios = {
+        "telefono": (Inscripcion.hash_telefono,),
+        "correo": (Inscripcion.hash_correo,),
+        "nombre_municipio": (Inscripcion.hash_nombre, Inscripcion.municipio),
+    }
+    for criterio, columnas in criterios.items():
+        repetidos = db.query(*columnas, func.count(Inscripcion.id)).filter(
+            *(columna.isnot(None) for columna in columnas)
+        ).group_by(*columnas).having(func.count(Inscripcion.id) > 1).all()
+        resumen[criterio] = {"grupos": len(repetidos), "inscripciones": sum(fila[-1] for fila in repetidos)}
+        for fila in repetidos[:max(0, maximo_grupos - len(grupos))]:
+            ids = [
+                inscripcion.id for inscripcion in db.query(Inscripcion.id).filter(
+                    *(columna == valor for columna, valor in zip(columnas, fila[:-1]))
+                ).order_by(Inscripcion.fecha_inscripcion)
+            ]
+            grupos.append({"criterio": criterio, "original": ids[0], "duplicados": ids[1:]})
+    return {"claves_calculadas": completadas, "resumen": resumen, "grupos": grupos}
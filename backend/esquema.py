@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Verificación y creación del esquema de la base de datos.
+
+La aplicación ya no ejecuta create_all al importarse; el esquema se crea con
+este paso explícito (o al arrancar con VERIFICAR_ESQUEMA=crear).
+
+Uso:
+    python esquema.py             # reporta tablas, columnas e índices faltantes
+    python esquema.py --crear     # crea las tablas, columnas e índices faltantes
+"""
+import argparse
+import sys
+from typing import Dict, List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+
+class EsquemaIncompleto(RuntimeError):
+    """La base no tiene todas las tablas, columnas o índices de los modelos"""
+
+
+def diferencias(engine: Engine) -> Dict[str, List[str]]:
+    """Tablas, columnas e índices de los modelos que no existen en la base"""
+    import models
+
+    inspector = inspect(engine)
+    existentes = set(inspector.get_table_names())
+    faltantes = {"tablas": [], "columnas": [], "indices": []}
+    for tabla in models.Base.metadata.sorted_tables:
+        if tabla.name not in existentes:
+            faltantes["tablas"].append(tabla.name)
+            continue
+        columnas = {columna["name"] for columna in inspector.get_columns(tabla.name)}
+        faltantes["columnas"] += [f"{tabla.name}.{c.name}" for c in tabla.columns if c.name not in columnas]
+        indices = {indice["name"] for indice in inspector.get_indexes(tabla.name)}
+        faltantes["indices"] += [f"{tabla.name}.{i.name}" for i in tabla.indexes if i.name not in indices]
+    return faltantes
+
+
+def verificar(engine: Engine):
+    """Lanzar EsquemaIncompleto si faltan tablas, columnas o índices"""
+    faltantes = diferencias(engine)
+    if any(faltantes.values()):
+        raise EsquemaIncompleto(
+            "; ".join(f"{tipo} faltantes: {', '.join(nombres)}" for tipo, nombres in faltantes.items() if nombres)
+        )
+
+
+def _agregar_columnas(engine: Engine, columnas: List[str]):
+    """ALTER TABLE ... ADD COLUMN para las columnas nuevas de tablas existentes"""
+    import models
+
+    preparador = engine.dialect.identifier_preparer
+    with engine.begin() as conexion:
+        for nombre in columnas:
+            tabla_nombre, columna_nombre = nombre.split(".", 1)
+            tabla = models.Base.metadata.tables[tabla_nombre]
+            columna = tabla.c[columna_nombre]
+            definicion = CreateColumn(columna).compile(dialect=engine.dialect)
+            conexion.execute(text(f"ALTER TABLE {preparador.format_table(tabla)} ADD COLUMN {definicion}"))
+            if columna.unique:
+                # ADD COLUMN no acepta UNIQUE en todos los motores: índice único aparte
+                conexion.execute(text(
+                    f"CREATE UNIQUE INDEX {preparador.quote(f'uq_{tabla_nombre}_{columna_nombre}')} "
+                    f"ON {preparador.format_table(tabla)} ({preparador.quote(columna_nombre)})"
+                ))
+
+
+def crear(engine: Engine) -> Dict[str, List[str]]:
+    """Crear las tablas, columnas e índices faltantes; devuelve lo que faltaba"""
+    import models
+
+    faltantes = diferencias(engine)
+    models.Base.metadata.create_all(bind=engine)
+    # create_all no agrega columnas ni índices nuevos a tablas existentes
+    _agregar_columnas(engine, faltantes["columnas"])
+    existentes = inspect(engine)
+    pendientes = set(faltantes["indices"])
+    for tabla in models.Base.metadata.sorted_tables:
+        columnas = {columna["name"] for columna in existentes.get_columns(tabla.name)}
+        for indice in tabla.indexes:
+            # Un índice sobre una columna que sigue faltando fallaría: queda en el reporte
+            if f"{tabla.name}.{indice.name}" in pendientes and {c.name for c in indice.columns} <= columnas:
+                indice.create(bind=engine)
+    return faltantes
+
+
+def main():
+    from dotenv import load_dotenv
+
+    import database
+
+    parser = argparse.ArgumentParser(description="Verificar o crear el esquema de la base de datos")
+    parser.add_argument("--crear", action="store_true", help="crear tablas e índices faltantes")
+    args = parser.parse_args()
+
+    load_dotenv()
+    engine = database.get_engine()
+    if args.crear:
+        faltantes = crear(engine)
+        restantes = diferencias(engine)
+        if any(restantes.values()):
+            print(f"Esquema incompleto después de crear: {restantes}")
+            sys.exit(1)
+        print("Esquema creado" if any(faltantes.values()) else "El esquema ya estaba completo", faltantes)
+        return
+    faltantes = diferencias(engine)
+    if any(faltantes.values()):
+        print(f"Esquema incompleto: {faltantes}")
+        sys.exit(1)
+    print("Esquema completo")
+
+
+if __name__ == "__main__":
+    main()
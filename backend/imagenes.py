@@ -0,0 +1,112 @@
+"""
+Normalización de imágenes de comprobantes de pago.
+
+El procesamiento (decodificar, quitar EXIF, reducir, recomprimir y generar la
+miniatura) es CPU intensivo, así que no se hace en el handler HTTP: lo ejecutan
+los procesos de worker.py (trabajo comprobante.procesar, ver tareas.py).
+"""
+import base64
+import io
+import os
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+try:
+    import pillow_heif
+    pillow_heif.register_heif_opener()
+except ImportError:  # pragma: no cover - dependencia opcional
+    pillow_heif = None
+
+# Lado máximo (px) y tamaño máximo (bytes) de la imagen normalizada
+LADO_MAXIMO_COMPROBANTE = int(os.getenv("LADO_MAXIMO_COMPROBANTE", "1600"))
+BYTES_MAXIMOS_COMPROBANTE = int(os.getenv("BYTES_MAXIMOS_COMPROBANTE", str(400 * 1024)))
+LADO_MINIATURA = int(os.getenv("LADO_MINIATURA", "200"))
+
+# Tamaño máximo aceptado del archivo original
+TAMAÑO_MAXIMO_COMPROBANTE = 15 * 1024 * 1024
+
+CALIDADES_WEBP = (80, 70, 60, 50)
+
+
+class ImagenInvalida(Exception):
+    """El archivo no es una imagen soportada o está dañado"""
+
+
+def detectar_tipo(contenido: bytes) -> Optional[str]:
+    """Tipo de imagen según su firma (no según la extensión ni el Content-Type)"""
+    if contenido.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if contenido.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if contenido[:4] == b"RIFF" and contenido[8:12] == b"WEBP":
+        return "webp"
+    if contenido[4:8] == b"ftyp" and contenido[8:12] in (b"heic", b"heix", b"heim", b"heis", b"mif1", b"msf1"):
+        return "heic"
+    return None
+
+
+def _codificar_webp(imagen: Image.Image, calidad: int) -> bytes:
+    salida = io.BytesIO()
+    # Sin exif=: el archivo resultante no lleva metadatos EXIF
+    imagen.save(salida, format="WEBP", quality=calidad, method=4)
+    return salida.getvalue()
+
+
+def procesar_comprobante(contenido: bytes) -> dict:
+    """Validar, quitar EXIF, reducir y recomprimir; genera también la miniatura"""
+    tipo = detectar_tipo(contenido)
+    if tipo is None:
+        raise ImagenInvalida("Formato no soportado. Use JPEG, PNG, WebP o HEIC.")
+    if tipo == "heic" and pillow_heif is None:
+        raise ImagenInvalida("HEIC no soportado en este servidor")
+
+    try:
+        imagen = Image.open(io.BytesIO(contenido))
+        imagen.draft("RGB", (LADO_MAXIMO_COMPROBANTE, LADO_MAXIMO_COMPROBANTE))  # decodificación reducida de JPEG
+        imagen = ImageOps.exif_transpose(imagen)
+    except (OSError, Image.DecompressionBombError, SyntaxError) as e:
+        raise ImagenInvalida(f"Imagen dañada: {e}")
+
+    if imagen.mode in ("RGBA", "LA", "P"):
+        imagen = imagen.convert("RGBA")
+        fondo = Image.new("RGB", imagen.size, (255, 255, 255))
+        fondo.paste(imagen, mask=imagen.getchannel("A"))
+        imagen = fondo
+    elif imagen.mode != "RGB":
+        imagen = imagen.convert("RGB")
+
+    imagen.thumbnail((LADO_MAXIMO_COMPROBANTE, LADO_MAXIMO_COMPROBANTE), Image.LANCZOS)
+
+    # Bajar calidad y, si no basta, resolución hasta quedar bajo el límite
+    while True:
+        for calidad in CALIDADES_WEBP:
+            datos = _codificar_webp(imagen, calidad)
+            if len(datos) <= BYTES_MAXIMOS_COMPROBANTE:
+                break
+        if len(datos) <= BYTES_MAXIMOS_COMPROBANTE or max(imagen.size) <= 400:
+            break
+        imagen.thumbnail((int(imagen.width * 0.75), int(imagen.height * 0.75)), Image.LANCZOS)
+
+    miniatura = imagen.copy()
+    miniatura.thumbnail((LADO_MINIATURA, LADO_MINIATURA), Image.LANCZOS)
+
+    return {
+        "imagen": datos,
+        "miniatura": _codificar_webp(miniatura, 60),
+        "tipo_contenido": "image/webp",
+        "ancho": imagen.width,
+        "alto": imagen.height,
+        "tipo_original": tipo,
+    }
+
+
+def como_data_uri(datos: bytes, tipo_contenido: str) -> str:
+    return f"data:{tipo_contenido};base64,{base64.b64encode(datos).decode()}"
+
+
+def desde_data_uri(data_uri: str):
+    """Separar un data URI en (tipo_contenido, bytes)"""
+    cabecera, _, codificado = data_uri.partition(",")
+    tipo_contenido = cabecera[len("data:"):].split(";")[0] or "application/octet-stream"
+    return tipo_contenido, base64.b64decode(codificado)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Decimal, Enum, ForeignKey, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Boolean, DateTime, DECIMAL, Enum, ForeignKey, JSON, Index, UniqueConstraint
 from sqlalchemy.dialects.mysql import LONGTEXT
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -7,6 +7,9 @@ import enum
 from datetime import datetime
 from typing import Optional
 
+# Texto largo: LONGTEXT en MySQL, TEXT en otros motores (SQLite en pruebas y benchmarks)
+TextoLargo = Text().with_variant(LONGTEXT(), "mysql")
+
 # Enums para los campos
 class RolUsuario(str, enum.Enum):
     admin = "admin"
@@ -23,6 +26,18 @@ class CategoriaParticipante(str, enum.Enum):
     KOE_SAI = "KOE SAI"
     TSUKAMU_KOE = "TSUKAMU KOE"
 
+class EstadoTrabajo(str, enum.Enum):
+    pendiente = "pendiente"
+    en_proceso = "en_proceso"
+    completado = "completado"
+    fallido = "fallido"
+
+class EstadoNotificacion(str, enum.Enum):
+    pendiente = "pendiente"
+    enviando = "enviando"
+    enviada = "enviada"
+    fallida = "fallida"
+
 class TipoRonda(str, enum.Enum):
     clasificatoria = "clasificatoria"
     interseccion = "interseccion"
@@ -73,7 +88,9 @@ class Inscripcion(Base):
     nombre_artistico = Column(String(255), nullable=False)
     telefono = Column(String(20), nullable=False)
     correo = Column(String(255))
-    categoria = Column(Enum(CategoriaParticipante), nullable=False, default=CategoriaParticipante.KOE_SAN)
+    # Se guarda el valor ('KOE SAN'), como en database_schema.sql, no el nombre del miembro
+    categoria = Column(Enum(CategoriaParticipante, values_callable=lambda e: [m.value for m in e]),
+                       nullable=False, default=CategoriaParticipante.KOE_SAN)
     municipio = Column(String(100), nullable=False)
     sede_id = Column(Integer, ForeignKey("sedes.id"), nullable=True)
     sede = Column(String(255))  # Campo temporal para migración
@@ -81,12 +98,37 @@ class Inscripcion(Base):
     fecha_inscripcion = Column(DateTime(timezone=True), server_default=func.now())
     fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     observaciones = Column(Text)
-    comprobante_pago = Column(LONGTEXT)  # Base64
+    comprobante_pago = Column(TextoLargo)  # Base64 (WebP normalizado)
+    comprobante_miniatura = Column(Text)  # Data URI de la miniatura para revisión
+    # Claves de contacto normalizadas y hasheadas (ver duplicados.py)
+    hash_telefono = Column(String(32))
+    hash_correo = Column(String(32))
+    hash_nombre = Column(String(32))
+    posible_duplicado_de = Column(String(36))  # inscripción anterior con contacto o nombre coincidente
+    clave_idempotencia = Column(String(64), unique=True)  # cabecera Idempotency-Key del registro
+    lista_espera = Column(Boolean, default=False)  # sede llena al registrarse; sin cupo reservado (ver cupos.py)
     
     # Relaciones
     sede_obj = relationship("Sede", back_populates="inscripciones")
     resultados = relationship("Resultado", back_populates="inscrito")
     videos = relationship("Video", back_populates="inscrito")
+    
+    __table_args__ = (
+        # Filtros del listado de administración, ordenado por fecha de inscripción
+        Index("idx_inscripciones_estatus", "estatus", "fecha_inscripcion"),
+        Index("idx_inscripciones_categoria", "categoria", "fecha_inscripcion"),
+        Index("idx_inscripciones_sede", "sede_id", "fecha_inscripcion"),
+        Index("idx_inscripciones_fecha", "fecha_inscripcion"),
+        Index("idx_inscripciones_municipio", "municipio"),
+        # Refresco incremental del cubo de estadísticas (cubo.py)
+        Index("idx_inscripciones_actualizacion", "fecha_actualizacion"),
+        # Búsqueda de duplicados al registrar y reporte agrupado
+        Index("idx_inscripciones_hash_telefono", "hash_telefono"),
+        Index("idx_inscripciones_hash_correo", "hash_correo"),
+        Index("idx_inscripciones_hash_nombre", "hash_nombre", "municipio"),
+        # Siguiente en la lista de espera de una sede
+        Index("idx_inscripciones_espera", "sede_id", "lista_espera", "fecha_inscripcion"),
+    )
 
 # Modelo de Rondas
 class Ronda(Base):
@@ -113,7 +155,7 @@ class Resultado(Base):
     id = Column(Integer, primary_key=True, index=True)
     inscrito_id = Column(String(36), ForeignKey("inscripciones.id"), nullable=False)
     ronda_id = Column(Integer, ForeignKey("rondas.id"), nullable=False)
-    puntaje = Column(Decimal(5, 2), default=0.00)
+    puntaje = Column(DECIMAL(5, 2), default=0.00)
     posicion = Column(Integer)
     clasificado = Column(Boolean, default=False)
     observaciones = Column(Text)
@@ -123,6 +165,49 @@ class Resultado(Base):
     # Relaciones
     inscrito = relationship("Inscripcion", back_populates="resultados")
     ronda = relationship("Ronda", back_populates="resultados")
+    
+    __table_args__ = (
+        # Un resultado por inscrito y ronda (destino del upsert de puntajes.py)
+        UniqueConstraint("inscrito_id", "ronda_id", name="unique_inscrito_ronda"),
+        # Listados ordenados por puntaje, por ronda o por inscrito
+        Index("idx_resultados_ronda", "ronda_id", "puntaje"),
+        Index("idx_resultados_inscrito", "inscrito_id", "puntaje"),
+        Index("idx_resultados_puntaje", "puntaje"),
+    )
+
+# Modelo de Puntajes por jurado (Resultado.puntaje es su agregado)
+class PuntajeJurado(Base):
+    __tablename__ = "puntajes_jurado"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    ronda_id = Column(Integer, ForeignKey("rondas.id"), nullable=False)
+    inscrito_id = Column(String(36), ForeignKey("inscripciones.id"), nullable=False)
+    jurado_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    puntaje = Column(DECIMAL(5, 2), nullable=False)
+    version = Column(Integer, nullable=False, default=1)  # se incrementa en cada cambio (conflictos de sincronización)
+    fecha_captura = Column(DateTime(timezone=True), server_default=func.now())  # UTC; la del dispositivo si sincroniza
+    fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        # Un puntaje por jurado; (ronda_id, inscrito_id) es el prefijo que lee la agregación
+        UniqueConstraint("ronda_id", "inscrito_id", "jurado_id", name="unique_ronda_inscrito_jurado"),
+    )
+
+# Modelo de Operaciones de puntaje sincronizadas desde los dispositivos de jurado
+class OperacionPuntaje(Base):
+    __tablename__ = "operaciones_puntaje"
+    
+    op_id = Column(String(36), primary_key=True)  # generado en el dispositivo
+    dispositivo_id = Column(String(64), nullable=False)
+    secuencia = Column(BigInteger, nullable=False)
+    jurado_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    estado = Column(String(20), nullable=False)  # aplicada | conflicto
+    fecha_sincronizacion = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # Última secuencia sincronizada por dispositivo
+        Index("idx_operaciones_puntaje_dispositivo", "dispositivo_id", "secuencia"),
+    )
 
 # Modelo de Videos
 class Video(Base):
@@ -133,10 +218,13 @@ class Video(Base):
     titulo = Column(String(255))
     descripcion = Column(Text)
     url_video = Column(String(500))
-    video_data = Column(LONGTEXT)  # Base64
+    video_data = Column(TextoLargo)  # Base64
     duracion = Column(Integer)  # segundos
-    formato = Column(String(10))
-    tamaño_mb = Column(Decimal(8, 2))
+    formato = Column(String(10))  # tipo real del contenedor (mp4, mov, webm, mkv, avi)
+    ancho = Column(Integer)
+    alto = Column(Integer)
+    codec = Column(String(50))
+    tamaño_mb = Column(DECIMAL(8, 2))
     aprobado = Column(Boolean, default=False)
     destacado = Column(Boolean, default=False)
     fecha_subida = Column(DateTime(timezone=True), server_default=func.now())
@@ -145,6 +233,129 @@ class Video(Base):
     
     # Relaciones
     inscrito = relationship("Inscripcion", back_populates="videos")
+    
+    __table_args__ = (
+        # Cola de revisión ordenada por fecha de subida
+        Index("idx_videos_aprobado", "aprobado", "fecha_subida"),
+        Index("idx_videos_destacado", "destacado", "fecha_subida"),
+        Index("idx_videos_inscrito", "inscrito_id", "fecha_subida"),
+        Index("idx_videos_fecha", "fecha_subida"),
+    )
+
+# Modelo de Subidas reanudables de video (protocolo por partes)
+class SubidaVideo(Base):
+    __tablename__ = "subidas_video"
+    
+    id = Column(String(36), primary_key=True, index=True)  # UUID
+    inscrito_id = Column(String(36), ForeignKey("inscripciones.id"), nullable=False, index=True)
+    nombre_archivo = Column(String(255))
+    tipo_contenido = Column(String(100))
+    tamaño_total = Column(BigInteger, nullable=False)
+    tamaño_parte = Column(Integer, nullable=False)
+    total_partes = Column(Integer, nullable=False)
+    completada = Column(Boolean, default=False, nullable=False)
+    video_id = Column(Integer, ForeignKey("videos.id"))
+    fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
+    fecha_expiracion = Column(DateTime(timezone=True), nullable=False, index=True)
+    
+    # Relaciones
+    partes = relationship("ParteSubida", cascade="all, delete-orphan", passive_deletes=True)
+
+# Modelo de Partes recibidas de una subida
+class ParteSubida(Base):
+    __tablename__ = "partes_subida"
+    
+    subida_id = Column(String(36), ForeignKey("subidas_video.id", ondelete="CASCADE"), primary_key=True)
+    indice = Column(Integer, primary_key=True)
+    tamaño = Column(Integer, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    fecha_recepcion = Column(DateTime(timezone=True), server_default=func.now())
+
+# Modelo de Trabajos en segundo plano (cola persistente)
+class Trabajo(Base):
+    __tablename__ = "trabajos"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String(50), nullable=False)
+    payload = Column(JSON)
+    prioridad = Column(Integer, nullable=False, default=0)  # mayor se atiende primero
+    estado = Column(Enum(EstadoTrabajo), nullable=False, default=EstadoTrabajo.pendiente)
+    intentos = Column(Integer, nullable=False, default=0)
+    max_intentos = Column(Integer, nullable=False, default=5)
+    ejecutar_despues = Column(DateTime, nullable=False, default=datetime.utcnow)
+    clave_idempotencia = Column(String(255), unique=True)
+    resultado = Column(JSON)
+    error = Column(Text)
+    trabajador = Column(String(100))
+    fecha_creacion = Column(DateTime, nullable=False, default=datetime.utcnow)
+    fecha_inicio = Column(DateTime)
+    fecha_fin = Column(DateTime)
+    
+    __table_args__ = (
+        # Índice de la consulta de desencolado
+        Index("idx_trabajos_cola", "estado", "prioridad", "ejecutar_despues"),
+        Index("idx_trabajos_tipo_estado", "tipo", "estado"),
+    )
+
+# Modelo de Notificaciones a participantes (bandeja de salida, ver notificaciones.py)
+class Notificacion(Base):
+    __tablename__ = "notificaciones"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    canal = Column(String(20), nullable=False)  # correo | sms
+    destino = Column(String(255), nullable=False)
+    plantilla = Column(String(50), nullable=False)
+    datos = Column(JSON)
+    clave_dedup = Column(String(150), nullable=False, unique=True)  # un aviso por evento y participante
+    estado = Column(Enum(EstadoNotificacion), nullable=False, default=EstadoNotificacion.pendiente)
+    intentos = Column(Integer, nullable=False, default=0)
+    ejecutar_despues = Column(DateTime, nullable=False, default=datetime.utcnow)
+    despachador = Column(String(100))
+    error = Column(Text)
+    fecha_creacion = Column(DateTime, nullable=False, default=datetime.utcnow)
+    fecha_toma = Column(DateTime)
+    fecha_envio = Column(DateTime)
+    
+    __table_args__ = (
+        # Índice de la consulta de toma del despachador
+        Index("idx_notificaciones_cola", "canal", "estado", "ejecutar_despues"),
+    )
+
+# Modelo de Conteos por hora (series de tiempo preagregadas, ver series_tiempo.py)
+class ConteoHora(Base):
+    __tablename__ = "conteos_hora"
+    
+    serie = Column(String(20), primary_key=True)  # inscripciones | videos
+    hora = Column(DateTime, primary_key=True)  # inicio de la hora
+    categoria = Column(String(20), primary_key=True, default="")  # "" si no aplica
+    sede_id = Column(Integer, primary_key=True, default=0)  # 0 sin sede
+    total = Column(Integer, nullable=False, default=0)
+
+# Modelo de Marcas de agregación: hasta dónde están contadas las filas de cada serie
+class MarcaSerie(Base):
+    __tablename__ = "marcas_series"
+    
+    serie = Column(String(20), primary_key=True)
+    hasta = Column(DateTime, nullable=False)  # las filas con fecha < hasta ya están en conteos_hora
+    fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# Modelo de Cupos por sede: contador de lugares reservados (ver cupos.py)
+class CupoSede(Base):
+    __tablename__ = "cupos_sede"
+    
+    sede_id = Column(Integer, ForeignKey("sedes.id"), primary_key=True)
+    capacidad = Column(Integer, nullable=False, default=0)  # copia de Sede.capacidad; 0 sin límite
+    reservados = Column(Integer, nullable=False, default=0)
+    fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# Modelo de Instantáneas públicas de resultados: versión vigente de cada archivo (ver publicacion.py)
+class SnapshotPublico(Base):
+    __tablename__ = "snapshots_publicos"
+    
+    clave = Column(String(100), primary_key=True)  # ronda:{id}, ronda:{id}:{categoria} o sede:{id}
+    version = Column(Integer, nullable=False)
+    huella = Column(String(32), nullable=False)  # sha256 del contenido; ETag de la respuesta pública
+    fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 # Modelo de Eventos del Sistema (para auditoría)
 class EventoSistema(Base):
@@ -162,4 +373,8 @@ class EventoSistema(Base):
     fecha_evento = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relaciones
-    usuario = relationship("Usuario")
\ No newline at end of file
+    usuario = relationship("Usuario")
+    
+    __table_args__ = (
+        Index("idx_eventos_fecha", "fecha_evento"),
+    )
\ No newline at end of file
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Notificaciones a participantes por correo o SMS con bandeja de salida (outbox).
+
+Los cambios que avisan al participante (inscripción aprobada o rechazada,
+video revisado, resultado clasificado) no envían nada: registrar() agrega
+filas a la tabla notificaciones en la misma transacción que el cambio, así
+que el aviso existe si y solo si el cambio se confirmó y la petición no espera
+al proveedor. clave_dedup es única: el mismo aviso del mismo evento se
+registra una sola vez aunque el cambio se repita (reintentos, doble clic,
+aprobar de nuevo).
+
+El despachador (python notificaciones.py) toma lotes por canal con
+FOR UPDATE SKIP LOCKED, los envía por el transporte del canal respetando su
+límite de envíos por segundo y marca cada fila como enviada, o la reprograma
+con espera exponencial hasta MAX_INTENTOS_NOTIFICACION. Una aprobación masiva
+de miles de inscripciones solo agrega filas; el despachador las vacía al
+ritmo que permite el proveedor. Las filas de un despachador que murió a mitad
+de un lote vuelven a la cola (entrega al menos una vez; el Message-ID derivado
+de clave_dedup permite al proveedor descartar repetidos).
+
+Transportes (TRANSPORTES_NOTIFICACIONES, p. ej. "correo=smtp,sms=archivo"):
+    archivo  agrega cada mensaje como una línea JSON a ARCHIVO_NOTIFICACIONES
+    smtp     SMTP_HOST:SMTP_PORT; para pruebas locales sirve el servidor de
+             depuración: python -m aiosmtpd -n -l localhost:1025
+Otro proveedor se conecta agregando su clase a TRANSPORTES.
+
+Uso:
+    python notificaciones.py [--canal correo] [--una-vez]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import signal
+import smtplib
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from database import upsert
+from models import EstadoNotificacion, Inscripcion, Notificacion, Ronda
+
+logger = logging.getLogger("notificaciones")
+
+TAMAÑO_LOTE_NOTIFICACIONES = int(os.getenv("TAMAÑO_LOTE_NOTIFICACIONES", "100"))
+MAX_INTENTOS_NOTIFICACION = int(os.getenv("MAX_INTENTOS_NOTIFICACION", "5"))
+ESPERA_BASE_NOTIFICACION = float(os.getenv("ESPERA_BASE_NOTIFICACION", "30"))  # segundos
+INTERVALO_SONDEO_NOTIFICACIONES = float(os.getenv("INTERVALO_SONDEO_NOTIFICACIONES", "2"))
+MINUTOS_BLOQUEO_NOTIFICACION = 10
+TAMAÑO_LOTE_REGISTRO = 500
+
+ARCHIVO_NOTIFICACIONES = os.getenv(
+    "ARCHIVO_NOTIFICACIONES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads", "notificaciones.jsonl"),
+)
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "1025"))
+SMTP_USUARIO = os.getenv("SMTP_USUARIO")
+SMTP_CONTRASEÑA = os.getenv("SMTP_CONTRASEÑA")
+SMTP_TLS = os.getenv("SMTP_TLS", "0") == "1"
+SMTP_REMITENTE = os.getenv("SMTP_REMITENTE", "no-responder@karaokesenso.com")
+
+CANALES = ("correo", "sms")
+
+# Plantilla -> (asunto del correo, texto); el texto se completa con los datos de la notificación
+PLANTILLAS = {
+    "inscripcion_aprobada": (
+        "Tu inscripción fue aprobada",
+        "Hola {nombre}, tu inscripción a Karaoke Sensō fue aprobada. ¡Nos vemos en el escenario!",
+    ),
+    "inscripcion_rechazada": (
+        "Tu inscripción no fue aprobada",
+        "Hola {nombre}, tu inscripción a Karaoke Sensō no fue aprobada. {observaciones}",
+    ),
+    "video_aprobado": ("Tu video fue aprobado", "Hola {nombre}, tu video fue aprobado."),
+    "video_rechazado": ("Tu video no fue aprobado", "Hola {nombre}, tu video no fue aprobado. {observaciones}"),
+    "clasificado": ("¡Clasificaste!", "Hola {nombre}, clasificaste en la ronda {ronda}. ¡Felicidades!"),
+}
+
+
+def _limites() -> Dict[str, float]:
+    """Envíos por segundo de cada canal (LIMITE_NOTIFICACIONES, p. ej. "correo=10,sms=5")"""
+    limites = {"correo": 10.0, "sms": 5.0}
+    for par in filter(None, os.getenv("LIMITE_NOTIFICACIONES", "").split(",")):
+        canal, _, valor = par.partition("=")
+        limites[canal.strip()] = float(valor)
+    return limites
+
+
+def destinatario(correo: Optional[str], telefono: Optional[str]) -> Optional[tuple]:
+    """(canal, destino): correo si lo hay, si no SMS al teléfono"""
+    if correo:
+        return "correo", correo
+    if telefono:
+        return "sms", telefono
+    return None
+
+
+def aviso(plantilla: str, referencia: str, correo: Optional[str], telefono: Optional[str], **datos) -> Optional[dict]:
+    """Fila de notificación para registrar(); None si el participante no tiene contacto"""
+    contacto = destinatario(correo, telefono)
+    if contacto is None:
+        return None
+    canal, destino = contacto
+    return {
+        "canal": canal,
+        "destino": destino,
+        "plantilla": plantilla,
+        "datos": datos,
+        "clave_dedup": f"{plantilla}:{referencia}",
+    }
+
+
+def aviso_estatus(inscripcion, estatus, observaciones: Optional[str] = None) -> Optional[dict]:
+    """Aviso de inscripción aprobada o rechazada (None para otros estatus)"""
+    estatus = getattr(estatus, "value", estatus)
+    if estatus not in ("aprobado", "rechazado"):
+        return None
+    plantilla = "inscripcion_aprobada" if estatus == "aprobado" else "inscripcion_rechazada"
+    return aviso(plantilla, inscripcion.id, inscripcion.correo, inscripcion.telefono,
+                 nombre=inscripcion.nombre_artistico, observaciones=observaciones or "")
+
+
+def avisos_clasificados(db: Session, pares: Sequence[tuple]) -> List[Optional[dict]]:
+    """Avisos de clasificación para pares (inscrito_id, ronda_id)"""
+    if not pares:
+        return []
+    inscritos = {fila.id: fila for fila in db.query(
+        Inscripcion.id, Inscripcion.nombre_artistico, Inscripcion.correo, Inscripcion.telefono
+    ).filter(Inscripcion.id.in_({inscrito_id for inscrito_id, _ in pares}))}
+    rondas = dict(db.query(Ronda.id, Ronda.nombre).filter(Ronda.id.in_({ronda_id for _, ronda_id in pares})))
+    avisos = []
+    for inscrito_id, ronda_id in pares:
+        fila = inscritos.get(inscrito_id)
+        if fila is not None:
+            avisos.append(aviso("clasificado", f"{inscrito_id}:{ronda_id}", fila.correo, fila.telefono,
+                                nombre=fila.nombre_artistico, ronda=rondas.get(ronda_id, "")))
+    return avisos
+
+
+def registrar(db: Session, avisos: Sequence[Optional[dict]]) -> int:
+    """Agregar avisos a la bandeja de salida (sin commit); los ya registrados (misma clave) se omiten"""
+    ahora = datetime.utcnow()
+    filas = [
+        {**fila, "estado": EstadoNotificacion.pendiente, "intentos": 0, "ejecutar_despues": ahora,
+         "fecha_creacion": ahora}
+        for fila in avisos if fila
+    ]
+    tabla = Notificacion.__table__
+    for inicio in range(0, len(filas), TAMAÑO_LOTE_REGISTRO):
+        # La actualización es un no-op: solo evita el error por clave repetida
+        upsert(db, tabla, filas[inicio:inicio + TAMAÑO_LOTE_REGISTRO], ("clave_dedup",),
+               expresiones={"clave_dedup": tabla.c.clave_dedup})
+    return len(filas)
+
+
+def renderizar(notificacion: Notificacion) -> tuple:
+    """(asunto, texto) de la notificación"""
+    asunto, texto = PLANTILLAS[notificacion.plantilla]
+    datos = {"nombre": "", "observaciones": "", "ronda": "", **(notificacion.datos or {})}
+    return asunto, texto.format(**datos).strip()
+
+
+class Transporte:
+    """Envía lotes de notificaciones; devuelve id -> error (None si se envió)"""
+
+    def enviar(self, notificaciones: List[Notificacion]) -> Dict[int, Optional[str]]:
+        raise NotImplementedError
+
+
+class TransporteArchivo(Transporte):
+    """Sumidero de pruebas: una línea JSON por mensaje"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, ruta: str = None):
+        self.ruta = ruta or ARCHIVO_NOTIFICACIONES
+
+    def enviar(self, notificaciones: List[Notificacion]) -> Dict[int, Optional[str]]:
+        lineas = []
+        for notificacion in notificaciones:
+            asunto, texto = renderizar(notificacion)
+            lineas.append(json.dumps({
+                "id": notificacion.id, "canal": notificacion.canal, "destino": notificacion.destino,
+                "asunto": asunto, "texto": texto, "clave": notificacion.clave_dedup,
+            }, ensure_ascii=False))
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        with self._lock, open(self.ruta, "a", encoding="utf-8") as archivo:
+            archivo.write("".join(linea + "\n" for linea in lineas))
+        return {notificacion.id: None for notificacion in notificaciones}
+
+
+class TransporteSMTP(Transporte):
+    """Correo por SMTP; una conexión por lote"""
+
+    def enviar(self, notificaciones: List[Notificacion]) -> Dict[int, Optional[str]]:
+        resultados = {}
+        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30) as servidor:
+            if SMTP_TLS:
+                servidor.starttls()
+            if SMTP_USUARIO:
+                servidor.login(SMTP_USUARIO, SMTP_CONTRASEÑA or "")
+            for notificacion in notificaciones:
+                asunto, texto = renderizar(notificacion)
+                mensaje = EmailMessage()
+                mensaje["From"] = SMTP_REMITENTE
+                mensaje["To"] = notificacion.destino
+                mensaje["Subject"] = asunto
+                huella = hashlib.sha256(notificacion.clave_dedup.encode()).hexdigest()[:32]
+                mensaje["Message-ID"] = f"<{huella}@{SMTP_REMITENTE.partition('@')[2] or 'localhost'}>"
+                mensaje.set_content(texto)
+                try:
+                    servidor.send_message(mensaje)
+                    resultados[notificacion.id] = None
+                except smtplib.SMTPRecipientsRefused as e:
+                    resultados[notificacion.id] = f"Destinatario rechazado: {e}"
+        return resultados
+
+
+TRANSPORTES = {"archivo": TransporteArchivo, "smtp": TransporteSMTP}
+
+
+def transportes() -> Dict[str, Transporte]:
+    """Transporte de cada canal según TRANSPORTES_NOTIFICACIONES (por defecto el archivo)"""
+    configurados = dict.fromkeys(CANALES, "archivo")
+    for par in filter(None, os.getenv("TRANSPORTES_NOTIFICACIONES", "").split(",")):
+        canal, _, nombre = par.partition("=")
+        configurados[canal.strip()] = nombre.strip()
+    return {canal: TRANSPORTES[nombre]() for canal, nombre in configurados.items()}
+
+
+def _espera(intentos: int) -> timedelta:
+    return timedelta(seconds=ESPERA_BASE_NOTIFICACION * 2 ** (intentos - 1) * random.uniform(0.8, 1.2))
+
+
+def liberar_abandonadas(db: Session) -> int:
+    """Devolver a la cola las notificaciones tomadas por un despachador que dejó de responder"""
+    limite = datetime.utcnow() - timedelta(minutes=MINUTOS_BLOQUEO_NOTIFICACION)
+    liberadas = db.query(Notificacion).filter(
+        Notificacion.estado == EstadoNotificacion.enviando,
+        Notificacion.fecha_toma < limite
+    ).update({"estado": EstadoNotificacion.pendiente, "despachador": None}, synchronize_session=False)
+    db.commit()
+    return liberadas
+
+
+def tomar(db: Session, canal: str, limite: int, despachador: str) -> List[Notificacion]:
+    """Reservar hasta `limite` notificaciones listas del canal y confirmarlo"""
+    ahora = datetime.utcnow()
+    ids = [fila.id for fila in db.query(Notificacion.id).filter(
+        Notificacion.canal == canal,
+        Notificacion.estado == EstadoNotificacion.pendiente,
+        Notificacion.ejecutar_despues <= ahora,
+    ).order_by(Notificacion.id).limit(limite).with_for_update(skip_locked=True)]
+    if not ids:
+        db.rollback()
+        return []
+    # UPDATE condicional: en motores sin SKIP LOCKED solo un despachador gana cada fila
+    db.query(Notificacion).filter(
+        Notificacion.id.in_(ids), Notificacion.estado == EstadoNotificacion.pendiente
+    ).update({
+        "estado": EstadoNotificacion.enviando,
+        "intentos": Notificacion.intentos + 1,
+        "despachador": despachador,
+        "fecha_toma": ahora,
+    }, synchronize_session=False)
+    db.commit()
+    return db.query(Notificacion).filter(
+        Notificacion.id.in_(ids),
+        Notificacion.estado == EstadoNotificacion.enviando,
+        Notificacion.despachador == despachador,
+    ).order_by(Notificacion.id).all()
+
+
+def _registrar_envio(db: Session, lote: List[Notificacion], resultados: Dict[int, Optional[str]]):
+    ahora = datetime.utcnow()
+    enviadas = [notificacion.id for notificacion in lote if notificacion.id in resultados
+                and resultados[notificacion.id] is None]
+    if enviadas:
+        db.query(Notificacion).filter(Notificacion.id.in_(enviadas)).update(
+            {"estado": EstadoNotificacion.enviada, "fecha_envio": ahora, "error": None}, synchronize_session=False
+        )
+    for notificacion in lote:
+        if notificacion.id in enviadas:
+            continue
+        error = resultados.get(notificacion.id) or "Sin respuesta del transporte"
+        notificacion.error = error
+        if notificacion.intentos >= MAX_INTENTOS_NOTIFICACION:
+            notificacion.estado = EstadoNotificacion.fallida
+            logger.error("Notificación %s fallida: %s", notificacion.id, error)
+        else:
+            notificacion.estado = EstadoNotificacion.pendiente
+            notificacion.ejecutar_despues = ahora + _espera(notificacion.intentos)
+    db.commit()
+
+
+class LimiteEnvios:
+    """Cubeta de fichas: como máximo `por_segundo` envíos por segundo, con ráfagas de hasta un segundo"""
+
+    def __init__(self, por_segundo: float):
+        self.por_segundo = por_segundo
+        self.fichas = por_segundo
+        self.actualizado = time.monotonic()
+
+    def disponibles(self) -> int:
+        ahora = time.monotonic()
+        self.fichas = min(self.por_segundo, self.fichas + (ahora - self.actualizado) * self.por_segundo)
+        self.actualizado = ahora
+        return int(self.fichas)
+
+    def esperar(self, parar: threading.Event) -> int:
+        """Esperar a tener al menos una ficha; devuelve las disponibles"""
+        while not parar.is_set():
+            disponibles = self.disponibles()
+            if disponibles:
+                return disponibles
+            parar.wait((1 - self.fichas) / self.por_segundo)
+        return 0
+
+    def consumir(self, cantidad: int):
+        self.fichas -= cantidad
+
+
+def despachar(db: Session, canal: str, transporte: Transporte, limite: LimiteEnvios, parar: threading.Event,
+               despachador: str) -> int:
+    """Enviar un lote del canal dentro del límite; devuelve cuántas se tomaron (0 si la cola está vacía)"""
+    disponibles = limite.esperar(parar)
+    if not disponibles:
+        return 0
+    lote = tomar(db, canal, min(TAMAÑO_LOTE_NOTIFICACIONES, disponibles), despachador)
+    if not lote:
+        return 0
+    limite.consumir(len(lote))
+    try:
+        resultados = transporte.enviar(lote)
+    except Exception as e:
+        logger.warning("Error del transporte %s: %s", canal, e)
+        resultados = {notificacion.id: f"{type(e).__name__}: {e}" for notificacion in lote}
+    _registrar_envio(db, lote, resultados)
+    return len(lote)
+
+
+def bucle(canal: str, parar: threading.Event, una_vez: bool = False):
+    """Despachar el canal hasta que se pida parar (o hasta vaciar la cola con una_vez)"""
+    from database import SessionLocal
+
+    despachador = f"{socket.gethostname()}:{os.getpid()}:{canal}"
+    transporte = transportes()[canal]
+    limite = LimiteEnvios(_limites()[canal])
+    ultima_liberacion = 0.0
+    while not parar.is_set():
+        db = SessionLocal()
+        try:
+            if time.monotonic() - ultima_liberacion > 60:
+                liberar_abandonadas(db)
+                ultima_liberacion = time.monotonic()
+            tomadas = despachar(db, canal, transporte, limite, parar, despachador)
+        except Exception:
+            logger.exception("Error en el despachador de %s", canal)
+            tomadas = 0
+        finally:
+            db.close()
+        if not tomadas:
+            if una_vez:
+                return
+            parar.wait(INTERVALO_SONDEO_NOTIFICACIONES)
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Despachador de notificaciones a participantes")
+    parser.add_argument("--canal", choices=CANALES, action="append", help="por defecto todos")
+    parser.add_argument("--una-vez", action="store_true", help="terminar cuando la cola esté vacía")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    parar = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: parar.set())
+    signal.signal(signal.SIGINT, lambda *_: parar.set())
+    # Un hilo por canal: cada proveedor tiene su propio límite
+    hilos = [
+        threading.Thread(target=bucle, args=(canal, parar, args.una_vez), name=f"notificaciones-{canal}")
+        for canal in args.canal or CANALES
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+
+if __name__ == "__main__":
+    main()
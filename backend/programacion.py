@@ -0,0 +1,324 @@
+"""
+Programación de rondas clasificatorias: asignar a los inscritos aprobados a
+rondas respetando la capacidad de las sedes.
+
+Cada ronda (una sede en una fecha) admite hasta Sede.capacidad inscritos,
+contando los resultados que ya tiene; capacidad 0 es "sin límite" y esas
+rondas se llenan después de las que tienen cupo declarado. Candidatas: las
+rondas clasificatorias activas de sedes activas y, por cada fecha de
+`fechas`, una ronda nueva por sede (solo se crea si recibe inscritos).
+
+Preferencias, de mejor a peor: la sede del inscrito, una sede de su
+municipio, una sede de su estado y, con nivel_maximo="cualquiera", cualquier
+sede. Los inscritos con la misma sede, municipio y categoría son
+intercambiables, así que se asignan por grupo y no uno por uno:
+
+- Por nivel, los grupos que compiten por las mismas rondas (misma sede,
+  municipio o estado) se reparten el cupo libre en proporción a su demanda.
+- Cada grupo reparte su parte entre sus rondas candidatas llenando primero
+  las menos ocupadas (montículo por ocupación relativa), así que las rondas
+  quedan balanceadas y cada categoría se distribuye entre todas.
+
+Es la versión voraz por niveles de un flujo de costo mínimo; el trabajo
+depende del número de grupos y rondas, no del de inscritos, y un millón de
+inscritos se programa en segundos (lo que más tarda es leerlos e insertar
+los resultados pendientes, por lotes).
+
+replanificar_sede() es la re-planeación incremental al desactivar una sede:
+saca a los inscritos con resultado pendiente de sus rondas clasificatorias y
+los vuelve a programar en las demás sedes, en las mismas fechas.
+"""
+import heapq
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import exists, func, insert
+from sqlalchemy.orm import Session
+
+import publicacion
+from models import EstatusInscripcion, Inscripcion, PuntajeJurado, Resultado, Ronda, Sede, TipoRonda
+
+TAMAÑO_LOTE_PROGRAMACION = int(os.getenv("TAMAÑO_LOTE_PROGRAMACION", "5000"))
+TAMAÑO_BLOQUE_IDS = 1000
+
+NIVELES = ("sede", "municipio", "estado", "cualquiera")
+OBSERVACION_PROGRAMADO = "Pendiente: programación automática"
+
+
+class ProgramacionInvalida(ValueError):
+    """Rondas candidatas o parámetros de programación incorrectos"""
+
+
+class Lugar:
+    """Ronda candidata (existente o por crear) con su capacidad y ocupación"""
+
+    __slots__ = ("ronda_id", "nueva", "sede_id", "nombre_sede", "municipio", "estado", "fecha", "capacidad",
+                 "ocupados", "asignados")
+
+    def __init__(self, ronda_id: Optional[int], sede: Sede, fecha: datetime, ocupados: int = 0):
+        self.ronda_id = ronda_id
+        self.nueva = ronda_id is None
+        self.nombre_sede = sede.nombre_sede
+        self.sede_id = sede.id
+        self.municipio = sede.municipio
+        self.estado = sede.estado
+        self.fecha = fecha
+        self.capacidad = sede.capacidad or 0
+        self.ocupados = ocupados
+        self.asignados = 0
+
+    def libres(self) -> float:
+        if not self.capacidad:
+            return float("inf")
+        return max(self.capacidad - self.ocupados - self.asignados, 0)
+
+    def prioridad(self) -> tuple:
+        # Primero las rondas con cupo declarado, por ocupación relativa; luego las sin límite, por ocupación
+        carga = self.ocupados + self.asignados
+        return (0, carga / self.capacidad) if self.capacidad else (1, carga)
+
+
+def _repartir(cantidad: int, lugares: Sequence[int], todos: List[Lugar]) -> Dict[int, int]:
+    """Repartir `cantidad` inscritos entre los lugares dados llenando primero los menos ocupados"""
+    monticulo = [(todos[i].prioridad(), i) for i in lugares if todos[i].libres() > 0]
+    heapq.heapify(monticulo)
+    asignacion: Dict[int, int] = defaultdict(int)
+    while cantidad and monticulo:
+        (clase, _), i = heapq.heappop(monticulo)
+        lugar = todos[i]
+        n = cantidad
+        if monticulo:
+            # Asignar de una vez hasta que deje de ser el menos ocupado
+            clase_siguiente, siguiente = monticulo[0][0]
+            carga = lugar.ocupados + lugar.asignados
+            if clase_siguiente == clase:
+                tope = int(siguiente * lugar.capacidad) if lugar.capacidad else int(siguiente)
+                n = max(1, tope - carga + 1)
+        n = int(min(n, cantidad, lugar.libres()))
+        lugar.asignados += n
+        asignacion[i] += n
+        cantidad -= n
+        if lugar.libres() > 0:
+            heapq.heappush(monticulo, (lugar.prioridad(), i))
+    return asignacion
+
+
+def _cuotas(demandas: List[int], disponible: float) -> List[int]:
+    """Cuota de cada grupo: todo si alcanza; si no, proporcional a la demanda (mayores residuos)"""
+    total = sum(demandas)
+    if total <= disponible:
+        return list(demandas)
+    disponible = int(disponible)
+    exactas = [demanda * disponible / total for demanda in demandas]
+    cuotas = [int(exacta) for exacta in exactas]
+    residuos = sorted(range(len(demandas)), key=lambda i: cuotas[i] - exactas[i])
+    for i in residuos[:disponible - sum(cuotas)]:
+        cuotas[i] += 1
+    return cuotas
+
+
+def _lugares(db: Session, ronda_ids: Optional[Sequence[int]], fechas: Sequence[datetime],
+             estado: Optional[str]) -> List[Lugar]:
+    sedes = db.query(Sede).filter(Sede.activo == True)
+    if estado:
+        sedes = sedes.filter(Sede.estado == estado)
+    sedes = {sede.id: sede for sede in sedes}
+
+    rondas = db.query(Ronda).filter(Ronda.tipo == TipoRonda.clasificatoria, Ronda.activo == True)
+    if ronda_ids:
+        rondas = db.query(Ronda).filter(Ronda.id.in_(ronda_ids))
+    rondas = rondas.all()
+    if ronda_ids:
+        faltantes = set(ronda_ids) - {ronda.id for ronda in rondas}
+        if faltantes:
+            raise ProgramacionInvalida(f"Rondas no encontradas: {sorted(faltantes)}")
+        if any(TipoRonda(ronda.tipo) != TipoRonda.clasificatoria or not ronda.activo for ronda in rondas):
+            raise ProgramacionInvalida("Solo se programan rondas clasificatorias activas")
+    rondas = [ronda for ronda in rondas if ronda.sede_id in sedes]
+
+    ocupados = dict(
+        db.query(Resultado.ronda_id, func.count()).filter(
+            Resultado.ronda_id.in_([ronda.id for ronda in rondas])
+        ).group_by(Resultado.ronda_id)
+    ) if rondas else {}
+    lugares = [Lugar(ronda.id, sedes[ronda.sede_id], ronda.fecha, ocupados.get(ronda.id, 0)) for ronda in rondas]
+
+    existentes = {(lugar.sede_id, lugar.fecha.replace(tzinfo=None)) for lugar in lugares}
+    for fecha in fechas:
+        for sede in sedes.values():
+            if (sede.id, fecha.replace(tzinfo=None)) not in existentes:
+                lugares.append(Lugar(None, sede, fecha))
+    return lugares
+
+
+def _pendientes(db: Session, categoria, inscrito_ids: Optional[Sequence[str]]):
+    """(id, municipio, sede_id, categoria) de los aprobados sin ronda clasificatoria activa"""
+    programado = exists().where(
+        Resultado.inscrito_id == Inscripcion.id,
+        Resultado.ronda_id == Ronda.id,
+        Ronda.tipo == TipoRonda.clasificatoria,
+        Ronda.activo == True,
+    )
+    query = db.query(Inscripcion.id, Inscripcion.municipio, Inscripcion.sede_id, Inscripcion.categoria).filter(
+        Inscripcion.estatus == EstatusInscripcion.aprobado, ~programado
+    )
+    if categoria:
+        query = query.filter(Inscripcion.categoria == categoria)
+    if inscrito_ids is None:
+        yield from query.order_by(Inscripcion.id).yield_per(TAMAÑO_LOTE_PROGRAMACION)
+        return
+    ids = sorted(inscrito_ids)
+    for inicio in range(0, len(ids), TAMAÑO_BLOQUE_IDS):
+        yield from query.filter(Inscripcion.id.in_(ids[inicio:inicio + TAMAÑO_BLOQUE_IDS])).order_by(Inscripcion.id)
+
+
+def programar(
+    db: Session,
+    fechas: Sequence[datetime] = (),
+    ronda_ids: Optional[Sequence[int]] = None,
+    categoria=None,
+    estado: Optional[str] = None,
+    nivel_maximo: str = "estado",
+    inscrito_ids: Optional[Sequence[str]] = None,
+    dry_run: bool = False,
+) -> dict:
+    """Asignar a los aprobados sin programar a rondas clasificatorias (sin commit); dry_run no escribe"""
+    if nivel_maximo not in NIVELES:
+        raise ProgramacionInvalida(f"nivel_maximo debe ser uno de {', '.join(NIVELES)}")
+    lugares = _lugares(db, ronda_ids, fechas, estado)
+    estado_sede = dict(db.query(Sede.id, Sede.estado))
+    estado_municipio = dict(db.query(Sede.municipio, Sede.estado).distinct())
+
+    # Grupos de inscritos intercambiables: (sede_id, municipio, estado, categoria) -> ids
+    grupos: Dict[tuple, List[str]] = defaultdict(list)
+    for id_, municipio, sede_id, categoria_fila in _pendientes(db, categoria, inscrito_ids):
+        estado_inscrito = estado_sede.get(sede_id) or estado_municipio.get(municipio)
+        grupos[(sede_id, municipio, estado_inscrito, categoria_fila)].append(id_)
+
+    candidatos = {
+        "sede": lambda clave: ("sede", clave[0]),
+        "municipio": lambda clave: ("municipio", clave[2], clave[1]),
+        "estado": lambda clave: ("estado", clave[2]),
+        "cualquiera": lambda clave: ("cualquiera", None),
+    }
+    indices: Dict[tuple, List[int]] = defaultdict(list)
+    for i, lugar in enumerate(lugares):
+        indices[("sede", lugar.sede_id)].append(i)
+        indices[("municipio", lugar.estado, lugar.municipio)].append(i)
+        indices[("estado", lugar.estado)].append(i)
+        indices[("cualquiera", None)].append(i)
+
+    faltan = {clave: len(ids) for clave, ids in grupos.items()}
+    asignaciones: Dict[tuple, List[tuple]] = defaultdict(list)  # grupo -> [(lugar, n)]
+    conteo_niveles = dict.fromkeys(NIVELES, 0)
+    for nivel in NIVELES[:NIVELES.index(nivel_maximo) + 1]:
+        compiten: Dict[tuple, List[tuple]] = defaultdict(list)
+        for clave, n in faltan.items():
+            if n:
+                compiten[candidatos[nivel](clave)].append(clave)
+        for destino in sorted(compiten, key=str):
+            opciones = indices.get(destino)
+            if not opciones:
+                continue
+            claves = sorted(compiten[destino], key=str)
+            disponible = sum(lugares[i].libres() for i in opciones)
+            for clave, cuota in zip(claves, _cuotas([faltan[clave] for clave in claves], disponible)):
+                for i, n in _repartir(cuota, opciones, lugares).items():
+                    asignaciones[clave].append((i, n))
+                    faltan[clave] -= n
+                    conteo_niveles[nivel] += n
+
+    usados = [lugar for lugar in lugares if lugar.asignados]
+    respuesta = {
+        "dry_run": dry_run,
+        "total": sum(len(ids) for ids in grupos.values()),
+        "asignados": sum(conteo_niveles.values()),
+        "sin_lugar": sum(faltan.values()),
+        "por_nivel": conteo_niveles,
+        "rondas": [],
+    }
+    if not dry_run and usados:
+        for lugar in usados:
+            if lugar.nueva:
+                ronda = Ronda(
+                    nombre=f"Clasificatoria - {lugar.nombre_sede}",
+                    descripcion="Programación automática",
+                    fecha=lugar.fecha,
+                    sede_id=lugar.sede_id,
+                    tipo=TipoRonda.clasificatoria,
+                )
+                db.add(ronda)
+                db.flush()
+                lugar.ronda_id = ronda.id
+        filas = []
+        for clave, partes in asignaciones.items():
+            ids, inicio = grupos[clave], 0
+            for i, n in partes:
+                filas += [
+                    {"inscrito_id": id_, "ronda_id": lugares[i].ronda_id, "puntaje": 0, "clasificado": False,
+                     "observaciones": OBSERVACION_PROGRAMADO}
+                    for id_ in ids[inicio:inicio + n]
+                ]
+                inicio += n
+            if len(filas) >= TAMAÑO_LOTE_PROGRAMACION:
+                db.execute(insert(Resultado), filas)
+                filas = []
+        if filas:
+            db.execute(insert(Resultado), filas)
+        publicacion.marcar(db, [lugar.ronda_id for lugar in usados])
+
+    respuesta["rondas"] = [
+        {
+            "ronda_id": lugar.ronda_id,
+            "sede_id": lugar.sede_id,
+            "fecha": lugar.fecha,
+            "nueva": lugar.nueva,
+            "capacidad": lugar.capacidad,
+            "ocupados": lugar.ocupados,
+            "asignados": lugar.asignados,
+        }
+        for lugar in sorted(usados, key=lambda lugar: (lugar.sede_id, lugar.fecha))
+    ]
+    return respuesta
+
+
+def replanificar_sede(db: Session, sede_id: int, nivel_maximo: str = "estado") -> dict:
+    """Mover a otras sedes a los inscritos con resultado pendiente en las rondas clasificatorias de la sede (sin commit).
+
+    Se llama con la sede ya desactivada. Los resultados con puntaje o con
+    calificaciones de jurado se conservan; las rondas que quedan vacías se desactivan.
+    """
+    rondas = db.query(Ronda).filter(
+        Ronda.sede_id == sede_id, Ronda.tipo == TipoRonda.clasificatoria, Ronda.activo == True
+    ).all()
+    if not rondas:
+        return {"movidos": 0, "rondas_desactivadas": 0, "sin_lugar": 0}
+    ronda_ids = [ronda.id for ronda in rondas]
+    calificado = exists().where(
+        PuntajeJurado.ronda_id == Resultado.ronda_id, PuntajeJurado.inscrito_id == Resultado.inscrito_id
+    )
+    pendientes = db.query(Resultado).filter(
+        Resultado.ronda_id.in_(ronda_ids),
+        Resultado.puntaje == 0,
+        Resultado.clasificado == False,
+        ~calificado,
+    )
+    inscrito_ids = [fila.inscrito_id for fila in pendientes.with_entities(Resultado.inscrito_id)]
+    pendientes.delete(synchronize_session=False)
+    publicacion.marcar(db, ronda_ids)
+
+    con_resultados = {
+        fila.ronda_id for fila in db.query(Resultado.ronda_id).filter(Resultado.ronda_id.in_(ronda_ids)).distinct()
+    }
+    desactivadas = 0
+    for ronda in rondas:
+        if ronda.id not in con_resultados:
+            ronda.activo = False
+            desactivadas += 1
+    db.flush()
+
+    fechas = sorted({ronda.fecha for ronda in rondas})
+    respuesta = programar(db, fechas=fechas, nivel_maximo=nivel_maximo, inscrito_ids=inscrito_ids)
+    return {"movidos": respuesta["asignados"], "rondas_desactivadas": desactivadas, "sin_lugar": respuesta["sin_lugar"]}
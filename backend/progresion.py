@@ -0,0 +1,169 @@
+"""
+Progresión de etapas: promover a los inscritos de rondas terminadas a la
+siguiente etapa (clasificatoria -> interseccion -> interciudad -> interestatal
+-> internacional).
+
+La selección se hace en la base con funciones de ventana:
+    clasificados  los resultados marcados como clasificado
+    mejores       los N mejores puntajes por sede o por estado de la ronda de origen
+Si un inscrito tiene resultado en varias de las rondas de origen cuenta solo
+el mejor. Los resultados pendientes de la etapa siguiente (puntaje 0) se
+crean con un único INSERT ... SELECT, así que promover decenas de miles de
+inscritos es una sola sentencia; los que ya están en la ronda destino se
+omiten, de modo que repetir la promoción no duplica nada.
+
+Destino: una ronda de la etapa siguiente por sede de origen (se reutiliza la
+ronda activa de esa etapa y sede si ya existe) o una sola ronda en
+`sede_destino_id` (p. ej. la final nacional).
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import String, case, cast, exists, false, func, insert, literal, select
+from sqlalchemy.orm import Session, aliased
+
+import publicacion
+from models import Resultado, Ronda, Sede, TipoRonda
+
+ETAPAS = list(TipoRonda)
+SIGUIENTE_ETAPA = dict(zip(ETAPAS, ETAPAS[1:]))
+
+
+class PromocionInvalida(ValueError):
+    """Rondas de origen o parámetros de promoción incorrectos"""
+
+
+def _promovidos(ronda_ids: Sequence[int], criterio: str, n: Optional[int], agrupar_por: str):
+    """Subconsulta (inscrito_id, ronda_origen, sede_id, puntaje) de los inscritos a promover"""
+    mejor = func.row_number().over(
+        partition_by=Resultado.inscrito_id, order_by=(Resultado.puntaje.desc(), Resultado.id)
+    )
+    por_inscrito = select(
+        Resultado.inscrito_id,
+        Resultado.ronda_id.label("ronda_origen"),
+        Resultado.puntaje,
+        Ronda.sede_id,
+        Sede.estado,
+        mejor.label("mejor"),
+    ).join(Ronda, Resultado.ronda_id == Ronda.id).join(Sede, Ronda.sede_id == Sede.id).where(
+        Resultado.ronda_id.in_(ronda_ids)
+    )
+    if criterio == "clasificados":
+        por_inscrito = por_inscrito.where(Resultado.clasificado == True)
+    por_inscrito = por_inscrito.subquery("por_inscrito")
+
+    grupo = por_inscrito.c.estado if agrupar_por == "estado" else por_inscrito.c.sede_id
+    posicion = func.row_number().over(
+        partition_by=grupo, order_by=(por_inscrito.c.puntaje.desc(), por_inscrito.c.inscrito_id)
+    )
+    ordenados = select(
+        por_inscrito.c.inscrito_id, por_inscrito.c.ronda_origen, por_inscrito.c.sede_id,
+        por_inscrito.c.puntaje, posicion.label("posicion"),
+    ).where(por_inscrito.c.mejor == 1).subquery("ordenados")
+
+    promovidos = select(ordenados)
+    if criterio == "mejores":
+        promovidos = promovidos.where(ordenados.c.posicion <= n)
+    return promovidos.subquery("promovidos")
+
+
+def _rondas_origen(db: Session, ronda_ids: Sequence[int]) -> List[Ronda]:
+    rondas = db.query(Ronda).filter(Ronda.id.in_(ronda_ids)).all()
+    faltantes = set(ronda_ids) - {ronda.id for ronda in rondas}
+    if faltantes:
+        raise PromocionInvalida(f"Rondas no encontradas: {sorted(faltantes)}")
+    tipos = {TipoRonda(ronda.tipo) for ronda in rondas}
+    if len(tipos) != 1:
+        raise PromocionInvalida("Las rondas de origen deben ser de la misma etapa")
+    if tipos.pop() not in SIGUIENTE_ETAPA:
+        raise PromocionInvalida("La etapa internacional es la última")
+    return rondas
+
+
+def promover(
+    db: Session,
+    ronda_ids: Sequence[int],
+    criterio: str = "clasificados",
+    n: Optional[int] = None,
+    agrupar_por: str = "sede",
+    fecha: Optional[datetime] = None,
+    sede_destino_id: Optional[int] = None,
+    dry_run: bool = False,
+) -> dict:
+    """Promover a la etapa siguiente (sin commit); con dry_run solo cuenta, sin escribir"""
+    if criterio == "mejores" and not n:
+        raise PromocionInvalida("El criterio 'mejores' requiere n")
+    rondas = _rondas_origen(db, ronda_ids)
+    tipo_origen = TipoRonda(rondas[0].tipo)
+    tipo_destino = SIGUIENTE_ETAPA[tipo_origen]
+    promovidos = _promovidos(ronda_ids, criterio, n, agrupar_por)
+
+    por_sede: Dict[int, int] = dict(
+        db.execute(select(promovidos.c.sede_id, func.count()).group_by(promovidos.c.sede_id)).all()
+    )
+    sedes_destino = [sede_destino_id] if sede_destino_id else sorted(por_sede)
+    if sede_destino_id and db.get(Sede, sede_destino_id) is None:
+        raise PromocionInvalida("Sede destino no encontrada")
+
+    # Rondas activas de la etapa siguiente que se reutilizan
+    destinos: Dict[int, int] = {}
+    for ronda in db.query(Ronda.id, Ronda.sede_id).filter(
+        Ronda.tipo == tipo_destino, Ronda.activo == True, Ronda.sede_id.in_(sedes_destino)
+    ).order_by(Ronda.fecha):
+        destinos[ronda.sede_id] = ronda.id
+
+    respuesta = {
+        "dry_run": dry_run,
+        "tipo_origen": tipo_origen,
+        "tipo_destino": tipo_destino,
+        "total": sum(por_sede.values()),
+        "creados": 0,
+        "grupos": [
+            {
+                "sede_id": sede_id,
+                "ronda_id": destinos.get(sede_id),
+                "nueva": sede_id not in destinos,
+                "promovidos": sum(por_sede.values()) if sede_destino_id else por_sede[sede_id],
+            }
+            for sede_id in sedes_destino
+        ],
+    }
+    if dry_run or not respuesta["total"]:
+        return respuesta
+
+    nuevas = [sede_id for sede_id in sedes_destino if sede_id not in destinos]
+    if nuevas and fecha is None:
+        raise PromocionInvalida("Se requiere la fecha de las rondas nuevas")
+    nombres = dict(db.query(Sede.id, Sede.nombre_sede).filter(Sede.id.in_(nuevas)))
+    for sede_id in nuevas:
+        ronda = Ronda(
+            nombre=f"{tipo_destino.value.capitalize()} - {nombres[sede_id]}",
+            descripcion=f"Promoción desde las rondas {', '.join(str(ronda.id) for ronda in rondas)}",
+            fecha=fecha,
+            sede_id=sede_id,
+            tipo=tipo_destino,
+        )
+        db.add(ronda)
+        db.flush()
+        destinos[sede_id] = ronda.id
+    for grupo in respuesta["grupos"]:
+        grupo["ronda_id"] = destinos[grupo["sede_id"]]
+
+    if sede_destino_id:
+        ronda_destino = literal(destinos[sede_destino_id])
+    else:
+        ronda_destino = case(destinos, value=promovidos.c.sede_id)
+    existente = aliased(Resultado)
+    seleccion = select(
+        promovidos.c.inscrito_id,
+        ronda_destino,
+        literal(0),
+        false(),
+        literal("Pendiente: promovido desde la ronda ") + cast(promovidos.c.ronda_origen, String),
+    ).where(~exists().where(existente.inscrito_id == promovidos.c.inscrito_id, existente.ronda_id == ronda_destino))
+    resultado = db.execute(insert(Resultado).from_select(
+        ["inscrito_id", "ronda_id", "puntaje", "clasificado", "observaciones"], seleccion
+    ))
+    respuesta["creados"] = resultado.rowcount
+    publicacion.marcar(db, destinos.values())
+    return respuesta
@@ -0,0 +1,169 @@
+"""
+Proyecciones de columnas para los listados administrativos.
+
+Traduce los parámetros `fields=` / `expand=` a un SELECT de columnas (filas
+Row, sin identity map) y serializa las filas directamente a dicts JSON sin
+volver a validar con Pydantic datos que ya vienen de la base de datos.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, Enum, Numeric
+from sqlalchemy.orm import Session
+
+import models
+import schemas
+
+
+def _convertidor(columna) -> Optional[Callable]:
+    """Convertidor a tipo JSON según el tipo de la columna (None = sin conversión)"""
+    tipo = columna.type
+    if isinstance(tipo, DateTime):
+        return lambda valor: valor.isoformat() if valor is not None else None
+    if isinstance(tipo, Enum):
+        return lambda valor: valor.value if valor is not None else None
+    if isinstance(tipo, Numeric):
+        return lambda valor: str(valor) if valor is not None else None
+    return None
+
+
+def _campos_esquema(modelo, esquema) -> Dict[str, object]:
+    """Columnas del modelo expuestas por el esquema de respuesta"""
+    return {
+        campo: getattr(modelo, campo)
+        for campo in esquema.model_fields
+        if campo in modelo.__table__.columns
+    }
+
+
+class Relacion:
+    """Relación expandible de una proyección (un nivel, vía LEFT JOIN)"""
+
+    def __init__(self, modelo, esquema, condicion):
+        self.modelo = modelo
+        self.campos = _campos_esquema(modelo, esquema)
+        self.condicion = condicion
+
+
+class ConsultaProyectada:
+    """Columnas a seleccionar y plan de serialización de cada fila"""
+
+    def __init__(self, columnas: list, joins: list, plan: list, relaciones: List[Tuple[str, list]]):
+        self.columnas = columnas
+        self.joins = joins
+        self._plan = plan
+        self._relaciones = relaciones
+
+    def query(self, db: Session):
+        query = db.query(*self.columnas)
+        for modelo, condicion in self.joins:
+            query = query.outerjoin(modelo, condicion)
+        return query
+
+    def serializar(self, filas) -> List[dict]:
+        """Convertir filas Row a dicts listos para JSON"""
+        plan = self._plan
+        relaciones = self._relaciones
+        resultado = []
+        for fila in filas:
+            item = {}
+            for indice, campo, convertir in plan:
+                valor = fila[indice]
+                item[campo] = convertir(valor) if convertir else valor
+            for nombre, plan_relacion in relaciones:
+                # La primera columna de cada relación es su id: None = sin fila relacionada
+                if fila[plan_relacion[0][0]] is None:
+                    item[nombre] = None
+                    continue
+                anidado = {}
+                for indice, campo, convertir in plan_relacion:
+                    valor = fila[indice]
+                    anidado[campo] = convertir(valor) if convertir else valor
+                item[nombre] = anidado
+            resultado.append(item)
+        return resultado
+
+
+class Proyeccion:
+    """Proyección configurable de una entidad y sus relaciones expandibles"""
+
+    def __init__(self, modelo, esquema, relaciones: Optional[Dict[str, Relacion]] = None):
+        self.modelo = modelo
+        self.campos = _campos_esquema(modelo, esquema)
+        self.relaciones = relaciones or {}
+
+    @staticmethod
+    def _separar(valor: Optional[str]) -> List[str]:
+        return [parte.strip() for parte in (valor or "").split(",") if parte.strip()]
+
+    def construir(self, fields: Optional[str], expand: Optional[str]) -> ConsultaProyectada:
+        """Construir la consulta; lanza ValueError con campos o relaciones desconocidos"""
+        expandidas = list(dict.fromkeys(self._separar(expand)))
+        for nombre in expandidas:
+            if nombre not in self.relaciones:
+                raise ValueError(f"Relación no expandible: {nombre}")
+
+        solicitados = self._separar(fields)
+        propios: List[str] = []
+        anidados: Dict[str, List[str]] = {}
+        for campo in solicitados:
+            if "." in campo:
+                relacion, subcampo = campo.split(".", 1)
+                if relacion not in self.relaciones:
+                    raise ValueError(f"Relación desconocida: {relacion}")
+                if subcampo not in self.relaciones[relacion].campos:
+                    raise ValueError(f"Campo desconocido: {campo}")
+                anidados.setdefault(relacion, []).append(subcampo)
+                if relacion not in expandidas:
+                    expandidas.append(relacion)
+            elif campo in self.campos:
+                propios.append(campo)
+            else:
+                raise ValueError(f"Campo desconocido: {campo}")
+
+        # Sin fields= se devuelven todas las columnas; el id siempre se incluye
+        if not propios:
+            propios = list(self.campos) if not solicitados else []
+        propios = ["id"] + [campo for campo in dict.fromkeys(propios) if campo != "id"]
+
+        columnas = []
+        plan = []
+        for campo in propios:
+            columna = self.campos[campo]
+            plan.append((len(columnas), campo, _convertidor(columna)))
+            columnas.append(columna)
+
+        joins = []
+        relaciones = []
+        for nombre in expandidas:
+            relacion = self.relaciones[nombre]
+            subcampos = anidados.get(nombre) or list(relacion.campos)
+            subcampos = ["id"] + [campo for campo in dict.fromkeys(subcampos) if campo != "id"]
+            plan_relacion = []
+            for campo in subcampos:
+                columna = relacion.campos[campo]
+                plan_relacion.append((len(columnas), campo, _convertidor(columna)))
+                columnas.append(columna)
+            joins.append((relacion.modelo, relacion.condicion))
+            relaciones.append((nombre, plan_relacion))
+
+        return ConsultaProyectada(columnas, joins, plan, relaciones)
+
+
+PROYECCION_INSCRIPCION = Proyeccion(
+    models.Inscripcion,
+    schemas.Inscripcion,
+    {
+        "sede_obj": Relacion(models.Sede, schemas.Sede, models.Inscripcion.sede_id == models.Sede.id),
+    },
+)
+
+PROYECCION_RESULTADO = Proyeccion(
+    models.Resultado,
+    schemas.Resultado,
+    {
+        "inscrito": Relacion(
+            models.Inscripcion, schemas.Inscripcion, models.Resultado.inscrito_id == models.Inscripcion.id
+        ),
+        "ronda": Relacion(models.Ronda, schemas.Ronda, models.Resultado.ronda_id == models.Ronda.id),
+    },
+)
@@ -0,0 +1,249 @@
+"""
+Publicación de resultados para el público: instantáneas JSON versionadas.
+
+Las tablas de posiciones que consultan los espectadores no se calculan por
+petición. Al publicar una ronda (y después de cada cambio en sus resultados)
+se generan archivos JSON inmutables en DIRECTORIO_PUBLICACION:
+
+    ronda:{id}              todos los resultados de la ronda, con posición general y por categoría
+    ronda:{id}:{categoria}  la tabla de una categoría
+    sede:{id}               las rondas publicadas de la sede con los primeros lugares por categoría
+
+Cada archivo es {clave}/v{version}.json; snapshots_publicos guarda la versión
+vigente y la huella del contenido (el ETag). Una instantánea solo cambia de
+versión si su contenido cambió, así que regenerar una ronda no invalida las
+categorías que siguen igual. Se conservan CONSERVAR_VERSIONES versiones para
+los clientes que piden una versión concreta; las anteriores se borran con
+borrar_obsoletas() después del commit, nunca antes.
+
+Regeneración incremental: los cambios de resultados llaman a marcar(), que
+encola el trabajo resultados.publicar solo para las rondas ya publicadas. La
+clave de idempotencia es por ronda e intervalo de INTERVALO_PUBLICACION
+segundos: una ráfaga de capturas de jurado produce una sola regeneración por
+ronda e intervalo.
+"""
+import hashlib
+import os
+import time
+from datetime import timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+import trabajos
+from models import Inscripcion, Resultado, Ronda, Sede, SnapshotPublico
+from respuestas import codificar_json
+
+DIRECTORIO_PUBLICACION = os.getenv(
+    "DIRECTORIO_PUBLICACION", os.path.join(os.path.dirname(os.path.abspath(__file__)), "publicados")
+)
+INTERVALO_PUBLICACION = int(os.getenv("INTERVALO_PUBLICACION", "10"))
+TTL_VIGENTE_PUBLICACION = float(os.getenv("TTL_VIGENTE_PUBLICACION", "2"))
+CONSERVAR_VERSIONES = 3
+LIDERES_POR_CATEGORIA = 3
+# Margen para que el trabajo lea también los cambios que confirman al final del intervalo
+MARGEN_PUBLICACION = timedelta(seconds=2)
+
+# Clave de Session.info con las versiones por borrar una vez confirmada la transacción
+_OBSOLETAS = "publicacion_obsoletas"
+
+# Versión vigente por clave en este proceso: (momento de la consulta, (versión, huella) o None)
+_vigentes: Dict[str, Tuple[float, Optional[Tuple[int, str]]]] = {}
+
+
+def clave_ronda(ronda_id: int, categoria: Optional[str] = None) -> str:
+    return f"ronda:{ronda_id}:{categoria}" if categoria else f"ronda:{ronda_id}"
+
+
+def clave_sede(sede_id: int) -> str:
+    return f"sede:{sede_id}"
+
+
+def ruta(clave: str, version: int) -> str:
+    return os.path.join(DIRECTORIO_PUBLICACION, *clave.replace(" ", "_").split(":"), f"v{version}.json")
+
+
+def leer(ruta_archivo: str) -> bytes:
+    """Contenido de una instantánea, en memoria mientras el archivo no se reescriba"""
+    return _leer(ruta_archivo, os.stat(ruta_archivo).st_mtime_ns)
+
+
+@lru_cache(maxsize=512)
+def _leer(ruta_archivo: str, modificado: int) -> bytes:
+    # Una versión solo se reescribe si su transacción se revirtió; la fecha de
+    # modificación en la llave descarta lo leído antes en cualquier proceso
+    with open(ruta_archivo, "rb") as archivo:
+        return archivo.read()
+
+
+def _escribir(db: Session, clave: str, contenido: dict) -> SnapshotPublico:
+    """Guardar una versión nueva si el contenido cambió; devuelve la instantánea vigente"""
+    huella = hashlib.sha256(codificar_json(contenido)).hexdigest()[:32]
+    actual = db.query(SnapshotPublico).filter(SnapshotPublico.clave == clave).with_for_update().first()
+    if actual is not None and actual.huella == huella:
+        return actual
+
+    version = actual.version + 1 if actual else 1
+    destino = ruta(clave, version)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporal = f"{destino}.tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(codificar_json({"clave": clave, "version": version, **contenido}))
+    os.replace(temporal, destino)
+    if version > CONSERVAR_VERSIONES:
+        db.info.setdefault(_OBSOLETAS, []).append((clave, version - CONSERVAR_VERSIONES))
+
+    if actual is None:
+        actual = SnapshotPublico(clave=clave, version=version, huella=huella)
+        db.add(actual)
+    else:
+        actual.version, actual.huella = version, huella
+    db.flush()
+    _vigentes.pop(clave, None)
+    return actual
+
+
+def borrar_obsoletas(db: Session):
+    """Borrar los archivos de las versiones que dejaron de conservarse; llamar después del commit"""
+    pendientes = db.info.pop(_OBSOLETAS, [])
+    if not pendientes:
+        return
+    # Solo las de versiones confirmadas: si la transacción se revirtió la versión anterior sigue vigente
+    vigentes = dict(db.query(SnapshotPublico.clave, SnapshotPublico.version).filter(
+        SnapshotPublico.clave.in_({clave for clave, _ in pendientes})
+    ))
+    for clave, version in pendientes:
+        if vigentes.get(clave, 0) - CONSERVAR_VERSIONES >= version:
+            anterior = ruta(clave, version)
+            if os.path.exists(anterior):
+                os.remove(anterior)
+
+
+def _clasificar(filas: List[dict]) -> List[dict]:
+    """Posición por puntaje (empates comparten posición: 1, 2, 2, 4)"""
+    posicion, anterior = 0, None
+    for indice, fila in enumerate(filas, start=1):
+        if fila["puntaje"] != anterior:
+            posicion, anterior = indice, fila["puntaje"]
+        fila["posicion"] = posicion
+    return filas
+
+
+def _ronda(ronda: Ronda) -> dict:
+    return {
+        "id": ronda.id,
+        "nombre": ronda.nombre,
+        "tipo": ronda.tipo.value if hasattr(ronda.tipo, "value") else ronda.tipo,
+        "fecha": ronda.fecha.isoformat() if ronda.fecha else None,
+        "sede_id": ronda.sede_id,
+        "sede": ronda.sede.nombre_sede if ronda.sede else None,
+    }
+
+
+def _tablas(db: Session, ronda_id: int) -> Tuple[List[dict], Dict[str, List[dict]]]:
+    """Tabla general y por categoría de la ronda (una sola consulta ordenada por puntaje)"""
+    filas = db.query(
+        Resultado.id, Resultado.puntaje, Resultado.clasificado,
+        Inscripcion.nombre_artistico, Inscripcion.categoria, Inscripcion.municipio,
+    ).join(Inscripcion, Resultado.inscrito_id == Inscripcion.id).filter(
+        Resultado.ronda_id == ronda_id
+    ).order_by(Resultado.puntaje.desc(), Inscripcion.nombre_artistico, Resultado.id)
+
+    general, por_categoria = [], {}
+    for fila in filas:
+        categoria = fila.categoria.value if fila.categoria else None
+        # Sin inscrito_id: los archivos son públicos y ese id autoriza las subidas del participante
+        entrada = {
+            "resultado_id": fila.id,
+            "nombre_artistico": fila.nombre_artistico,
+            "categoria": categoria,
+            "municipio": fila.municipio,
+            "puntaje": str(fila.puntaje),
+            "clasificado": bool(fila.clasificado),
+        }
+        general.append(entrada)
+        por_categoria.setdefault(categoria, []).append(dict(entrada))
+    _clasificar(general)
+    for tabla in por_categoria.values():
+        _clasificar(tabla)
+    return general, por_categoria
+
+
+def publicar_ronda(db: Session, ronda_id: int, sede: bool = True) -> dict:
+    """Generar las instantáneas de la ronda (y de su sede) que cambiaron; sin commit"""
+    ronda = db.get(Ronda, ronda_id)
+    if ronda is None:
+        return {}
+    general, por_categoria = _tablas(db, ronda_id)
+    datos_ronda = _ronda(ronda)
+    versiones = {}
+    instantanea = _escribir(db, clave_ronda(ronda_id), {
+        "ronda": datos_ronda, "categorias": sorted(por_categoria), "resultados": general,
+    })
+    versiones[instantanea.clave] = instantanea.version
+    for categoria, tabla in sorted(por_categoria.items()):
+        instantanea = _escribir(db, clave_ronda(ronda_id, categoria), {
+            "ronda": datos_ronda, "categoria": categoria, "resultados": tabla,
+        })
+        versiones[instantanea.clave] = instantanea.version
+    if sede:
+        versiones.update(publicar_sede(db, ronda.sede_id))
+    return versiones
+
+
+def publicar_sede(db: Session, sede_id: int) -> dict:
+    """Índice de la sede: sus rondas publicadas con los primeros lugares por categoría; sin commit"""
+    sede = db.get(Sede, sede_id)
+    rondas = db.query(Ronda).filter(Ronda.sede_id == sede_id).order_by(Ronda.fecha, Ronda.id).all()
+    publicadas = {
+        clave for (clave,) in db.query(SnapshotPublico.clave).filter(
+            SnapshotPublico.clave.in_([clave_ronda(ronda.id) for ronda in rondas])
+        )
+    } if rondas else set()
+    rondas = [ronda for ronda in rondas if clave_ronda(ronda.id) in publicadas]
+    contenido = {
+        "sede": {"id": sede_id, "nombre": sede.nombre_sede, "municipio": sede.municipio, "estado": sede.estado},
+        "rondas": [],
+    }
+    for ronda in rondas:
+        _, por_categoria = _tablas(db, ronda.id)
+        contenido["rondas"].append({
+            **_ronda(ronda),
+            "lideres": {
+                categoria: tabla[:LIDERES_POR_CATEGORIA] for categoria, tabla in sorted(por_categoria.items())
+            },
+        })
+    instantanea = _escribir(db, clave_sede(sede_id), contenido)
+    return {instantanea.clave: instantanea.version}
+
+
+def marcar(db: Session, ronda_ids: Iterable[int]):
+    """Encolar la regeneración de las rondas publicadas entre `ronda_ids` (sin commit)"""
+    import tareas
+
+    claves = {clave_ronda(ronda_id): ronda_id for ronda_id in set(ronda_ids)}
+    if not claves:
+        return
+    publicadas = db.query(SnapshotPublico.clave).filter(SnapshotPublico.clave.in_(claves))
+    siguiente = int(time.time() // INTERVALO_PUBLICACION) + 1
+    retraso = timedelta(seconds=siguiente * INTERVALO_PUBLICACION - time.time()) + MARGEN_PUBLICACION
+    for (clave,) in publicadas:
+        ronda_id = claves[clave]
+        trabajos.encolar(
+            db, tareas.PUBLICAR_RESULTADOS, {"ronda_id": ronda_id},
+            clave_idempotencia=f"{tareas.PUBLICAR_RESULTADOS}:{ronda_id}:{siguiente}",
+            retraso=retraso,
+        )
+
+
+def vigente(db: Session, clave: str) -> Optional[Tuple[int, str]]:
+    """(versión, huella) vigentes de la instantánea; se consulta la base a lo más cada TTL_VIGENTE_PUBLICACION"""
+    ahora = time.monotonic()
+    guardada = _vigentes.get(clave)
+    if guardada is not None and ahora - guardada[0] < TTL_VIGENTE_PUBLICACION:
+        return guardada[1]
+    fila = db.query(SnapshotPublico.version, SnapshotPublico.huella).filter(SnapshotPublico.clave == clave).first()
+    valor = (fila.version, fila.huella) if fila else None
+    _vigentes[clave] = (ahora, valor)
+    return valor
@@ -0,0 +1,252 @@
+"""
+Captura de puntajes por jurado con escritura diferida por lotes.
+
+Cada jurado califica desde su teléfono al mismo tiempo que los demás (3 a 7
+por presentación). En lugar de un commit por puntaje, las capturas entran a
+un buffer en memoria que un hilo vuelca cada INTERVALO_VOLCADO_PUNTAJES
+segundos (o al llegar a TAMAÑO_VOLCADO_PUNTAJES): las capturas repetidas de
+un mismo jurado se coalescen (gana la última), todo el lote se guarda con un
+upsert de varias filas y el puntaje agregado de cada inscrito/ronda tocado se
+recalcula en la misma transacción. Solo se leen los puntajes de los pares
+afectados, no la ronda completa.
+
+El handler HTTP espera a que su lote quede confirmado antes de responder, así
+que una respuesta 2xx significa que el puntaje está guardado.
+
+Agregación por tipo de ronda (AGREGACION_PUNTAJES, p. ej.
+"clasificatoria=media,internacional=mediana"):
+    media            promedio simple
+    media_recortada  promedio sin el puntaje más alto ni el más bajo (con 3 o más jurados)
+    mediana          valor central
+"""
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from sqlalchemy import bindparam, tuple_, update
+from sqlalchemy.orm import Session
+
+import publicacion
+from database import upsert
+from models import PuntajeJurado, Resultado, Ronda, TipoRonda
+
+logger = logging.getLogger("puntajes")
+
+INTERVALO_VOLCADO_PUNTAJES = float(os.getenv("INTERVALO_VOLCADO_PUNTAJES", "0.05"))  # segundos
+TAMAÑO_VOLCADO_PUNTAJES = int(os.getenv("TAMAÑO_VOLCADO_PUNTAJES", "500"))
+# Pares inscrito/ronda por consulta IN al recalcular agregados
+TAMAÑO_BLOQUE_AGREGADOS = 500
+
+METODOS_AGREGACION = ("media", "media_recortada", "mediana")
+
+AGREGACION_POR_DEFECTO = {
+    TipoRonda.clasificatoria: "media",
+    TipoRonda.interseccion: "media",
+    TipoRonda.interciudad: "media_recortada",
+    TipoRonda.interestatal: "media_recortada",
+    TipoRonda.internacional: "mediana",
+}
+
+CENTESIMOS = Decimal("0.01")
+
+
+class Captura(NamedTuple):
+    ronda_id: int
+    inscrito_id: str
+    jurado_id: int
+    puntaje: Decimal
+
+
+def leer_agregacion(texto: str) -> Dict[TipoRonda, str]:
+    """Método por tipo de ronda: los valores por defecto con los de `texto` ("tipo=metodo,...")"""
+    agregacion = dict(AGREGACION_POR_DEFECTO)
+    for par in filter(None, (parte.strip() for parte in texto.split(","))):
+        tipo, _, metodo = par.partition("=")
+        if metodo.strip() not in METODOS_AGREGACION:
+            raise ValueError(f"Método de agregación inválido: {par}")
+        agregacion[TipoRonda(tipo.strip())] = metodo.strip()
+    return agregacion
+
+
+AGREGACION_PUNTAJES = leer_agregacion(os.getenv("AGREGACION_PUNTAJES", ""))
+
+
+def agregar(valores: Sequence[Decimal], metodo: str) -> Decimal:
+    """Puntaje agregado de los jurados, redondeado a centésimos"""
+    valores = sorted(valores)
+    if metodo == "media_recortada" and len(valores) >= 3:
+        valores = valores[1:-1]
+    if metodo == "mediana":
+        resultado = statistics.median(valores)
+    else:
+        resultado = sum(valores) / len(valores)
+    return Decimal(resultado).quantize(CENTESIMOS, rounding=ROUND_HALF_UP)
+
+
+def programados(db: Session, pares: Sequence[Tuple[int, str]]) -> set:
+    """Pares (ronda_id, inscrito_id) con resultado programado en una ronda activa (consulta a la base)"""
+    pares = sorted(set(pares))
+    encontrados = set()
+    for inicio in range(0, len(pares), TAMAÑO_BLOQUE_AGREGADOS):
+        encontrados.update(
+            (fila.ronda_id, fila.inscrito_id) for fila in db.query(Resultado.ronda_id, Resultado.inscrito_id).join(
+                Ronda, Resultado.ronda_id == Ronda.id
+            ).filter(
+                Ronda.activo == True,
+                tuple_(Resultado.ronda_id, Resultado.inscrito_id).in_(pares[inicio:inicio + TAMAÑO_BLOQUE_AGREGADOS])
+            )
+        )
+    return encontrados
+
+
+def recalcular_agregados(db: Session, pares: Sequence[Tuple[int, str]]):
+    """Recalcular Resultado.puntaje de los pares (ronda_id, inscrito_id) a partir de sus puntajes de jurado"""
+    pares = sorted(set(pares))
+    if not pares:
+        return
+    tipos = dict(db.query(Ronda.id, Ronda.tipo).filter(Ronda.id.in_({ronda_id for ronda_id, _ in pares})))
+    puntajes = defaultdict(list)
+    for inicio in range(0, len(pares), TAMAÑO_BLOQUE_AGREGADOS):
+        # Lectura con bloqueo: ve los puntajes confirmados por otros procesos
+        # que vuelcan el mismo inscrito/ronda, en lugar de una instantánea vieja
+        filas = db.query(PuntajeJurado.ronda_id, PuntajeJurado.inscrito_id, PuntajeJurado.puntaje).filter(
+            tuple_(PuntajeJurado.ronda_id, PuntajeJurado.inscrito_id).in_(pares[inicio:inicio + TAMAÑO_BLOQUE_AGREGADOS])
+        ).with_for_update()
+        for ronda_id, inscrito_id, puntaje in filas:
+            puntajes[(ronda_id, inscrito_id)].append(Decimal(puntaje))
+
+    # Solo se actualizan resultados existentes: el par debe estar programado en la ronda
+    actualizados = [
+        {
+            "b_inscrito_id": inscrito_id,
+            "b_ronda_id": ronda_id,
+            "puntaje": agregar(puntajes[(ronda_id, inscrito_id)], AGREGACION_PUNTAJES[TipoRonda(tipos[ronda_id])]),
+        }
+        for ronda_id, inscrito_id in sorted(puntajes)
+    ]
+    if actualizados:
+        tabla = Resultado.__table__
+        db.execute(
+            update(tabla).where(
+                tabla.c.inscrito_id == bindparam("b_inscrito_id"), tabla.c.ronda_id == bindparam("b_ronda_id")
+            ).values(puntaje=bindparam("puntaje")),
+            actualizados
+        )
+    publicacion.marcar(db, tipos)
+
+
+def volcar(db: Session, capturas: Sequence[Captura]) -> int:
+    """Guardar un lote de capturas y recalcular los agregados tocados (sin commit); devuelve los puntajes escritos"""
+    # Gana la última captura de cada jurado; el orden por clave hace que dos
+    # procesos que vuelcan a la vez tomen los bloqueos en el mismo orden
+    ultimas = {(c.ronda_id, c.inscrito_id, c.jurado_id): c for c in capturas}
+    if not ultimas:
+        return 0
+    # fecha_captura en UTC, como la escriben las capturas sincronizadas (ultimo_escritor las compara)
+    ahora = datetime.utcnow()
+    upsert(
+        db, PuntajeJurado.__table__,
+        [{**ultimas[clave]._asdict(), "fecha_captura": ahora} for clave in sorted(ultimas)],
+        ("ronda_id", "inscrito_id", "jurado_id"), ("puntaje", "fecha_captura"),
+        {"version": PuntajeJurado.version + 1}
+    )
+    recalcular_agregados(db, [(ronda_id, inscrito_id) for ronda_id, inscrito_id, _ in ultimas])
+    return len(ultimas)
+
+
+class BufferPuntajes:
+    """Buffer de escritura diferida: agrupa las capturas concurrentes y las vuelca por lotes en un hilo"""
+
+    def __init__(self, fabrica_sesiones: Callable[[], Session] = None,
+                 intervalo: float = INTERVALO_VOLCADO_PUNTAJES, tamaño: int = TAMAÑO_VOLCADO_PUNTAJES):
+        self._fabrica_sesiones = fabrica_sesiones
+        self.intervalo = intervalo
+        self.tamaño = tamaño
+        self._condicion = threading.Condition()
+        self._pendientes: Dict[Tuple[int, str, int], Captura] = {}
+        self._solicitudes: List[Tuple[List[Captura], Future]] = []
+        self._hilo = None
+        self._detenido = False
+        self.lotes = 0
+
+    def agregar(self, capturas: List[Captura]) -> Future:
+        """Encolar capturas; el Future se resuelve cuando su lote queda confirmado"""
+        futuro = Future()
+        with self._condicion:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._detenido = False
+                self._hilo = threading.Thread(target=self._ciclo, name="volcado-puntajes", daemon=True)
+                self._hilo.start()
+            for captura in capturas:
+                self._pendientes[(captura.ronda_id, captura.inscrito_id, captura.jurado_id)] = captura
+            self._solicitudes.append((capturas, futuro))
+            self._condicion.notify()
+        return futuro
+
+    def detener(self):
+        """Volcar lo pendiente y terminar el hilo (apagado de la aplicación)"""
+        with self._condicion:
+            hilo = self._hilo
+            self._detenido = True
+            self._condicion.notify()
+        if hilo is not None:
+            hilo.join()
+
+    def _ciclo(self):
+        while True:
+            with self._condicion:
+                while not self._pendientes and not self._detenido:
+                    self._condicion.wait()
+                if not self._pendientes:
+                    return
+                # Ventana de agrupación: esperar más capturas hasta el intervalo o el tamaño de lote
+                limite = time.monotonic() + self.intervalo
+                while len(self._pendientes) < self.tamaño and not self._detenido:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._condicion.wait(restante)
+                lote, solicitudes = list(self._pendientes.values()), self._solicitudes
+                self._pendientes, self._solicitudes = {}, []
+            self._volcar(lote, solicitudes)
+
+    def _sesion(self) -> Session:
+        if self._fabrica_sesiones is None:
+            from database import SessionLocal
+            return SessionLocal()
+        return self._fabrica_sesiones()
+
+    def _volcar(self, lote: List[Captura], solicitudes: List[Tuple[List[Captura], Future]]):
+        db = self._sesion()
+        try:
+            volcar(db, lote)
+            db.commit()
+            self.lotes += 1
+        except Exception:
+            db.rollback()
+            logger.exception("Falló el volcado de %s puntajes; se reintentan por solicitud", len(lote))
+            # Una solicitud problemática no hace fallar a las demás del lote
+            for capturas, futuro in solicitudes:
+                try:
+                    volcar(db, capturas)
+                    db.commit()
+                except Exception as error:
+                    db.rollback()
+                    futuro.set_exception(error)
+                else:
+                    futuro.set_result(len(capturas))
+            return
+        finally:
+            db.close()
+        for capturas, futuro in solicitudes:
+            futuro.set_result(len(capturas))
+
+
+buffer_puntajes = BufferPuntajes()
@@ -0,0 +1,226 @@
+"""
+Codificación y compresión de respuestas HTTP.
+
+- RespuestaJSON: JSON compacto (orjson si está instalado) o MessagePack cuando
+  el cliente envía `Accept: application/msgpack`.
+- NegociacionContenidoMiddleware: negocia el formato y comprime con brotli o
+  gzip las respuestas que superan un umbral; las respuestas en streaming se
+  comprimen por fragmentos sin acumularlas en memoria.
+"""
+import gzip
+import json
+import os
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependencia opcional
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+# Respuestas más pequeñas que el umbral (bytes) se envían sin comprimir
+UMBRAL_COMPRESION = int(os.getenv("UMBRAL_COMPRESION", "1024"))
+NIVEL_GZIP = int(os.getenv("NIVEL_GZIP", "6"))
+CALIDAD_BROTLI = int(os.getenv("CALIDAD_BROTLI", "5"))
+
+TIPOS_MSGPACK = ("application/msgpack", "application/x-msgpack")
+TIPOS_COMPRIMIBLES = ("application/json", "application/msgpack", "text/", "application/x-ndjson")
+
+# Formato negociado para la petición en curso (lo fija el middleware)
+_formato_respuesta: ContextVar[str] = ContextVar("formato_respuesta", default="json")
+
+
+def formato_respuesta() -> str:
+    """Formato negociado para la petición en curso ('json' o 'msgpack')"""
+    return _formato_respuesta.get()
+
+
+@contextmanager
+def formato_respuesta_json():
+    """Forzar JSON en las respuestas construidas dentro del bloque (p. ej. sub-peticiones de un lote)"""
+    token = _formato_respuesta.set("json")
+    try:
+        yield
+    finally:
+        _formato_respuesta.reset(token)
+
+
+def codificar_json(contenido) -> bytes:
+    """Serializar a JSON compacto"""
+    if orjson is not None:
+        return orjson.dumps(contenido, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(contenido, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class RespuestaJSON(JSONResponse):
+    """Respuesta JSON rápida que respeta el formato negociado (JSON o MessagePack)"""
+
+    def render(self, content) -> bytes:
+        if _formato_respuesta.get() == "msgpack":
+            self.media_type = "application/msgpack"
+            return msgpack.packb(content, use_bin_type=True)
+        return codificar_json(content)
+
+
+def _preferencias(cabecera: str) -> Dict[str, float]:
+    """Parsear una cabecera Accept/Accept-Encoding a {valor: q}"""
+    preferencias = {}
+    for parte in cabecera.split(","):
+        elementos = parte.strip().split(";")
+        valor = elementos[0].strip().lower()
+        if not valor:
+            continue
+        calidad = 1.0
+        for parametro in elementos[1:]:
+            nombre, _, dato = parametro.strip().partition("=")
+            if nombre == "q":
+                try:
+                    calidad = float(dato)
+                except ValueError:
+                    calidad = 0.0
+        preferencias[valor] = calidad
+    return preferencias
+
+
+def negociar_codificacion(accept_encoding: str) -> Optional[str]:
+    """Elegir 'br', 'gzip' o None según Accept-Encoding"""
+    preferencias = _preferencias(accept_encoding)
+    comodin = preferencias.get("*", 0.0)
+    if brotli is not None and preferencias.get("br", comodin) > 0:
+        return "br"
+    if preferencias.get("gzip", comodin) > 0:
+        return "gzip"
+    return None
+
+
+def negociar_formato(accept: str) -> str:
+    """Elegir 'msgpack' o 'json' según Accept"""
+    if msgpack is None:
+        return "json"
+    preferencias = _preferencias(accept)
+    calidad_msgpack = max(preferencias.get(tipo, 0.0) for tipo in TIPOS_MSGPACK)
+    calidad_json = preferencias.get("application/json", 0.0)
+    return "msgpack" if calidad_msgpack > 0 and calidad_msgpack >= calidad_json else "json"
+
+
+class _Compresor:
+    """Compresor incremental para brotli o gzip"""
+
+    def __init__(self, codificacion: str):
+        self.codificacion = codificacion
+        if codificacion == "br":
+            self._compresor = brotli.Compressor(quality=CALIDAD_BROTLI)
+        else:
+            self._compresor = zlib.compressobj(NIVEL_GZIP, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def fragmento(self, datos: bytes) -> bytes:
+        """Comprimir un fragmento y vaciar el buffer para que el cliente lo reciba ya"""
+        if self.codificacion == "br":
+            return self._compresor.process(datos) + self._compresor.flush()
+        return self._compresor.compress(datos) + self._compresor.flush(zlib.Z_SYNC_FLUSH)
+
+    def final(self) -> bytes:
+        if self.codificacion == "br":
+            return self._compresor.finish()
+        return self._compresor.flush(zlib.Z_FINISH)
+
+
+def comprimir(datos: bytes, codificacion: str) -> bytes:
+    """Comprimir un cuerpo completo"""
+    if codificacion == "br":
+        return brotli.compress(datos, quality=CALIDAD_BROTLI)
+    return gzip.compress(datos, compresslevel=NIVEL_GZIP)
+
+
+class NegociacionContenidoMiddleware:
+    """Middleware ASGI de negociación de formato (JSON/MessagePack) y compresión"""
+
+    def __init__(self, app, umbral: int = UMBRAL_COMPRESION):
+        self.app = app
+        self.umbral = umbral
+
+    @staticmethod
+    def _comprimir_fragmento(compresor: _Compresor, mensaje: dict) -> dict:
+        mas_cuerpo = mensaje.get("more_body", False)
+        datos = compresor.fragmento(mensaje.get("body", b""))
+        if not mas_cuerpo:
+            datos += compresor.final()
+        return {"type": "http.response.body", "body": datos, "more_body": mas_cuerpo}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cabeceras = {nombre.decode("latin-1").lower(): valor.decode("latin-1") for nombre, valor in scope["headers"]}
+        token = _formato_respuesta.set(negociar_formato(cabeceras.get("accept", "")))
+        codificacion = negociar_codificacion(cabeceras.get("accept-encoding", ""))
+
+        inicio = None
+        iniciado = False
+        compresor = None
+
+        async def enviar(mensaje):
+            nonlocal inicio, iniciado, compresor
+            if mensaje["type"] == "http.response.start":
+                # Se retiene hasta ver el primer fragmento del cuerpo
+                inicio = mensaje
+                return
+            if mensaje["type"] != "http.response.body" or iniciado:
+                if compresor is not None and mensaje["type"] == "http.response.body":
+                    mensaje = self._comprimir_fragmento(compresor, mensaje)
+                await send(mensaje)
+                return
+
+            iniciado = True
+            cuerpo = mensaje.get("body", b"")
+            mas_cuerpo = mensaje.get("more_body", False)
+
+            cabeceras_respuesta = [(n, v) for n, v in inicio["headers"]]
+            nombres = {n.lower(): v for n, v in cabeceras_respuesta}
+            tipo = nombres.get(b"content-type", b"").decode("latin-1")
+            comprimible = (
+                codificacion is not None
+                and b"content-encoding" not in nombres
+                and tipo.startswith(TIPOS_COMPRIMIBLES)
+            )
+            vary = nombres.get(b"vary")
+            cabeceras_respuesta = [(n, v) for n, v in cabeceras_respuesta if n.lower() != b"vary"]
+            cabeceras_respuesta.append((b"vary", (vary + b", " if vary else b"") + b"Accept, Accept-Encoding"))
+
+            if comprimible and not mas_cuerpo and len(cuerpo) >= self.umbral:
+                # Respuesta completa: comprimir de una vez y fijar Content-Length
+                cuerpo = comprimir(cuerpo, codificacion)
+                cabeceras_respuesta = [(n, v) for n, v in cabeceras_respuesta if n.lower() != b"content-length"]
+                cabeceras_respuesta += [
+                    (b"content-encoding", codificacion.encode()),
+                    (b"content-length", str(len(cuerpo)).encode()),
+                ]
+            elif comprimible and mas_cuerpo:
+                # Respuesta en streaming: comprimir cada fragmento sin acumular
+                compresor = _Compresor(codificacion)
+                cuerpo = compresor.fragmento(cuerpo)
+                cabeceras_respuesta = [(n, v) for n, v in cabeceras_respuesta if n.lower() != b"content-length"]
+                cabeceras_respuesta.append((b"content-encoding", codificacion.encode()))
+
+            await send({**inicio, "headers": cabeceras_respuesta})
+            await send({"type": "http.response.body", "body": cuerpo, "more_body": mas_cuerpo})
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _formato_respuesta.reset(token)
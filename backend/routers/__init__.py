@@ -0,0 +1,4 @@
+"""
+Routers de la API por subsistema. server.crear_app() importa solo los
+módulos de los subsistemas habilitados, en el orden de SUBSISTEMAS.
+"""
@@ -0,0 +1,35 @@
+"""
+Autenticación de administradores y jurados.
+"""
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from auth import ACCESS_TOKEN_EXPIRE_MINUTES, authenticate_user, create_access_token
+from database import get_db
+from schemas import LoginRequest, LoginResponse
+
+router = APIRouter()
+
+
+@router.post("/api/auth/login", response_model=LoginResponse)
+async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+    """Endpoint de login para administradores"""
+    user = authenticate_user(db, login_data.correo, login_data.contraseña)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+    
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": str(user.id)}, expires_delta=access_token_expires
+    )
+    
+    return LoginResponse(
+        access_token=access_token,
+        token_type="bearer",
+        user=user
+    )
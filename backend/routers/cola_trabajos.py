@@ -0,0 +1,37 @@
+"""
+Consulta de los trabajos en segundo plano.
+"""
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+import trabajos
+from auth import get_current_admin_user
+from database import get_db
+from models import Trabajo, Usuario
+from schemas import EstadisticasTrabajo, TrabajoResponse
+
+router = APIRouter()
+
+
+@router.get("/api/admin/trabajos/estadisticas", response_model=List[EstadisticasTrabajo])
+async def get_estadisticas_trabajos(
+    horas: int = Query(24, ge=1, le=24 * 30),
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Profundidad de la cola y latencia por tipo de trabajo"""
+    return trabajos.estadisticas(db, horas)
+
+@router.get("/api/admin/trabajos/{trabajo_id}", response_model=TrabajoResponse)
+async def get_trabajo(
+    trabajo_id: int,
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Obtener el estado de un trabajo"""
+    trabajo = db.query(Trabajo).filter(Trabajo.id == trabajo_id).first()
+    if not trabajo:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return trabajo
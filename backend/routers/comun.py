@@ -0,0 +1,16 @@
+"""
+Utilidades compartidas por los routers.
+"""
+from typing import Optional
+
+from fastapi import HTTPException
+
+
+def construir_proyeccion(proyeccion, fields: Optional[str], expand: Optional[str]):
+    """Proyección de columnas para fields=/expand=, o None para la respuesta completa"""
+    if fields is None and expand is None:
+        return None
+    try:
+        return proyeccion.construir(fields, expand)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,125 @@
+"""
+Reportes y estadísticas del panel de administración.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+import cubo
+import series_tiempo
+from auth import get_current_admin_or_jurado_user
+from database import get_db
+from models import CategoriaParticipante, EstatusInscripcion, Inscripcion, Ronda, Sede, Usuario, Video
+from schemas import CuboResponse, EstadisticasResponse, SerieTiempoResponse
+
+router = APIRouter()
+
+
+@router.get("/api/admin/estadisticas", response_model=EstadisticasResponse)
+async def get_estadisticas_admin(
+    current_user: Usuario = Depends(get_current_admin_or_jurado_user),
+    db: Session = Depends(get_db)
+):
+    """Obtener estadísticas completas del sistema"""
+    
+    # Conteos por estatus (una sola pasada sobre el índice de estatus)
+    por_estatus = dict(db.query(Inscripcion.estatus, func.count(Inscripcion.id)).group_by(Inscripcion.estatus).all())
+    inscritos_pendientes = por_estatus.get(EstatusInscripcion.pendiente, 0)
+    inscritos_aprobados = por_estatus.get(EstatusInscripcion.aprobado, 0)
+    inscritos_rechazados = por_estatus.get(EstatusInscripcion.rechazado, 0)
+    
+    # Conteos básicos
+    total_inscritos = sum(por_estatus.values())
+    total_sedes = db.query(Sede).filter(Sede.activo == True).count()
+    total_rondas = db.query(Ronda).filter(Ronda.activo == True).count()
+    
+    # Videos
+    videos_subidos = db.query(Video).count()
+    videos_aprobados = db.query(Video).filter(Video.aprobado == True).count()
+    
+    # Inscritos por categoría
+    inscritos_por_categoria = {}
+    categorias = db.query(Inscripcion.categoria, func.count(Inscripcion.id)).group_by(Inscripcion.categoria).all()
+    for categoria, count in categorias:
+        inscritos_por_categoria[categoria.value] = count
+    
+    # Inscritos por sede
+    inscritos_por_sede = {}
+    sedes_query = db.query(
+        Sede.nombre_sede, 
+        func.count(Inscripcion.id)
+    ).outerjoin(Inscripcion).group_by(Sede.id, Sede.nombre_sede).all()
+    
+    for sede_nombre, count in sedes_query:
+        inscritos_por_sede[sede_nombre] = count
+    
+    # Inscritos por municipio
+    inscritos_por_municipio = {}
+    municipios = db.query(Inscripcion.municipio, func.count(Inscripcion.id)).group_by(Inscripcion.municipio).all()
+    for municipio, count in municipios:
+        inscritos_por_municipio[municipio] = count
+    
+    return EstadisticasResponse(
+        total_inscritos=total_inscritos,
+        total_sedes=total_sedes,
+        total_rondas=total_rondas,
+        inscritos_pendientes=inscritos_pendientes,
+        inscritos_aprobados=inscritos_aprobados,
+        inscritos_rechazados=inscritos_rechazados,
+        videos_subidos=videos_subidos,
+        videos_aprobados=videos_aprobados,
+        inscritos_por_categoria=inscritos_por_categoria,
+        inscritos_por_sede=inscritos_por_sede,
+        inscritos_por_municipio=inscritos_por_municipio
+    )
+
+@router.get("/api/admin/estadisticas/series", response_model=SerieTiempoResponse)
+async def get_serie_tiempo(
+    desde: datetime,
+    hasta: Optional[datetime] = None,
+    serie: str = Query("inscripciones", pattern="^(inscripciones|videos)$"),
+    granularidad: str = Query("hora", pattern="^(hora|dia|semana|mes)$"),
+    por: str = Query("ninguna", pattern="^(ninguna|categoria|sede)$"),
+    categoria: Optional[CategoriaParticipante] = None,
+    sede_id: Optional[int] = None,
+    current_user: Usuario = Depends(get_current_admin_or_jurado_user),
+    db: Session = Depends(get_db)
+):
+    """Inscripciones o videos por periodo, desde los conteos por hora preagregados"""
+    desde = series_tiempo.como_fecha(desde)
+    # Hora del servidor de base de datos, la de los conteos por hora
+    hasta = series_tiempo.como_fecha(hasta) if hasta else series_tiempo.ahora(db)
+    if hasta <= desde:
+        raise HTTPException(status_code=400, detail="'hasta' debe ser posterior a 'desde'")
+    return series_tiempo.consultar(
+        db, serie, desde, hasta, granularidad, por, categoria.value if categoria else None, sede_id
+    )
+
+@router.get("/api/admin/estadisticas/cubo", response_model=CuboResponse)
+async def get_cubo_inscripciones(
+    por: str = Query("estado", description="dimensiones separadas por coma: estado,municipio,sede_id,categoria,estatus"),
+    estado: Optional[List[str]] = Query(None),
+    municipio: Optional[List[str]] = Query(None),
+    sede_id: Optional[List[int]] = Query(None),
+    categoria: Optional[List[CategoriaParticipante]] = Query(None),
+    estatus: Optional[List[EstatusInscripcion]] = Query(None),
+    current_user: Usuario = Depends(get_current_admin_or_jurado_user),
+    db: Session = Depends(get_db)
+):
+    """Conteos de inscripciones agregados y filtrados por cualquier combinación de dimensiones (desde memoria)"""
+    dimensiones = [dimension.strip() for dimension in por.split(",") if dimension.strip()]
+    desconocidas = set(dimensiones) - set(cubo.DIMENSIONES)
+    if desconocidas:
+        raise HTTPException(status_code=400, detail=f"Dimensiones desconocidas: {', '.join(sorted(desconocidas))}")
+    filtros = {
+        "estado": estado,
+        "municipio": municipio,
+        "sede_id": sede_id,
+        "categoria": [valor.value for valor in categoria] if categoria else None,
+        "estatus": [valor.value for valor in estatus] if estatus else None,
+    }
+    instantanea = cubo.cubo_inscripciones.instantanea(db)
+    return cubo.consultar(instantanea, dimensiones, filtros)
@@ -0,0 +1,310 @@
+"""
+Gestión de inscripciones (panel de administración).
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import desc, insert, or_
+from sqlalchemy.orm import Session, defer, joinedload
+
+import cupos
+import duplicados
+import imagenes
+import notificaciones
+import schemas
+import tareas
+import trabajos
+from auth import get_current_admin_or_jurado_user, get_current_admin_user
+from database import get_db
+from models import CategoriaParticipante, EstatusInscripcion, EventoSistema, Inscripcion, Usuario
+from proyecciones import PROYECCION_INSCRIPCION
+from respuestas import RespuestaJSON
+from routers.comun import construir_proyeccion
+from schemas import CambioEstatusMasivo, CambioEstatusMasivoResponse, InscripcionUpdate
+
+router = APIRouter()
+
+
+@router.get("/api/admin/inscripciones", response_model=List[schemas.Inscripcion])
+async def get_inscripciones_admin(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    estatus: Optional[EstatusInscripcion] = None,
+    categoria: Optional[CategoriaParticipante] = None,
+    sede_id: Optional[int] = None,
+    search: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    current_user: Usuario = Depends(get_current_admin_or_jurado_user),
+    db: Session = Depends(get_db)
+):
+    """Obtener todas las inscripciones con filtros para administradores"""
+    proyeccion = construir_proyeccion(PROYECCION_INSCRIPCION, fields, expand)
+    if proyeccion:
+        query = proyeccion.query(db)
+    else:
+        # El comprobante completo no se transfiere en el listado; basta la miniatura
+        query = db.query(Inscripcion).options(joinedload(Inscripcion.sede_obj), defer(Inscripcion.comprobante_pago))
+    
+    # Aplicar filtros
+    if estatus:
+        query = query.filter(Inscripcion.estatus == estatus)
+    if categoria:
+        query = query.filter(Inscripcion.categoria == categoria)
+    if sede_id:
+        query = query.filter(Inscripcion.sede_id == sede_id)
+    if search:
+        query = query.filter(
+            or_(
+                Inscripcion.nombre_completo.contains(search),
+                Inscripcion.nombre_artistico.contains(search),
+                Inscripcion.telefono.contains(search),
+                Inscripcion.correo.contains(search)
+            )
+        )
+    
+    inscripciones = query.order_by(desc(Inscripcion.fecha_inscripcion)).offset(skip).limit(limit).all()
+    if proyeccion:
+        return RespuestaJSON(proyeccion.serializar(inscripciones))
+    return inscripciones
+
+@router.put("/api/admin/inscripciones/{inscripcion_id}/estatus")
+async def actualizar_estatus_inscripcion(
+    inscripcion_id: str,
+    estatus_data: dict,
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Aprobar o rechazar una inscripción"""
+    inscripcion = db.query(Inscripcion).filter(Inscripcion.id == inscripcion_id).with_for_update().first()
+    if not inscripcion:
+        raise HTTPException(status_code=404, detail="Inscripción no encontrada")
+    
+    nuevo_estatus = estatus_data.get("estatus")
+    observaciones = estatus_data.get("observaciones", "")
+    
+    if nuevo_estatus not in ["aprobado", "rechazado", "pendiente"]:
+        raise HTTPException(status_code=400, detail="Estatus inválido")
+    
+    # Guardar datos anteriores para auditoría
+    datos_anteriores = {
+        "estatus": inscripcion.estatus,
+        "observaciones": inscripcion.observaciones
+    }
+    
+    # Rechazar libera el lugar en la sede (pasa el siguiente de la lista de espera)
+    admitidos = cupos.cambiar_estatus(db, inscripcion, nuevo_estatus)
+    
+    # Actualizar inscripción
+    inscripcion.estatus = nuevo_estatus
+    inscripcion.observaciones = observaciones
+    inscripcion.fecha_actualizacion = datetime.utcnow()
+    
+    # Crear evento de auditoría
+    evento = EventoSistema(
+        usuario_id=current_user.id,
+        accion=f"Cambio de estatus de inscripción a {nuevo_estatus}",
+        tabla_afectada="inscripciones",
+        registro_id=inscripcion_id,
+        datos_anteriores=datos_anteriores,
+        datos_nuevos={"estatus": nuevo_estatus, "observaciones": observaciones}
+    )
+    db.add(evento)
+    
+    # Aviso al participante, en la misma transacción que el cambio
+    if datos_anteriores["estatus"] != EstatusInscripcion(nuevo_estatus):
+        notificaciones.registrar(db, [notificaciones.aviso_estatus(inscripcion, nuevo_estatus, observaciones)])
+    
+    db.commit()
+    db.refresh(inscripcion)
+    
+    return {"message": f"Inscripción {nuevo_estatus} exitosamente", "inscripcion": inscripcion,
+            "admitidos_lista_espera": admitidos}
+
+# Tamaño de lote para UPDATE e INSERT de auditoría en cambios masivos
+TAMAÑO_LOTE_ESTATUS = 500
+
+def _en_lotes(elementos: list, tamaño: int):
+    """Dividir una lista en lotes consecutivos"""
+    for inicio in range(0, len(elementos), tamaño):
+        yield elementos[inicio:inicio + tamaño]
+
+def _ajustar_cupos(db: Session, filas: list, estatus: EstatusInscripcion):
+    """Cupos de sede tras un cambio masivo: liberar los lugares rechazados o reservar los reactivados"""
+    rechazado = EstatusInscripcion.rechazado
+    if estatus == rechazado:
+        liberados: Dict[int, int] = {}
+        for fila in filas:
+            if fila.sede_id and fila.estatus != rechazado and not fila.lista_espera:
+                liberados[fila.sede_id] = liberados.get(fila.sede_id, 0) + 1
+        db.query(Inscripcion).filter(
+            Inscripcion.id.in_([fila.id for fila in filas]), Inscripcion.lista_espera == True
+        ).update({"lista_espera": False}, synchronize_session=False)
+        for sede_id in sorted(liberados):
+            cupos.liberar(db, sede_id, liberados[sede_id])
+        return
+    en_espera = [
+        fila.id for fila in filas
+        if fila.sede_id and fila.estatus == rechazado and not cupos.reservar(db, fila.sede_id)
+    ]
+    if en_espera:
+        db.query(Inscripcion).filter(Inscripcion.id.in_(en_espera)).update(
+            {"lista_espera": True}, synchronize_session=False
+        )
+
+@router.post("/api/admin/inscripciones/estatus/bulk", response_model=CambioEstatusMasivoResponse)
+async def actualizar_estatus_inscripciones_bulk(
+    cambio: CambioEstatusMasivo,
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Aprobar o rechazar inscripciones en lote por lista de IDs o filtro"""
+    filtro = cambio.filtro.dict(exclude_none=True) if cambio.filtro else {}
+    if not cambio.ids and not filtro:
+        raise HTTPException(status_code=400, detail="Debe indicar una lista de IDs o un filtro")
+
+    # Resolver IDs objetivo (solo la columna id, sin cargar entidades)
+    if cambio.ids:
+        ids = list(dict.fromkeys(cambio.ids))
+    else:
+        query = db.query(Inscripcion.id)
+        if "estatus" in filtro:
+            query = query.filter(Inscripcion.estatus == filtro["estatus"])
+        if "categoria" in filtro:
+            query = query.filter(Inscripcion.categoria == filtro["categoria"])
+        if "sede_id" in filtro:
+            query = query.filter(Inscripcion.sede_id == filtro["sede_id"])
+        if "municipio" in filtro:
+            query = query.filter(Inscripcion.municipio == filtro["municipio"])
+        ids = [fila.id for fila in query.order_by(Inscripcion.id)]
+
+    valores = {"estatus": cambio.estatus, "fecha_actualizacion": datetime.utcnow()}
+    if cambio.observaciones is not None:
+        valores["observaciones"] = cambio.observaciones
+    datos_nuevos = {"estatus": cambio.estatus.value, "observaciones": cambio.observaciones}
+
+    resultados: Dict[str, str] = {}
+    for lote in _en_lotes(ids, TAMAÑO_LOTE_ESTATUS):
+        # Estado actual del lote; se bloquea solo cuando se va a modificar
+        query = db.query(
+            Inscripcion.id, Inscripcion.estatus, Inscripcion.observaciones, Inscripcion.sede_id,
+            Inscripcion.lista_espera, Inscripcion.nombre_artistico, Inscripcion.correo, Inscripcion.telefono
+        ).filter(Inscripcion.id.in_(lote))
+        if not cambio.dry_run:
+            query = query.with_for_update()
+        actuales = {fila.id: fila for fila in query}
+
+        por_actualizar = []
+        for inscripcion_id in lote:
+            fila = actuales.get(inscripcion_id)
+            if fila is None:
+                resultados[inscripcion_id] = "no_encontrado"
+            elif fila.estatus == cambio.estatus and (
+                cambio.observaciones is None or fila.observaciones == cambio.observaciones
+            ):
+                resultados[inscripcion_id] = "sin_cambio"
+            else:
+                resultados[inscripcion_id] = "actualizado"
+                por_actualizar.append(fila)
+
+        if cambio.dry_run or not por_actualizar:
+            db.rollback()
+            continue
+
+        # Un UPDATE por lote y un INSERT multi-fila para la auditoría
+        db.query(Inscripcion).filter(
+            Inscripcion.id.in_([fila.id for fila in por_actualizar])
+        ).update(valores, synchronize_session=False)
+        # Las filas que ya tenían el estatus solo cambian observaciones: sin cupos ni aviso
+        cambian_estatus = [fila for fila in por_actualizar if fila.estatus != cambio.estatus]
+        _ajustar_cupos(db, cambian_estatus, cambio.estatus)
+        db.execute(insert(EventoSistema), [
+            {
+                "usuario_id": current_user.id,
+                "accion": f"Cambio de estatus de inscripción a {cambio.estatus.value}",
+                "tabla_afectada": "inscripciones",
+                "registro_id": fila.id,
+                "datos_anteriores": {"estatus": fila.estatus.value, "observaciones": fila.observaciones},
+                "datos_nuevos": datos_nuevos,
+            }
+            for fila in por_actualizar
+        ])
+        # Los avisos quedan en la bandeja de salida; el despachador los envía al ritmo del proveedor
+        notificaciones.registrar(db, [
+            notificaciones.aviso_estatus(fila, cambio.estatus, cambio.observaciones) for fila in cambian_estatus
+        ])
+        db.commit()
+
+    conteos = list(resultados.values())
+    return CambioEstatusMasivoResponse(
+        dry_run=cambio.dry_run,
+        total=len(resultados),
+        actualizados=conteos.count("actualizado"),
+        sin_cambio=conteos.count("sin_cambio"),
+        no_encontrados=conteos.count("no_encontrado"),
+        resultados=resultados
+    )
+
+@router.put("/api/admin/inscripciones/{inscripcion_id}", response_model=schemas.Inscripcion)
+async def actualizar_inscripcion(
+    inscripcion_id: str,
+    inscripcion_data: InscripcionUpdate,
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Actualizar datos de una inscripción"""
+    inscripcion = db.query(Inscripcion).filter(Inscripcion.id == inscripcion_id).with_for_update().first()
+    if not inscripcion:
+        raise HTTPException(status_code=404, detail="Inscripción no encontrada")
+    
+    # Sede y estatus pasan por los cupos (y el estatus avisa al participante)
+    cambios = inscripcion_data.dict(exclude_unset=True)
+    if "sede_id" in cambios:
+        cupos.cambiar_sede(db, inscripcion, cambios.pop("sede_id"))
+    nuevo_estatus = cambios.pop("estatus", None)
+    if nuevo_estatus is not None and nuevo_estatus != inscripcion.estatus:
+        cupos.cambiar_estatus(db, inscripcion, nuevo_estatus)
+        inscripcion.estatus = nuevo_estatus
+        notificaciones.registrar(db, [notificaciones.aviso_estatus(
+            inscripcion, nuevo_estatus, cambios.get("observaciones", inscripcion.observaciones)
+        )])
+    
+    # Actualizar campos
+    for campo, valor in cambios.items():
+        setattr(inscripcion, campo, valor)
+    if cambios.keys() & {"telefono", "correo", "nombre_completo"}:
+        duplicados.asignar_claves(inscripcion)
+    
+    inscripcion.fecha_actualizacion = datetime.utcnow()
+    
+    db.commit()
+    db.refresh(inscripcion)
+    
+    return inscripcion
+
+@router.get("/api/admin/inscripciones/{inscripcion_id}/comprobante")
+async def get_comprobante_admin(
+    inscripcion_id: str,
+    current_user: Usuario = Depends(get_current_admin_or_jurado_user),
+    db: Session = Depends(get_db)
+):
+    """Obtener la imagen completa del comprobante de pago"""
+    fila = db.query(Inscripcion.comprobante_pago).filter(Inscripcion.id == inscripcion_id).first()
+    if not fila:
+        raise HTTPException(status_code=404, detail="Inscripción no encontrada")
+    if not fila.comprobante_pago:
+        raise HTTPException(status_code=404, detail="La inscripción no tiene comprobante")
+    
+    tipo_contenido, datos = imagenes.desde_data_uri(fila.comprobante_pago)
+    return Response(content=datos, media_type=tipo_contenido, headers={"Cache-Control": "private, max-age=3600"})
+
+@router.post("/api/admin/inscripciones/duplicados/reporte", status_code=202)
+async def generar_reporte_duplicados(
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Encolar el reporte de duplicados; el resultado queda en /api/admin/trabajos/{id}"""
+    trabajo = trabajos.encolar(db, tareas.REPORTE_DUPLICADOS, {"solicitado_por": current_user.id})
+    db.commit()
+    return {"message": "Reporte de duplicados encolado", "trabajo_id": trabajo.id}
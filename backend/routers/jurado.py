@@ -0,0 +1,79 @@
+"""
+Captura de puntajes de los jurados.
+"""
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+import schemas
+import sincronizacion
+from auth import get_current_jurado_user
+from database import get_db
+from models import EventoSistema, PuntajeJurado, Usuario
+from puntajes import Captura, buffer_puntajes, programados
+from schemas import PuntajesJuradoRequest, SincronizacionPuntajesRequest
+
+router = APIRouter()
+
+
+@router.post("/api/jurado/puntajes")
+async def capturar_puntajes(
+    datos: PuntajesJuradoRequest,
+    current_user: Usuario = Depends(get_current_jurado_user),
+    db: Session = Depends(get_db)
+):
+    """Registrar los puntajes del jurado; responde cuando su lote queda guardado"""
+    # Validar aquí y no en el volcado: un puntaje inválido no debe hacer fallar el lote de los demás
+    # Se consulta la base y no la caché de rondas: una ronda recién desactivada no debe aceptar puntajes
+    pares = {(p.ronda_id, p.inscrito_id) for p in datos.puntajes}
+    no_programados = sorted(pares - programados(db, pares))
+    if no_programados:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Participantes no programados en una ronda activa (ronda, inscrito): {no_programados}"
+        )
+    db.close()
+
+    futuro = buffer_puntajes.agregar([
+        Captura(p.ronda_id, p.inscrito_id, current_user.id, p.puntaje) for p in datos.puntajes
+    ])
+    guardados = await asyncio.wrap_future(futuro)
+    return {"guardados": guardados}
+
+
+@router.get("/api/jurado/puntajes", response_model=List[schemas.PuntajeJurado])
+async def get_puntajes_jurado(
+    ronda_id: int,
+    current_user: Usuario = Depends(get_current_jurado_user),
+    db: Session = Depends(get_db)
+):
+    """Puntajes capturados por el jurado en una ronda"""
+    return db.query(PuntajeJurado).filter(
+        PuntajeJurado.ronda_id == ronda_id, PuntajeJurado.jurado_id == current_user.id
+    ).order_by(PuntajeJurado.inscrito_id).all()
+
+
+@router.post("/api/jurado/puntajes/sincronizar", response_model=schemas.SincronizacionPuntajesResponse)
+async def sincronizar_puntajes(
+    datos: SincronizacionPuntajesRequest,
+    current_user: Usuario = Depends(get_current_jurado_user),
+    db: Session = Depends(get_db)
+):
+    """Aplicar exactamente una vez las operaciones encoladas sin conexión en un dispositivo"""
+    jurado_id = current_user.id
+    respuesta = sincronizacion.sincronizar(db, jurado_id, datos.dispositivo_id, datos.operaciones, datos.regla)
+
+    db.add(EventoSistema(
+        usuario_id=jurado_id,
+        accion=(
+            f"Sincronización de puntajes: {respuesta['aplicadas']} aplicadas, {len(respuesta['conflictos'])} "
+            f"en conflicto, {respuesta['duplicadas']} duplicadas"
+        ),
+        tabla_afectada="puntajes_jurado",
+        registro_id=datos.dispositivo_id[:36],
+        datos_nuevos={"dispositivo_id": datos.dispositivo_id, "ultima_secuencia": respuesta["ultima_secuencia"]}
+    ))
+    db.commit()
+    return respuesta
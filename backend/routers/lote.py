@@ -0,0 +1,121 @@
+"""
+Endpoint de lote: carga de una pantalla en una sola petición.
+"""
+import inspect
+import json
+from typing import Any, Dict
+from urllib.parse import parse_qs
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, params
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter, ValidationError, create_model
+from sqlalchemy.orm import Session
+
+from auth import get_current_admin_or_jurado_user
+from database import get_db
+from models import Usuario
+from respuestas import formato_respuesta_json
+from routers.estadisticas import get_estadisticas_admin
+from routers.inscripciones import get_inscripciones_admin
+from routers.resultados import get_resultados_admin
+from routers.rondas import get_rondas_admin
+from routers.sedes import get_sedes_admin
+from routers.videos import get_videos_admin
+from schemas import LoteRequest, LoteResponse, PeticionLote, RespuestaLote
+
+router = APIRouter()
+
+
+# Endpoints de solo lectura que pueden pedirse dentro de un lote
+ENDPOINTS_LOTE = {
+    "/api/admin/estadisticas": get_estadisticas_admin,
+    "/api/admin/inscripciones": get_inscripciones_admin,
+    "/api/admin/sedes": get_sedes_admin,
+    "/api/admin/rondas": get_rondas_admin,
+    "/api/admin/resultados": get_resultados_admin,
+    "/api/admin/videos": get_videos_admin,
+}
+
+# Cabeceras de la petición del lote que no aplican a cada sub-petición: un
+# If-None-Match dirigido al lote no debe convertir las respuestas internas en 304
+CABECERAS_CONDICIONALES = {b"if-none-match", b"if-modified-since", b"if-match", b"if-unmodified-since", b"if-range"}
+
+_parametros_lote: Dict[Any, Any] = {}
+
+def _preparar_endpoint_lote(endpoint, ruta):
+    """Modelo de parámetros de query y adaptador de respuesta de un endpoint"""
+    if endpoint not in _parametros_lote:
+        campos = {}
+        for nombre, parametro in inspect.signature(endpoint).parameters.items():
+            if parametro.annotation is Request or isinstance(parametro.default, params.Depends):
+                continue
+            default = ... if parametro.default is inspect.Parameter.empty else parametro.default
+            campos[nombre] = (parametro.annotation, default)
+        modelo = create_model(f"Parametros_{endpoint.__name__}", **campos)
+        adaptador = TypeAdapter(ruta.response_model) if ruta.response_model else None
+        _parametros_lote[endpoint] = (modelo, adaptador)
+    return _parametros_lote[endpoint]
+
+def _subpeticion(request: Request, ruta: str, query_string: str) -> Request:
+    """Request propia de una sub-petición: su ruta y query, sin cabeceras condicionales"""
+    scope = dict(request.scope)
+    scope.update(
+        method="GET",
+        path=ruta,
+        raw_path=ruta.encode(),
+        query_string=query_string.encode(),
+        headers=[(nombre, valor) for nombre, valor in request.scope["headers"] if nombre.lower() not in CABECERAS_CONDICIONALES],
+    )
+    return Request(scope)
+
+async def _ejecutar_peticion_lote(peticion: PeticionLote, request: Request, current_user: Usuario, db: Session) -> RespuestaLote:
+    ruta, _, query_string = peticion.ruta.partition("?")
+    endpoint = ENDPOINTS_LOTE.get(ruta)
+    # El endpoint debe estar montado en esta aplicación (ver SUBSISTEMAS en server.py)
+    montada = next((r for r in request.app.routes if getattr(r, "endpoint", None) is endpoint), None)
+    if endpoint is None or montada is None:
+        return RespuestaLote(id=peticion.id, status=404, body={"detail": "Ruta no disponible en lote"})
+
+    modelo, adaptador = _preparar_endpoint_lote(endpoint, montada)
+    valores = {clave: lista[-1] for clave, lista in parse_qs(query_string).items()}
+    try:
+        parametros = modelo.model_validate(valores)
+    except ValidationError as e:
+        return RespuestaLote(id=peticion.id, status=422, body={"detail": jsonable_encoder(e.errors())})
+
+    argumentos = dict(parametros)
+    if "request" in inspect.signature(endpoint).parameters:
+        argumentos["request"] = _subpeticion(request, ruta, query_string)
+    try:
+        resultado = await endpoint(current_user=current_user, db=db, **argumentos)
+    except HTTPException as e:
+        return RespuestaLote(id=peticion.id, status=e.status_code, body={"detail": e.detail})
+
+    if isinstance(resultado, Response):
+        cuerpo = json.loads(resultado.body) if resultado.body else None
+        return RespuestaLote(id=peticion.id, status=resultado.status_code, body=cuerpo)
+    if adaptador is not None:
+        validado = adaptador.validate_python(resultado, from_attributes=True)
+        return RespuestaLote(id=peticion.id, status=200, body=adaptador.dump_python(validado, mode="json"))
+    return RespuestaLote(id=peticion.id, status=200, body=jsonable_encoder(resultado))
+
+@router.post("/api/admin/batch", response_model=LoteResponse)
+async def ejecutar_lote(
+    lote: LoteRequest,
+    request: Request,
+    current_user: Usuario = Depends(get_current_admin_or_jurado_user),
+    db: Session = Depends(get_db)
+):
+    """Ejecutar varias consultas de solo lectura con una autenticación y una sesión"""
+    # Todas las sub-peticiones comparten la transacción de la sesión (misma
+    # instantánea de lectura en InnoDB); se ejecutan en serie porque una
+    # sesión/conexión no admite consultas simultáneas.
+    respuestas = []
+    with formato_respuesta_json():
+        for peticion in lote.peticiones:
+            try:
+                respuestas.append(await _ejecutar_peticion_lote(peticion, request, current_user, db))
+            except Exception as e:
+                db.rollback()
+                respuestas.append(RespuestaLote(id=peticion.id, status=500, body={"detail": str(e)}))
+    return LoteResponse(respuestas=respuestas)
@@ -0,0 +1,177 @@
+"""
+Endpoints públicos de la landing page: inscripción, comprobante y video.
+"""
+import os
+import uuid
+from decimal import Decimal
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Header, HTTPException, UploadFile
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import contenedores
+import cupos
+import duplicados
+import imagenes
+import subidas
+import tareas
+import trabajos
+from database import get_db
+from models import Inscripcion, Video
+from schemas import InscripcionCreate
+
+router = APIRouter()
+
+
+@router.post("/api/inscripciones")
+async def crear_inscripcion_publica(
+    inscripcion: InscripcionCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=64),
+    db: Session = Depends(get_db)
+):
+    """Crear nueva inscripción desde la landing page"""
+    # Reintento del cliente con la misma Idempotency-Key: se devuelve la original
+    if idempotency_key:
+        existente = db.query(Inscripcion.id).filter(Inscripcion.clave_idempotencia == idempotency_key).first()
+        if existente:
+            return {"message": "Inscripción ya registrada", "id": existente.id, "duplicada": True}
+
+    # Doble envío sin clave: misma persona con el mismo teléfono o correo (búsqueda por índice)
+    claves = duplicados.claves_contacto(inscripcion.telefono, inscripcion.correo, inscripcion.nombre_completo)
+    coincidencias = duplicados.buscar(db, claves, inscripcion.municipio)
+    if coincidencias and coincidencias[0]["tipo"] == "exacta":
+        return {"message": "Inscripción ya registrada", "id": coincidencias[0]["id"], "duplicada": True}
+
+    # Generar UUID para la inscripción
+    inscripcion_id = str(uuid.uuid4())
+    
+    # Reservar lugar en la sede (UPDATE condicional del contador); sin lugar queda en lista de espera.
+    # Va justo antes del commit: el contador de la sede queda bloqueado solo durante el INSERT
+    lista_espera = bool(inscripcion.sede_id) and not cupos.reservar(db, inscripcion.sede_id)
+    
+    # Crear objeto de inscripción; las coincidencias parciales quedan marcadas para revisión
+    nueva_inscripcion = Inscripcion(
+        id=inscripcion_id,
+        clave_idempotencia=idempotency_key,
+        posible_duplicado_de=coincidencias[0]["id"] if coincidencias else None,
+        lista_espera=lista_espera,
+        **claves,
+        **inscripcion.dict()
+    )
+    
+    db.add(nueva_inscripcion)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Dos reintentos simultáneos con la misma clave: el índice único decide
+        db.rollback()
+        existente = db.query(Inscripcion.id).filter(Inscripcion.clave_idempotencia == idempotency_key).first()
+        if not idempotency_key or not existente:
+            raise
+        return {"message": "Inscripción ya registrada", "id": existente.id, "duplicada": True}
+    
+    if lista_espera:
+        return {"message": "Sede llena: inscripción registrada en lista de espera", "id": inscripcion_id,
+                "duplicada": False, "lista_espera": True}
+    return {"message": "Inscripción creada exitosamente", "id": inscripcion_id, "duplicada": False, "lista_espera": False}
+
+@router.get("/api/estadisticas")
+async def get_estadisticas_publicas(db: Session = Depends(get_db)):
+    """Estadísticas públicas para la landing page"""
+    total_inscritos = db.query(Inscripcion).count()
+    total_municipios = db.query(func.count(func.distinct(Inscripcion.municipio))).scalar()
+    
+    # Simular votos para mantener compatibilidad
+    total_votos = total_inscritos * 150  # Simulación
+    
+    return {
+        "total_inscritos": total_inscritos,
+        "total_municipios": total_municipios,
+        "total_votos": total_votos
+    }
+
+@router.post("/api/inscripciones/{inscripcion_id}/comprobante")
+async def subir_comprobante(
+    inscripcion_id: str,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """Subir comprobante de pago"""
+    inscripcion = db.query(Inscripcion).filter(Inscripcion.id == inscripcion_id).first()
+    if not inscripcion:
+        raise HTTPException(status_code=404, detail="Inscripción no encontrada")
+    
+    if imagenes.detectar_tipo(await file.read(16)) is None:
+        raise HTTPException(status_code=400, detail="Formato no soportado. Use JPEG, PNG, WebP o HEIC.")
+    await file.seek(0)
+    
+    try:
+        ruta, _, sha256 = subidas.guardar_archivo(file.file, "comprobantes", "", imagenes.TAMAÑO_MAXIMO_COMPROBANTE)
+    except subidas.ParteInvalida:
+        raise HTTPException(status_code=413, detail="Archivo muy grande. Máximo 15MB.")
+    
+    # La normalización (sin EXIF, reducida, WebP) y la miniatura las hace un worker.
+    # Solo se deduplica contra un trabajo pendiente o en proceso: si el del mismo archivo
+    # ya terminó, el comprobante vigente puede ser otro (A, B, A) y hay que procesarlo de nuevo
+    clave = f"comprobante:{inscripcion_id}:{sha256}"
+    trabajos.liberar_clave(db, clave)
+    trabajo = trabajos.encolar(
+        db, tareas.PROCESAR_COMPROBANTE,
+        {"inscripcion_id": inscripcion_id, "ruta": ruta},
+        prioridad=10,
+        clave_idempotencia=clave
+    )
+    if trabajo.payload["ruta"] != ruta:
+        os.remove(subidas.ruta_absoluta(ruta))  # mismo archivo ya encolado
+    db.commit()
+    
+    return {"message": "Comprobante subido exitosamente", "trabajo_id": trabajo.id}
+
+@router.post("/api/inscripciones/{inscripcion_id}/video")
+async def subir_video(
+    inscripcion_id: str,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """Subir video de participante"""
+    inscripcion = db.query(Inscripcion).filter(Inscripcion.id == inscripcion_id).first()
+    if not inscripcion:
+        raise HTTPException(status_code=404, detail="Inscripción no encontrada")
+    
+    # Validar tamaño (50MB máximo) mientras se copia a disco
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    try:
+        ruta, tamaño, _ = subidas.guardar_archivo(file.file, "videos", extension, subidas.TAMAÑO_MAXIMO_VIDEO)
+    except subidas.ParteInvalida:
+        raise HTTPException(status_code=413, detail="Archivo muy grande. Máximo 50MB.")
+    size_mb = tamaño / (1024 * 1024)
+    
+    # Duración, resolución y tipo real del contenedor (solo cabeceras, sin decodificar)
+    try:
+        metadatos = contenedores.analizar_ruta(subidas.ruta_absoluta(ruta))
+        contenedores.verificar_declarado(metadatos, file.filename, file.content_type)
+    except contenedores.ContenedorInvalido as e:
+        os.remove(subidas.ruta_absoluta(ruta))
+        raise HTTPException(status_code=415, detail=str(e))
+    
+    # Crear registro de video; la copia base64 (video_data) la genera un worker
+    video = Video(
+        inscrito_id=inscripcion_id,
+        titulo=f"Video de {inscripcion.nombre_artistico}",
+        formato=metadatos.formato,
+        duracion=metadatos.duracion_segundos,
+        ancho=metadatos.ancho,
+        alto=metadatos.alto,
+        codec=metadatos.codec,
+        url_video=ruta,
+        tamaño_mb=Decimal(str(round(size_mb, 2)))
+    )
+    
+    db.add(video)
+    db.flush()
+    trabajo = trabajos.encolar(db, tareas.CODIFICAR_VIDEO, {"video_id": video.id, "tipo_contenido": file.content_type})
+    db.commit()
+    
+    return {"message": "Video subido exitosamente", "trabajo_id": trabajo.id}
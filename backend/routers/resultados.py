@@ -0,0 +1,267 @@
+"""
+Gestión y exportación de resultados.
+"""
+import csv
+import io
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import desc
+from sqlalchemy.orm import Session, defer, joinedload
+
+import notificaciones
+import publicacion
+import schemas
+from auth import get_current_admin_or_jurado_user, get_current_admin_user
+from database import SessionLocal, get_db
+from models import EventoSistema, Inscripcion, Resultado, Ronda, Usuario
+from proyecciones import PROYECCION_RESULTADO
+from respuestas import RespuestaJSON, codificar_json
+from routers.comun import construir_proyeccion
+from schemas import PublicacionRequest, ResultadoCreate
+
+router = APIRouter()
+
+
+@router.get("/api/admin/resultados", response_model=List[schemas.Resultado])
+async def get_resultados_admin(
+    ronda_id: Optional[int] = None,
+    inscrito_id: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    current_user: Usuario = Depends(get_current_admin_or_jurado_user),
+    db: Session = Depends(get_db)
+):
+    """Obtener resultados con filtros"""
+    proyeccion = construir_proyeccion(PROYECCION_RESULTADO, fields, expand)
+    if proyeccion:
+        query = proyeccion.query(db)
+    else:
+        query = db.query(Resultado).options(
+            joinedload(Resultado.inscrito).options(
+                defer(Inscripcion.comprobante_pago), joinedload(Inscripcion.sede_obj)
+            ),
+            joinedload(Resultado.ronda).joinedload(Ronda.sede)
+        )
+    
+    if ronda_id:
+        query = query.filter(Resultado.ronda_id == ronda_id)
+    if inscrito_id:
+        query = query.filter(Resultado.inscrito_id == inscrito_id)
+    
+    resultados = query.order_by(desc(Resultado.puntaje)).offset(skip).limit(limit).all()
+    if proyeccion:
+        return RespuestaJSON(proyeccion.serializar(resultados))
+    return resultados
+
+# Columnas del export de resultados (proyección, sin entidades ORM)
+CAMPOS_EXPORTACION_RESULTADOS = (
+    "id,inscrito_id,ronda_id,puntaje,posicion,clasificado,"
+    "inscrito.nombre_artistico,inscrito.categoria,inscrito.municipio,ronda.nombre,ronda.tipo"
+)
+
+@router.get("/api/admin/resultados/exportar")
+async def exportar_resultados(
+    ronda_id: Optional[int] = None,
+    formato: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: Usuario = Depends(get_current_admin_or_jurado_user)
+):
+    """Exportar resultados en streaming (CSV o NDJSON)"""
+    consulta = PROYECCION_RESULTADO.construir(CAMPOS_EXPORTACION_RESULTADOS, None)
+
+    def generar():
+        # Sesión propia: la de la dependencia se cierra antes de iniciar el streaming
+        db = SessionLocal()
+        try:
+            query = consulta.query(db)
+            if ronda_id:
+                query = query.filter(Resultado.ronda_id == ronda_id)
+            query = query.order_by(Resultado.ronda_id, desc(Resultado.puntaje)).yield_per(1000)
+
+            encabezado_enviado = False
+            lote = []
+            for fila in query:
+                lote.append(fila)
+                if len(lote) < 1000:
+                    continue
+                yield _codificar_exportacion(consulta.serializar(lote), formato, not encabezado_enviado)
+                encabezado_enviado = True
+                lote = []
+            if lote or not encabezado_enviado:
+                yield _codificar_exportacion(consulta.serializar(lote), formato, not encabezado_enviado)
+        finally:
+            db.close()
+
+    media_type = "text/csv" if formato == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        generar(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="resultados.{formato}"'}
+    )
+
+def _codificar_exportacion(items: List[dict], formato: str, encabezado: bool) -> bytes:
+    """Codificar un lote de resultados serializados como CSV o NDJSON"""
+    if formato == "ndjson":
+        return b"".join(codificar_json(item) + b"\n" for item in items)
+
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    columnas = CAMPOS_EXPORTACION_RESULTADOS.split(",")
+    if encabezado:
+        escritor.writerow(columnas)
+    for item in items:
+        fila = []
+        for columna in columnas:
+            relacion, _, campo = columna.partition(".")
+            if campo:
+                anidado = item.get(relacion)
+                fila.append(anidado.get(campo) if anidado else None)
+            else:
+                fila.append(item.get(columna))
+        escritor.writerow(fila)
+    return salida.getvalue().encode("utf-8")
+
+@router.post("/api/admin/resultados", response_model=schemas.Resultado)
+async def crear_resultado(
+    resultado_data: ResultadoCreate,
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Crear o actualizar resultado de participante en ronda"""
+    # Verificar que no existe ya un resultado para este inscrito en esta ronda
+    resultado_existente = db.query(Resultado).filter(
+        Resultado.inscrito_id == resultado_data.inscrito_id,
+        Resultado.ronda_id == resultado_data.ronda_id
+    ).first()
+    
+    clasificado_antes = bool(resultado_existente and resultado_existente.clasificado)
+    if resultado_data.clasificado and not clasificado_antes:
+        notificaciones.registrar(db, notificaciones.avisos_clasificados(
+            db, [(resultado_data.inscrito_id, resultado_data.ronda_id)]
+        ))
+    
+    if resultado_existente:
+        # Actualizar resultado existente
+        for campo, valor in resultado_data.dict().items():
+            setattr(resultado_existente, campo, valor)
+        
+        resultado_existente.fecha_actualizacion = datetime.utcnow()
+        
+        # Crear evento de auditoría (también al reenviar o corregir un resultado)
+        evento = EventoSistema(
+            usuario_id=current_user.id,
+            accion="Actualización de resultado",
+            tabla_afectada="resultados",
+            registro_id=str(resultado_existente.id),
+            datos_nuevos=jsonable_encoder(resultado_data)
+        )
+        db.add(evento)
+        publicacion.marcar(db, [resultado_data.ronda_id])
+        db.commit()
+        db.refresh(resultado_existente)
+        
+        return resultado_existente
+    else:
+        # Crear nuevo resultado
+        resultado = Resultado(**resultado_data.dict())
+        db.add(resultado)
+        
+        # Crear evento de auditoría
+        evento = EventoSistema(
+            usuario_id=current_user.id,
+            accion="Creación de resultado",
+            tabla_afectada="resultados",
+            datos_nuevos=resultado_data.dict()
+        )
+        db.add(evento)
+        publicacion.marcar(db, [resultado_data.ronda_id])
+        
+        db.commit()
+        db.refresh(resultado)
+        
+        return resultado
+
+@router.post("/api/admin/resultados/bulk")
+async def cargar_resultados_bulk(
+    resultados_data: List[ResultadoCreate],
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Cargar resultados en lote para una ronda"""
+    resultados_creados = []
+    resultados_actualizados = []
+    nuevos_clasificados = []
+    
+    for resultado_data in resultados_data:
+        # Verificar si ya existe
+        resultado_existente = db.query(Resultado).filter(
+            Resultado.inscrito_id == resultado_data.inscrito_id,
+            Resultado.ronda_id == resultado_data.ronda_id
+        ).first()
+        
+        if resultado_data.clasificado and not (resultado_existente and resultado_existente.clasificado):
+            nuevos_clasificados.append((resultado_data.inscrito_id, resultado_data.ronda_id))
+        
+        if resultado_existente:
+            # Actualizar existente
+            for campo, valor in resultado_data.dict().items():
+                setattr(resultado_existente, campo, valor)
+            resultado_existente.fecha_actualizacion = datetime.utcnow()
+            resultados_actualizados.append(resultado_existente)
+        else:
+            # Crear nuevo
+            resultado = Resultado(**resultado_data.dict())
+            db.add(resultado)
+            resultados_creados.append(resultado)
+    
+    # Crear evento de auditoría
+    evento = EventoSistema(
+        usuario_id=current_user.id,
+        accion=f"Carga masiva de resultados: {len(resultados_creados)} creados, {len(resultados_actualizados)} actualizados",
+        tabla_afectada="resultados"
+    )
+    db.add(evento)
+    publicacion.marcar(db, [resultado_data.ronda_id for resultado_data in resultados_data])
+    notificaciones.registrar(db, notificaciones.avisos_clasificados(db, nuevos_clasificados))
+    
+    db.commit()
+    
+    return {
+        "message": "Resultados cargados exitosamente",
+        "creados": len(resultados_creados),
+        "actualizados": len(resultados_actualizados)
+    }
+
+@router.post("/api/admin/resultados/publicar", response_model=schemas.PublicacionResponse)
+async def publicar_resultados(
+    datos: PublicacionRequest,
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Publicar los resultados de las rondas; después se regeneran solos al cambiar"""
+    ronda_ids = sorted(set(datos.ronda_ids))
+    existentes = {fila.id for fila in db.query(Ronda.id).filter(Ronda.id.in_(ronda_ids))}
+    faltantes = [ronda_id for ronda_id in ronda_ids if ronda_id not in existentes]
+    if faltantes:
+        raise HTTPException(status_code=404, detail=f"Rondas no encontradas: {faltantes}")
+
+    versiones = {}
+    for ronda_id in ronda_ids:
+        versiones.update(publicacion.publicar_ronda(db, ronda_id))
+
+    # Crear evento de auditoría
+    evento = EventoSistema(
+        usuario_id=current_user.id,
+        accion=f"Publicación de resultados de {len(ronda_ids)} rondas",
+        tabla_afectada="resultados",
+        datos_nuevos={"ronda_ids": ronda_ids}
+    )
+    db.add(evento)
+    db.commit()
+    publicacion.borrar_obsoletas(db)
+    return {"versiones": versiones}
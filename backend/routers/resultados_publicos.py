@@ -0,0 +1,72 @@
+"""
+Resultados publicados para espectadores (instantáneas JSON, sin consultar resultados).
+"""
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+
+import publicacion
+from database import get_db
+from models import CategoriaParticipante
+
+# La versión vigente puede cambiar: caché corta y revalidación con ETag.
+# Una versión concreta nunca cambia: caché permanente.
+MAX_EDAD_PUBLICO = int(os.getenv("MAX_EDAD_PUBLICO", "10"))
+CACHE_VIGENTE = f"public, max-age={MAX_EDAD_PUBLICO}, stale-while-revalidate={MAX_EDAD_PUBLICO * 6}"
+CACHE_VERSION = "public, max-age=31536000, immutable"
+
+router = APIRouter()
+
+
+def _servir(request: Request, db: Session, clave: str, version: Optional[int]) -> Response:
+    """Responder con el archivo de la instantánea: 304 si el ETag coincide"""
+    vigente = publicacion.vigente(db, clave)
+    if vigente is None:
+        raise HTTPException(status_code=404, detail="Resultados no publicados")
+    actual, _ = vigente
+    if version is not None and not actual - publicacion.CONSERVAR_VERSIONES < version <= actual:
+        raise HTTPException(status_code=404, detail="Versión no disponible")
+
+    fijada = version is not None
+    version = version or actual
+    ubicacion = request.url.include_query_params(version=version)
+    cabeceras = {
+        "ETag": f'"{clave.replace(" ", "_")}-v{version}"',
+        "Cache-Control": CACHE_VERSION if fijada else CACHE_VIGENTE,
+        "Content-Location": f"{ubicacion.path}?{ubicacion.query}",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and cabeceras["ETag"] in {valor.strip() for valor in if_none_match.split(",")}:
+        return Response(status_code=304, headers=cabeceras)
+
+    try:
+        contenido = publicacion.leer(publicacion.ruta(clave, version))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Versión no disponible")
+    return Response(content=contenido, media_type="application/json", headers=cabeceras)
+
+
+@router.get("/api/publico/resultados/rondas/{ronda_id}")
+async def get_resultados_ronda_publicos(
+    request: Request,
+    ronda_id: int,
+    categoria: Optional[CategoriaParticipante] = None,
+    version: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db)
+):
+    """Tabla de posiciones publicada de una ronda (general o de una categoría)"""
+    clave = publicacion.clave_ronda(ronda_id, categoria.value if categoria else None)
+    return _servir(request, db, clave, version)
+
+
+@router.get("/api/publico/resultados/sedes/{sede_id}")
+async def get_resultados_sede_publicos(
+    request: Request,
+    sede_id: int,
+    version: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db)
+):
+    """Rondas publicadas de la sede con los primeros lugares por categoría"""
+    return _servir(request, db, publicacion.clave_sede(sede_id), version)
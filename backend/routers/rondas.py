@@ -0,0 +1,126 @@
+"""
+Gestión de rondas.
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+import programacion
+import progresion
+import schemas
+from auth import get_current_admin_or_jurado_user, get_current_admin_user
+from cache_referencia import cache_rondas
+from database import get_db
+from models import EventoSistema, Ronda, Sede, TipoRonda, Usuario
+from schemas import ProgramacionRequest, PromocionRequest, RondaCreate
+
+router = APIRouter()
+
+
+@router.get("/api/admin/rondas", response_model=List[schemas.Ronda])
+async def get_rondas_admin(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    sede_id: Optional[int] = None,
+    tipo: Optional[TipoRonda] = None,
+    activo: Optional[bool] = None,
+    current_user: Usuario = Depends(get_current_admin_or_jurado_user),
+    db: Session = Depends(get_db)
+):
+    """Obtener todas las rondas (desde la caché de referencia)"""
+    def filtrar(rondas: List[dict]) -> List[dict]:
+        if sede_id:
+            rondas = [ronda for ronda in rondas if ronda["sede_id"] == sede_id]
+        if tipo:
+            rondas = [ronda for ronda in rondas if ronda["tipo"] == tipo.value]
+        if activo is not None:
+            rondas = [ronda for ronda in rondas if ronda["activo"] == activo]
+        return rondas[skip:skip + limit]
+
+    clave = f"{skip}|{limit}|{sede_id}|{tipo.value if tipo else None}|{activo}"
+    return cache_rondas.responder(request, db, clave, filtrar)
+
+@router.post("/api/admin/rondas", response_model=schemas.Ronda)
+async def crear_ronda(
+    ronda_data: RondaCreate,
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Crear nueva ronda"""
+    # Verificar que la sede existe
+    sede = db.query(Sede).filter(Sede.id == ronda_data.sede_id).first()
+    if not sede:
+        raise HTTPException(status_code=404, detail="Sede no encontrada")
+    
+    ronda = Ronda(**ronda_data.dict())
+    db.add(ronda)
+    
+    # Crear evento de auditoría
+    evento = EventoSistema(
+        usuario_id=current_user.id,
+        accion="Creación de ronda",
+        tabla_afectada="rondas",
+        datos_nuevos=jsonable_encoder(ronda_data)
+    )
+    db.add(evento)
+    
+    db.commit()
+    db.refresh(ronda)
+    cache_rondas.invalidar()
+    
+    return ronda
+
+@router.post("/api/admin/rondas/programar", response_model=schemas.ProgramacionResponse)
+async def programar_rondas(
+    datos: ProgramacionRequest,
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Asignar a los aprobados sin programar a rondas clasificatorias según la capacidad de las sedes"""
+    try:
+        respuesta = programacion.programar(db, **datos.dict())
+    except programacion.ProgramacionInvalida as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if datos.dry_run:
+        return respuesta
+
+    # Crear evento de auditoría
+    evento = EventoSistema(
+        usuario_id=current_user.id,
+        accion=f"Programación de rondas clasificatorias: {respuesta['asignados']} inscritos asignados",
+        tabla_afectada="resultados",
+        datos_nuevos=jsonable_encoder(datos)
+    )
+    db.add(evento)
+    db.commit()
+    cache_rondas.invalidar()
+    return respuesta
+
+@router.post("/api/admin/rondas/promover", response_model=schemas.PromocionResponse)
+async def promover_rondas(
+    datos: PromocionRequest,
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Promover a los inscritos de las rondas a la siguiente etapa (dry_run para ver el resultado sin aplicarlo)"""
+    try:
+        respuesta = progresion.promover(db, **datos.dict())
+    except progresion.PromocionInvalida as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if datos.dry_run:
+        return respuesta
+
+    # Crear evento de auditoría
+    evento = EventoSistema(
+        usuario_id=current_user.id,
+        accion=f"Promoción a {respuesta['tipo_destino'].value}: {respuesta['creados']} resultados creados",
+        tabla_afectada="resultados",
+        datos_nuevos=jsonable_encoder(datos)
+    )
+    db.add(evento)
+    db.commit()
+    cache_rondas.invalidar()
+    return respuesta
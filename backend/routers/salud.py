@@ -0,0 +1,22 @@
+"""
+Salud del servicio.
+"""
+from fastapi import APIRouter
+
+from database import test_connection
+
+router = APIRouter()
+
+
+@router.get("/")
+async def root():
+    return {"message": "Karaoke Sensō API v2.0 - Panel de Administración"}
+
+@router.get("/api/health")
+async def health_check():
+    db_status = test_connection()
+    return {
+        "status": "healthy" if db_status else "unhealthy",
+        "database": "connected" if db_status else "disconnected",
+        "version": "2.0.0"
+    }
@@ -0,0 +1,158 @@
+"""
+Gestión de sedes.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+
+import cupos
+import programacion
+import schemas
+from auth import get_current_admin_or_jurado_user, get_current_admin_user
+from cache_referencia import cache_rondas, cache_sedes
+from database import get_db
+from models import EventoSistema, Inscripcion, Sede, Usuario
+from schemas import SedeCreate, SedeUpdate
+
+router = APIRouter()
+
+
+@router.get("/api/admin/sedes", response_model=List[schemas.Sede])
+async def get_sedes_admin(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    activo: Optional[bool] = None,
+    estado: Optional[str] = None,
+    current_user: Usuario = Depends(get_current_admin_or_jurado_user),
+    db: Session = Depends(get_db)
+):
+    """Obtener todas las sedes (desde la caché de referencia)"""
+    def filtrar(sedes: List[dict]) -> List[dict]:
+        if activo is not None:
+            sedes = [sede for sede in sedes if sede["activo"] == activo]
+        if estado:
+            buscado = estado.casefold()
+            sedes = [sede for sede in sedes if buscado in sede["estado"].casefold()]
+        return sedes[skip:skip + limit]
+
+    return cache_sedes.responder(request, db, f"{skip}|{limit}|{activo}|{estado}", filtrar)
+
+@router.post("/api/admin/sedes", response_model=schemas.Sede)
+async def crear_sede(
+    sede_data: SedeCreate,
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Crear nueva sede"""
+    sede = Sede(**sede_data.dict())
+    db.add(sede)
+    db.flush()
+    cupos.asegurar(db, sede.id)
+    
+    # Crear evento de auditoría
+    evento = EventoSistema(
+        usuario_id=current_user.id,
+        accion="Creación de sede",
+        tabla_afectada="sedes",
+        datos_nuevos=sede_data.dict()
+    )
+    db.add(evento)
+    
+    db.commit()
+    db.refresh(sede)
+    cache_sedes.invalidar()
+    cache_rondas.invalidar()
+    
+    return sede
+
+@router.put("/api/admin/sedes/{sede_id}", response_model=schemas.Sede)
+async def actualizar_sede(
+    sede_id: int,
+    sede_data: SedeUpdate,
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Actualizar sede existente"""
+    sede = db.query(Sede).filter(Sede.id == sede_id).first()
+    if not sede:
+        raise HTTPException(status_code=404, detail="Sede no encontrada")
+    
+    # Guardar datos anteriores
+    datos_anteriores = {campo: getattr(sede, campo) for campo in sede_data.dict(exclude_unset=True).keys()}
+    
+    # Actualizar campos
+    for campo, valor in sede_data.dict(exclude_unset=True).items():
+        setattr(sede, campo, valor)
+    
+    sede.fecha_actualizacion = datetime.utcnow()
+    
+    # La capacidad nueva se copia al contador de cupos; si aumentó pasan los de la lista de espera
+    if "capacidad" in sede_data.dict(exclude_unset=True):
+        cupos.ajustar_capacidad(db, sede_id, sede.capacidad)
+    
+    # Crear evento de auditoría  
+    evento = EventoSistema(
+        usuario_id=current_user.id,
+        accion="Actualización de sede",
+        tabla_afectada="sedes",
+        registro_id=str(sede_id),
+        datos_anteriores=datos_anteriores,
+        datos_nuevos=sede_data.dict(exclude_unset=True)
+    )
+    db.add(evento)
+    
+    db.commit()
+    db.refresh(sede)
+    cache_sedes.invalidar()
+    cache_rondas.invalidar()
+    
+    return sede
+
+@router.delete("/api/admin/sedes/{sede_id}")
+async def eliminar_sede(
+    sede_id: int,
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Eliminar sede (soft delete)"""
+    sede = db.query(Sede).filter(Sede.id == sede_id).first()
+    if not sede:
+        raise HTTPException(status_code=404, detail="Sede no encontrada")
+    
+    # Verificar si tiene inscripciones activas
+    inscripciones_activas = db.query(Inscripcion).filter(
+        Inscripcion.sede_id == sede_id,
+        Inscripcion.estatus.in_(["pendiente", "aprobado"])
+    ).count()
+    
+    if inscripciones_activas > 0:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"No se puede eliminar la sede. Tiene {inscripciones_activas} inscripciones activas."
+        )
+    
+    sede.activo = False
+    sede.fecha_actualizacion = datetime.utcnow()
+    db.flush()
+    
+    # Re-programar en otras sedes a los inscritos pendientes de sus rondas clasificatorias
+    replanificacion = programacion.replanificar_sede(db, sede_id)
+    
+    # Crear evento de auditoría
+    evento = EventoSistema(
+        usuario_id=current_user.id,
+        accion="Eliminación de sede",
+        tabla_afectada="sedes",
+        registro_id=str(sede_id),
+        datos_nuevos=replanificacion
+    )
+    db.add(evento)
+    
+    db.commit()
+    cache_sedes.invalidar()
+    cache_rondas.invalidar()
+    
+    return {"message": "Sede eliminada exitosamente", "replanificacion": replanificacion}
@@ -0,0 +1,168 @@
+"""
+Subidas reanudables de video (protocolo por partes, estilo tus).
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+
+import contenedores
+import subidas
+from database import get_db
+from models import Inscripcion, ParteSubida, SubidaVideo, Video
+from schemas import SubidaVideoCreate, SubidaVideoEstado
+
+router = APIRouter()
+
+
+CABECERAS_TUS = {"Tus-Resumable": "1.0.0", "Cache-Control": "no-store"}
+
+def _obtener_subida(db: Session, subida_id: str) -> SubidaVideo:
+    subida = db.query(SubidaVideo).filter(SubidaVideo.id == subida_id).first()
+    if not subida:
+        raise HTTPException(status_code=404, detail="Subida no encontrada")
+    return subida
+
+def _partes_recibidas(db: Session, subida_id: str) -> List[int]:
+    return [fila.indice for fila in db.query(ParteSubida.indice).filter(ParteSubida.subida_id == subida_id)]
+
+def _estado_subida(db: Session, subida: SubidaVideo) -> SubidaVideoEstado:
+    recibidas = _partes_recibidas(db, subida.id)
+    return SubidaVideoEstado(
+        id=subida.id,
+        inscrito_id=subida.inscrito_id,
+        tamaño_total=subida.tamaño_total,
+        tamaño_parte=subida.tamaño_parte,
+        total_partes=subida.total_partes,
+        partes_pendientes=subidas.partes_pendientes(subida, recibidas),
+        offset=subidas.offset_contiguo(subida, recibidas),
+        completada=subida.completada,
+        video_id=subida.video_id,
+        fecha_expiracion=subida.fecha_expiracion
+    )
+
+def _completar_subida(db: Session, subida: SubidaVideo):
+    """Crear el Video una sola vez, cuando llega la última parte"""
+    # UPDATE condicional: solo una petición concurrente gana la finalización
+    ganada = db.query(SubidaVideo).filter(
+        SubidaVideo.id == subida.id,
+        SubidaVideo.completada == False
+    ).update({"completada": True}, synchronize_session=False)
+    if not ganada:
+        db.rollback()
+        return
+
+    try:
+        metadatos = contenedores.analizar_ruta(subidas.ruta_parcial(subida.id))
+        contenedores.verificar_declarado(metadatos, subida.nombre_archivo, subida.tipo_contenido)
+    except contenedores.ContenedorInvalido as e:
+        subidas.descartar_subida(db, subida)
+        db.commit()
+        raise HTTPException(status_code=415, detail=str(e))
+
+    ruta = subidas.finalizar_archivo(subida)
+    inscripcion = db.query(Inscripcion).filter(Inscripcion.id == subida.inscrito_id).first()
+    video = Video(
+        inscrito_id=subida.inscrito_id,
+        titulo=f"Video de {inscripcion.nombre_artistico}",
+        url_video=ruta,
+        formato=metadatos.formato,
+        duracion=metadatos.duracion_segundos,
+        ancho=metadatos.ancho,
+        alto=metadatos.alto,
+        codec=metadatos.codec,
+        tamaño_mb=Decimal(str(round(subida.tamaño_total / (1024 * 1024), 2)))
+    )
+    db.add(video)
+    db.flush()
+    db.query(SubidaVideo).filter(SubidaVideo.id == subida.id).update(
+        {"video_id": video.id}, synchronize_session=False
+    )
+    db.commit()
+
+@router.post("/api/inscripciones/{inscripcion_id}/video/subidas", response_model=SubidaVideoEstado, status_code=201)
+async def crear_subida_video(
+    inscripcion_id: str,
+    datos: SubidaVideoCreate,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    """Iniciar una subida reanudable de video"""
+    inscripcion = db.query(Inscripcion).filter(Inscripcion.id == inscripcion_id).first()
+    if not inscripcion:
+        raise HTTPException(status_code=404, detail="Inscripción no encontrada")
+    if datos.tamaño_total > subidas.TAMAÑO_MAXIMO_VIDEO:
+        raise HTTPException(status_code=413, detail="Archivo muy grande. Máximo 50MB.")
+
+    # Limpieza oportunista de subidas abandonadas
+    subidas.purgar_subidas_expiradas(db)
+
+    subida = subidas.crear_subida(db, inscripcion_id, datos.tamaño_total, datos.nombre_archivo, datos.tipo_contenido)
+    db.commit()
+
+    response.headers.update(CABECERAS_TUS)
+    response.headers["Location"] = f"/api/subidas/{subida.id}"
+    return _estado_subida(db, subida)
+
+@router.get("/api/subidas/{subida_id}", response_model=SubidaVideoEstado)
+async def obtener_subida_video(subida_id: str, db: Session = Depends(get_db)):
+    """Estado de una subida: partes pendientes y offset contiguo"""
+    return _estado_subida(db, _obtener_subida(db, subida_id))
+
+@router.head("/api/subidas/{subida_id}")
+async def consultar_subida_video(subida_id: str, db: Session = Depends(get_db)):
+    """Progreso de una subida en cabeceras (Upload-Offset / Upload-Length)"""
+    subida = _obtener_subida(db, subida_id)
+    recibidas = _partes_recibidas(db, subida.id)
+    return Response(status_code=200, headers={
+        **CABECERAS_TUS,
+        "Upload-Offset": str(subidas.offset_contiguo(subida, recibidas)),
+        "Upload-Length": str(subida.tamaño_total),
+        "Upload-Parts-Pending": str(subida.total_partes - len(recibidas))
+    })
+
+@router.patch("/api/subidas/{subida_id}", status_code=204)
+async def subir_parte_video(subida_id: str, request: Request, db: Session = Depends(get_db)):
+    """Recibir una parte; las partes pueden enviarse en paralelo y en cualquier orden"""
+    subida = _obtener_subida(db, subida_id)
+    if subida.completada:
+        return Response(status_code=204, headers={**CABECERAS_TUS, "Upload-Offset": str(subida.tamaño_total)})
+    if subida.fecha_expiracion.replace(tzinfo=None) < datetime.utcnow():
+        raise HTTPException(status_code=410, detail="La subida expiró")
+
+    try:
+        offset = int(request.headers["upload-offset"])
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="Cabecera Upload-Offset requerida")
+
+    try:
+        parte = await subidas.escribir_parte(subida, offset, request.stream(), request.headers.get("upload-checksum"))
+    except subidas.ParteInvalida as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except subidas.ChecksumInvalido as e:
+        raise HTTPException(status_code=460, detail=str(e))
+
+    if parte.indice == 0:
+        # Rechazar pronto un archivo que no es del tipo declarado, sin esperar el resto
+        with open(subidas.ruta_parcial(subida.id), "rb") as archivo:
+            inicio = archivo.read(12)
+        try:
+            contenedores.verificar_inicio(inicio, subida.nombre_archivo, subida.tipo_contenido)
+        except contenedores.ContenedorInvalido as e:
+            subidas.descartar_subida(db, subida)
+            db.commit()
+            raise HTTPException(status_code=415, detail=str(e))
+
+    db.merge(parte)
+    db.commit()
+
+    recibidas = _partes_recibidas(db, subida.id)
+    if len(recibidas) == subida.total_partes:
+        _completar_subida(db, subida)
+
+    return Response(status_code=204, headers={
+        **CABECERAS_TUS,
+        "Upload-Offset": str(subidas.offset_contiguo(subida, recibidas))
+    })
@@ -0,0 +1,89 @@
+"""
+Revisión de videos.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import desc
+from sqlalchemy.orm import Session, defer, joinedload
+
+import notificaciones
+import schemas
+from auth import get_current_admin_or_jurado_user, get_current_admin_user
+from database import get_db
+from models import EventoSistema, Inscripcion, Usuario, Video
+
+router = APIRouter()
+
+
+@router.get("/api/admin/videos", response_model=List[schemas.Video])
+async def get_videos_admin(
+    aprobado: Optional[bool] = None,
+    destacado: Optional[bool] = None,
+    inscrito_id: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: Usuario = Depends(get_current_admin_or_jurado_user),
+    db: Session = Depends(get_db)
+):
+    """Obtener videos con filtros"""
+    query = db.query(Video).options(
+        joinedload(Video.inscrito).options(defer(Inscripcion.comprobante_pago), joinedload(Inscripcion.sede_obj))
+    )
+    
+    if aprobado is not None:
+        query = query.filter(Video.aprobado == aprobado)
+    if destacado is not None:
+        query = query.filter(Video.destacado == destacado)
+    if inscrito_id:
+        query = query.filter(Video.inscrito_id == inscrito_id)
+    
+    videos = query.order_by(desc(Video.fecha_subida)).offset(skip).limit(limit).all()
+    return videos
+
+@router.put("/api/admin/videos/{video_id}/revision")
+async def revisar_video(
+    video_id: int,
+    revision_data: dict,
+    current_user: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Aprobar, rechazar o marcar como destacado un video"""
+    video = db.query(Video).filter(Video.id == video_id).first()
+    if not video:
+        raise HTTPException(status_code=404, detail="Video no encontrado")
+    
+    # Actualizar campos de revisión
+    if "aprobado" in revision_data:
+        video.aprobado = revision_data["aprobado"]
+    if "destacado" in revision_data:
+        video.destacado = revision_data["destacado"]
+    if "observaciones" in revision_data:
+        video.observaciones = revision_data["observaciones"]
+    
+    video.fecha_revision = datetime.utcnow()
+    
+    # Crear evento de auditoría
+    evento = EventoSistema(
+        usuario_id=current_user.id,
+        accion="Revisión de video",
+        tabla_afectada="videos",
+        registro_id=str(video_id),
+        datos_nuevos=revision_data
+    )
+    db.add(evento)
+    
+    # Aviso al participante; la clave por video y decisión evita repetirlo en revisiones posteriores
+    if "aprobado" in revision_data:
+        inscripcion = video.inscrito
+        plantilla = "video_aprobado" if video.aprobado else "video_rechazado"
+        notificaciones.registrar(db, [notificaciones.aviso(
+            plantilla, f"{video_id}:{int(bool(video.aprobado))}", inscripcion.correo, inscripcion.telefono,
+            nombre=inscripcion.nombre_artistico, observaciones=video.observaciones or "",
+        )])
+    
+    db.commit()
+    db.refresh(video)
+    
+    return {"message": "Video revisado exitosamente", "video": video}
@@ -1,8 +1,8 @@
-from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, validator
+from typing import Any, Optional, List, Dict
 from datetime import datetime
 from decimal import Decimal
-from models import RolUsuario, EstatusInscripcion, CategoriaParticipante, TipoRonda
+from models import RolUsuario, EstatusInscripcion, CategoriaParticipante, TipoRonda, EstadoTrabajo
 
 # Esquemas para Usuario
 class UsuarioBase(BaseModel):
@@ -104,11 +104,36 @@ class Inscripcion(InscripcionBase):
     fecha_inscripcion: datetime
     fecha_actualizacion: datetime
     observaciones: Optional[str] = None
+    comprobante_miniatura: Optional[str] = None
+    posible_duplicado_de: Optional[str] = None
     sede_obj: Optional[Sede] = None
     
     class Config:
         from_attributes = True
 
+# Esquemas para cambios masivos de estatus
+class FiltroInscripciones(BaseModel):
+    estatus: Optional[EstatusInscripcion] = None
+    categoria: Optional[CategoriaParticipante] = None
+    sede_id: Optional[int] = None
+    municipio: Optional[str] = None
+
+class CambioEstatusMasivo(BaseModel):
+    estatus: EstatusInscripcion
+    # También se guardan en filas que ya tienen el estatus (cuentan como actualizadas, sin aviso)
+    observaciones: Optional[str] = None
+    ids: Optional[List[str]] = None
+    filtro: Optional[FiltroInscripciones] = None
+    dry_run: bool = False
+
+class CambioEstatusMasivoResponse(BaseModel):
+    dry_run: bool
+    total: int
+    actualizados: int
+    sin_cambio: int
+    no_encontrados: int
+    resultados: Dict[str, str]
+
 # Esquemas para Ronda
 class RondaBase(BaseModel):
     nombre: str
@@ -138,6 +163,56 @@ class Ronda(RondaBase):
     class Config:
         from_attributes = True
 
+# Esquemas para promoción a la siguiente etapa
+class PromocionRequest(BaseModel):
+    ronda_ids: List[int] = Field(..., min_length=1)
+    criterio: str = Field("clasificados", pattern="^(clasificados|mejores)$")
+    n: Optional[int] = Field(None, ge=1)  # para criterio "mejores"
+    agrupar_por: str = Field("sede", pattern="^(sede|estado)$")
+    fecha: Optional[datetime] = None  # de las rondas nuevas
+    sede_destino_id: Optional[int] = None  # una sola ronda destino en esta sede
+    dry_run: bool = False
+
+class GrupoPromocion(BaseModel):
+    sede_id: int
+    ronda_id: Optional[int] = None
+    nueva: bool
+    promovidos: int
+
+class PromocionResponse(BaseModel):
+    dry_run: bool
+    tipo_origen: TipoRonda
+    tipo_destino: TipoRonda
+    total: int
+    creados: int
+    grupos: List[GrupoPromocion]
+
+# Esquemas para programación de rondas clasificatorias
+class ProgramacionRequest(BaseModel):
+    fechas: List[datetime] = []  # una ronda nueva por sede y fecha, si recibe inscritos
+    ronda_ids: Optional[List[int]] = None  # por defecto todas las clasificatorias activas
+    categoria: Optional[CategoriaParticipante] = None
+    estado: Optional[str] = None
+    nivel_maximo: str = Field("estado", pattern="^(sede|municipio|estado|cualquiera)$")
+    dry_run: bool = False
+
+class RondaProgramada(BaseModel):
+    ronda_id: Optional[int] = None
+    sede_id: int
+    fecha: datetime
+    nueva: bool
+    capacidad: int  # 0 = sin límite
+    ocupados: int
+    asignados: int
+
+class ProgramacionResponse(BaseModel):
+    dry_run: bool
+    total: int
+    asignados: int
+    sin_lugar: int
+    por_nivel: Dict[str, int]
+    rondas: List[RondaProgramada]
+
 # Esquemas para Resultado
 class ResultadoBase(BaseModel):
     inscrito_id: str
@@ -166,6 +241,63 @@ class Resultado(ResultadoBase):
     class Config:
         from_attributes = True
 
+# Esquemas para Puntajes por jurado
+class PuntajeJuradoCreate(BaseModel):
+    ronda_id: int
+    inscrito_id: str
+    puntaje: Decimal = Field(..., ge=0, le=100, decimal_places=2)
+
+class PuntajesJuradoRequest(BaseModel):
+    puntajes: List[PuntajeJuradoCreate] = Field(..., min_length=1, max_length=500)
+
+class PuntajeJurado(PuntajeJuradoCreate):
+    jurado_id: int
+    version: int
+    fecha_captura: Optional[datetime] = None
+    fecha_actualizacion: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+# Esquemas para sincronización de puntajes capturados sin conexión
+class OperacionPuntajeSync(PuntajeJuradoCreate):
+    op_id: str = Field(..., min_length=1, max_length=36)
+    secuencia: int = Field(..., ge=0)
+    version_base: Optional[int] = None  # versión del servidor que vio el dispositivo; None si no la conocía
+    capturado_en: datetime
+
+class SincronizacionPuntajesRequest(BaseModel):
+    dispositivo_id: str = Field(..., min_length=1, max_length=64)
+    regla: str = Field("version", pattern="^(version|ultimo_escritor)$")
+    operaciones: List[OperacionPuntajeSync] = Field(..., min_length=1, max_length=10000)
+
+class EstadoPuntaje(BaseModel):
+    ronda_id: int
+    inscrito_id: str
+    puntaje: Decimal
+    version: int
+    fecha_captura: Optional[datetime] = None
+
+class ConflictoPuntaje(EstadoPuntaje):
+    op_id: str
+
+class SincronizacionPuntajesResponse(BaseModel):
+    dispositivo_id: str
+    ultima_secuencia: Optional[int] = None
+    aplicadas: int
+    duplicadas: int
+    rechazadas: int
+    resultados: Dict[str, str]  # op_id -> aplicada | conflicto | rechazada (en un reenvío, el estado original)
+    aplicados: List[EstadoPuntaje]
+    conflictos: List[ConflictoPuntaje]
+
+# Esquemas para publicación de resultados
+class PublicacionRequest(BaseModel):
+    ronda_ids: List[int] = Field(..., min_length=1, max_length=500)
+
+class PublicacionResponse(BaseModel):
+    versiones: Dict[str, int]  # clave de instantánea -> versión vigente
+
 # Esquemas para Video
 class VideoBase(BaseModel):
     inscrito_id: str
@@ -174,6 +306,9 @@ class VideoBase(BaseModel):
     url_video: Optional[str] = None
     duracion: Optional[int] = None
     formato: Optional[str] = None
+    ancho: Optional[int] = None
+    alto: Optional[int] = None
+    codec: Optional[str] = None
     tamaño_mb: Optional[Decimal] = None
 
 class VideoCreate(VideoBase):
@@ -198,6 +333,54 @@ class Video(VideoBase):
     class Config:
         from_attributes = True
 
+# Esquemas para Subidas reanudables de video
+class SubidaVideoCreate(BaseModel):
+    tamaño_total: int = Field(..., gt=0)
+    nombre_archivo: str
+    tipo_contenido: Optional[str] = None
+
+class SubidaVideoEstado(BaseModel):
+    id: str
+    inscrito_id: str
+    tamaño_total: int
+    tamaño_parte: int
+    total_partes: int
+    partes_pendientes: List[int]
+    offset: int
+    completada: bool
+    video_id: Optional[int] = None
+    fecha_expiracion: datetime
+
+# Esquemas para Trabajos en segundo plano
+class TrabajoResponse(BaseModel):
+    id: int
+    tipo: str
+    estado: EstadoTrabajo
+    prioridad: int
+    intentos: int
+    max_intentos: int
+    ejecutar_despues: datetime
+    resultado: Optional[Any] = None
+    error: Optional[str] = None
+    fecha_creacion: datetime
+    fecha_inicio: Optional[datetime] = None
+    fecha_fin: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class EstadisticasTrabajo(BaseModel):
+    tipo: str
+    pendiente: int
+    listos: int
+    en_proceso: int
+    completado: int
+    fallido: int
+    espera_p50_ms: Optional[float] = None
+    espera_p95_ms: Optional[float] = None
+    ejecucion_p50_ms: Optional[float] = None
+    ejecucion_p95_ms: Optional[float] = None
+
 # Esquemas para Estadísticas
 class EstadisticasResponse(BaseModel):
     total_inscritos: int
@@ -210,4 +393,38 @@ class EstadisticasResponse(BaseModel):
     videos_aprobados: int
     inscritos_por_categoria: dict
     inscritos_por_sede: dict
-    inscritos_por_municipio: dict
\ No newline at end of file
+    inscritos_por_municipio: dict
+
+class CuboResponse(BaseModel):
+    por: List[str]
+    total: int
+    celdas: List[Dict[str, Any]]  # valores de las dimensiones de `por` y "conteo"
+    actualizado: datetime
+
+class PuntoSerie(BaseModel):
+    inicio: datetime
+    grupo: Optional[Any] = None  # categoría o sede_id, según `por`
+    total: int
+
+class SerieTiempoResponse(BaseModel):
+    serie: str
+    granularidad: str
+    por: str
+    al_dia_hasta: Optional[datetime] = None  # después de esta fecha los conteos son en vivo
+    puntos: List[PuntoSerie]
+
+# Esquemas para peticiones en lote
+class PeticionLote(BaseModel):
+    id: str
+    ruta: str  # p. ej. "/api/admin/inscripciones?estatus=pendiente&limit=50"
+
+class LoteRequest(BaseModel):
+    peticiones: List[PeticionLote] = Field(..., min_length=1, max_length=20)
+
+class RespuestaLote(BaseModel):
+    id: str
+    status: int
+    body: Any = None
+
+class LoteResponse(BaseModel):
+    respuestas: List[RespuestaLote]
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Series de tiempo preagregadas de inscripciones y videos subidos.
+
+conteos_hora guarda cuántas filas hubo por hora, categoría y sede; las
+gráficas del panel leen esos contadores en lugar de agrupar las tablas
+completas. Niveles más gruesos (día, semana, mes) se derivan de las horas.
+
+Mantenimiento:
+- ponerse_al_dia() suma las filas nuevas desde la marca de cada serie
+  (marcas_series.hasta) hasta ahora menos MARGEN_SERIES_SEGUNDOS, para no
+  perder filas de transacciones que confirman tarde. Solo recorre el índice
+  de fecha a partir de la marca. Lo ejecuta el trabajo periódico
+  estadisticas.series (ver tareas.py).
+- reconstruir() vuelve a contar desde una fecha (o desde el principio): es el
+  backfill de datos históricos y corrige los contadores tras borrados.
+- consultar() lee los contadores hasta la marca y cuenta en vivo solo el
+  tramo posterior, así que la respuesta siempre está al día.
+
+Las horas son las del servidor de base de datos (las mismas de las columnas de fecha).
+
+Uso:
+    python series_tiempo.py                          # ponerse al día
+    python series_tiempo.py --reconstruir [--desde 2025-01-01]
+    python series_tiempo.py --programar              # encolar el trabajo periódico
+"""
+import argparse
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from database import upsert
+from models import ConteoHora, Inscripcion, MarcaSerie, Video
+
+MARGEN_SERIES_SEGUNDOS = int(os.getenv("MARGEN_SERIES_SEGUNDOS", "60"))
+INTERVALO_SERIES_SEGUNDOS = int(os.getenv("INTERVALO_SERIES_SEGUNDOS", "300"))
+TAMAÑO_LOTE_CONTEOS = 1000
+
+# Serie -> columna de fecha; la categoría y la sede son las de la inscripción
+SERIES = {
+    "inscripciones": Inscripcion.fecha_inscripcion,
+    "videos": Video.fecha_subida,
+}
+GRANULARIDADES = ("hora", "dia", "semana", "mes")
+AGRUPACIONES = ("ninguna", "categoria", "sede")
+
+Fila = Tuple[datetime, str, int, int]  # (hora, categoria, sede_id, total)
+
+
+def _truncar_hora(db: Session, columna):
+    # Formato como texto SQL y no como parámetro: el GROUP BY debe repetir
+    # exactamente la expresión del SELECT (ONLY_FULL_GROUP_BY en MySQL)
+    dialecto = db.get_bind().dialect.name
+    if dialecto == "mysql":
+        return func.date_format(columna, text("'%Y-%m-%d %H:00:00'"))
+    if dialecto == "sqlite":
+        return func.strftime(text("'%Y-%m-%d %H:00:00'"), columna)
+    return func.date_trunc(text("'hour'"), columna)
+
+
+def como_fecha(valor) -> datetime:
+    return datetime.fromisoformat(valor) if isinstance(valor, str) else valor.replace(tzinfo=None)
+
+
+def inicio_hora(fecha: datetime) -> datetime:
+    return fecha.replace(minute=0, second=0, microsecond=0)
+
+
+def cubeta(hora: datetime, granularidad: str) -> datetime:
+    """Inicio del periodo de `granularidad` que contiene la hora"""
+    if granularidad == "hora":
+        return hora
+    dia = hora.replace(hour=0)
+    if granularidad == "dia":
+        return dia
+    if granularidad == "semana":
+        return dia - timedelta(days=dia.weekday())
+    return dia.replace(day=1)
+
+
+def ahora(db: Session) -> datetime:
+    """Hora actual del servidor de base de datos (la que usan los server_default)"""
+    return como_fecha(db.execute(select(func.now())).scalar())
+
+
+def contar(db: Session, serie: str, desde: Optional[datetime], hasta: datetime,
+           categoria: Optional[str] = None, sede_id: Optional[int] = None) -> List[Fila]:
+    """Conteos por hora, categoría y sede de las filas con desde <= fecha < hasta, desde la tabla de origen"""
+    fecha = SERIES[serie]
+    hora = _truncar_hora(db, fecha)
+    query = db.query(hora, Inscripcion.categoria, Inscripcion.sede_id, func.count())
+    if serie == "videos":
+        query = query.select_from(Video).join(Inscripcion, Video.inscrito_id == Inscripcion.id)
+    query = query.filter(fecha < hasta)
+    if desde is not None:
+        query = query.filter(fecha >= desde)
+    if categoria:
+        query = query.filter(Inscripcion.categoria == categoria)
+    if sede_id is not None:
+        query = query.filter(func.coalesce(Inscripcion.sede_id, 0) == sede_id)
+    return [
+        (como_fecha(hora), categoria.value if categoria else "", sede_id or 0, total)
+        for hora, categoria, sede_id, total in query.group_by(hora, Inscripcion.categoria, Inscripcion.sede_id)
+    ]
+
+
+def _sumar(db: Session, serie: str, filas: List[Fila]):
+    """Sumar conteos a conteos_hora (upsert aditivo por lotes)"""
+    for inicio in range(0, len(filas), TAMAÑO_LOTE_CONTEOS):
+        upsert(db, ConteoHora.__table__, [
+            {"serie": serie, "hora": hora, "categoria": categoria, "sede_id": sede_id, "total": total}
+            for hora, categoria, sede_id, total in filas[inicio:inicio + TAMAÑO_LOTE_CONTEOS]
+        ], ("serie", "hora", "categoria", "sede_id"), sumar=("total",))
+
+
+def _marca(db: Session, serie: str) -> Optional[MarcaSerie]:
+    return db.query(MarcaSerie).filter(MarcaSerie.serie == serie).with_for_update().first()
+
+
+def reconstruir(db: Session, serie: str, desde: Optional[datetime] = None) -> int:
+    """Volver a contar la serie desde `desde` (por defecto desde el principio); sin commit"""
+    marca = _marca(db, serie)
+    hasta = ahora(db) - timedelta(seconds=MARGEN_SERIES_SEGUNDOS)
+    if marca is not None:
+        hasta = max(hasta, marca.hasta)
+    desde = inicio_hora(desde) if desde else None
+
+    borrar = db.query(ConteoHora).filter(ConteoHora.serie == serie)
+    if desde is not None:
+        borrar = borrar.filter(ConteoHora.hora >= desde)
+    borrar.delete(synchronize_session=False)
+    filas = contar(db, serie, desde, hasta)
+    _sumar(db, serie, filas)
+
+    if marca is None:
+        db.add(MarcaSerie(serie=serie, hasta=hasta))
+    else:
+        marca.hasta = hasta
+    return sum(fila[-1] for fila in filas)
+
+
+def ponerse_al_dia(db: Session, serie: str) -> int:
+    """Sumar las filas nuevas desde la marca de la serie; sin commit. Devuelve las filas contadas"""
+    marca = _marca(db, serie)
+    if marca is None:
+        return reconstruir(db, serie)
+    hasta = ahora(db) - timedelta(seconds=MARGEN_SERIES_SEGUNDOS)
+    if hasta <= marca.hasta:
+        return 0
+    filas = contar(db, serie, marca.hasta, hasta)
+    _sumar(db, serie, filas)
+    marca.hasta = hasta
+    return sum(fila[-1] for fila in filas)
+
+
+def consultar(
+    db: Session,
+    serie: str,
+    desde: datetime,
+    hasta: datetime,
+    granularidad: str = "hora",
+    por: str = "ninguna",
+    categoria: Optional[str] = None,
+    sede_id: Optional[int] = None,
+) -> dict:
+    """Totales por periodo (y por categoría o sede) entre desde y hasta, desde los contadores"""
+    desde, hasta = inicio_hora(como_fecha(desde)), como_fecha(hasta)
+    marca = db.query(MarcaSerie.hasta).filter(MarcaSerie.serie == serie).scalar()
+    limite = min(marca, hasta) if marca is not None else desde
+    totales: Dict[Tuple[datetime, object], int] = defaultdict(int)
+
+    def grupo(categoria_fila: str, sede_fila: int):
+        if por == "categoria":
+            return categoria_fila or None
+        if por == "sede":
+            return sede_fila or None
+        return None
+
+    if limite > desde:
+        columnas = [ConteoHora.hora]
+        if por == "categoria":
+            columnas.append(ConteoHora.categoria)
+        elif por == "sede":
+            columnas.append(ConteoHora.sede_id)
+        query = db.query(*columnas, func.sum(ConteoHora.total)).filter(
+            ConteoHora.serie == serie, ConteoHora.hora >= desde, ConteoHora.hora < limite
+        )
+        if categoria:
+            query = query.filter(ConteoHora.categoria == categoria)
+        if sede_id is not None:
+            query = query.filter(ConteoHora.sede_id == sede_id)
+        for fila in query.group_by(*columnas):
+            clave = fila[1] if len(fila) == 3 else None
+            totales[(cubeta(como_fecha(fila[0]), granularidad), clave or None)] += int(fila[-1])
+
+    # Tramo posterior a la marca: se cuenta en vivo (solo las filas más recientes)
+    if limite < hasta:
+        for hora, categoria_fila, sede_fila, total in contar(db, serie, max(limite, desde), hasta, categoria, sede_id):
+            totales[(cubeta(hora, granularidad), grupo(categoria_fila, sede_fila))] += total
+
+    return {
+        "serie": serie,
+        "granularidad": granularidad,
+        "por": por,
+        "al_dia_hasta": marca,
+        "puntos": [
+            {"inicio": inicio, "grupo": clave, "total": total}
+            for (inicio, clave), total in sorted(totales.items(), key=lambda item: (item[0][0], str(item[0][1])))
+        ],
+    }
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    import database
+    import tareas
+    import trabajos
+
+    parser = argparse.ArgumentParser(description="Mantener las series de tiempo preagregadas")
+    parser.add_argument("--reconstruir", action="store_true", help="volver a contar (backfill)")
+    parser.add_argument("--desde", type=datetime.fromisoformat, help="con --reconstruir: desde esta fecha")
+    parser.add_argument("--serie", choices=sorted(SERIES), action="append", help="por defecto todas")
+    parser.add_argument("--programar", action="store_true", help="encolar el trabajo periódico de actualización")
+    args = parser.parse_args()
+
+    db = database.SessionLocal()
+    try:
+        if args.programar:
+            trabajos.encolar(db, tareas.ACTUALIZAR_SERIES)
+            db.commit()
+            print("Trabajo periódico encolado")
+            return
+        for serie in args.serie or sorted(SERIES):
+            contadas = reconstruir(db, serie, args.desde) if args.reconstruir else ponerse_al_dia(db, serie)
+            db.commit()
+            print(f"{serie}: {contadas} filas contadas")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
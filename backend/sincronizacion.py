@@ -0,0 +1,215 @@
+"""
+Sincronización de puntajes capturados sin conexión en los dispositivos de jurado.
+
+En las sedes con mala conectividad el dispositivo encola las capturas y las
+envía después en lotes. Cada operación trae un op_id generado en el
+dispositivo y una secuencia creciente por dispositivo:
+
+- Exactamente una vez: los op_id aplicados quedan en operaciones_puntaje, en la
+  misma transacción que el puntaje; un reenvío del lote (respuesta perdida,
+  reintento) no vuelve a aplicar nada y devuelve el estado registrado la
+  primera vez (aplicada o conflicto, con el valor actual del servidor).
+- Orden: las operaciones de un mismo inscrito/ronda se aplican por secuencia y
+  se coalescen (el valor final es el de la última); la comprobación de
+  conflicto usa la primera, que es la que refleja lo que el dispositivo vio.
+- Conflictos, según `regla`:
+      version          se aplica si version_base coincide con la versión actual
+      ultimo_escritor  se aplica si se capturó después que el valor actual
+  En conflicto no se escribe nada y se devuelve el estado del servidor.
+
+Las operaciones se agrupan por inscrito/ronda en transacciones de hasta
+TAMAÑO_TRANSACCION_SINCRONIZACION operaciones: miles de puntajes se sincronizan
+en unas pocas transacciones con upserts de varias filas.
+"""
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import func, insert, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import upsert
+from models import OperacionPuntaje, PuntajeJurado
+from puntajes import TAMAÑO_BLOQUE_AGREGADOS, programados, recalcular_agregados
+from schemas import OperacionPuntajeSync
+
+TAMAÑO_TRANSACCION_SINCRONIZACION = int(os.getenv("TAMAÑO_TRANSACCION_SINCRONIZACION", "2000"))
+
+# Estado de un puntaje que se devuelve al dispositivo
+CAMPOS_ESTADO = ("ronda_id", "inscrito_id", "puntaje", "version", "fecha_captura")
+
+Clave = Tuple[int, str]
+
+
+def _utc(fecha: datetime) -> datetime:
+    """Fecha UTC sin zona (como la guardan las columnas DateTime)"""
+    return fecha.astimezone(timezone.utc).replace(tzinfo=None) if fecha.tzinfo else fecha
+
+
+def _bloques(valores: Sequence, tamaño: int = TAMAÑO_BLOQUE_AGREGADOS):
+    for inicio in range(0, len(valores), tamaño):
+        yield valores[inicio:inicio + tamaño]
+
+
+def _registradas(db: Session, op_ids: Sequence[str]) -> Dict[str, str]:
+    """op_id -> estado con que se registró (aplicada | conflicto)"""
+    registradas = {}
+    for bloque in _bloques(list(op_ids)):
+        registradas.update(db.query(OperacionPuntaje.op_id, OperacionPuntaje.estado).filter(
+            OperacionPuntaje.op_id.in_(bloque)
+        ))
+    return registradas
+
+
+def _repetidas(db: Session, jurado_id: int, operaciones: Sequence[OperacionPuntajeSync], registradas: Dict[str, str],
+               respuesta: dict):
+    """Responder a las operaciones ya registradas con su estado original (y el valor actual si fue conflicto)"""
+    conflictos = [op for op in operaciones if registradas[op.op_id] == "conflicto"]
+    actuales = {}
+    claves = sorted({(op.ronda_id, op.inscrito_id) for op in conflictos})
+    for bloque in _bloques(claves):
+        filas = db.query(PuntajeJurado).filter(
+            PuntajeJurado.jurado_id == jurado_id,
+            tuple_(PuntajeJurado.ronda_id, PuntajeJurado.inscrito_id).in_(bloque)
+        )
+        actuales.update({(fila.ronda_id, fila.inscrito_id): fila for fila in filas})
+    for op in operaciones:
+        respuesta["resultados"][op.op_id] = registradas[op.op_id]
+    respuesta["conflictos"] += [
+        {"op_id": op.op_id, **_estado(actuales[(op.ronda_id, op.inscrito_id)])}
+        for op in conflictos if (op.ronda_id, op.inscrito_id) in actuales
+    ]
+    respuesta["repetidas"] += [op.op_id for op in operaciones]
+
+
+def _estado(fila: PuntajeJurado) -> dict:
+    return {campo: getattr(fila, campo) for campo in CAMPOS_ESTADO}
+
+
+def _aplicar(db: Session, jurado_id: int, dispositivo_id: str, cadenas: Dict[Clave, List[OperacionPuntajeSync]],
+             regla: str, respuesta: dict):
+    """Aplicar las cadenas de operaciones de una transacción (sin commit)"""
+    claves = sorted(cadenas)
+    actuales = {}
+    for bloque in _bloques(claves):
+        filas = db.query(PuntajeJurado).filter(
+            PuntajeJurado.jurado_id == jurado_id,
+            tuple_(PuntajeJurado.ronda_id, PuntajeJurado.inscrito_id).in_(bloque)
+        ).with_for_update()
+        actuales.update({(fila.ronda_id, fila.inscrito_id): fila for fila in filas})
+
+    puntajes, registro = [], []
+    for clave in claves:
+        cadena, actual = cadenas[clave], actuales.get(clave)
+        ultima = cadena[-1]
+        if actual is None:
+            aceptada = True
+        elif regla == "version":
+            aceptada = cadena[0].version_base == actual.version
+        else:
+            aceptada = actual.fecha_captura is None or _utc(ultima.capturado_en) > actual.fecha_captura
+
+        if aceptada:
+            nuevo = {
+                "ronda_id": ultima.ronda_id,
+                "inscrito_id": ultima.inscrito_id,
+                "jurado_id": jurado_id,
+                "puntaje": ultima.puntaje,
+                "version": actual.version + 1 if actual else 1,
+                "fecha_captura": _utc(ultima.capturado_en),
+            }
+            puntajes.append(nuevo)
+            respuesta["aplicados"].append({campo: nuevo[campo] for campo in CAMPOS_ESTADO})
+        else:
+            respuesta["conflictos"] += [{"op_id": op.op_id, **_estado(actual)} for op in cadena]
+        estado = "aplicada" if aceptada else "conflicto"
+        for op in cadena:
+            respuesta["resultados"][op.op_id] = estado
+            registro.append({
+                "op_id": op.op_id,
+                "dispositivo_id": dispositivo_id,
+                "secuencia": op.secuencia,
+                "jurado_id": jurado_id,
+                "estado": estado,
+            })
+
+    if puntajes:
+        upsert(db, PuntajeJurado.__table__, puntajes, ("ronda_id", "inscrito_id", "jurado_id"),
+               ("puntaje", "version", "fecha_captura"))
+        recalcular_agregados(db, [(fila["ronda_id"], fila["inscrito_id"]) for fila in puntajes])
+    db.execute(insert(OperacionPuntaje), registro)
+
+
+def sincronizar(db: Session, jurado_id: int, dispositivo_id: str, operaciones: Sequence[OperacionPuntajeSync],
+                regla: str = "version") -> dict:
+    """Aplicar un lote de operaciones del dispositivo exactamente una vez; confirma por transacción"""
+    respuesta = {"resultados": {}, "aplicados": [], "conflictos": [], "repetidas": []}
+    unicas = {}
+    for op in sorted(operaciones, key=lambda op: op.secuencia):
+        unicas.setdefault(op.op_id, op)
+
+    registradas = _registradas(db, unicas)
+    _repetidas(db, jurado_id, [unicas.pop(op_id) for op_id in registradas], registradas, respuesta)
+
+    # Participantes no programados en una ronda activa (como en la captura en línea): se
+    # rechazan sin registrarse, el dispositivo puede corregirlos y reenviar
+    validos = programados(db, [(op.ronda_id, op.inscrito_id) for op in unicas.values()])
+    cadenas = defaultdict(list)
+    for op in unicas.values():
+        if (op.ronda_id, op.inscrito_id) in validos:
+            cadenas[(op.ronda_id, op.inscrito_id)].append(op)
+        else:
+            respuesta["resultados"][op.op_id] = "rechazada"
+
+    # Transacciones de cadenas completas: una cadena nunca se parte entre dos
+    transacciones, actual, tamaño = [], [], 0
+    for clave in sorted(cadenas):
+        if actual and tamaño + len(cadenas[clave]) > TAMAÑO_TRANSACCION_SINCRONIZACION:
+            transacciones.append(actual)
+            actual, tamaño = [], 0
+        actual.append(clave)
+        tamaño += len(cadenas[clave])
+    if actual:
+        transacciones.append(actual)
+
+    for claves in transacciones:
+        lote = {clave: cadenas[clave] for clave in claves}
+        parcial = {"resultados": {}, "aplicados": [], "conflictos": [], "repetidas": []}
+        try:
+            _aplicar(db, jurado_id, dispositivo_id, lote, regla, parcial)
+            db.commit()
+        except IntegrityError:
+            # Otra sincronización del mismo lote (reintento concurrente) registró
+            # algunas operaciones primero: descartarlas y aplicar el resto
+            db.rollback()
+            registradas = _registradas(db, [op.op_id for cadena in lote.values() for op in cadena])
+            parcial = {"resultados": {}, "aplicados": [], "conflictos": [], "repetidas": []}
+            _repetidas(db, jurado_id, [
+                op for cadena in lote.values() for op in cadena if op.op_id in registradas
+            ], registradas, parcial)
+            lote = {
+                clave: [op for op in cadena if op.op_id not in registradas] for clave, cadena in lote.items()
+            }
+            lote = {clave: cadena for clave, cadena in lote.items() if cadena}
+            if lote:
+                _aplicar(db, jurado_id, dispositivo_id, lote, regla, parcial)
+            db.commit()
+        respuesta["resultados"].update(parcial["resultados"])
+        respuesta["aplicados"] += parcial["aplicados"]
+        respuesta["conflictos"] += parcial["conflictos"]
+        respuesta["repetidas"] += parcial["repetidas"]
+
+    repetidas = set(respuesta.pop("repetidas"))
+    estados = [estado for op_id, estado in respuesta["resultados"].items() if op_id not in repetidas]
+    respuesta.update(
+        dispositivo_id=dispositivo_id,
+        ultima_secuencia=db.query(func.max(OperacionPuntaje.secuencia)).filter(
+            OperacionPuntaje.dispositivo_id == dispositivo_id
+        ).scalar(),
+        aplicadas=estados.count("aplicada"),
+        duplicadas=len(repetidas),
+        rechazadas=estados.count("rechazada"),
+    )
+    return respuesta
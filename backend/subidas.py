@@ -0,0 +1,188 @@
+"""
+Almacenamiento de subidas reanudables de video.
+
+Cada subida se guarda en un archivo preasignado del tamaño final; las partes
+se escriben directamente en su desplazamiento (os.pwrite), de modo que pueden
+llegar en paralelo y en cualquier orden, y al completarse el archivo solo se
+renombra a su ubicación definitiva: no se vuelven a leer ni a copiar bytes.
+"""
+import base64
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterator, BinaryIO, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+import models
+
+DIRECTORIO_SUBIDAS = os.getenv(
+    "DIRECTORIO_SUBIDAS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads")
+)
+TAMAÑO_PARTE_SUBIDA = int(os.getenv("TAMAÑO_PARTE_SUBIDA", str(5 * 1024 * 1024)))
+HORAS_EXPIRACION_SUBIDA = int(os.getenv("HORAS_EXPIRACION_SUBIDA", "24"))
+TAMAÑO_MAXIMO_VIDEO = 50 * 1024 * 1024
+
+
+class ChecksumInvalido(Exception):
+    """La suma de verificación de la parte no coincide"""
+
+
+class ParteInvalida(Exception):
+    """Desplazamiento o longitud de parte incorrectos"""
+
+
+def ruta_parcial(subida_id: str) -> str:
+    return os.path.join(DIRECTORIO_SUBIDAS, "parciales", f"{subida_id}.part")
+
+
+def ruta_absoluta(ruta_relativa: str) -> str:
+    """Ruta en disco de un archivo guardado (p. ej. Video.url_video)"""
+    return os.path.join(DIRECTORIO_SUBIDAS, ruta_relativa)
+
+
+def crear_subida(db: Session, inscrito_id: str, tamaño_total: int, nombre_archivo: str,
+                 tipo_contenido: Optional[str]) -> models.SubidaVideo:
+    """Registrar una subida y preasignar su archivo parcial"""
+    total_partes = (tamaño_total + TAMAÑO_PARTE_SUBIDA - 1) // TAMAÑO_PARTE_SUBIDA
+    subida = models.SubidaVideo(
+        id=str(uuid.uuid4()),
+        inscrito_id=inscrito_id,
+        nombre_archivo=nombre_archivo,
+        tipo_contenido=tipo_contenido,
+        tamaño_total=tamaño_total,
+        tamaño_parte=TAMAÑO_PARTE_SUBIDA,
+        total_partes=total_partes,
+        fecha_expiracion=datetime.utcnow() + timedelta(hours=HORAS_EXPIRACION_SUBIDA),
+    )
+    ruta = ruta_parcial(subida.id)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, "wb") as archivo:
+        archivo.truncate(tamaño_total)
+    db.add(subida)
+    return subida
+
+
+def _verificar_checksum(cabecera: Optional[str], digest: bytes):
+    """Validar `Upload-Checksum: sha256 <base64>` (extensión checksum de tus)"""
+    if not cabecera:
+        return
+    algoritmo, _, valor = cabecera.strip().partition(" ")
+    if algoritmo.lower() != "sha256":
+        raise ChecksumInvalido(f"Algoritmo no soportado: {algoritmo}")
+    try:
+        esperado = base64.b64decode(valor.strip(), validate=True)
+    except ValueError:
+        raise ChecksumInvalido("Checksum mal formado")
+    if esperado != digest:
+        raise ChecksumInvalido("Checksum no coincide")
+
+
+async def escribir_parte(subida: models.SubidaVideo, offset: int, cuerpo: AsyncIterator[bytes],
+                         checksum: Optional[str]) -> models.ParteSubida:
+    """Escribir una parte en su desplazamiento a medida que llega el cuerpo"""
+    if offset < 0 or offset >= subida.tamaño_total or offset % subida.tamaño_parte:
+        raise ParteInvalida("Upload-Offset debe ser múltiplo del tamaño de parte")
+    esperado = min(subida.tamaño_parte, subida.tamaño_total - offset)
+
+    digest = hashlib.sha256()
+    escritos = 0
+    descriptor = os.open(ruta_parcial(subida.id), os.O_WRONLY)
+    try:
+        async for fragmento in cuerpo:
+            if not fragmento:
+                continue
+            if escritos + len(fragmento) > esperado:
+                raise ParteInvalida(f"La parte excede {esperado} bytes")
+            os.pwrite(descriptor, fragmento, offset + escritos)
+            digest.update(fragmento)
+            escritos += len(fragmento)
+    finally:
+        os.close(descriptor)
+
+    if escritos != esperado:
+        raise ParteInvalida(f"Parte incompleta: {escritos} de {esperado} bytes")
+    _verificar_checksum(checksum, digest.digest())
+    return models.ParteSubida(
+        subida_id=subida.id, indice=offset // subida.tamaño_parte, tamaño=escritos, sha256=digest.hexdigest()
+    )
+
+
+def guardar_archivo(origen: BinaryIO, carpeta: str, extension: str, tamaño_maximo: int) -> Tuple[str, int, str]:
+    """Copiar un archivo subido a disco por bloques; devuelve (ruta relativa, tamaño, sha256)"""
+    relativa = os.path.join(carpeta, f"{uuid.uuid4()}{extension}")
+    destino = ruta_absoluta(relativa)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    digest = hashlib.sha256()
+    tamaño = 0
+    try:
+        with open(destino, "wb") as archivo:
+            while True:
+                bloque = origen.read(1024 * 1024)
+                if not bloque:
+                    break
+                tamaño += len(bloque)
+                if tamaño > tamaño_maximo:
+                    raise ParteInvalida(f"El archivo excede {tamaño_maximo} bytes")
+                digest.update(bloque)
+                archivo.write(bloque)
+    except BaseException:
+        os.remove(destino)
+        raise
+    return relativa, tamaño, digest.hexdigest()
+
+
+def partes_pendientes(subida: models.SubidaVideo, recibidas: List[int]) -> List[int]:
+    recibidas = set(recibidas)
+    return [indice for indice in range(subida.total_partes) if indice not in recibidas]
+
+
+def offset_contiguo(subida: models.SubidaVideo, recibidas: List[int]) -> int:
+    """Bytes recibidos de forma contigua desde el inicio (Upload-Offset de tus)"""
+    pendientes = partes_pendientes(subida, recibidas)
+    if not pendientes:
+        return subida.tamaño_total
+    return pendientes[0] * subida.tamaño_parte
+
+
+def finalizar_archivo(subida: models.SubidaVideo) -> str:
+    """Mover el archivo completo a su ubicación definitiva; devuelve la ruta relativa"""
+    extension = os.path.splitext(subida.nombre_archivo or "")[1].lower() or ".mp4"
+    relativa = os.path.join("videos", f"{subida.id}{extension}")
+    destino = ruta_absoluta(relativa)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    origen = ruta_parcial(subida.id)
+    descriptor = os.open(origen, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+    os.replace(origen, destino)
+    return relativa
+
+
+def descartar_subida(db: Session, subida: models.SubidaVideo):
+    """Eliminar una subida, sus partes y su archivo parcial (sin commit)"""
+    try:
+        os.remove(ruta_parcial(subida.id))
+    except FileNotFoundError:
+        pass
+    db.query(models.ParteSubida).filter(models.ParteSubida.subida_id == subida.id).delete(
+        synchronize_session=False
+    )
+    db.delete(subida)
+
+
+def purgar_subidas_expiradas(db: Session, limite: int = 100) -> int:
+    """Eliminar subidas incompletas vencidas y sus archivos parciales"""
+    vencidas = (
+        db.query(models.SubidaVideo)
+        .filter(models.SubidaVideo.completada == False, models.SubidaVideo.fecha_expiracion < datetime.utcnow())
+        .limit(limite)
+        .all()
+    )
+    for subida in vencidas:
+        descartar_subida(db, subida)
+    db.commit()
+    return len(vencidas)
@@ -0,0 +1,101 @@
+"""
+Manejadores de los trabajos en segundo plano (ver trabajos.py y worker.py).
+"""
+import base64
+import os
+import time
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+import duplicados
+import imagenes
+import publicacion
+import series_tiempo
+import subidas
+import trabajos
+from models import Inscripcion, Video
+from trabajos import ErrorPermanente, manejador
+
+PROCESAR_COMPROBANTE = "comprobante.procesar"
+CODIFICAR_VIDEO = "video.codificar"
+REPORTE_DUPLICADOS = "inscripciones.reporte_duplicados"
+ACTUALIZAR_SERIES = "estadisticas.series"
+PUBLICAR_RESULTADOS = "resultados.publicar"
+
+
+@manejador(PROCESAR_COMPROBANTE)
+def procesar_comprobante(db: Session, payload: dict) -> dict:
+    """Normalizar el comprobante original guardado en disco y generar su miniatura"""
+    ruta = subidas.ruta_absoluta(payload["ruta"])
+    inscripcion = db.query(Inscripcion).filter(Inscripcion.id == payload["inscripcion_id"]).first()
+    if not inscripcion:
+        raise ErrorPermanente("Inscripción no encontrada")
+    if not os.path.exists(ruta):
+        raise ErrorPermanente("Archivo original no encontrado")
+
+    with open(ruta, "rb") as archivo:
+        contenido = archivo.read()
+    try:
+        procesada = imagenes.procesar_comprobante(contenido)
+    except imagenes.ImagenInvalida as e:
+        os.remove(ruta)
+        raise ErrorPermanente(str(e))
+
+    inscripcion.comprobante_pago = imagenes.como_data_uri(procesada["imagen"], procesada["tipo_contenido"])
+    inscripcion.comprobante_miniatura = imagenes.como_data_uri(procesada["miniatura"], procesada["tipo_contenido"])
+    db.commit()
+    os.remove(ruta)
+    return {
+        "bytes_original": len(contenido),
+        "bytes_final": len(procesada["imagen"]),
+        "ancho": procesada["ancho"],
+        "alto": procesada["alto"],
+    }
+
+
+@manejador(CODIFICAR_VIDEO)
+def codificar_video(db: Session, payload: dict) -> dict:
+    """Llenar Video.video_data (base64) a partir del archivo guardado"""
+    video = db.query(Video).filter(Video.id == payload["video_id"]).first()
+    if not video or not video.url_video:
+        raise ErrorPermanente("Video no encontrado")
+    ruta = subidas.ruta_absoluta(video.url_video)
+    if not os.path.exists(ruta):
+        raise ErrorPermanente("Archivo de video no encontrado")
+
+    with open(ruta, "rb") as archivo:
+        codificado = base64.b64encode(archivo.read()).decode()
+    video.video_data = f"data:{payload.get('tipo_contenido') or 'video/' + (video.formato or 'mp4')};base64,{codificado}"
+    db.commit()
+    return {"bytes": os.path.getsize(ruta)}
+
+
+@manejador(REPORTE_DUPLICADOS)
+def reporte_duplicados(db: Session, payload: dict) -> dict:
+    """Completar las claves de contacto faltantes y agrupar las inscripciones repetidas"""
+    return duplicados.reporte(db)
+
+
+@manejador(ACTUALIZAR_SERIES)
+def actualizar_series(db: Session, payload: dict) -> dict:
+    """Sumar a las series de tiempo las filas nuevas y programar la siguiente actualización"""
+    contadas = {serie: series_tiempo.ponerse_al_dia(db, serie) for serie in series_tiempo.SERIES}
+    # Trabajo periódico: la clave por intervalo evita duplicarlo si dos workers lo reprograman
+    intervalo = series_tiempo.INTERVALO_SERIES_SEGUNDOS
+    siguiente = int(time.time() // intervalo) + 1
+    trabajos.encolar(
+        db, ACTUALIZAR_SERIES,
+        clave_idempotencia=f"{ACTUALIZAR_SERIES}:{siguiente}",
+        retraso=timedelta(seconds=siguiente * intervalo - time.time()),
+    )
+    return contadas
+
+
+@manejador(PUBLICAR_RESULTADOS)
+def publicar_resultados(db: Session, payload: dict) -> dict:
+    """Regenerar las instantáneas públicas de la ronda (solo las que cambiaron)"""
+    versiones = publicacion.publicar_ronda(db, payload["ronda_id"])
+    db.commit()
+    publicacion.borrar_obsoletas(db)
+    return versiones
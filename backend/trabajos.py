@@ -0,0 +1,248 @@
+"""
+Cola persistente de trabajos en segundo plano.
+
+Los handlers HTTP solo encolan (en la misma transacción que sus propios
+cambios) y responden; los procesos de worker.py toman los trabajos con
+SELECT ... FOR UPDATE SKIP LOCKED, de modo que varios workers no se bloquean
+entre sí, y los reintentan con espera exponencial si fallan.
+"""
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import String, cast, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import EstadoTrabajo, Trabajo
+
+logger = logging.getLogger("trabajos")
+
+ESPERA_BASE_REINTENTO = float(os.getenv("ESPERA_BASE_REINTENTO", "5"))  # segundos
+ESPERA_MAXIMA_REINTENTO = float(os.getenv("ESPERA_MAXIMA_REINTENTO", "3600"))
+# Un trabajo en proceso más tiempo que esto se considera abandonado (worker caído)
+MINUTOS_BLOQUEO_TRABAJO = int(os.getenv("MINUTOS_BLOQUEO_TRABAJO", "15"))
+
+# Manejadores registrados por tipo de trabajo: f(db, payload) -> resultado
+MANEJADORES: Dict[str, Callable[[Session, dict], Any]] = {}
+
+
+class ErrorPermanente(Exception):
+    """Error que no se resuelve reintentando; el trabajo se marca fallido de inmediato"""
+
+
+def manejador(tipo: str):
+    """Registrar la función que procesa un tipo de trabajo"""
+    def registrar(funcion):
+        MANEJADORES[tipo] = funcion
+        return funcion
+    return registrar
+
+
+def encolar(
+    db: Session,
+    tipo: str,
+    payload: Optional[dict] = None,
+    prioridad: int = 0,
+    clave_idempotencia: Optional[str] = None,
+    retraso: Optional[timedelta] = None,
+    max_intentos: int = 5,
+) -> Trabajo:
+    """Agregar un trabajo; no hace commit, se confirma junto con la transacción del llamador.
+
+    Con clave_idempotencia, encolar dos veces el mismo trabajo devuelve el existente.
+    """
+    if clave_idempotencia:
+        existente = db.query(Trabajo).filter(Trabajo.clave_idempotencia == clave_idempotencia).first()
+        if existente:
+            return existente
+
+    trabajo = Trabajo(
+        tipo=tipo,
+        payload=payload or {},
+        prioridad=prioridad,
+        clave_idempotencia=clave_idempotencia,
+        max_intentos=max_intentos,
+        ejecutar_despues=datetime.utcnow() + (retraso or timedelta()),
+    )
+    if not clave_idempotencia:
+        db.add(trabajo)
+        db.flush()
+        return trabajo
+
+    # Otra petición puede insertar la misma clave en paralelo: el índice único decide
+    try:
+        with db.begin_nested():
+            db.add(trabajo)
+    except IntegrityError:
+        return db.query(Trabajo).filter(Trabajo.clave_idempotencia == clave_idempotencia).one()
+    return trabajo
+
+
+def liberar_clave(db: Session, clave_idempotencia: str) -> int:
+    """Liberar la clave de idempotencia de un trabajo ya terminado para poder encolarlo de nuevo (sin commit)"""
+    return db.query(Trabajo).filter(
+        Trabajo.clave_idempotencia == clave_idempotencia,
+        Trabajo.estado.in_([EstadoTrabajo.completado, EstadoTrabajo.fallido])
+    ).update(
+        {"clave_idempotencia": Trabajo.clave_idempotencia + ":" + cast(Trabajo.id, String)},
+        synchronize_session=False
+    )
+
+
+def tomar(db: Session, trabajador: str, tipos: Optional[List[str]] = None) -> Optional[Trabajo]:
+    """Reservar el siguiente trabajo listo (mayor prioridad, más antiguo) y confirmarlo"""
+    ahora = datetime.utcnow()
+    query = db.query(Trabajo.id).filter(
+        Trabajo.estado == EstadoTrabajo.pendiente,
+        Trabajo.ejecutar_despues <= ahora
+    )
+    if tipos:
+        query = query.filter(Trabajo.tipo.in_(tipos))
+    fila = (
+        query.order_by(Trabajo.prioridad.desc(), Trabajo.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if fila is None:
+        db.rollback()
+        return None
+
+    # UPDATE condicional: en motores sin SKIP LOCKED solo un worker gana la reserva
+    reservado = db.query(Trabajo).filter(
+        Trabajo.id == fila.id,
+        Trabajo.estado == EstadoTrabajo.pendiente
+    ).update({
+        "estado": EstadoTrabajo.en_proceso,
+        "intentos": Trabajo.intentos + 1,
+        "trabajador": trabajador,
+        "fecha_inicio": ahora,
+    }, synchronize_session=False)
+    db.commit()
+    if not reservado:
+        return None
+    return db.query(Trabajo).filter(Trabajo.id == fila.id).one()
+
+
+def _espera_reintento(intentos: int) -> timedelta:
+    """Espera exponencial con jitter: base * 2^(n-1), con tope"""
+    segundos = min(ESPERA_BASE_REINTENTO * 2 ** (intentos - 1), ESPERA_MAXIMA_REINTENTO)
+    return timedelta(seconds=segundos * random.uniform(0.8, 1.2))
+
+
+def ejecutar(db: Session, trabajo: Trabajo):
+    """Ejecutar un trabajo reservado y registrar su resultado o programar el reintento"""
+    funcion = MANEJADORES.get(trabajo.tipo)
+    try:
+        if funcion is None:
+            raise ErrorPermanente(f"Tipo de trabajo sin manejador: {trabajo.tipo}")
+        resultado = funcion(db, trabajo.payload or {})
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        permanente = isinstance(e, ErrorPermanente) or trabajo.intentos >= trabajo.max_intentos
+        cambios = {"error": f"{type(e).__name__}: {e}", "fecha_fin": datetime.utcnow()}
+        if permanente:
+            cambios["estado"] = EstadoTrabajo.fallido
+            logger.error("Trabajo %s (%s) fallido: %s", trabajo.id, trabajo.tipo, e)
+        else:
+            cambios["estado"] = EstadoTrabajo.pendiente
+            cambios["ejecutar_despues"] = datetime.utcnow() + _espera_reintento(trabajo.intentos)
+            logger.warning("Trabajo %s (%s) intento %s falló: %s", trabajo.id, trabajo.tipo, trabajo.intentos, e)
+        db.query(Trabajo).filter(Trabajo.id == trabajo.id).update(cambios, synchronize_session=False)
+        db.commit()
+        return
+
+    db.query(Trabajo).filter(Trabajo.id == trabajo.id).update({
+        "estado": EstadoTrabajo.completado,
+        "resultado": resultado,
+        "error": None,
+        "fecha_fin": datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
+
+
+def liberar_abandonados(db: Session) -> int:
+    """Devolver a la cola los trabajos cuyo worker dejó de responder; devuelve cuántos volvieron.
+
+    Si ya agotaron sus intentos quedan como fallidos: un payload que tumba al
+    worker (imagen bomba de descompresión, falta de memoria) no se reintenta para siempre.
+    """
+    ahora = datetime.utcnow()
+    abandonados = db.query(Trabajo).filter(
+        Trabajo.estado == EstadoTrabajo.en_proceso,
+        Trabajo.fecha_inicio < ahora - timedelta(minutes=MINUTOS_BLOQUEO_TRABAJO)
+    )
+    fallidos = abandonados.filter(Trabajo.intentos >= Trabajo.max_intentos).update({
+        "estado": EstadoTrabajo.fallido,
+        "error": "Worker sin respuesta en todos los intentos",
+        "fecha_fin": ahora,
+    }, synchronize_session=False)
+    if fallidos:
+        logger.error("%s trabajos abandonados sin intentos restantes marcados como fallidos", fallidos)
+    liberados = abandonados.update({"estado": EstadoTrabajo.pendiente, "trabajador": None}, synchronize_session=False)
+    db.commit()
+    return liberados
+
+
+def procesar_siguiente(db: Session, trabajador: str, tipos: Optional[List[str]] = None) -> bool:
+    """Tomar y ejecutar un trabajo; False si la cola está vacía"""
+    trabajo = tomar(db, trabajador, tipos)
+    if trabajo is None:
+        return False
+    inicio = time.perf_counter()
+    ejecutar(db, trabajo)
+    logger.info("Trabajo %s (%s) en %.0f ms", trabajo.id, trabajo.tipo, (time.perf_counter() - inicio) * 1000)
+    return True
+
+
+def _percentil(valores: List[float], p: float) -> Optional[float]:
+    if not valores:
+        return None
+    valores = sorted(valores)
+    return round(valores[min(len(valores) - 1, int(p * len(valores)))], 1)
+
+
+def estadisticas(db: Session, horas: int = 24) -> List[dict]:
+    """Profundidad de la cola y latencias (espera y ejecución) por tipo de trabajo"""
+    por_tipo: Dict[str, dict] = {}
+
+    def entrada(tipo: str) -> dict:
+        return por_tipo.setdefault(tipo, {
+            "tipo": tipo,
+            **{estado.value: 0 for estado in EstadoTrabajo},
+            "listos": 0,
+            "espera_p50_ms": None, "espera_p95_ms": None,
+            "ejecucion_p50_ms": None, "ejecucion_p95_ms": None,
+        })
+
+    for tipo, estado, total in db.query(Trabajo.tipo, Trabajo.estado, func.count(Trabajo.id)).group_by(
+        Trabajo.tipo, Trabajo.estado
+    ):
+        entrada(tipo)[EstadoTrabajo(estado).value] = total
+
+    for tipo, total in db.query(Trabajo.tipo, func.count(Trabajo.id)).filter(
+        Trabajo.estado == EstadoTrabajo.pendiente,
+        Trabajo.ejecutar_despues <= datetime.utcnow()
+    ).group_by(Trabajo.tipo):
+        entrada(tipo)["listos"] = total
+
+    desde = datetime.utcnow() - timedelta(hours=horas)
+    tiempos: Dict[str, tuple] = {}
+    for tipo, creado, inicio, fin in db.query(
+        Trabajo.tipo, Trabajo.fecha_creacion, Trabajo.fecha_inicio, Trabajo.fecha_fin
+    ).filter(Trabajo.estado == EstadoTrabajo.completado, Trabajo.fecha_fin >= desde):
+        esperas, ejecuciones = tiempos.setdefault(tipo, ([], []))
+        esperas.append((inicio - creado).total_seconds() * 1000)
+        ejecuciones.append((fin - inicio).total_seconds() * 1000)
+
+    for tipo, (esperas, ejecuciones) in tiempos.items():
+        datos = entrada(tipo)
+        datos["espera_p50_ms"], datos["espera_p95_ms"] = _percentil(esperas, 0.5), _percentil(esperas, 0.95)
+        datos["ejecucion_p50_ms"], datos["ejecucion_p95_ms"] = _percentil(ejecuciones, 0.5), _percentil(ejecuciones, 0.95)
+
+    return sorted(por_tipo.values(), key=lambda datos: datos["tipo"])
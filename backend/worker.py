@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Worker de trabajos en segundo plano.
+
+Uso: python worker.py [--concurrencia 4] [--modo hilos|procesos] [--tipos comprobante.procesar,...]
+
+En modo procesos cada worker es un proceso independiente (recomendado para
+trabajos de CPU como el procesamiento de imágenes); en modo hilos comparten
+el proceso, suficiente para trabajos que esperan E/S.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+from dotenv import load_dotenv
+
+# Punto de entrada: .env se carga antes de importar los módulos que leen su configuración
+load_dotenv()
+
+from database import SessionLocal  # noqa: E402
+import tareas  # noqa: F401,E402 - registra los manejadores
+import trabajos  # noqa: E402
+
+INTERVALO_SONDEO = float(os.getenv("INTERVALO_SONDEO_TRABAJOS", "1"))
+INTERVALO_LIBERACION = 60
+
+logger = logging.getLogger("worker")
+
+
+def bucle(nombre: str, parar, tipos=None, liberar: bool = False):
+    """Procesar trabajos hasta que se pida parar; duerme solo si la cola está vacía"""
+    ultima_liberacion = 0.0
+    while not parar.is_set():
+        db = SessionLocal()
+        try:
+            if liberar and time.monotonic() - ultima_liberacion > INTERVALO_LIBERACION:
+                liberados = trabajos.liberar_abandonados(db)
+                if liberados:
+                    logger.warning("%s trabajos abandonados devueltos a la cola", liberados)
+                ultima_liberacion = time.monotonic()
+            procesado = trabajos.procesar_siguiente(db, nombre, tipos)
+        except Exception:
+            logger.exception("Error en el worker %s", nombre)
+            procesado = False
+        finally:
+            db.close()
+        if not procesado:
+            parar.wait(INTERVALO_SONDEO)
+
+
+def _proceso(nombre: str, tipos, liberar: bool):
+    parar = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: parar.set())
+    signal.signal(signal.SIGINT, lambda *_: parar.set())
+    bucle(nombre, parar, tipos, liberar)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker de trabajos en segundo plano")
+    parser.add_argument("--concurrencia", type=int, default=int(os.getenv("CONCURRENCIA_TRABAJOS", "2")))
+    parser.add_argument("--modo", choices=["hilos", "procesos"], default="procesos")
+    parser.add_argument("--tipos", help="tipos de trabajo separados por coma (por defecto todos)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    tipos = args.tipos.split(",") if args.tipos else None
+    prefijo = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info("Iniciando %s workers (%s) para %s", args.concurrencia, args.modo, tipos or sorted(trabajos.MANEJADORES))
+
+    if args.modo == "procesos":
+        hijos = [
+            multiprocessing.Process(target=_proceso, args=(f"{prefijo}/{i}", tipos, i == 0), daemon=True)
+            for i in range(args.concurrencia)
+        ]
+        for hijo in hijos:
+            hijo.start()
+        signal.signal(signal.SIGTERM, lambda *_: [hijo.terminate() for hijo in hijos])
+        for hijo in hijos:
+            hijo.join()
+        return
+
+    parar = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: parar.set())
+    signal.signal(signal.SIGINT, lambda *_: parar.set())
+    hilos = [
+        threading.Thread(target=bucle, args=(f"{prefijo}/{i}", parar, tipos, i == 0), name=f"worker-{i}")
+        for i in range(args.concurrencia)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+
+if __name__ == "__main__":
+    main()
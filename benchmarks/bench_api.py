@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga de la API sin red: arranca la app de FastAPI en el mismo
+proceso contra una base local (SQLite temporal por defecto, o MySQL local con
+--database-url), la puebla y ejecuta cada escenario con un generador de carga
+asíncrono de concurrencia configurable.
+
+Reporta throughput, p50/p95/p99 y memoria por escenario y guarda el resultado
+en JSON (con el commit actual) para comparar entre versiones con --comparar.
+
+Uso:
+    python benchmarks/bench_api.py [--concurrencia 16] [--peticiones 500] [--inscripciones 5000]
+    python benchmarks/bench_api.py --escenarios listado_admin,busqueda --comparar anterior.json
+    python benchmarks/bench_api.py --database-url mysql+pymysql://root:@localhost/karaoke_bench
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+RAIZ = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(RAIZ, "backend"))
+
+
+# -----------------------------------------------------------------------------
+# Entorno
+# -----------------------------------------------------------------------------
+
+def preparar_entorno(database_url: Optional[str]) -> str:
+    """Configurar la base y el directorio de archivos antes de importar la app"""
+    directorio = tempfile.mkdtemp(prefix="bench_api_")
+    os.environ["DATABASE_URL"] = database_url or f"sqlite:///{os.path.join(directorio, 'bench.db')}"
+    os.environ["DIRECTORIO_SUBIDAS"] = os.path.join(directorio, "uploads")
+    return directorio
+
+
+def importar_app():
+    """Crear el esquema y la aplicación (la app ya no crea tablas al importarse)"""
+    import database
+    import esquema
+    from server import crear_app
+
+    esquema.crear(database.get_engine())
+    return crear_app()
+
+
+def poblar(inscripciones: int, semilla: int) -> dict:
+    """Insertar datos base con INSERT multi-fila (sin pasar por la API)"""
+    from sqlalchemy import insert
+
+    import auth
+    import database
+    import models
+
+    rng = random.Random(semilla)
+    municipios = [f"Municipio {i}" for i in range(40)]
+    base = datetime(2025, 1, 1)
+    with database.engine.begin() as conexion:
+        admin = conexion.execute(insert(models.Usuario).values(
+            nombre="Admin", correo=f"admin-{uuid.uuid4().hex[:8]}@bench.local",
+            rol=models.RolUsuario.admin, contraseña=auth.get_password_hash("bench")
+        )).inserted_primary_key[0]
+        conexion.execute(insert(models.Sede), [
+            {"nombre_sede": f"Sede {i}", "estado": "Querétaro", "municipio": municipios[i % 40], "capacidad": 300}
+            for i in range(20)
+        ])
+        sedes = [fila.id for fila in conexion.execute(models.Sede.__table__.select())]
+        conexion.execute(insert(models.Ronda), [
+            {"nombre": f"Ronda {i}", "fecha": base + timedelta(days=i), "sede_id": sedes[i % len(sedes)],
+             "tipo": list(models.TipoRonda)[i % len(models.TipoRonda)]}
+            for i in range(10)
+        ])
+        rondas = [fila.id for fila in conexion.execute(models.Ronda.__table__.select())]
+
+        ids = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(inscripciones)]
+        for inicio in range(0, inscripciones, 1000):
+            conexion.execute(insert(models.Inscripcion), [
+                {
+                    "id": ids[i], "nombre_completo": f"Participante {i}", "nombre_artistico": f"Artista {i}",
+                    "telefono": f"442{i:07d}", "correo": f"p{i}@example.com",
+                    "categoria": list(models.CategoriaParticipante)[i % 3],
+                    "municipio": municipios[int(rng.paretovariate(1.2)) % 40],
+                    "sede_id": sedes[i % len(sedes)],
+                    "estatus": list(models.EstatusInscripcion)[i % 3],
+                    "fecha_inscripcion": base + timedelta(minutes=i),
+                }
+                for i in range(inicio, min(inicio + 1000, inscripciones))
+            ])
+            conexion.execute(insert(models.Resultado), [
+                {"inscrito_id": ids[i], "ronda_id": rondas[i % len(rondas)], "puntaje": rng.uniform(0, 100)}
+                for i in range(inicio, min(inicio + 1000, inscripciones))
+            ])
+
+    token = auth.create_access_token({"sub": str(admin)})
+    return {"token": token, "inscripciones": ids, "rondas": rondas, "sedes": sedes}
+
+
+def mp4_sintetico(tamaño: int) -> bytes:
+    """MP4 mínimo válido (ftyp + moov con una pista avc1 + mdat de relleno)"""
+    def caja(tipo: bytes, contenido: bytes) -> bytes:
+        return struct.pack(">I", 8 + len(contenido)) + tipo + contenido
+
+    mvhd = caja(b"mvhd", bytes(4) + struct.pack(">IIII", 0, 0, 1000, 30000) + bytes(80))
+    tkhd = caja(b"tkhd", bytes(4) + bytes(72) + struct.pack(">II", 1280 << 16, 720 << 16))
+    hdlr = caja(b"hdlr", bytes(8) + b"vide" + bytes(12) + b"\0")
+    avc1 = caja(b"avc1", bytes(24) + struct.pack(">HH", 1280, 720) + bytes(50))
+    stsd = caja(b"stsd", bytes(4) + struct.pack(">I", 1) + avc1)
+    trak = caja(b"trak", tkhd + caja(b"mdia", hdlr + caja(b"minf", caja(b"stbl", stsd))))
+    cabecera = caja(b"ftyp", b"isom" + bytes(4) + b"isomavc1") + caja(b"moov", mvhd + trak)
+    return cabecera + caja(b"mdat", os.urandom(max(0, tamaño - len(cabecera) - 8)))
+
+
+# -----------------------------------------------------------------------------
+# Escenarios
+# -----------------------------------------------------------------------------
+
+class Escenario:
+    def __init__(self, nombre: str, peticion: Callable[[int], tuple], descripcion: str):
+        self.nombre = nombre
+        self.peticion = peticion
+        self.descripcion = descripcion
+
+
+def escenarios(datos: dict, args) -> Dict[str, Escenario]:
+    cabeceras = {"Authorization": f"Bearer {datos['token']}"}
+    rng = random.Random(args.semilla)
+    ids = datos["inscripciones"]
+    video = mp4_sintetico(args.tamaño_video * 1024)
+    corrida = uuid.uuid4().hex[:6]
+
+    def registro(i):
+        return "POST", "/api/inscripciones", {"json": {
+            "nombre_completo": f"Nuevo Participante {corrida} {i}", "nombre_artistico": f"Nuevo {i}",
+            "telefono": f"55{i:08d}", "correo": f"nuevo{corrida}{i}@example.com",
+            "categoria": "KOE SAN", "municipio": "Querétaro", "sede_id": datos["sedes"][i % len(datos["sedes"])],
+        }}
+
+    def listado_admin(i):
+        skip = rng.randrange(0, max(1, len(ids) - 100))
+        return "GET", f"/api/admin/inscripciones?skip={skip}&limit=100", {"headers": cabeceras}
+
+    def busqueda(i):
+        return "GET", f"/api/admin/inscripciones?search=Artista {rng.randrange(len(ids))}", {"headers": cabeceras}
+
+    def estadisticas(i):
+        return "GET", "/api/admin/estadisticas", {"headers": cabeceras}
+
+    def resultados_bulk(i):
+        ronda = datos["rondas"][i % len(datos["rondas"])]
+        # Sin pares (inscrito, ronda) repetidos dentro del lote: violarían unique_inscrito_ronda
+        lote = [{"inscrito_id": inscrito_id, "ronda_id": ronda, "puntaje": f"{rng.uniform(0, 100):.2f}"}
+                for inscrito_id in rng.sample(ids, min(args.tamaño_lote, len(ids)))]
+        return "POST", "/api/admin/resultados/bulk", {"headers": cabeceras, "json": lote}
+
+    def subida_video(i):
+        return "POST", f"/api/inscripciones/{rng.choice(ids)}/video", {
+            "files": {"file": ("video.mp4", video, "video/mp4")}
+        }
+
+    return {
+        escenario.nombre: escenario for escenario in (
+            Escenario("registro", registro, "ráfaga de POST /api/inscripciones"),
+            Escenario("listado_admin", listado_admin, "paginado de /api/admin/inscripciones (limit=100)"),
+            Escenario("busqueda", busqueda, "búsqueda por texto en inscripciones"),
+            Escenario("estadisticas", estadisticas, "GET /api/admin/estadisticas"),
+            Escenario("resultados_bulk", resultados_bulk, f"POST /api/admin/resultados/bulk ({args.tamaño_lote} filas)"),
+            Escenario("subida_video", subida_video, f"POST de video de {args.tamaño_video} KiB"),
+        )
+    }
+
+
+# -----------------------------------------------------------------------------
+# Generador de carga
+# -----------------------------------------------------------------------------
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _percentil(valores: List[float], p: float) -> Optional[float]:
+    if not valores:
+        return None
+    return round(valores[min(len(valores) - 1, int(p * len(valores)))], 2)
+
+
+async def generar_carga(cliente, escenario: Escenario, peticiones: int, concurrencia: int,
+                        duracion: Optional[float]) -> dict:
+    """Lanzar `concurrencia` clientes que consumen peticiones hasta agotar el total o el tiempo"""
+    latencias: List[float] = []
+    codigos: Counter = Counter()
+    contador = itertools.count()
+    limite = time.perf_counter() + duracion if duracion else None
+
+    async def cliente_virtual():
+        while True:
+            i = next(contador)
+            if i >= peticiones or (limite and time.perf_counter() > limite):
+                return
+            metodo, url, opciones = escenario.peticion(i)
+            inicio = time.perf_counter()
+            try:
+                respuesta = await cliente.request(metodo, url, **opciones)
+                codigo = str(respuesta.status_code)
+            except Exception as e:
+                codigo = type(e).__name__
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            codigos[codigo] += 1
+
+    rss_inicio = _rss_mb()
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente_virtual() for _ in range(concurrencia)))
+    segundos = time.perf_counter() - inicio
+    latencias.sort()
+    errores = sum(n for codigo, n in codigos.items() if not codigo.startswith("2"))
+    return {
+        "descripcion": escenario.descripcion,
+        "peticiones": len(latencias),
+        "errores": errores,
+        "codigos": dict(codigos),
+        "segundos": round(segundos, 3),
+        "throughput_rps": round(len(latencias) / segundos, 1) if segundos else None,
+        "p50_ms": _percentil(latencias, 0.50),
+        "p95_ms": _percentil(latencias, 0.95),
+        "p99_ms": _percentil(latencias, 0.99),
+        "max_ms": round(latencias[-1], 2) if latencias else None,
+        "rss_inicio_mb": round(rss_inicio, 1),
+        "rss_fin_mb": round(_rss_mb(), 1),
+        "rss_pico_proceso_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+# -----------------------------------------------------------------------------
+# Reporte
+# -----------------------------------------------------------------------------
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir(resultados: dict, anterior: Optional[dict]):
+    print(f"{'escenario':<16} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errores':>8} {'RSS MB':>8}")
+    for nombre, r in resultados["escenarios"].items():
+        linea = (f"{nombre:<16} {r['throughput_rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} "
+                 f"{r['p99_ms']:>8} {r['errores']:>8} {r['rss_fin_mb']:>8}")
+        previo = (anterior or {}).get("escenarios", {}).get(nombre)
+        if previo and previo.get("throughput_rps") and previo.get("p95_ms"):
+            linea += (f"   Δ req/s {r['throughput_rps'] / previo['throughput_rps'] - 1:+.1%}"
+                      f"  Δ p95 {r['p95_ms'] / previo['p95_ms'] - 1:+.1%}")
+        print(linea)
+
+
+async def ejecutar(args):
+    import httpx
+
+    directorio = preparar_entorno(args.database_url)
+    inicio = time.perf_counter()
+    app = importar_app()
+    arranque = time.perf_counter() - inicio
+    datos = poblar(args.inscripciones, args.semilla)
+    disponibles = escenarios(datos, args)
+    elegidos = args.escenarios.split(",") if args.escenarios else list(disponibles)
+
+    resultados = {
+        "commit": _commit(),
+        "fecha": datetime.utcnow().isoformat(timespec="seconds"),
+        "entorno": {
+            "python": platform.python_version(), "plataforma": platform.platform(), "nucleos": os.cpu_count(),
+            "base": os.environ["DATABASE_URL"].split("://")[0],
+        },
+        "parametros": {
+            "concurrencia": args.concurrencia, "peticiones": args.peticiones, "duracion": args.duracion,
+            "inscripciones": args.inscripciones, "semilla": args.semilla,
+        },
+        "arranque_s": round(arranque, 3),
+        "escenarios": {},
+        "con_errores": [],
+    }
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=120) as cliente:
+        for nombre in elegidos:
+            escenario = disponibles[nombre]
+            await generar_carga(cliente, escenario, min(args.calentamiento, args.peticiones), args.concurrencia, None)
+            resultados["escenarios"][nombre] = await generar_carga(
+                cliente, escenario, args.peticiones, args.concurrencia, args.duracion
+            )
+            print(f"  {nombre}: {resultados['escenarios'][nombre]['throughput_rps']} req/s", file=sys.stderr)
+            if resultados["escenarios"][nombre]["errores"]:
+                resultados["con_errores"].append(nombre)
+    return resultados, directorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="por defecto una base SQLite temporal")
+    parser.add_argument("--escenarios", help="lista separada por comas (por defecto todos)")
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--peticiones", type=int, default=500, help="peticiones por escenario")
+    parser.add_argument("--duracion", type=float, help="límite de segundos por escenario")
+    parser.add_argument("--calentamiento", type=int, default=20)
+    parser.add_argument("--inscripciones", type=int, default=5000)
+    parser.add_argument("--tamaño-lote", dest="tamaño_lote", type=int, default=50)
+    parser.add_argument("--tamaño-video", dest="tamaño_video", type=int, default=1024, help="KiB")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="archivo JSON (por defecto benchmarks/resultados/api-<fecha>-<commit>.json)")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior")
+    args = parser.parse_args()
+
+    resultados, directorio = asyncio.run(ejecutar(args))
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar) as archivo:
+            anterior = json.load(archivo)
+    imprimir(resultados, anterior)
+
+    salida = args.salida or os.path.join(
+        RAIZ, "benchmarks", "resultados",
+        f"api-{resultados['fecha'].replace(':', '')}-{resultados['commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w") as archivo:
+        json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {salida}")
+    if not args.database_url:
+        shutil.rmtree(directorio, ignore_errors=True)
+    # Un escenario con respuestas de error mide otra cosa: la ejecución no es válida
+    if resultados["con_errores"]:
+        for nombre in resultados["con_errores"]:
+            print(f"ERROR: {nombre} tuvo respuestas de error {resultados['escenarios'][nombre]['codigos']}",
+                  file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark de codificación de respuestas: bytes en la red y CPU de codificación
+para una respuesta de /api/admin/resultados con 500 filas anidadas.
+
+Uso: python benchmarks/bench_compresion.py [--filas 500] [--repeticiones 50]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import respuestas
+from respuestas import codificar_json, comprimir
+
+
+def sede(i: int) -> dict:
+    return {
+        "id": i, "nombre_sede": f"Centro Cultural {i}", "estado": "Querétaro", "municipio": "Querétaro",
+        "direccion": "Centro Histórico, Querétaro", "responsable": "Juan Pérez", "telefono": "442-123-4567",
+        "correo": None, "capacidad": 300, "activo": True,
+        "fecha_creacion": "2025-01-10T09:00:00", "fecha_actualizacion": "2025-01-10T09:00:00",
+    }
+
+
+def resultado(i: int) -> dict:
+    """Resultado con el mismo anidamiento que schemas.Resultado"""
+    inscrito_id = str(uuid.UUID(int=i))
+    return {
+        "inscrito_id": inscrito_id, "ronda_id": 7, "puntaje": f"{(i * 37) % 10000 / 100:.2f}",
+        "posicion": i + 1, "clasificado": i < 50, "observaciones": None, "id": i + 1,
+        "fecha_evaluacion": "2025-06-01T20:15:00", "fecha_actualizacion": "2025-06-01T20:15:00",
+        "inscrito": {
+            "nombre_completo": f"Participante Número {i}", "nombre_artistico": f"La Voz {i}",
+            "telefono": f"442{i:07d}", "correo": f"participante{i}@example.com", "categoria": "KOE SAN",
+            "municipio": "Querétaro", "sede_id": i % 12, "sede": None, "id": inscrito_id,
+            "estatus": "aprobado", "fecha_inscripcion": "2025-03-01T12:00:00",
+            "fecha_actualizacion": "2025-03-02T12:00:00", "observaciones": None, "sede_obj": sede(i % 12),
+        },
+        "ronda": {
+            "nombre": "Clasificatoria Querétaro", "descripcion": None, "fecha": "2025-06-01T18:00:00",
+            "sede_id": 1, "tipo": "clasificatoria", "activo": True, "id": 7,
+            "fecha_creacion": "2025-05-01T10:00:00", "fecha_actualizacion": "2025-05-01T10:00:00",
+            "sede": sede(1),
+        },
+    }
+
+
+def medir(nombre: str, codificar, repeticiones: int, base: int):
+    datos = codificar()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        codificar()
+    ms = (time.perf_counter() - inicio) / repeticiones * 1000
+    print(f"{nombre:<32} {len(datos):>10,} bytes  {len(datos) / base:>6.1%}  {ms:>8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=int, default=500)
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    contenido = [resultado(i) for i in range(args.filas)]
+    base = len(json.dumps(contenido).encode())
+    json_compacto = codificar_json(contenido)
+
+    print(f"filas={args.filas}  orjson={'sí' if respuestas.orjson else 'no'}  "
+          f"msgpack={'sí' if respuestas.msgpack else 'no'}  brotli={'sí' if respuestas.brotli else 'no'}")
+    print(f"{'codificación':<32} {'tamaño':>16}  {'%':>6}  {'CPU':>11}")
+    medir("json.dumps (anterior)", lambda: json.dumps(contenido).encode(), args.repeticiones, base)
+    medir("codificar_json", lambda: codificar_json(contenido), args.repeticiones, base)
+    medir("codificar_json + gzip", lambda: comprimir(codificar_json(contenido), "gzip"), args.repeticiones, base)
+    if respuestas.brotli:
+        medir("codificar_json + brotli", lambda: comprimir(codificar_json(contenido), "br"),
+              args.repeticiones, base)
+        medir("  solo brotli (json ya codificado)", lambda: comprimir(json_compacto, "br"), args.repeticiones, base)
+    if respuestas.msgpack:
+        packb = respuestas.msgpack.packb
+        medir("msgpack", lambda: packb(contenido, use_bin_type=True), args.repeticiones, base)
+        medir("msgpack + gzip", lambda: comprimir(packb(contenido, use_bin_type=True), "gzip"),
+              args.repeticiones, base)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark del procesamiento de comprobantes de pago: rendimiento al normalizar
+un lote de fotos de celular (JPEG 12 MP con EXIF) según el número de procesos.
+
+Uso: python benchmarks/bench_comprobantes.py [--cantidad 1000] [--procesos 1,2,4]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import numpy as np
+from PIL import Image
+
+import imagenes
+
+
+def foto_celular(semilla: int, ancho: int, alto: int) -> bytes:
+    """JPEG con textura (ruido sobre degradado) y orientación EXIF, como una foto real"""
+    rng = np.random.default_rng(semilla)
+    degradado = np.linspace(40, 215, ancho, dtype=np.float32)[None, :, None]
+    ruido = rng.normal(0, 10, (alto, ancho, 3)).astype(np.float32)
+    pixeles = np.clip(degradado + ruido, 0, 255).astype(np.uint8)
+    exif = Image.Exif()
+    exif[0x0112] = 6  # orientación: rotada 90°
+    exif[0x010F] = "Fabricante"
+    salida = io.BytesIO()
+    Image.fromarray(pixeles).save(salida, format="JPEG", quality=92, exif=exif.tobytes())
+    return salida.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cantidad", type=int, default=1000)
+    parser.add_argument("--procesos", default=",".join(str(n) for n in sorted({1, 2, os.cpu_count() or 1})))
+    parser.add_argument("--ancho", type=int, default=4032)
+    parser.add_argument("--alto", type=int, default=3024)
+    parser.add_argument("--variantes", type=int, default=8, help="fotos distintas que se reciclan en el lote")
+    args = parser.parse_args()
+
+    fotos = [foto_celular(i, args.ancho, args.alto) for i in range(args.variantes)]
+    lote = [fotos[i % len(fotos)] for i in range(args.cantidad)]
+    entrada = sum(len(foto) for foto in lote)
+    muestra = imagenes.procesar_comprobante(fotos[0])
+
+    print(f"núcleos={os.cpu_count()}  comprobantes={args.cantidad}  "
+          f"original={args.ancho}x{args.alto} ({entrada / len(lote) / 1024:,.0f} KiB promedio)")
+    print(f"salida: {muestra['ancho']}x{muestra['alto']} WebP {len(muestra['imagen']) / 1024:,.0f} KiB, "
+          f"miniatura {len(muestra['miniatura']) / 1024:,.1f} KiB")
+    print(f"{'procesos':>8} {'segundos':>10} {'comprobantes/s':>16} {'ms/comprobante':>16}")
+    for procesos in (int(n) for n in args.procesos.split(",")):
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            list(pool.map(imagenes.procesar_comprobante, fotos[:procesos]))  # calentar procesos
+            inicio = time.perf_counter()
+            salida = sum(len(r["imagen"]) for r in pool.map(imagenes.procesar_comprobante, lote, chunksize=4))
+            segundos = time.perf_counter() - inicio
+        print(f"{procesos:>8} {segundos:>10.1f} {args.cantidad / segundos:>16.1f} "
+              f"{segundos / args.cantidad * 1000:>16.1f}")
+    print(f"bytes almacenados: {entrada / 1024 ** 2:,.0f} MiB -> {salida / 1024 ** 2:,.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
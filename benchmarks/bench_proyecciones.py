@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark de serialización de listados: entidades ORM + validación Pydantic
+(from_attributes) contra proyección de columnas (fields=/expand=).
+
+Mide filas/segundo serializadas a JSON con limit=500 sobre SQLite en memoria.
+Uso: python benchmarks/bench_proyecciones.py [--filas 500] [--repeticiones 20]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, desc
+from sqlalchemy.orm import sessionmaker, joinedload
+from sqlalchemy.pool import StaticPool
+
+import models
+import schemas
+from proyecciones import PROYECCION_INSCRIPCION, PROYECCION_RESULTADO
+
+
+def poblar(db, filas: int):
+    """Crear sedes, una ronda y `filas` inscripciones con su resultado"""
+    sedes = [
+        models.Sede(nombre_sede=f"Sede {i}", estado="Querétaro", municipio=f"Municipio {i}", capacidad=100)
+        for i in range(10)
+    ]
+    db.add_all(sedes)
+    db.flush()
+    ronda = models.Ronda(nombre="Clasificatoria", fecha=datetime(2025, 6, 1), sede_id=sedes[0].id,
+                         tipo=models.TipoRonda.clasificatoria)
+    db.add(ronda)
+    db.flush()
+    base = datetime(2025, 1, 1)
+    for i in range(filas):
+        inscripcion_id = str(uuid.uuid4())
+        db.add(models.Inscripcion(
+            id=inscripcion_id,
+            nombre_completo=f"Participante {i}",
+            nombre_artistico=f"Artista {i}",
+            telefono=f"442{i:07d}",
+            correo=f"p{i}@example.com",
+            municipio=f"Municipio {i % 10}",
+            sede_id=sedes[i % 10].id,
+            fecha_inscripcion=base + timedelta(minutes=i),
+            fecha_actualizacion=base + timedelta(minutes=i),
+        ))
+        db.add(models.Resultado(inscrito_id=inscripcion_id, ronda_id=ronda.id,
+                                puntaje=Decimal(i % 100), fecha_evaluacion=base, fecha_actualizacion=base))
+    db.commit()
+
+
+def medir(nombre: str, funcion, filas: int, repeticiones: int):
+    funcion()  # calentamiento
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        tamaño = len(funcion())
+    duracion = time.perf_counter() - inicio
+    print(f"{nombre:<52} {filas * repeticiones / duracion:>12,.0f} filas/s  {tamaño:>10,} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=int, default=500)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        poblar(db, args.filas)
+
+    adaptador_inscripciones = TypeAdapter(List[schemas.Inscripcion])
+    adaptador_resultados = TypeAdapter(List[schemas.Resultado])
+
+    def inscripciones_orm():
+        with Session() as db:
+            filas = (db.query(models.Inscripcion).options(joinedload(models.Inscripcion.sede_obj))
+                     .order_by(desc(models.Inscripcion.fecha_inscripcion)).limit(args.filas).all())
+            return adaptador_inscripciones.dump_json(adaptador_inscripciones.validate_python(filas))
+
+    def inscripciones_proyeccion(fields=None, expand=None):
+        consulta = PROYECCION_INSCRIPCION.construir(fields, expand)
+        with Session() as db:
+            filas = (consulta.query(db).order_by(desc(models.Inscripcion.fecha_inscripcion))
+                     .limit(args.filas).all())
+            return json.dumps(consulta.serializar(filas)).encode()
+
+    def resultados_orm():
+        with Session() as db:
+            filas = (db.query(models.Resultado)
+                     .options(joinedload(models.Resultado.inscrito), joinedload(models.Resultado.ronda))
+                     .order_by(desc(models.Resultado.puntaje)).limit(args.filas).all())
+            return adaptador_resultados.dump_json(adaptador_resultados.validate_python(filas))
+
+    def resultados_proyeccion(fields=None, expand=None):
+        consulta = PROYECCION_RESULTADO.construir(fields, expand)
+        with Session() as db:
+            filas = consulta.query(db).order_by(desc(models.Resultado.puntaje)).limit(args.filas).all()
+            return json.dumps(consulta.serializar(filas)).encode()
+
+    print(f"limit={args.filas}, repeticiones={args.repeticiones}")
+    medir("inscripciones ORM + from_attributes", inscripciones_orm, args.filas, args.repeticiones)
+    medir("inscripciones expand=sede_obj", lambda: inscripciones_proyeccion(expand="sede_obj"),
+          args.filas, args.repeticiones)
+    medir("inscripciones fields=id,nombre_artistico,estatus",
+          lambda: inscripciones_proyeccion(fields="id,nombre_artistico,estatus"), args.filas, args.repeticiones)
+    medir("resultados ORM + from_attributes", resultados_orm, args.filas, args.repeticiones)
+    medir("resultados expand=inscrito,ronda", lambda: resultados_proyeccion(expand="inscrito,ronda"),
+          args.filas, args.repeticiones)
+    medir("resultados fields=puntaje,inscrito.nombre_artistico",
+          lambda: resultados_proyeccion(fields="puntaje,posicion,inscrito.nombre_artistico"),
+          args.filas, args.repeticiones)
+
+
+if __name__ == "__main__":
+    main()
@@ -46,6 +46,13 @@ CREATE TABLE inscripciones (
     fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     observaciones TEXT,
     comprobante_pago TEXT, -- Base64 del comprobante
+    comprobante_miniatura TEXT, -- Data URI de la miniatura para revisión
+    hash_telefono CHAR(32), -- Claves de contacto normalizadas (backend/duplicados.py)
+    hash_correo CHAR(32),
+    hash_nombre CHAR(32),
+    posible_duplicado_de VARCHAR(36),
+    clave_idempotencia VARCHAR(64) UNIQUE, -- Cabecera Idempotency-Key del registro
+    lista_espera BOOLEAN DEFAULT FALSE, -- Sede llena al registrarse (backend/cupos.py)
     FOREIGN KEY (sede_id) REFERENCES sedes(id) ON DELETE SET NULL
 );
 
@@ -79,6 +86,33 @@ CREATE TABLE resultados (
     UNIQUE KEY unique_inscrito_ronda (inscrito_id, ronda_id)
 );
 
+-- Tabla de puntajes por jurado (resultados.puntaje es su agregado)
+CREATE TABLE puntajes_jurado (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    ronda_id INT NOT NULL,
+    inscrito_id VARCHAR(36) NOT NULL,
+    jurado_id INT NOT NULL,
+    puntaje DECIMAL(5,2) NOT NULL,
+    version INT NOT NULL DEFAULT 1,
+    fecha_captura TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (ronda_id) REFERENCES rondas(id) ON DELETE CASCADE,
+    FOREIGN KEY (inscrito_id) REFERENCES inscripciones(id) ON DELETE CASCADE,
+    FOREIGN KEY (jurado_id) REFERENCES usuarios(id),
+    UNIQUE KEY unique_ronda_inscrito_jurado (ronda_id, inscrito_id, jurado_id)
+);
+
+-- Registro de operaciones sincronizadas desde los dispositivos de jurado (cada una se aplica una sola vez)
+CREATE TABLE operaciones_puntaje (
+    op_id VARCHAR(36) PRIMARY KEY,
+    dispositivo_id VARCHAR(64) NOT NULL,
+    secuencia BIGINT NOT NULL,
+    jurado_id INT NOT NULL,
+    estado VARCHAR(20) NOT NULL,
+    fecha_sincronizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (jurado_id) REFERENCES usuarios(id)
+);
+
 -- Tabla de videos subidos
 CREATE TABLE videos (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -88,7 +122,10 @@ CREATE TABLE videos (
     url_video VARCHAR(500),
     video_data LONGTEXT, -- Base64 del video si se sube directamente
     duracion INT, -- Duración en segundos
-    formato VARCHAR(10), -- mp4, avi, mov
+    formato VARCHAR(10), -- tipo real del contenedor (mp4, mov, webm, mkv, avi)
+    ancho INT,
+    alto INT,
+    codec VARCHAR(50),
     tamaño_mb DECIMAL(8,2),
     aprobado BOOLEAN DEFAULT FALSE,
     destacado BOOLEAN DEFAULT FALSE,
@@ -98,6 +135,34 @@ CREATE TABLE videos (
     FOREIGN KEY (inscrito_id) REFERENCES inscripciones(id) ON DELETE CASCADE
 );
 
+-- Subidas de video por partes en curso (backend/subidas.py)
+CREATE TABLE subidas_video (
+    id VARCHAR(36) PRIMARY KEY, -- UUID
+    inscrito_id VARCHAR(36) NOT NULL,
+    nombre_archivo VARCHAR(255),
+    tipo_contenido VARCHAR(100),
+    tamaño_total BIGINT NOT NULL,
+    tamaño_parte INT NOT NULL,
+    total_partes INT NOT NULL,
+    completada BOOLEAN NOT NULL DEFAULT FALSE,
+    video_id INT,
+    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_expiracion DATETIME NOT NULL,
+    FOREIGN KEY (inscrito_id) REFERENCES inscripciones(id),
+    FOREIGN KEY (video_id) REFERENCES videos(id)
+);
+
+-- Partes recibidas de cada subida
+CREATE TABLE partes_subida (
+    subida_id VARCHAR(36) NOT NULL,
+    indice INT NOT NULL,
+    tamaño INT NOT NULL,
+    sha256 VARCHAR(64) NOT NULL,
+    fecha_recepcion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (subida_id, indice),
+    FOREIGN KEY (subida_id) REFERENCES subidas_video(id) ON DELETE CASCADE
+);
+
 -- Tabla de eventos/logs del sistema
 CREATE TABLE eventos_sistema (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -113,6 +178,77 @@ CREATE TABLE eventos_sistema (
     FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE SET NULL
 );
 
+-- Conteos por hora de inscripciones y videos (series de tiempo preagregadas)
+CREATE TABLE conteos_hora (
+    serie VARCHAR(20) NOT NULL,
+    hora DATETIME NOT NULL,
+    categoria VARCHAR(20) NOT NULL DEFAULT '',
+    sede_id INT NOT NULL DEFAULT 0,
+    total INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (serie, hora, categoria, sede_id)
+);
+
+-- Hasta dónde están contadas las filas de cada serie
+CREATE TABLE marcas_series (
+    serie VARCHAR(20) PRIMARY KEY,
+    hasta DATETIME NOT NULL,
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Lugares reservados por sede (backend/cupos.py)
+CREATE TABLE cupos_sede (
+    sede_id INT PRIMARY KEY,
+    capacidad INT NOT NULL DEFAULT 0,
+    reservados INT NOT NULL DEFAULT 0,
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (sede_id) REFERENCES sedes(id) ON DELETE CASCADE
+);
+
+-- Versión vigente de las instantáneas públicas de resultados (backend/publicacion.py)
+CREATE TABLE snapshots_publicos (
+    clave VARCHAR(100) PRIMARY KEY,
+    version INT NOT NULL,
+    huella CHAR(32) NOT NULL,
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Cola persistente de trabajos en segundo plano (backend/trabajos.py)
+CREATE TABLE trabajos (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    tipo VARCHAR(50) NOT NULL,
+    payload JSON,
+    prioridad INT NOT NULL DEFAULT 0, -- mayor se atiende primero
+    estado ENUM('pendiente', 'en_proceso', 'completado', 'fallido') NOT NULL DEFAULT 'pendiente',
+    intentos INT NOT NULL DEFAULT 0,
+    max_intentos INT NOT NULL DEFAULT 5,
+    ejecutar_despues DATETIME NOT NULL,
+    clave_idempotencia VARCHAR(255) UNIQUE,
+    resultado JSON,
+    error TEXT,
+    trabajador VARCHAR(100),
+    fecha_creacion DATETIME NOT NULL,
+    fecha_inicio DATETIME,
+    fecha_fin DATETIME
+);
+
+-- Bandeja de salida de notificaciones a participantes (backend/notificaciones.py)
+CREATE TABLE notificaciones (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    canal VARCHAR(20) NOT NULL,
+    destino VARCHAR(255) NOT NULL,
+    plantilla VARCHAR(50) NOT NULL,
+    datos JSON,
+    clave_dedup VARCHAR(150) NOT NULL UNIQUE,
+    estado ENUM('pendiente', 'enviando', 'enviada', 'fallida') NOT NULL DEFAULT 'pendiente',
+    intentos INT NOT NULL DEFAULT 0,
+    ejecutar_despues DATETIME NOT NULL,
+    despachador VARCHAR(100),
+    error TEXT,
+    fecha_creacion DATETIME NOT NULL,
+    fecha_toma DATETIME,
+    fecha_envio DATETIME
+);
+
 -- Insertar usuario administrador por defecto
 INSERT INTO usuarios (nombre, correo, rol, contraseña) VALUES 
 ('Administrador', 'admin@karaokesenso.com', 'admin', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewGwUQKPjOtP7j.O'); -- admin123
@@ -124,12 +260,28 @@ INSERT INTO sedes (nombre_sede, estado, municipio, direccion, responsable, telef
 ('Teatro Morelos', 'Michoacán', 'Morelia', 'Centro Histórico Morelia', 'Carlos López', '443-123-4567');
 
 -- Crear índices para optimizar consultas
-CREATE INDEX idx_inscripciones_estatus ON inscripciones(estatus);
-CREATE INDEX idx_inscripciones_categoria ON inscripciones(categoria);
-CREATE INDEX idx_inscripciones_sede ON inscripciones(sede_id);
+-- (compuestos con la columna de orden de cada listado; ver tests/test_planes_consulta.py)
+CREATE INDEX idx_inscripciones_estatus ON inscripciones(estatus, fecha_inscripcion);
+CREATE INDEX idx_inscripciones_categoria ON inscripciones(categoria, fecha_inscripcion);
+CREATE INDEX idx_inscripciones_sede ON inscripciones(sede_id, fecha_inscripcion);
 CREATE INDEX idx_inscripciones_fecha ON inscripciones(fecha_inscripcion);
-CREATE INDEX idx_resultados_ronda ON resultados(ronda_id);
-CREATE INDEX idx_resultados_inscrito ON resultados(inscrito_id);
-CREATE INDEX idx_videos_aprobado ON videos(aprobado);
-CREATE INDEX idx_videos_destacado ON videos(destacado);
+CREATE INDEX idx_inscripciones_municipio ON inscripciones(municipio);
+CREATE INDEX idx_inscripciones_actualizacion ON inscripciones(fecha_actualizacion);
+CREATE INDEX idx_inscripciones_hash_telefono ON inscripciones(hash_telefono);
+CREATE INDEX idx_inscripciones_hash_correo ON inscripciones(hash_correo);
+CREATE INDEX idx_inscripciones_hash_nombre ON inscripciones(hash_nombre, municipio);
+CREATE INDEX idx_inscripciones_espera ON inscripciones(sede_id, lista_espera, fecha_inscripcion);
+CREATE INDEX idx_resultados_ronda ON resultados(ronda_id, puntaje);
+CREATE INDEX idx_resultados_inscrito ON resultados(inscrito_id, puntaje);
+CREATE INDEX idx_resultados_puntaje ON resultados(puntaje);
+CREATE INDEX idx_operaciones_puntaje_dispositivo ON operaciones_puntaje(dispositivo_id, secuencia);
+CREATE INDEX idx_videos_aprobado ON videos(aprobado, fecha_subida);
+CREATE INDEX idx_videos_destacado ON videos(destacado, fecha_subida);
+CREATE INDEX idx_videos_inscrito ON videos(inscrito_id, fecha_subida);
+CREATE INDEX idx_videos_fecha ON videos(fecha_subida);
+CREATE INDEX ix_subidas_video_inscrito_id ON subidas_video(inscrito_id);
+CREATE INDEX ix_subidas_video_fecha_expiracion ON subidas_video(fecha_expiracion);
+CREATE INDEX idx_trabajos_cola ON trabajos(estado, prioridad, ejecutar_despues);
+CREATE INDEX idx_trabajos_tipo_estado ON trabajos(tipo, estado);
+CREATE INDEX idx_notificaciones_cola ON notificaciones(canal, estado, ejecutar_despues);
 CREATE INDEX idx_eventos_fecha ON eventos_sistema(fecha_evento);
\ No newline at end of file
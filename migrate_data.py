@@ -1,100 +1,389 @@
 #!/usr/bin/env python3
 """
 Script para migrar datos de MongoDB a MySQL
+
+Lee la colección de inscripciones con un cursor por lotes (sin cargarla en
+memoria), inserta con executemany en lotes con commit periódico y guarda un
+checkpoint por partición para poder reanudar. La colección se divide en
+rangos de _id que procesan en paralelo varias conexiones. Al final compara
+conteos y checksums entre origen y destino.
+
+Uso:
+    python migrate_data.py [--trabajadores 4] [--lote 1000] [--checkpoint migracion.checkpoint.json]
+    python migrate_data.py --sqlite destino.db        # destino SQLite (pruebas)
+    python migrate_data.py --solo-verificar
 """
-import asyncio
-import pymongo
-import mysql.connector
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bson import json_util
+
+# Espacio de nombres para derivar un UUID estable de un _id sin campo "id":
+# reanudar o repetir la migración produce el mismo id y no duplica filas
+NAMESPACE_MIGRACION = uuid.UUID("6f1c2b0e-5d1a-4d8e-9b8a-3a4f8c2e7d10")
+
+COLUMNAS = (
+    "id", "nombre_completo", "nombre_artistico", "telefono", "correo",
+    "categoria", "municipio", "sede", "estatus", "fecha_inscripcion",
+    "observaciones", "comprobante_pago",
+)
+
+
+def _fecha(valor, _id=None) -> Optional[datetime]:
+    if isinstance(valor, str):
+        try:
+            valor = datetime.fromisoformat(valor.replace("Z", "+00:00"))
+        except ValueError:
+            valor = None
+    if not isinstance(valor, datetime):
+        # Sin fecha válida: la de creación del ObjectId, o NULL. Debe ser determinista
+        # para que verificar() y las re-ejecuciones conviertan el documento igual
+        valor = getattr(_id, "generation_time", None)
+        if valor is None:
+            return None
+    # DATETIME de MySQL no guarda zona ni (sin fsp) microsegundos
+    return valor.replace(tzinfo=None, microsecond=0)
+
+
+def _comprobante(valor) -> Optional[str]:
+    """Comprobante embebido como data URI, venga como cadena, bytes o subdocumento"""
+    if valor is None or isinstance(valor, str):
+        return valor or None
+    tipo_contenido = "application/octet-stream"
+    if isinstance(valor, dict):
+        tipo_contenido = valor.get("content_type") or valor.get("tipo") or tipo_contenido
+        valor = valor.get("data") or valor.get("contenido")
+        if isinstance(valor, str):
+            return valor if valor.startswith("data:") else f"data:{tipo_contenido};base64,{valor}"
+    if isinstance(valor, (bytes, bytearray)):
+        return f"data:{tipo_contenido};base64,{base64.b64encode(bytes(valor)).decode()}"
+    return None
+
+
+def convertir(documento: dict) -> tuple:
+    """Documento de MongoDB -> fila de inscripciones (en el orden de COLUMNAS)"""
+    return (
+        documento.get("id") or str(uuid.uuid5(NAMESPACE_MIGRACION, str(documento["_id"]))),
+        documento.get("nombre_completo", ""),
+        documento.get("nombre_artistico", ""),
+        documento.get("telefono", ""),
+        documento.get("correo"),
+        documento.get("categoria", "KOE SAN"),
+        documento.get("municipio", ""),
+        documento.get("sede", ""),
+        documento.get("estatus") or documento.get("estado", "pendiente"),  # estado -> estatus
+        _fecha(documento.get("fecha_inscripcion"), documento.get("_id")),
+        documento.get("observaciones"),
+        _comprobante(documento.get("comprobante_pago")),
+    )
+
+
+def _normalizar(valor) -> str:
+    if valor is None:
+        return ""
+    if isinstance(valor, datetime):
+        return valor.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(valor, str) and len(valor) >= 19 and valor[10:11] in (" ", "T") and valor[4:5] == "-":
+        return valor[:19].replace("T", " ")  # fecha leída como texto (SQLite)
+    return str(valor)
+
+
+def huella(fila: tuple) -> str:
+    return hashlib.sha256("\x1f".join(_normalizar(valor) for valor in fila).encode()).hexdigest()
+
+
+class Destino:
+    """Diferencias de SQL entre MySQL y SQLite"""
+
+    def __init__(self, dialecto: str, conectar: Callable[[], Any]):
+        self.dialecto = dialecto
+        self.conectar = conectar
+        marcas = ", ".join(["%s" if dialecto == "mysql" else "?"] * len(COLUMNAS))
+        if dialecto == "mysql":
+            actualizar = ", ".join(f"{c} = VALUES({c})" for c in COLUMNAS[1:])
+            conflicto = f"ON DUPLICATE KEY UPDATE {actualizar}"
+        else:
+            actualizar = ", ".join(f"{c} = excluded.{c}" for c in COLUMNAS[1:])
+            conflicto = f"ON CONFLICT(id) DO UPDATE SET {actualizar}"
+        self.sql_insertar = f"INSERT INTO inscripciones ({', '.join(COLUMNAS)}) VALUES ({marcas}) {conflicto}"
+        self.marca = "%s" if dialecto == "mysql" else "?"
+
+    def leer(self, cursor, ids: List[str]) -> Dict[str, tuple]:
+        marcas = ", ".join([self.marca] * len(ids))
+        cursor.execute(f"SELECT {', '.join(COLUMNAS)} FROM inscripciones WHERE id IN ({marcas})", ids)
+        return {fila[0]: tuple(fila) for fila in cursor.fetchall()}
+
+
+class Checkpoint:
+    """Último _id confirmado por partición, guardado de forma atómica en JSON"""
+
+    def __init__(self, ruta: Optional[str]):
+        self.ruta = ruta
+        self.datos: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        if ruta and os.path.exists(ruta):
+            with open(ruta) as archivo:
+                self.datos = json_util.loads(archivo.read())
+
+    def guardar(self):
+        if not self.ruta:
+            return
+        temporal = f"{self.ruta}.tmp"
+        with open(temporal, "w") as archivo:
+            archivo.write(json_util.dumps(self.datos))
+        os.replace(temporal, self.ruta)
+
+    def actualizar(self, particion: int, **cambios):
+        with self._lock:
+            self.datos["particiones"][particion].update(cambios)
+            self.guardar()
+
+
+class Migrador:
+    def __init__(self, coleccion, destino: Destino, lote: int = 1000, trabajadores: int = 4,
+                 checkpoint: Optional[str] = None, log: Callable[[str], None] = print):
+        self.coleccion = coleccion
+        self.destino = destino
+        self.lote = lote
+        self.trabajadores = max(1, trabajadores)
+        self.checkpoint = Checkpoint(checkpoint)
+        self.log = log
+
+    # -- particiones ---------------------------------------------------------
+
+    def _limites(self) -> List[Tuple[Any, Any]]:
+        """Dividir la colección en rangos de _id [desde, hasta) de tamaño similar"""
+        total = self.coleccion.estimated_document_count()
+        n = max(1, min(self.trabajadores, total // max(self.lote, 1) or 1))
+        cortes = []
+        for k in range(1, n):
+            documento = next(
+                self.coleccion.find({}, {"_id": 1}).sort("_id", 1).skip(k * total // n).limit(1), None
+            )
+            if documento and (not cortes or documento["_id"] != cortes[-1]):
+                cortes.append(documento["_id"])
+        bordes = [None] + cortes + [None]
+        return list(zip(bordes[:-1], bordes[1:]))
+
+    def particiones(self) -> List[dict]:
+        if "particiones" not in self.checkpoint.datos:
+            self.checkpoint.datos = {
+                "iniciado": datetime.utcnow().isoformat(),
+                "particiones": [
+                    {"desde": desde, "hasta": hasta, "ultimo_id": None, "migrados": 0, "completada": False}
+                    for desde, hasta in self._limites()
+                ],
+            }
+            self.checkpoint.guardar()
+        return self.checkpoint.datos["particiones"]
+
+    @staticmethod
+    def _filtro(particion: dict, reanudar: bool = True) -> dict:
+        rango = {}
+        if reanudar and particion["ultimo_id"] is not None:
+            rango["$gt"] = particion["ultimo_id"]
+        elif particion["desde"] is not None:
+            rango["$gte"] = particion["desde"]
+        if particion["hasta"] is not None:
+            rango["$lt"] = particion["hasta"]
+        return {"_id": rango} if rango else {}
+
+    def _documentos(self, filtro: dict):
+        return self.coleccion.find(filtro).sort("_id", 1).batch_size(self.lote)
+
+    # -- migración -----------------------------------------------------------
+
+    def _migrar_particion(self, indice: int) -> int:
+        particion = self.checkpoint.datos["particiones"][indice]
+        if particion["completada"]:
+            return 0
+        conexion = self.destino.conectar()
+        cursor = conexion.cursor()
+        migrados = 0
+        filas: List[tuple] = []
+        ultimo_id = None
+
+        def confirmar():
+            nonlocal migrados
+            cursor.executemany(self.destino.sql_insertar, filas)
+            conexion.commit()
+            migrados += len(filas)
+            self.checkpoint.actualizar(indice, ultimo_id=ultimo_id, migrados=particion["migrados"] + len(filas))
+            filas.clear()
+
+        try:
+            for documento in self._documentos(self._filtro(particion)):
+                filas.append(convertir(documento))
+                ultimo_id = documento["_id"]
+                if len(filas) >= self.lote:
+                    confirmar()
+            if filas:
+                confirmar()
+            self.checkpoint.actualizar(indice, completada=True)
+        finally:
+            cursor.close()
+            conexion.close()
+        self.log(f"  partición {indice}: {migrados} inscripciones")
+        return migrados
+
+    def migrar(self) -> int:
+        particiones = self.particiones()
+        pendientes = [i for i, p in enumerate(particiones) if not p["completada"]]
+        ya = sum(p["migrados"] for p in particiones)
+        self.log(f"📋 {len(particiones)} particiones, {len(pendientes)} pendientes ({ya} filas ya migradas)")
+        with ThreadPoolExecutor(max_workers=self.trabajadores) as pool:
+            total = sum(pool.map(self._migrar_particion, pendientes))
+        self.log(f"✅ Migradas {total} inscripciones en esta ejecución")
+        return total
+
+    # -- verificación --------------------------------------------------------
+
+    def _verificar_particion(self, particion: dict) -> dict:
+        conexion = self.destino.conectar()
+        cursor = conexion.cursor()
+        resultado = {"origen": 0, "destino": 0, "faltantes": [], "diferentes": [], "checksum_origen": 0,
+                     "checksum_destino": 0}
+        lote: List[tuple] = []
+
+        def comparar():
+            encontradas = self.destino.leer(cursor, [fila[0] for fila in lote])
+            for fila in lote:
+                esperado = huella(fila)
+                resultado["checksum_origen"] ^= int(esperado[:16], 16)
+                actual = encontradas.get(fila[0])
+                if actual is None:
+                    resultado["faltantes"].append(fila[0])
+                    continue
+                resultado["destino"] += 1
+                obtenido = huella(actual)
+                resultado["checksum_destino"] ^= int(obtenido[:16], 16)
+                if obtenido != esperado:
+                    resultado["diferentes"].append(fila[0])
+            lote.clear()
+
+        try:
+            for documento in self._documentos(self._filtro(particion, reanudar=False)):
+                lote.append(convertir(documento))
+                resultado["origen"] += 1
+                if len(lote) >= self.lote:
+                    comparar()
+            if lote:
+                comparar()
+        finally:
+            cursor.close()
+            conexion.close()
+        return resultado
+
+    def verificar(self) -> dict:
+        """Comparar conteos y checksums (XOR de sha256 por fila) entre MongoDB y el destino"""
+        particiones = self.particiones()
+        with ThreadPoolExecutor(max_workers=self.trabajadores) as pool:
+            parciales = list(pool.map(self._verificar_particion, particiones))
+        resumen = {"origen": 0, "destino": 0, "faltantes": [], "diferentes": [], "checksum_origen": 0,
+                   "checksum_destino": 0}
+        for parcial in parciales:
+            resumen["origen"] += parcial["origen"]
+            resumen["destino"] += parcial["destino"]
+            resumen["faltantes"] += parcial["faltantes"]
+            resumen["diferentes"] += parcial["diferentes"]
+            resumen["checksum_origen"] ^= parcial["checksum_origen"]
+            resumen["checksum_destino"] ^= parcial["checksum_destino"]
+        resumen["total_mongo"] = self.coleccion.count_documents({})
+        resumen["ok"] = (
+            resumen["origen"] == resumen["destino"] == resumen["total_mongo"]
+            and resumen["checksum_origen"] == resumen["checksum_destino"]
+            and not resumen["faltantes"] and not resumen["diferentes"]
+        )
+        resumen["checksum_origen"] = f"{resumen['checksum_origen']:016x}"
+        resumen["checksum_destino"] = f"{resumen['checksum_destino']:016x}"
+        return resumen
+
+
+def _conectar_mysql(args) -> Callable[[], Any]:
+    import mysql.connector
+
+    def conectar():
+        return mysql.connector.connect(
+            host=args.mysql_host, port=args.mysql_port, user=args.mysql_user,
+            password=args.mysql_password, database=args.mysql_database
+        )
+    return conectar
+
+
+def _conectar_sqlite(ruta: str) -> Callable[[], Any]:
+    def conectar():
+        conexion = sqlite3.connect(ruta, timeout=60)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        return conexion
+    return conectar
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrar inscripciones de MongoDB a MySQL")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--mongo-db", default=os.environ.get("MONGO_DB", "karaoke_senso"))
+    parser.add_argument("--mysql-host", default=os.environ.get("MYSQL_HOST", "localhost"))
+    parser.add_argument("--mysql-port", type=int, default=int(os.environ.get("MYSQL_PORT", "3306")))
+    parser.add_argument("--mysql-user", default=os.environ.get("MYSQL_USER", "root"))
+    parser.add_argument("--mysql-password", default=os.environ.get("MYSQL_PASSWORD", ""))
+    parser.add_argument("--mysql-database", default=os.environ.get("MYSQL_DATABASE", "karaoke_senso"))
+    parser.add_argument("--sqlite", help="ruta de una base SQLite de destino en lugar de MySQL")
+    parser.add_argument("--lote", type=int, default=1000, help="filas por executemany/commit")
+    parser.add_argument("--trabajadores", type=int, default=4, help="conexiones en paralelo (particiones de _id)")
+    parser.add_argument("--checkpoint", default="migracion.checkpoint.json")
+    parser.add_argument("--reiniciar", action="store_true", help="ignorar el checkpoint existente")
+    parser.add_argument("--solo-verificar", action="store_true")
+    args = parser.parse_args()
+
+    import pymongo
+
+    if args.reiniciar and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
 
-async def migrate_data():
-    """Migrar inscripciones de MongoDB a MySQL"""
-    
-    # Conexión a MongoDB
     try:
-        mongo_client = pymongo.MongoClient(os.environ.get('MONGO_URL', 'mongodb://localhost:27017'))
-        mongo_db = mongo_client.karaoke_senso
+        mongo_client = pymongo.MongoClient(args.mongo_url)
+        coleccion = mongo_client[args.mongo_db].inscripciones
         print("✅ Conectado a MongoDB")
     except Exception as e:
         print(f"❌ Error conectando a MongoDB: {e}")
-        return
-    
-    # Conexión a MySQL
-    try:
-        mysql_conn = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='',
-            database='karaoke_senso'
-        )
-        mysql_cursor = mysql_conn.cursor()
-        print("✅ Conectado a MySQL")
-    except Exception as e:
-        print(f"❌ Error conectando a MySQL: {e}")
-        return
-    
-    # Obtener inscripciones de MongoDB
+        return 1
+
+    if args.sqlite:
+        destino = Destino("sqlite", _conectar_sqlite(args.sqlite))
+    else:
+        destino = Destino("mysql", _conectar_mysql(args))
     try:
-        inscripciones_mongo = list(mongo_db.inscripciones.find({}))
-        print(f"📋 Encontradas {len(inscripciones_mongo)} inscripciones en MongoDB")
+        destino.conectar().close()
+        print(f"✅ Conectado a {'SQLite' if args.sqlite else 'MySQL'}")
     except Exception as e:
-        print(f"❌ Error obteniendo inscripciones de MongoDB: {e}")
-        return
-    
-    # Migrar inscripciones a MySQL
-    migrated_count = 0
-    for inscripcion in inscripciones_mongo:
-        try:
-            # Usar el ID existente o generar uno nuevo
-            inscripcion_id = inscripcion.get('id', str(uuid.uuid4()))
-            
-            # Preparar datos
-            insert_query = """
-            INSERT INTO inscripciones (
-                id, nombre_completo, nombre_artistico, telefono, correo, 
-                categoria, municipio, sede, estatus, fecha_inscripcion,
-                comprobante_pago
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                nombre_completo = VALUES(nombre_completo),
-                nombre_artistico = VALUES(nombre_artistico),
-                telefono = VALUES(telefono)
-            """
-            
-            # Valores para inserción
-            values = (
-                inscripcion_id,
-                inscripcion.get('nombre_completo', ''),
-                inscripcion.get('nombre_artistico', ''),
-                inscripcion.get('telefono', ''),
-                inscripcion.get('correo'),
-                inscripcion.get('categoria', 'KOE SAN'),
-                inscripcion.get('municipio', ''),
-                inscripcion.get('sede', ''),
-                inscripcion.get('estado', 'pendiente'),  # estado -> estatus
-                inscripcion.get('fecha_inscripcion', datetime.now()),
-                inscripcion.get('comprobante_pago')
-            )
-            
-            mysql_cursor.execute(insert_query, values)
-            migrated_count += 1
-            
-        except Exception as e:
-            print(f"⚠️ Error migrando inscripción {inscripcion.get('id', 'sin_id')}: {e}")
-            continue
-    
-    # Confirmar cambios
-    mysql_conn.commit()
-    print(f"✅ Migradas {migrated_count} inscripciones exitosamente")
-    
-    # Cerrar conexiones
-    mysql_cursor.close()
-    mysql_conn.close()
+        print(f"❌ Error conectando a la base de destino: {e}")
+        return 1
+
+    migrador = Migrador(coleccion, destino, lote=args.lote, trabajadores=args.trabajadores,
+                        checkpoint=args.checkpoint)
+    if not args.solo_verificar:
+        migrador.migrar()
+
+    print("🔎 Verificando...")
+    resumen = migrador.verificar()
+    print(json.dumps({k: (v[:20] if isinstance(v, list) else v) for k, v in resumen.items()}, indent=2))
     mongo_client.close()
-    
-    print("🎉 Migración completada")
+
+    if resumen["ok"]:
+        print("🎉 Migración completada y verificada")
+        return 0
+    print("⚠️ La verificación encontró diferencias")
+    return 2
+
 
 if __name__ == "__main__":
-    asyncio.run(migrate_data())
\ No newline at end of file
+    raise SystemExit(main())
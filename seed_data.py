@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Generador de datos sintéticos y carga masiva a escala de producción
+
+Genera sedes, inscripciones, rondas, resultados y metadatos de videos con
+distribuciones sesgadas (Zipf por municipio y sede, fechas concentradas al
+cierre de la convocatoria) vectorizadas con numpy y una semilla fija, las
+escribe como CSV y las carga con LOAD DATA LOCAL INFILE en MySQL (o con
+inserciones por lotes en SQLite para pruebas), quitando los índices
+secundarios durante la carga y reconstruyéndolos al final. Opcionalmente
+escribe un volcado JSONL con la forma de la colección de MongoDB para probar
+migrate_data.py (importable con mongoimport).
+
+Uso:
+    python seed_data.py                                   # solo CSV, escala completa
+    python seed_data.py --escala 0.01 --cargar sqlite --database-url sqlite:///semilla.db
+    python seed_data.py --cargar mysql --database-url mysql+pymysql://root:@localhost/karaoke_senso
+    python seed_data.py --mongo-jsonl inscripciones.jsonl
+"""
+import argparse
+import binascii
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+NOMBRES = np.array([
+    "José", "María", "Juan", "Guadalupe", "Luis", "Ana", "Carlos", "Fernanda", "Miguel", "Sofía",
+    "Jorge", "Valeria", "Alejandro", "Daniela", "Ricardo", "Camila", "Eduardo", "Ximena", "Hiroshi", "Yuki",
+])
+APELLIDOS = np.array([
+    "Hernández", "García", "Martínez", "López", "González", "Pérez", "Rodríguez", "Sánchez", "Ramírez", "Cruz",
+    "Flores", "Gómez", "Morales", "Vázquez", "Jiménez", "Reyes", "Díaz", "Torres", "Tanaka", "Suzuki",
+])
+ESTADOS = np.array(["Querétaro", "Guanajuato", "Jalisco", "Ciudad de México", "Nuevo León", "Puebla",
+                    "Estado de México", "Michoacán", "Yucatán", "Baja California"])
+CATEGORIAS = np.array(["KOE SAN", "KOE SAI", "TSUKAMU KOE"])
+ESTATUS = np.array(["pendiente", "aprobado", "rechazado"])
+TIPOS_RONDA = np.array(["clasificatoria", "interseccion", "interciudad", "interestatal", "internacional"])
+FORMATOS_VIDEO = np.array(["mp4", "mov", "webm"])
+CODECS_VIDEO = np.array(["avc1", "hvc1", "V_VP9"])
+
+INICIO_CONVOCATORIA = datetime(2025, 1, 15)
+DIAS_CONVOCATORIA = 120
+
+# Orden de carga (respeta llaves foráneas)
+TABLAS = ["sedes", "inscripciones", "rondas", "resultados", "videos"]
+
+
+def _zipf(rng: np.random.Generator, n: int, tamaño: int, s: float = 1.1) -> np.ndarray:
+    """Índices en [0, n) con probabilidad proporcional a 1/rango^s"""
+    pesos = 1.0 / np.arange(1, n + 1) ** s
+    return rng.choice(n, size=tamaño, p=pesos / pesos.sum())
+
+
+def _uuids(rng: np.random.Generator, n: int) -> np.ndarray:
+    """UUID v4 deterministas a partir del generador"""
+    crudos = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    crudos[:, 6] = (crudos[:, 6] & 0x0F) | 0x40
+    crudos[:, 8] = (crudos[:, 8] & 0x3F) | 0x80
+    hexadecimal = np.frombuffer(binascii.hexlify(crudos.tobytes()), dtype="S32").astype(str)
+    return np.array([f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}" for h in hexadecimal])
+
+
+def _fechas(base: datetime, segundos: np.ndarray) -> pd.Series:
+    return pd.Series(pd.Timestamp(base) + pd.to_timedelta(segundos.astype(np.int64), unit="s"))
+
+
+def generar(args) -> Dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(args.semilla)
+    n_municipios = max(1, int(args.municipios))
+    n_sedes = max(1, int(args.sedes * min(1.0, args.escala * 10)))
+    n_inscripciones = int(args.inscripciones * args.escala)
+    n_rondas = max(len(TIPOS_RONDA), int(args.rondas * args.escala))
+    n_resultados = int(args.resultados * args.escala)
+    n_videos = int(args.videos * args.escala)
+
+    municipios = np.array([f"Municipio {i:04d}" for i in range(n_municipios)])
+    estado_municipio = ESTADOS[rng.integers(0, len(ESTADOS), n_municipios)]
+
+    # Sedes: concentradas en los municipios grandes
+    municipio_sede = _zipf(rng, n_municipios, n_sedes)
+    sedes = pd.DataFrame({
+        "id": np.arange(1, n_sedes + 1),
+        "nombre_sede": [f"Sede {i} {municipios[m]}" for i, m in enumerate(municipio_sede, start=1)],
+        "estado": estado_municipio[municipio_sede],
+        "municipio": municipios[municipio_sede],
+        "direccion": [f"Calle {i} #{(i * 37) % 900 + 10}" for i in range(n_sedes)],
+        "responsable": np.char.add(np.char.add(NOMBRES[rng.integers(0, len(NOMBRES), n_sedes)], " "),
+                                   APELLIDOS[rng.integers(0, len(APELLIDOS), n_sedes)]),
+        "telefono": rng.integers(4_420_000_000, 4_429_999_999, n_sedes).astype(str),
+        "capacidad": np.clip(rng.lognormal(5.0, 0.7, n_sedes), 20, 5000).astype(int),
+        "activo": (rng.random(n_sedes) > 0.05).astype(int),
+    })
+
+    # Inscripciones: sede por Zipf, municipio el de la sede casi siempre, fechas
+    # concentradas al final de la convocatoria (beta 4,1.5)
+    sede_inscripcion = _zipf(rng, n_sedes, n_inscripciones, s=0.9)
+    municipio_inscripcion = np.where(
+        rng.random(n_inscripciones) < 0.85, municipio_sede[sede_inscripcion],
+        _zipf(rng, n_municipios, n_inscripciones)
+    )
+    nombres = np.char.add(np.char.add(NOMBRES[rng.integers(0, len(NOMBRES), n_inscripciones)], " "),
+                          APELLIDOS[rng.integers(0, len(APELLIDOS), n_inscripciones)])
+    nombres = np.char.add(np.char.add(nombres, " "), APELLIDOS[rng.integers(0, len(APELLIDOS), n_inscripciones)])
+    ids = _uuids(rng, n_inscripciones)
+    fecha_inscripcion = _fechas(
+        INICIO_CONVOCATORIA, rng.beta(4, 1.5, n_inscripciones) * DIAS_CONVOCATORIA * 86400
+    )
+    correo = pd.Series(np.char.add(np.char.add("participante", np.arange(n_inscripciones).astype(str)), "@example.com"))
+    correo[rng.random(n_inscripciones) < 0.2] = None
+    inscripciones = pd.DataFrame({
+        "id": ids,
+        "nombre_completo": nombres,
+        "nombre_artistico": np.char.add("Artista ", np.arange(n_inscripciones).astype(str)),
+        "telefono": rng.integers(2_000_000_000, 9_999_999_999, n_inscripciones).astype(str),
+        "correo": correo,
+        "categoria": CATEGORIAS[rng.choice(3, n_inscripciones, p=[0.55, 0.3, 0.15])],
+        "municipio": municipios[municipio_inscripcion],
+        "sede_id": sede_inscripcion + 1,
+        "estatus": ESTATUS[rng.choice(3, n_inscripciones, p=[0.3, 0.6, 0.1])],
+        "fecha_inscripcion": fecha_inscripcion,
+        "fecha_actualizacion": fecha_inscripcion,
+    })
+
+    # Rondas: la mayoría clasificatorias, pocas en las fases altas
+    tipo_ronda = TIPOS_RONDA[rng.choice(len(TIPOS_RONDA), n_rondas, p=[0.7, 0.15, 0.08, 0.05, 0.02])]
+    tipo_ronda[:len(TIPOS_RONDA)] = TIPOS_RONDA  # al menos una de cada tipo
+    fecha_ronda = _fechas(
+        INICIO_CONVOCATORIA + timedelta(days=DIAS_CONVOCATORIA), rng.random(n_rondas) * 180 * 86400
+    )
+    rondas = pd.DataFrame({
+        "id": np.arange(1, n_rondas + 1),
+        "nombre": [f"Ronda {t} {i}" for i, t in enumerate(tipo_ronda, start=1)],
+        "fecha": fecha_ronda,
+        "sede_id": _zipf(rng, n_sedes, n_rondas, s=0.9) + 1,
+        "tipo": tipo_ronda,
+        "activo": 1,
+    })
+
+    # Resultados: pares (inscrito, ronda) únicos; los inscritos aprobados participan más
+    pesos = np.where(inscripciones["estatus"].to_numpy() == "aprobado", 3.0, 1.0)
+    claves = np.empty(0, dtype=np.int64)
+    while len(claves) < n_resultados and n_inscripciones:
+        faltan = int((n_resultados - len(claves)) * 1.1) + 16
+        inscrito = rng.choice(n_inscripciones, faltan, p=pesos / pesos.sum())
+        ronda = rng.integers(0, n_rondas, faltan)
+        claves = np.unique(np.concatenate([claves, inscrito.astype(np.int64) * n_rondas + ronda]))
+    claves = rng.permutation(claves)[:n_resultados]
+    puntaje = np.round(np.clip(rng.normal(72, 12, len(claves)), 0, 100), 2)
+    resultados = pd.DataFrame({
+        "id": np.arange(1, len(claves) + 1),
+        "inscrito_id": ids[claves // n_rondas] if n_inscripciones else [],
+        "ronda_id": claves % n_rondas + 1,
+        "puntaje": puntaje,
+        "clasificado": (puntaje >= 85).astype(int),
+        "fecha_evaluacion": fecha_ronda.to_numpy()[claves % n_rondas],
+    })
+
+    # Metadatos de videos (sin el contenido)
+    inscrito_video = rng.integers(0, max(1, n_inscripciones), n_videos)
+    formato = rng.choice(len(FORMATOS_VIDEO), n_videos, p=[0.7, 0.2, 0.1])
+    vertical = rng.random(n_videos) < 0.6
+    videos = pd.DataFrame({
+        "id": np.arange(1, n_videos + 1),
+        "inscrito_id": ids[inscrito_video] if n_inscripciones else [],
+        "titulo": np.char.add("Video ", np.arange(n_videos).astype(str)),
+        "url_video": [f"videos/seed-{i}.{FORMATOS_VIDEO[f]}" for i, f in enumerate(formato)],
+        "duracion": np.clip(rng.gamma(4, 45, n_videos), 15, 600).astype(int),
+        "formato": FORMATOS_VIDEO[formato],
+        "ancho": np.where(vertical, 1080, 1920),
+        "alto": np.where(vertical, 1920, 1080),
+        "codec": CODECS_VIDEO[formato],
+        "tamaño_mb": np.round(np.clip(rng.lognormal(2.8, 0.6, n_videos), 1, 50), 2),
+        "aprobado": (rng.random(n_videos) < 0.5).astype(int),
+        "destacado": (rng.random(n_videos) < 0.03).astype(int),
+        "fecha_subida": _fechas(INICIO_CONVOCATORIA, rng.random(n_videos) * DIAS_CONVOCATORIA * 86400),
+    })
+
+    return {"sedes": sedes, "inscripciones": inscripciones, "rondas": rondas, "resultados": resultados,
+            "videos": videos}
+
+
+def escribir_csv(tablas: Dict[str, pd.DataFrame], directorio: str) -> Dict[str, str]:
+    os.makedirs(directorio, exist_ok=True)
+    rutas = {}
+    for nombre in TABLAS:
+        ruta = os.path.join(directorio, f"{nombre}.csv")
+        # NULL sin comillas: LOAD DATA con ESCAPED BY '' lo lee como NULL
+        tablas[nombre].to_csv(ruta, index=False, na_rep="NULL", quoting=csv.QUOTE_MINIMAL,
+                              date_format="%Y-%m-%d %H:%M:%S", chunksize=200_000, lineterminator="\n")
+        rutas[nombre] = ruta
+    return rutas
+
+
+def escribir_mongo_jsonl(inscripciones: pd.DataFrame, ruta: str):
+    """Volcado con la forma de la colección inscripciones de MongoDB (JSON extendido)"""
+    segundos = ((inscripciones["fecha_inscripcion"] - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).to_numpy()
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        for i, fila in enumerate(inscripciones.itertuples(index=False)):
+            documento = {
+                # ObjectId determinista: marca de tiempo de la inscripción + contador
+                "_id": {"$oid": f"{int(segundos[i]):08x}{i:016x}"},
+                "id": fila.id,
+                "nombre_completo": fila.nombre_completo,
+                "nombre_artistico": fila.nombre_artistico,
+                "telefono": fila.telefono,
+                "correo": None if pd.isna(fila.correo) else fila.correo,
+                "categoria": fila.categoria,
+                "municipio": fila.municipio,
+                "sede": f"Sede {fila.sede_id}",
+                "estado": fila.estatus,  # el esquema anterior usaba "estado"
+                "fecha_inscripcion": {"$date": fila.fecha_inscripcion.strftime("%Y-%m-%dT%H:%M:%SZ")},
+            }
+            archivo.write(json.dumps(documento, ensure_ascii=False) + "\n")
+
+
+# -----------------------------------------------------------------------------
+# Carga
+# -----------------------------------------------------------------------------
+
+def _cargar_mysql(motor, rutas: Dict[str, str], columnas: Dict[str, List[str]]):
+    from sqlalchemy import text
+
+    with motor.connect() as conexion:
+        conexion.execute(text("SET foreign_key_checks = 0, unique_checks = 0, sql_log_bin = 0"))
+        for tabla in TABLAS:
+            inicio = time.perf_counter()
+            # Índices secundarios que no respaldan una llave foránea: se quitan durante la carga
+            foraneas = {fila[0] for fila in conexion.execute(text(
+                "SELECT column_name FROM information_schema.key_column_usage "
+                "WHERE table_schema = DATABASE() AND table_name = :t AND referenced_table_name IS NOT NULL"
+            ), {"t": tabla})}
+            indices: Dict[str, dict] = {}
+            for fila in conexion.execute(text(f"SHOW INDEX FROM {tabla}")).mappings():
+                if fila["Key_name"] == "PRIMARY":
+                    continue
+                indice = indices.setdefault(fila["Key_name"], {"unico": not fila["Non_unique"], "columnas": []})
+                indice["columnas"].append(fila["Column_name"])
+            quitar = {nombre: i for nombre, i in indices.items() if i["columnas"][0] not in foraneas}
+            if quitar:
+                conexion.execute(text(f"ALTER TABLE {tabla} " + ", ".join(f"DROP INDEX {n}" for n in quitar)))
+
+            conexion.execute(text(
+                f"LOAD DATA LOCAL INFILE :ruta INTO TABLE {tabla} CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                f"LINES TERMINATED BY '\\n' IGNORE 1 LINES ({', '.join(columnas[tabla])})"
+            ), {"ruta": os.path.abspath(rutas[tabla])})
+            conexion.commit()
+            cargada = time.perf_counter()
+
+            if quitar:
+                conexion.execute(text(f"ALTER TABLE {tabla} " + ", ".join(
+                    f"ADD {'UNIQUE ' if i['unico'] else ''}INDEX {n} ({', '.join(i['columnas'])})"
+                    for n, i in quitar.items()
+                )))
+            print(f"  {tabla}: carga {cargada - inicio:.1f} s, índices {time.perf_counter() - cargada:.1f} s")
+        conexion.execute(text("SET foreign_key_checks = 1, unique_checks = 1"))
+
+
+def _cargar_sqlite(motor, rutas: Dict[str, str], columnas: Dict[str, List[str]]):
+    conexion = motor.raw_connection()
+    try:
+        cursor = conexion.cursor()
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA journal_mode = MEMORY")
+        for tabla in TABLAS:
+            inicio = time.perf_counter()
+            indices = cursor.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                (tabla,)
+            ).fetchall()
+            for nombre, _ in indices:
+                cursor.execute(f'DROP INDEX "{nombre}"')
+            marcas = ", ".join("?" * len(columnas[tabla]))
+            sql = f"INSERT INTO {tabla} ({', '.join(columnas[tabla])}) VALUES ({marcas})"
+            for bloque in pd.read_csv(rutas[tabla], chunksize=100_000, na_values=["NULL"], keep_default_na=False,
+                                      dtype=str):
+                filas = bloque.astype(object).where(bloque.notna(), None).itertuples(index=False, name=None)
+                cursor.executemany(sql, filas)
+            conexion.commit()
+            cargada = time.perf_counter()
+            for _, sql_indice in indices:
+                cursor.execute(sql_indice)
+            conexion.commit()
+            print(f"  {tabla}: carga {cargada - inicio:.1f} s, índices {time.perf_counter() - cargada:.1f} s")
+    finally:
+        conexion.close()
+
+
+def cargar(database_url: str, rutas: Dict[str, str], tablas: Dict[str, pd.DataFrame], crear_tablas: bool):
+    from sqlalchemy import create_engine
+
+    argumentos = {"connect_args": {"local_infile": True}} if database_url.startswith("mysql") else {}
+    motor = create_engine(database_url, **argumentos)
+    if crear_tablas:
+        import models  # noqa: F401 - registra las tablas en Base.metadata
+        from database import Base
+        Base.metadata.create_all(bind=motor, tables=[Base.metadata.tables[t] for t in TABLAS])
+
+    columnas = {nombre: list(tablas[nombre].columns) for nombre in TABLAS}
+    if motor.dialect.name == "mysql":
+        _cargar_mysql(motor, rutas, columnas)
+    elif motor.dialect.name == "sqlite":
+        _cargar_sqlite(motor, rutas, columnas)
+    else:
+        raise SystemExit(f"Dialecto no soportado: {motor.dialect.name}")
+    motor.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generar y cargar datos sintéticos")
+    parser.add_argument("--escala", type=float, default=1.0, help="multiplica todos los volúmenes")
+    parser.add_argument("--inscripciones", type=int, default=1_000_000)
+    parser.add_argument("--municipios", type=int, default=500)
+    parser.add_argument("--sedes", type=int, default=300)
+    parser.add_argument("--rondas", type=int, default=10_000)
+    parser.add_argument("--resultados", type=int, default=5_000_000)
+    parser.add_argument("--videos", type=int, default=200_000)
+    parser.add_argument("--semilla", type=int, default=20250115)
+    parser.add_argument("--directorio", default="datos_sinteticos", help="destino de los CSV")
+    parser.add_argument("--cargar", choices=["ninguno", "mysql", "sqlite"], default="ninguno")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--crear-tablas", action="store_true", help="crear las tablas desde los modelos")
+    parser.add_argument("--mongo-jsonl", help="escribir también un volcado de inscripciones estilo MongoDB")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    tablas = generar(args)
+    print(f"🧮 Generado en {time.perf_counter() - inicio:.1f} s: " +
+          ", ".join(f"{nombre}={len(tablas[nombre]):,}" for nombre in TABLAS))
+
+    inicio = time.perf_counter()
+    rutas = escribir_csv(tablas, args.directorio)
+    tamaño = sum(os.path.getsize(ruta) for ruta in rutas.values())
+    print(f"📄 CSV en {args.directorio}/ ({tamaño / 1024 ** 2:,.0f} MiB) en {time.perf_counter() - inicio:.1f} s")
+
+    if args.mongo_jsonl:
+        inicio = time.perf_counter()
+        escribir_mongo_jsonl(tablas["inscripciones"], args.mongo_jsonl)
+        print(f"🍃 Volcado MongoDB en {args.mongo_jsonl} en {time.perf_counter() - inicio:.1f} s "
+              f"(mongoimport --db karaoke_senso --collection inscripciones --file {args.mongo_jsonl})")
+
+    if args.cargar != "ninguno":
+        if not args.database_url:
+            raise SystemExit("--database-url es requerido para cargar")
+        inicio = time.perf_counter()
+        print(f"🚚 Cargando en {args.cargar}...")
+        cargar(args.database_url, rutas, tablas, args.crear_tablas)
+        print(f"✅ Carga completa en {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
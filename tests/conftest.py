@@ -0,0 +1,85 @@
+"""
+Configuración común de las pruebas: rutas de importación del backend y
+fixtures de base de datos.
+
+    motor         SQLite temporal por prueba, configurado como el de la
+                  aplicación (database.configurar_engine) y con el esquema creado
+    motor_modulo  igual pero compartido por el módulo; con TEST_DATABASE_URL usa
+                  esa base (p. ej. una MySQL local vacía). El módulo puede
+                  ajustar create_engine con ARGUMENTOS_MOTOR
+    sesion        sesión sobre `motor`, cerrada al terminar
+    cliente       TestClient de crear_app() sobre `motor`
+    autorizacion  cabeceras Bearer de un usuario
+"""
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "backend"))
+
+
+def _crear_motor(url: str, **argumentos):
+    from sqlalchemy import create_engine
+
+    import database
+    import esquema
+
+    if url.startswith("sqlite"):
+        argumentos.setdefault("connect_args", {}).setdefault("check_same_thread", False)
+    motor = create_engine(url, **argumentos)
+    database.configurar_engine(motor)
+    esquema.crear(motor)
+    return motor
+
+
+@pytest.fixture
+def motor(tmp_path):
+    pytest.importorskip("sqlalchemy")
+    import database
+
+    yield _crear_motor(f"sqlite:///{tmp_path / 'pruebas.db'}")
+    database.cerrar_engine()
+
+
+@pytest.fixture(scope="module")
+def motor_modulo(request, tmp_path_factory):
+    pytest.importorskip("sqlalchemy")
+    import database
+
+    url = os.getenv("TEST_DATABASE_URL") or f"sqlite:///{tmp_path_factory.mktemp('base') / 'pruebas.db'}"
+    argumentos = dict(getattr(request.module, "ARGUMENTOS_MOTOR", {}))
+    if not url.startswith("sqlite"):
+        argumentos.pop("connect_args", None)
+    yield _crear_motor(url, **argumentos)
+    database.cerrar_engine()
+
+
+@pytest.fixture
+def sesion(motor):
+    import database
+
+    sesion = database.SessionLocal()
+    yield sesion
+    sesion.close()
+
+
+@pytest.fixture
+def cliente(motor):
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    from server import crear_app
+
+    return TestClient(crear_app())
+
+
+@pytest.fixture
+def autorizacion():
+    import auth
+
+    def cabeceras(usuario) -> dict:
+        return {"Authorization": f"Bearer {auth.create_access_token({'sub': str(usuario.id)})}"}
+
+    return cabeceras
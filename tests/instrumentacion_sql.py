@@ -0,0 +1,153 @@
+"""
+Instrumentación de SQL para pruebas: registra cada sentencia por petición con
+eventos de SQLAlchemy, detecta patrones N+1 y analiza los planes de ejecución
+(EXPLAIN en MySQL, EXPLAIN QUERY PLAN en SQLite) de los SELECT capturados.
+"""
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Tablas que crecen con la competencia; en ellas un recorrido completo es una regresión
+TABLAS_GRANDES = ("inscripciones", "resultados", "videos", "eventos_sistema", "trabajos")
+
+
+@dataclass
+class Consulta:
+    sql: str
+    parametros: object
+    duracion_ms: float
+    etiqueta: str
+
+    @property
+    def forma(self) -> str:
+        """Sentencia sin literales, para agrupar las repetidas"""
+        return re.sub(r"\s+", " ", re.sub(r"'[^']*'|\b\d+\b", "?", self.sql)).strip()
+
+
+@dataclass
+class Plan:
+    consulta: Consulta
+    detalle: List[str]
+    recorridos: List[str] = field(default_factory=list)  # tablas grandes leídas completas
+    ordenamiento: bool = False  # filesort / B-tree temporal para ORDER BY o GROUP BY
+
+    @property
+    def problemas(self) -> List[str]:
+        problemas = [f"recorrido completo de {tabla}" for tabla in self.recorridos]
+        if self.ordenamiento:
+            problemas.append("ordenamiento sin índice")
+        return problemas
+
+
+class RegistroConsultas:
+    """Registro de las sentencias ejecutadas en un engine, agrupadas por etiqueta"""
+
+    def __init__(self, motor: Engine):
+        self.motor = motor
+        self.consultas: List[Consulta] = []
+        self._etiqueta: Optional[str] = None
+        self._inicio: Dict[int, float] = {}
+
+    def __enter__(self):
+        event.listen(self.motor, "before_cursor_execute", self._antes)
+        event.listen(self.motor, "after_cursor_execute", self._despues)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.motor, "before_cursor_execute", self._antes)
+        event.remove(self.motor, "after_cursor_execute", self._despues)
+
+    def _antes(self, conn, cursor, sql, parametros, context, executemany):
+        self._inicio[id(cursor)] = time.perf_counter()
+
+    def _despues(self, conn, cursor, sql, parametros, context, executemany):
+        if self._etiqueta is None:
+            return
+        duracion = (time.perf_counter() - self._inicio.pop(id(cursor), time.perf_counter())) * 1000
+        self.consultas.append(Consulta(sql, parametros, duracion, self._etiqueta))
+
+    @contextmanager
+    def capturar(self, etiqueta: str):
+        """Atribuir a `etiqueta` las sentencias ejecutadas dentro del bloque"""
+        self._etiqueta = etiqueta
+        inicio = len(self.consultas)
+        capturadas: List[Consulta] = []
+        try:
+            yield capturadas
+        finally:
+            self._etiqueta = None
+            capturadas.extend(self.consultas[inicio:])
+
+    def por_etiqueta(self) -> Dict[str, List[Consulta]]:
+        agrupadas: Dict[str, List[Consulta]] = defaultdict(list)
+        for consulta in self.consultas:
+            agrupadas[consulta.etiqueta].append(consulta)
+        return agrupadas
+
+
+def repetidas(consultas: Iterable[Consulta], umbral: int = 3) -> Dict[str, int]:
+    """Formas de sentencia ejecutadas `umbral` veces o más (patrón N+1)"""
+    conteo = Counter(consulta.forma for consulta in consultas)
+    return {forma: n for forma, n in conteo.items() if n >= umbral}
+
+
+def explicar(motor: Engine, consulta: Consulta, tablas_grandes: Iterable[str] = TABLAS_GRANDES) -> Optional[Plan]:
+    """Plan de ejecución de un SELECT capturado; None para otras sentencias"""
+    if not consulta.sql.lstrip().upper().startswith("SELECT"):
+        return None
+    tablas_grandes = set(tablas_grandes)
+    with motor.connect() as conexion:
+        cursor = conexion.connection.cursor()
+        try:
+            if motor.dialect.name == "sqlite":
+                cursor.execute("EXPLAIN QUERY PLAN " + consulta.sql, consulta.parametros or ())
+                detalle = [fila[-1] for fila in cursor.fetchall()]
+                plan = Plan(consulta, detalle)
+                for linea in detalle:
+                    # "SCAN tabla" sin índice; "SCAN tabla USING [COVERING] INDEX" recorre solo el índice
+                    coincidencia = re.match(r"SCAN (\w+)(?: AS \w+)?$", linea)
+                    if coincidencia and coincidencia.group(1) in tablas_grandes:
+                        plan.recorridos.append(coincidencia.group(1))
+                    if linea.startswith("USE TEMP B-TREE"):
+                        plan.ordenamiento = True
+            else:
+                cursor.execute("EXPLAIN " + consulta.sql, consulta.parametros or ())
+                columnas = [descripcion[0] for descripcion in cursor.description]
+                filas = [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+                detalle = [f"{f['table']}: type={f['type']} key={f['key']} rows={f['rows']} {f['Extra'] or ''}"
+                           for f in filas]
+                plan = Plan(consulta, detalle)
+                for fila in filas:
+                    if fila["type"] == "ALL" and fila["table"] in tablas_grandes:
+                        plan.recorridos.append(fila["table"])
+                    if "filesort" in (fila["Extra"] or ""):
+                        plan.ordenamiento = True
+        finally:
+            cursor.close()
+    return plan
+
+
+def reporte(registro: RegistroConsultas, planes: List[Plan], limite: int = 10) -> str:
+    """Resumen por etiqueta y las consultas más lentas o problemáticas"""
+    lineas = ["Consultas por petición", "======================"]
+    for etiqueta, consultas in sorted(registro.por_etiqueta().items()):
+        total = sum(consulta.duracion_ms for consulta in consultas)
+        lineas.append(f"{etiqueta}: {len(consultas)} consultas, {total:.1f} ms")
+        for forma, n in repetidas(consultas).items():
+            lineas.append(f"  N+1? {n}x {forma[:120]}")
+
+    lineas += ["", f"Peores {limite} consultas", "================="]
+    ordenados = sorted(planes, key=lambda plan: (-len(plan.problemas), -plan.consulta.duracion_ms))
+    for plan in ordenados[:limite]:
+        consulta = plan.consulta
+        lineas.append(f"[{consulta.etiqueta}] {consulta.duracion_ms:.2f} ms "
+                      f"{'; '.join(plan.problemas) or 'sin problemas'}")
+        lineas.append(f"  {consulta.forma[:200]}")
+        lineas.extend(f"    {paso}" for paso in plan.detalle)
+    return "\n".join(lineas)
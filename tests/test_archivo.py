@@ -0,0 +1,132 @@
+"""
+Archivo en lotes (backend/archivo.py): las filas de la política se escriben a
+archivos comprimidos y se borran de la base, la ejecución se puede reanudar y
+una interrupción entre el commit y progreso.json no pierde filas archivadas.
+"""
+import glob
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+RECHAZADAS = 25
+LOTE = 4
+
+
+@pytest.fixture
+def entorno(sesion, tmp_path, monkeypatch):
+    import archivo
+    import models
+    import subidas
+
+    monkeypatch.setattr(archivo, "DIRECTORIO_ARCHIVO", str(tmp_path / "archivados"))
+    monkeypatch.setattr(subidas, "DIRECTORIO_SUBIDAS", str(tmp_path / "uploads"))
+    os.makedirs(tmp_path / "uploads" / "videos")
+
+    sede = models.Sede(nombre_sede="Sede", estado="Querétaro", municipio="Querétaro")
+    sesion.add(sede)
+    sesion.flush()
+    ronda = models.Ronda(nombre="Ronda", fecha=datetime(2025, 1, 1), sede_id=sede.id, tipo="clasificatoria")
+    sesion.add(ronda)
+    sesion.flush()
+    antigua = datetime.utcnow() - timedelta(days=200)
+    for i in range(RECHAZADAS + 5):
+        inscripcion = models.Inscripcion(
+            id=f"ins-{i:04d}", nombre_completo=f"Participante {i}", nombre_artistico=f"Artista {i}",
+            telefono="4420000000", municipio="Querétaro", sede_id=sede.id, comprobante_pago="x" * 1000,
+            estatus=models.EstatusInscripcion.rechazado if i < RECHAZADAS else models.EstatusInscripcion.aprobado,
+            fecha_inscripcion=antigua, fecha_actualizacion=antigua,
+        )
+        sesion.add(inscripcion)
+        sesion.add(models.Resultado(inscrito_id=inscripcion.id, ronda_id=ronda.id, puntaje=50))
+        if i % 3 == 0:
+            (tmp_path / "uploads" / "videos" / f"{i}.mp4").write_bytes(b"0" * 100)
+            sesion.add(models.Video(inscrito_id=inscripcion.id, url_video=f"videos/{i}.mp4", video_data="y" * 500))
+    sesion.commit()
+
+    return {"sesion": sesion, "archivo": archivo, "models": models, "directorio": tmp_path}
+
+
+def _archivados(politica) -> dict:
+    """id -> línea de todos los archivos de lote"""
+    lineas = {}
+    for ruta in glob.glob(os.path.join(politica.directorio, "lote-*.jsonl.gz")):
+        for linea in gzip.decompress(open(ruta, "rb").read()).decode().splitlines():
+            fila = json.loads(linea)
+            lineas[fila["fila"]["id"]] = fila
+    return lineas
+
+
+def test_estimar_no_modifica(entorno):
+    archivo, sesion, models = entorno["archivo"], entorno["sesion"], entorno["models"]
+    estimacion = archivo.estimar(sesion, archivo.Politica("rechazadas", 90))
+    assert estimacion["filas"]["inscripciones"] == RECHAZADAS
+    assert estimacion["filas"]["resultados"] == RECHAZADAS
+    assert estimacion["bytes_base"] >= RECHAZADAS * 1000
+    assert sesion.query(models.Inscripcion).count() == RECHAZADAS + 5
+
+
+def test_archivar_borrar_y_reanudar(entorno):
+    archivo, sesion, models = entorno["archivo"], entorno["sesion"], entorno["models"]
+    politica = archivo.Politica("rechazadas", 90)
+
+    progreso = archivo.archivar(sesion, politica, tamaño=LOTE, pausa=0, max_lotes=2)
+    assert not progreso["completado"]
+    assert progreso["filas"] == 2 * LOTE
+
+    progreso = archivo.archivar(sesion, archivo.Politica("rechazadas", 90), tamaño=LOTE, pausa=0)
+    assert progreso["completado"]
+    assert progreso["filas"] == RECHAZADAS
+
+    restantes = sesion.query(models.Inscripcion).all()
+    assert {i.estatus for i in restantes} == {models.EstatusInscripcion.aprobado}
+    assert sesion.query(models.Resultado).count() == 5
+    assert all(v.inscrito_id >= f"ins-{RECHAZADAS:04d}" for v in sesion.query(models.Video))
+
+    archivados = _archivados(politica)
+    assert sorted(archivados) == [f"ins-{i:04d}" for i in range(RECHAZADAS)]
+    assert all(len(linea["resultados"]) == 1 for linea in archivados.values())
+    assert os.path.exists(os.path.join(politica.directorio, "archivos", "videos", "0.mp4"))
+    assert not os.path.exists(entorno["directorio"] / "uploads" / "videos" / "0.mp4")
+
+
+def test_interrupcion_despues_del_commit_no_pierde_lotes(entorno):
+    archivo, sesion = entorno["archivo"], entorno["sesion"]
+    politica = archivo.Politica("rechazadas", 90)
+    progreso = archivo.archivar(sesion, politica, tamaño=LOTE, pausa=0, max_lotes=1)
+
+    # El lote siguiente se confirma pero progreso.json no se actualiza (caída del proceso)
+    anterior = dict(progreso)
+    archivo.archivar_lote(sesion, politica, dict(progreso), LOTE)
+    archivo._guardar(os.path.join(politica.directorio, "progreso.json"), json.dumps(anterior).encode())
+
+    archivo.archivar(sesion, politica, tamaño=LOTE, pausa=0)
+    assert sorted(_archivados(politica)) == [f"ins-{i:04d}" for i in range(RECHAZADAS)]
+
+
+def test_fila_que_deja_de_cumplir_la_politica_no_se_archiva(entorno, monkeypatch):
+    archivo, sesion, models = entorno["archivo"], entorno["sesion"], entorno["models"]
+    politica = archivo.Politica("rechazadas", 90)
+    leer_filas = archivo._filas
+
+    def reaprobar_antes_del_bloqueo(db, modelo, *condiciones, bloquear=False):
+        # Entre la selección de ids y la lectura bloqueante se aprueba de nuevo la primera inscripción
+        if modelo is models.Inscripcion and bloquear:
+            db.query(models.Inscripcion).filter(models.Inscripcion.id == "ins-0000").update(
+                {"estatus": models.EstatusInscripcion.aprobado}, synchronize_session=False
+            )
+        return leer_filas(db, modelo, *condiciones, bloquear=bloquear)
+
+    monkeypatch.setattr(archivo, "_filas", reaprobar_antes_del_bloqueo)
+    progreso = archivo.archivar(sesion, politica, tamaño=LOTE, pausa=0, max_lotes=1)
+    assert progreso["filas"] == LOTE - 1
+    assert progreso["ultimo_id"] == f"ins-{LOTE - 1:04d}"
+
+    sesion.expire_all()
+    assert sesion.get(models.Inscripcion, "ins-0000").estatus == models.EstatusInscripcion.aprobado
+    assert sesion.query(models.Resultado).filter(models.Resultado.inscrito_id == "ins-0000").count() == 1
+    assert sorted(_archivados(politica)) == [f"ins-{i:04d}" for i in range(1, LOTE)]
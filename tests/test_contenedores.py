@@ -0,0 +1,197 @@
+"""
+Lectura de cabeceras de contenedores (backend/contenedores.py) con archivos
+mínimos construidos a mano: MP4/MOV (mvhd v0/v1, tkhd, stsd), WebM/Matroska,
+AVI (avih/strh), los rechazos por cabeceras inválidas y la comprobación del
+formato declarado.
+"""
+import struct
+
+import pytest
+
+import contenedores
+from contenedores import ContenedorInvalido, analizar_bytes, verificar_declarado, verificar_inicio
+
+
+# -----------------------------------------------------------------------------
+# ISO BMFF
+# -----------------------------------------------------------------------------
+
+def _caja(tipo: bytes, *hijos: bytes) -> bytes:
+    contenido = b"".join(hijos)
+    return struct.pack(">I4s", 8 + len(contenido), tipo) + contenido
+
+
+def _mvhd(version: int, escala: int, duracion: int) -> bytes:
+    if version == 1:
+        contenido = bytes([1, 0, 0, 0]) + bytes(16) + struct.pack(">IQ", escala, duracion)
+    else:
+        contenido = bytes(4) + bytes(8) + struct.pack(">II", escala, duracion)
+    return _caja(b"mvhd", contenido + bytes(80))
+
+
+def _tkhd(version: int, ancho: int, alto: int) -> bytes:
+    desplazamiento = 88 if version == 1 else 76
+    contenido = bytearray(desplazamiento + 8)
+    contenido[0] = version
+    struct.pack_into(">II", contenido, desplazamiento, ancho << 16, alto << 16)
+    return _caja(b"tkhd", bytes(contenido))
+
+
+def _stsd(codec: bytes, ancho: int = None, alto: int = None) -> bytes:
+    entrada = struct.pack(">I4s", 8, codec)
+    if ancho is not None:
+        entrada = struct.pack(">I4s", 36, codec) + bytes(24) + struct.pack(">HH", ancho, alto)
+    return _caja(b"stsd", bytes(4) + struct.pack(">I", 1) + entrada)
+
+
+def _trak(manejador: bytes, *hijos: bytes, stsd: bytes) -> bytes:
+    hdlr = _caja(b"hdlr", bytes(8) + manejador + bytes(12))
+    return _caja(b"trak", *hijos, _caja(b"mdia", hdlr, _caja(b"minf", _caja(b"stbl", stsd))))
+
+
+def _mp4(marca: bytes, *moov: bytes) -> bytes:
+    return _caja(b"ftyp", marca + bytes(4)) + _caja(b"mdat", bytes(64)) + _caja(b"moov", *moov)
+
+
+def test_mp4_mvhd_v0_y_dimensiones_de_stsd():
+    archivo = _mp4(
+        b"isom",
+        _mvhd(0, 1000, 5000),
+        _trak(b"soun", stsd=_stsd(b"mp4a")),
+        _trak(b"vide", _tkhd(0, 320, 240), stsd=_stsd(b"avc1", 1280, 720)),
+    )
+    metadatos = analizar_bytes(archivo)
+    assert (metadatos.familia, metadatos.formato) == ("isobmff", "mp4")
+    assert (metadatos.duracion_ms, metadatos.duracion_segundos) == (5000, 5)
+    assert (metadatos.codec, metadatos.ancho, metadatos.alto) == ("avc1", 1280, 720)
+
+
+def test_mov_mvhd_v1_y_dimensiones_de_tkhd():
+    archivo = _mp4(
+        b"qt  ",
+        _mvhd(1, 600, 600 * 90),
+        _trak(b"vide", _tkhd(1, 1920, 1080), stsd=_stsd(b"hvc1")),
+    )
+    metadatos = analizar_bytes(archivo)
+    assert metadatos.formato == "mov"
+    assert metadatos.duracion_ms == 90_000
+    assert (metadatos.codec, metadatos.ancho, metadatos.alto) == ("hvc1", 1920, 1080)
+
+
+def test_mp4_sin_moov_o_con_caja_truncada():
+    with pytest.raises(ContenedorInvalido, match="moov"):
+        analizar_bytes(_caja(b"ftyp", b"isom" + bytes(4)) + _caja(b"mdat", bytes(16)))
+    truncada = _caja(b"moov", struct.pack(">I4s", 500, b"mvhd") + bytes(20))
+    with pytest.raises(ContenedorInvalido, match="truncada"):
+        analizar_bytes(_caja(b"ftyp", b"isom" + bytes(4)) + truncada)
+
+
+# -----------------------------------------------------------------------------
+# EBML
+# -----------------------------------------------------------------------------
+
+DESCONOCIDO = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+
+def _elemento(identificador: int, contenido: bytes, tamaño: bytes = None) -> bytes:
+    ident = identificador.to_bytes((identificador.bit_length() + 7) // 8, "big")
+    if tamaño is None:
+        assert len(contenido) < 0x7F
+        tamaño = bytes([0x80 | len(contenido)])
+    return ident + tamaño + contenido
+
+
+def _matroska(tipo_documento: bytes = b"webm", tamaño_cabecera: bytes = None) -> bytes:
+    cabecera = _elemento(contenedores.EBML_CABECERA, _elemento(contenedores.EBML_DOCTYPE, tipo_documento),
+                         tamaño_cabecera)
+    info = _elemento(contenedores.MKV_INFO, _elemento(contenedores.MKV_ESCALA_TIEMPO, (1_000_000).to_bytes(3, "big"))
+                     + _elemento(contenedores.MKV_DURACION, struct.pack(">f", 4500.0)))
+    video = _elemento(contenedores.MKV_VIDEO, _elemento(contenedores.MKV_ANCHO, (640).to_bytes(2, "big"))
+                      + _elemento(contenedores.MKV_ALTO, (360).to_bytes(2, "big")))
+    audio = _elemento(contenedores.MKV_PISTA, _elemento(contenedores.MKV_TIPO_PISTA, b"\x02")
+                      + _elemento(contenedores.MKV_CODEC, b"A_OPUS"))
+    pista = _elemento(contenedores.MKV_PISTA, _elemento(contenedores.MKV_TIPO_PISTA, b"\x01")
+                      + _elemento(contenedores.MKV_CODEC, b"V_VP9") + video)
+    pistas = _elemento(contenedores.MKV_PISTAS, audio + pista)
+    cluster = _elemento(contenedores.MKV_CLUSTER, bytes(32))
+    # Segmento de tamaño desconocido, como lo escriben los grabadores en vivo
+    return cabecera + _elemento(contenedores.MKV_SEGMENTO, info + pistas + cluster, DESCONOCIDO)
+
+
+def test_webm_y_mkv():
+    metadatos = analizar_bytes(_matroska())
+    assert (metadatos.familia, metadatos.formato) == ("matroska", "webm")
+    assert metadatos.duracion_ms == 4500
+    assert (metadatos.codec, metadatos.ancho, metadatos.alto) == ("V_VP9", 640, 360)
+    assert analizar_bytes(_matroska(b"matroska")).formato == "mkv"
+
+
+def test_matroska_rechaza_cabecera_de_tamaño_desconocido_y_sin_segmento():
+    with pytest.raises(ContenedorInvalido, match="desconocido"):
+        analizar_bytes(_matroska(tamaño_cabecera=DESCONOCIDO))
+    cabecera = _elemento(contenedores.EBML_CABECERA, _elemento(contenedores.EBML_DOCTYPE, b"webm"))
+    with pytest.raises(ContenedorInvalido, match="segmento"):
+        analizar_bytes(cabecera + _elemento(contenedores.MKV_CLUSTER, bytes(8)))
+
+
+# -----------------------------------------------------------------------------
+# RIFF
+# -----------------------------------------------------------------------------
+
+def _fragmento(tipo: bytes, contenido: bytes) -> bytes:
+    return struct.pack("<4sI", tipo, len(contenido)) + contenido + bytes(len(contenido) & 1)
+
+
+def _lista(tipo: bytes, *hijos: bytes) -> bytes:
+    return _fragmento(b"LIST", tipo + b"".join(hijos))
+
+
+def _avi(*fragmentos: bytes) -> bytes:
+    contenido = b"AVI " + b"".join(fragmentos)
+    return struct.pack("<4sI", b"RIFF", len(contenido)) + contenido
+
+
+def test_avi_avih_y_strh():
+    avih = bytearray(56)
+    struct.pack_into("<I", avih, 0, 40_000)  # 25 cuadros por segundo
+    struct.pack_into("<I", avih, 16, 250)
+    struct.pack_into("<II", avih, 32, 720, 576)
+    strh_audio = _fragmento(b"strh", b"auds" + bytes(52))
+    strh_video = _fragmento(b"strh", b"vidsXVID" + bytes(48))
+    archivo = _avi(
+        _fragmento(b"JUNK", bytes(3)),
+        _lista(b"hdrl", _fragmento(b"avih", bytes(avih)), _lista(b"strl", strh_audio), _lista(b"strl", strh_video)),
+        _lista(b"movi", bytes(16)),
+    )
+    metadatos = analizar_bytes(archivo)
+    assert (metadatos.familia, metadatos.formato) == ("riff", "avi")
+    assert metadatos.duracion_ms == 10_000
+    assert (metadatos.codec, metadatos.ancho, metadatos.alto) == ("XVID", 720, 576)
+
+
+def test_avi_sin_hdrl_y_formato_desconocido():
+    with pytest.raises(ContenedorInvalido, match="hdrl"):
+        analizar_bytes(_avi(_lista(b"movi", bytes(16))))
+    with pytest.raises(ContenedorInvalido, match="no reconocido"):
+        analizar_bytes(b"GIF89a" + bytes(64))
+
+
+# -----------------------------------------------------------------------------
+# Formato declarado
+# -----------------------------------------------------------------------------
+
+def test_verificar_declarado():
+    mp4 = analizar_bytes(_mp4(b"isom", _mvhd(0, 1000, 1000)))
+    verificar_declarado(mp4, "video.MP4", "video/mp4")
+    verificar_declarado(mp4, "video.mov", None)
+    verificar_declarado(mp4, None, None)
+    with pytest.raises(ContenedorInvalido, match="MP4"):
+        verificar_declarado(mp4, "video.webm", None)
+    with pytest.raises(ContenedorInvalido):
+        verificar_declarado(mp4, None, "video/x-msvideo")
+
+    verificar_inicio(_matroska()[:12], "video.mkv", "video/webm")
+    with pytest.raises(ContenedorInvalido):
+        verificar_inicio(_matroska()[:12], "video.avi", None)
+    with pytest.raises(ContenedorInvalido, match="no reconocido"):
+        verificar_inicio(b"hola mundo!!", "video.mp4", None)
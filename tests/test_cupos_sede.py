@@ -0,0 +1,109 @@
+"""
+Prueba de estrés de los cupos por sede: cientos de registros simultáneos a
+POST /api/inscripciones contra una sede con capacidad limitada no deben
+sobrevender lugares, y rechazar una inscripción debe admitir a la siguiente
+de la lista de espera.
+
+Con TEST_DATABASE_URL se ejecuta contra otra base (p. ej. una MySQL local vacía).
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+
+CAPACIDAD = 40
+REGISTROS = 300
+HILOS = 50
+
+# SQLite serializa las escrituras: los hilos esperan el bloqueo en lugar de fallar
+ARGUMENTOS_MOTOR = {"pool_size": HILOS, "max_overflow": 0, "connect_args": {"timeout": 60}}
+
+
+@pytest.fixture(scope="module")
+def entorno(motor_modulo):
+    import auth
+    import database
+    import models
+    from fastapi.testclient import TestClient
+    from server import crear_app
+
+    sesion = database.SessionLocal()
+    admin = models.Usuario(nombre="Admin", correo="admin@cupos.local", rol=models.RolUsuario.admin,
+                           contraseña="sin-uso")
+    sede = models.Sede(nombre_sede="Sede llena", estado="Querétaro", municipio="Querétaro", capacidad=CAPACIDAD)
+    sesion.add_all([admin, sede])
+    sesion.commit()
+    datos = {
+        "token": auth.create_access_token({"sub": str(admin.id)}),
+        "sede_id": sede.id,
+    }
+    sesion.close()
+
+    yield {
+        "cliente": TestClient(crear_app()),
+        "headers": {"Authorization": f"Bearer {datos['token']}"},
+        "sede_id": datos["sede_id"],
+    }
+
+
+def _registrar(cliente, sede_id: int, i: int):
+    return cliente.post("/api/inscripciones", json={
+        "nombre_completo": f"Participante {i}",
+        "nombre_artistico": f"Artista {i}",
+        "telefono": f"442{i:07d}",
+        "municipio": "Querétaro",
+        "sede_id": sede_id,
+    })
+
+
+def _conteos(sede_id: int):
+    import database
+    import models
+
+    sesion = database.SessionLocal()
+    try:
+        cupo = sesion.get(models.CupoSede, sede_id)
+        inscripciones = sesion.query(models.Inscripcion).filter(models.Inscripcion.sede_id == sede_id).all()
+        con_lugar = [i for i in inscripciones if not i.lista_espera and i.estatus != models.EstatusInscripcion.rechazado]
+        en_espera = [i for i in inscripciones if i.lista_espera]
+        return cupo.reservados, con_lugar, en_espera
+    finally:
+        sesion.close()
+
+
+def test_registros_simultaneos_no_sobrevenden(entorno):
+    cliente, sede_id = entorno["cliente"], entorno["sede_id"]
+    with ThreadPoolExecutor(HILOS) as ejecutor:
+        respuestas = list(ejecutor.map(lambda i: _registrar(cliente, sede_id, i), range(REGISTROS)))
+
+    assert all(respuesta.status_code == 200 for respuesta in respuestas), [
+        respuesta.text for respuesta in respuestas if respuesta.status_code != 200
+    ][:3]
+    en_espera = [respuesta.json()["lista_espera"] for respuesta in respuestas]
+    assert en_espera.count(False) == CAPACIDAD
+    assert en_espera.count(True) == REGISTROS - CAPACIDAD
+
+    reservados, con_lugar, lista = _conteos(sede_id)
+    assert reservados == len(con_lugar) == CAPACIDAD
+    assert len(lista) == REGISTROS - CAPACIDAD
+
+
+def test_rechazo_libera_lugar_para_la_lista_de_espera(entorno):
+    cliente, sede_id = entorno["cliente"], entorno["sede_id"]
+    _, con_lugar, lista = _conteos(sede_id)
+    siguiente = min(lista, key=lambda i: (i.fecha_inscripcion, i.id))
+
+    respuesta = cliente.put(
+        f"/api/admin/inscripciones/{con_lugar[0].id}/estatus",
+        json={"estatus": "rechazado"},
+        headers=entorno["headers"],
+    )
+    assert respuesta.status_code == 200, respuesta.text
+    assert respuesta.json()["admitidos_lista_espera"] == [siguiente.id]
+
+    reservados, con_lugar, lista = _conteos(sede_id)
+    assert reservados == len(con_lugar) == CAPACIDAD
+    assert siguiente.id in {i.id for i in con_lugar}
+    assert len(lista) == REGISTROS - CAPACIDAD - 1
@@ -0,0 +1,157 @@
+"""
+Pruebas del migrador MongoDB -> SQL con mongomock y SQLite.
+"""
+import base64
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+pytest.importorskip("sqlalchemy")
+
+import migrate_data
+from migrate_data import Destino, Migrador
+
+TOTAL = 2500
+
+
+def _documento(i: int) -> dict:
+    documento = {
+        "nombre_completo": f"Participante {i}",
+        "nombre_artistico": f"Artista {i}",
+        "telefono": f"442{i:07d}",
+        "correo": f"p{i}@example.com" if i % 3 else None,
+        "categoria": ["KOE SAN", "KOE SAI", "TSUKAMU KOE"][i % 3],
+        "municipio": "Querétaro",
+        "sede": f"Sede {i % 7}",
+        "estado": "pendiente" if i % 2 else "aprobado",
+        "fecha_inscripcion": datetime(2025, 1, 1, 12, i % 60, i % 60, 123456),
+    }
+    if i % 10 == 0:
+        documento["id"] = f"00000000-0000-4000-8000-{i:012d}"
+    if i % 5 == 0:
+        documento["comprobante_pago"] = "data:image/png;base64,iVBORw0KGgo="
+    elif i % 5 == 1:
+        documento["comprobante_pago"] = {"content_type": "image/jpeg", "data": b"\xff\xd8\xff\xe0" + bytes([i % 256])}
+    elif i % 5 == 2:
+        documento["fecha_inscripcion"] = "2025-03-04T05:06:07Z"
+    if i % 11 == 0:
+        del documento["fecha_inscripcion"]
+    elif i % 13 == 0:
+        documento["fecha_inscripcion"] = "sin fecha"
+    return documento
+
+
+@pytest.fixture
+def coleccion():
+    cliente = mongomock.MongoClient()
+    coleccion = cliente.karaoke_senso.inscripciones
+    coleccion.insert_many([_documento(i) for i in range(TOTAL)])
+    return coleccion
+
+
+@pytest.fixture
+def destino(tmp_path):
+    from sqlalchemy import create_engine
+
+    import models
+
+    ruta = str(tmp_path / "destino.db")
+    motor = create_engine(f"sqlite:///{ruta}")
+    models.Inscripcion.__table__.create(motor)
+    motor.dispose()
+    return ruta, Destino("sqlite", migrate_data._conectar_sqlite(ruta))
+
+
+def _contar(ruta: str) -> int:
+    with sqlite3.connect(ruta) as conexion:
+        return conexion.execute("SELECT COUNT(*) FROM inscripciones").fetchone()[0]
+
+
+def test_migra_y_verifica_en_paralelo(coleccion, destino, tmp_path):
+    ruta, destino_sql = destino
+    migrador = Migrador(coleccion, destino_sql, lote=200, trabajadores=4,
+                        checkpoint=str(tmp_path / "checkpoint.json"), log=lambda _: None)
+
+    assert migrador.migrar() == TOTAL
+    assert len(migrador.particiones()) == 4
+    assert _contar(ruta) == TOTAL
+
+    resumen = migrador.verificar()
+    assert resumen["ok"], resumen
+    assert resumen["origen"] == resumen["destino"] == TOTAL
+
+    with sqlite3.connect(ruta) as conexion:
+        comprobante, = conexion.execute(
+            "SELECT comprobante_pago FROM inscripciones WHERE telefono = ?", ("4420000001",)
+        ).fetchone()
+        estatus, = conexion.execute(
+            "SELECT estatus FROM inscripciones WHERE id = ?", ("00000000-0000-4000-8000-000000000010",)
+        ).fetchone()
+        sin_fecha, = conexion.execute(
+            "SELECT fecha_inscripcion FROM inscripciones WHERE telefono = ?", ("4420000011",)
+        ).fetchone()
+    assert comprobante == "data:image/jpeg;base64," + base64.b64encode(b"\xff\xd8\xff\xe0\x01").decode()
+    assert estatus == "aprobado"
+    creado = coleccion.find_one({"telefono": "4420000011"})["_id"].generation_time
+    assert sin_fecha[:19] == creado.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def test_reanuda_desde_el_checkpoint_sin_duplicar(coleccion, destino, tmp_path):
+    ruta, destino_sql = destino
+    checkpoint = str(tmp_path / "checkpoint.json")
+
+    lotes = {"n": 0}
+    conectar_original = destino_sql.conectar
+
+    class CursorQueFalla:
+        def __init__(self, cursor):
+            self._cursor = cursor
+
+        def executemany(self, sql, filas):
+            lotes["n"] += 1
+            if lotes["n"] == 4:
+                raise RuntimeError("conexión perdida")
+            return self._cursor.executemany(sql, filas)
+
+        def __getattr__(self, nombre):
+            return getattr(self._cursor, nombre)
+
+    class ConexionQueFalla:
+        def __init__(self):
+            self._conexion = conectar_original()
+
+        def cursor(self):
+            return CursorQueFalla(self._conexion.cursor())
+
+        def __getattr__(self, nombre):
+            return getattr(self._conexion, nombre)
+
+    destino_sql.conectar = ConexionQueFalla
+    with pytest.raises(RuntimeError):
+        Migrador(coleccion, destino_sql, lote=250, trabajadores=1, checkpoint=checkpoint,
+                 log=lambda _: None).migrar()
+    assert _contar(ruta) == 750
+
+    destino_sql.conectar = conectar_original
+    reanudado = Migrador(coleccion, destino_sql, lote=250, trabajadores=1, checkpoint=checkpoint, log=lambda _: None)
+    assert reanudado.migrar() == TOTAL - 750
+    assert _contar(ruta) == TOTAL
+    assert reanudado.verificar()["ok"]
+
+
+def test_verificacion_detecta_diferencias(coleccion, destino):
+    ruta, destino_sql = destino
+    migrador = Migrador(coleccion, destino_sql, lote=500, trabajadores=2, checkpoint=None, log=lambda _: None)
+    migrador.migrar()
+
+    with sqlite3.connect(ruta) as conexion:
+        conexion.execute("UPDATE inscripciones SET telefono = '0' WHERE telefono = '4420000007'")
+        conexion.execute("DELETE FROM inscripciones WHERE telefono = '4420000008'")
+
+    resumen = migrador.verificar()
+    assert not resumen["ok"]
+    assert len(resumen["diferentes"]) == 1
+    assert len(resumen["faltantes"]) == 1
+    assert resumen["checksum_origen"] != resumen["checksum_destino"]
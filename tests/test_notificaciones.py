@@ -0,0 +1,94 @@
+"""
+Bandeja de salida de notificaciones (backend/notificaciones.py): aprobar de
+nuevo una inscripción no registra otro aviso, y un envío que falla se
+reprograma con espera creciente hasta quedar como fallida.
+"""
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+
+MAX_INTENTOS = 3
+
+
+@pytest.fixture
+def entorno(sesion, cliente, autorizacion, monkeypatch):
+    import models
+    import notificaciones
+
+    monkeypatch.setattr(notificaciones, "MAX_INTENTOS_NOTIFICACION", MAX_INTENTOS)
+    admin = models.Usuario(nombre="Admin", correo="admin@avisos.local", rol=models.RolUsuario.admin,
+                           contraseña="sin-uso")
+    sede = models.Sede(nombre_sede="Sede", estado="Querétaro", municipio="Querétaro")
+    sesion.add_all([admin, sede])
+    sesion.flush()
+    inscripcion = models.Inscripcion(
+        id="ins-1", nombre_completo="Participante", nombre_artistico="Artista", telefono="4420000000",
+        correo="participante@avisos.local", municipio="Querétaro", sede_id=sede.id,
+    )
+    sesion.add(inscripcion)
+    sesion.commit()
+
+    return {
+        "cliente": cliente,
+        "headers": autorizacion(admin),
+        "sesion": sesion,
+        "models": models,
+        "notificaciones": notificaciones,
+        "inscripcion_id": inscripcion.id,
+    }
+
+
+class TransporteCaido:
+    """Transporte que siempre falla"""
+
+    def enviar(self, lote):
+        raise ConnectionError("proveedor no disponible")
+
+
+def _despachar(notificaciones, sesion, transporte) -> int:
+    limite = notificaciones.LimiteEnvios(1000)
+    return notificaciones.despachar(sesion, "correo", transporte, limite, threading.Event(), "pruebas")
+
+
+def test_aprobar_de_nuevo_no_duplica_el_aviso(entorno):
+    cliente, headers, models = entorno["cliente"], entorno["headers"], entorno["models"]
+    ruta = f"/api/admin/inscripciones/{entorno['inscripcion_id']}/estatus"
+    for estatus in ("aprobado", "aprobado", "pendiente", "aprobado"):
+        respuesta = cliente.put(ruta, json={"estatus": estatus}, headers=headers)
+        assert respuesta.status_code == 200, respuesta.text
+
+    avisos = entorno["sesion"].query(models.Notificacion).all()
+    assert [aviso.clave_dedup for aviso in avisos] == [f"inscripcion_aprobada:{entorno['inscripcion_id']}"]
+    assert avisos[0].canal == "correo"
+    assert avisos[0].estado == models.EstadoNotificacion.pendiente
+
+
+def test_reintentos_con_espera_hasta_fallida(entorno, tmp_path):
+    sesion, models, notificaciones = entorno["sesion"], entorno["models"], entorno["notificaciones"]
+    inscripcion = sesion.get(models.Inscripcion, entorno["inscripcion_id"])
+    notificaciones.registrar(sesion, [notificaciones.aviso_estatus(inscripcion, "aprobado")])
+    sesion.commit()
+    aviso = sesion.query(models.Notificacion).one()
+
+    esperas = []
+    for intento in range(1, MAX_INTENTOS + 1):
+        antes = datetime.utcnow()
+        assert _despachar(notificaciones, sesion, TransporteCaido()) == 1
+        sesion.refresh(aviso)
+        assert aviso.intentos == intento
+        assert "proveedor no disponible" in aviso.error
+        if intento < MAX_INTENTOS:
+            assert aviso.estado == models.EstadoNotificacion.pendiente
+            esperas.append(aviso.ejecutar_despues - antes)
+            # Mientras no se cumple la espera no se vuelve a tomar
+            assert _despachar(notificaciones, sesion, TransporteCaido()) == 0
+            aviso.ejecutar_despues = datetime.utcnow() - timedelta(seconds=1)
+            sesion.commit()
+
+    assert aviso.estado == models.EstadoNotificacion.fallida
+    assert esperas[1] > esperas[0] > timedelta(0)
+    assert _despachar(notificaciones, sesion, notificaciones.TransporteArchivo(str(tmp_path / "avisos.jsonl"))) == 0
@@ -0,0 +1,141 @@
+"""
+Guardia de planes de consulta: cuenta las sentencias de cada endpoint listado
+contra su presupuesto, detecta N+1 y ejecuta EXPLAIN sobre los SELECT
+capturados en una base poblada con seed_data.py. Falla si un endpoint recorre
+completa o reordena sin índice una tabla grande.
+
+El reporte de las peores consultas se escribe en $REPORTE_CONSULTAS (o en el
+directorio temporal de la sesión). Con TEST_DATABASE_URL se ejecuta contra
+otra base (p. ej. una MySQL local vacía).
+"""
+import argparse
+import os
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+from tests.instrumentacion_sql import RegistroConsultas, explicar, repetidas, reporte
+
+# Escala de seed_data.py: 2k inscripciones, 10k resultados, 400 videos
+ESCALA = 0.002
+
+# (etiqueta, ruta, presupuesto de sentencias incluyendo la del usuario autenticado)
+ENDPOINTS = [
+    ("inscripciones", "/api/admin/inscripciones", 2),
+    ("inscripciones_estatus", "/api/admin/inscripciones?estatus=aprobado", 2),
+    ("inscripciones_categoria", "/api/admin/inscripciones?categoria=KOE%20SAI", 2),
+    ("inscripciones_sede", "/api/admin/inscripciones?sede_id=1", 2),
+    ("inscripciones_campos", "/api/admin/inscripciones?fields=id,nombre_artistico&expand=sede_obj", 2),
+    ("resultados", "/api/admin/resultados", 2),
+    ("resultados_ronda", "/api/admin/resultados?ronda_id=1", 2),
+    ("resultados_inscrito", "/api/admin/resultados?inscrito_id={inscrito_id}", 2),
+    ("videos", "/api/admin/videos", 2),
+    ("videos_aprobados", "/api/admin/videos?aprobado=true", 2),
+    ("videos_destacados", "/api/admin/videos?destacado=true", 2),
+    ("estadisticas_admin", "/api/admin/estadisticas", 9),
+    ("estadisticas_publicas", "/api/estadisticas", 2),
+]
+
+# Planes acumulados de todos los endpoints para el reporte final
+_planes_pendientes = []
+
+
+@pytest.fixture(scope="module")
+def entorno(motor_modulo, tmp_path_factory):
+    import auth
+    import database
+    import models
+    import seed_data
+    from fastapi.testclient import TestClient
+    from server import crear_app
+
+    motor = motor_modulo
+    directorio = tmp_path_factory.mktemp("planes")
+    url = motor.url.render_as_string(hide_password=False)
+
+    argumentos_semilla = argparse.Namespace(
+        escala=ESCALA, inscripciones=1_000_000, municipios=500, sedes=300, rondas=10_000,
+        resultados=5_000_000, videos=200_000, semilla=20250115,
+    )
+    tablas = seed_data.generar(argumentos_semilla)
+    rutas = seed_data.escribir_csv(tablas, str(directorio / "csv"))
+    seed_data.cargar(url, rutas, tablas, crear_tablas=False)
+
+    sesion = database.SessionLocal()
+    admin = models.Usuario(nombre="Admin", correo="admin@planes.local", rol=models.RolUsuario.admin,
+                           contraseña="sin-uso")
+    sesion.add(admin)
+    sesion.commit()
+    if motor.dialect.name == "sqlite":
+        with motor.begin() as conexion:
+            conexion.exec_driver_sql("ANALYZE")
+    token = auth.create_access_token({"sub": str(admin.id)})
+    inscrito_id = tablas["resultados"]["inscrito_id"].iloc[0]
+    sesion.close()
+
+    with RegistroConsultas(motor) as registro:
+        yield {
+            "cliente": TestClient(crear_app()),
+            "headers": {"Authorization": f"Bearer {token}"},
+            "motor": motor,
+            "registro": registro,
+            "inscrito_id": inscrito_id,
+        }
+
+    texto = reporte(registro, _planes_pendientes)
+    ruta = os.getenv("REPORTE_CONSULTAS") or str(directorio / "reporte_consultas.txt")
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        archivo.write(texto + "\n")
+    print(f"\nReporte de consultas: {ruta}")
+
+
+@pytest.mark.parametrize("etiqueta,ruta,presupuesto", ENDPOINTS, ids=[e[0] for e in ENDPOINTS])
+def test_presupuesto_y_plan_por_endpoint(entorno, etiqueta, ruta, presupuesto):
+    with entorno["registro"].capturar(etiqueta) as consultas:
+        respuesta = entorno["cliente"].get(ruta.format(**entorno), headers=entorno["headers"])
+    assert respuesta.status_code == 200, respuesta.text
+
+    assert len(consultas) <= presupuesto, (
+        f"{etiqueta}: {len(consultas)} consultas (presupuesto {presupuesto})\n"
+        + "\n".join(consulta.forma for consulta in consultas)
+    )
+    assert not repetidas(consultas), f"{etiqueta}: posible N+1 {repetidas(consultas)}"
+
+    planes = [plan for plan in (explicar(entorno["motor"], consulta) for consulta in consultas) if plan]
+    _planes_pendientes.extend(planes)
+    problemas = [(plan.problemas, plan.consulta.forma, plan.detalle) for plan in planes if plan.problemas]
+    assert not problemas, f"{etiqueta}: planes con recorridos completos u ordenamientos\n{problemas}"
+
+
+def test_detecta_n_mas_1_en_serializacion_perezosa(entorno):
+    """La carga perezosa de Resultado.inscrito debe aparecer como N+1"""
+    import database
+    import models
+
+    sesion = database.SessionLocal()
+    try:
+        with entorno["registro"].capturar("n_mas_1_intencional") as consultas:
+            for resultado in sesion.query(models.Resultado).limit(10).all():
+                resultado.inscrito.nombre_artistico
+    finally:
+        sesion.close()
+    assert repetidas(consultas)
+
+
+def test_detecta_recorrido_completo_en_columna_sin_indice(entorno):
+    """Un filtro sobre una columna sin índice debe reportarse como recorrido completo"""
+    import database
+    import models
+
+    sesion = database.SessionLocal()
+    try:
+        with entorno["registro"].capturar("recorrido_intencional") as consultas:
+            sesion.query(models.Inscripcion.id).filter(models.Inscripcion.nombre_artistico == "Artista 7").all()
+    finally:
+        sesion.close()
+    plan = explicar(entorno["motor"], consultas[0])
+    assert plan.recorridos == ["inscripciones"], plan.detalle
@@ -0,0 +1,102 @@
+"""
+Programación de rondas clasificatorias (backend/programacion.py): ninguna
+ronda recibe más inscritos que la capacidad de su sede, programar de nuevo
+no duplica lugares y replanificar_sede() mueve a los pendientes de una sede
+desactivada a las demás sin sobrecupo.
+"""
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+FECHA = datetime(2025, 3, 1, 10, 0)
+# nombre -> (municipio, capacidad, inscritos con esa sede)
+SEDES = {
+    "A": ("Querétaro", 12, 15),
+    "B": ("Querétaro", 15, 10),
+    "C": ("Corregidora", 10, 10),
+}
+SIN_SEDE = 5
+
+
+@pytest.fixture
+def entorno(sesion):
+    import models
+    import programacion
+
+    sedes = {}
+    for nombre, (municipio, capacidad, inscritos) in SEDES.items():
+        sede = models.Sede(nombre_sede=nombre, estado="Querétaro", municipio=municipio, capacidad=capacidad)
+        sesion.add(sede)
+        sesion.flush()
+        sedes[nombre] = sede
+        for i in range(inscritos):
+            sesion.add(_inscripcion(models, f"{nombre}-{i:02d}", municipio, sede.id))
+    for i in range(SIN_SEDE):
+        sesion.add(_inscripcion(models, f"X-{i:02d}", "Querétaro", None))
+    sesion.commit()
+    return {"sesion": sesion, "models": models, "programacion": programacion, "sedes": sedes}
+
+
+def _inscripcion(models, id_, municipio, sede_id):
+    return models.Inscripcion(
+        id=id_, nombre_completo=f"Participante {id_}", nombre_artistico=f"Artista {id_}", telefono="4420000000",
+        municipio=municipio, sede_id=sede_id, estatus=models.EstatusInscripcion.aprobado,
+    )
+
+
+def _ocupacion(sesion, models) -> dict:
+    """ronda_id -> (capacidad de la sede, resultados)"""
+    conteos = Counter(resultado.ronda_id for resultado in sesion.query(models.Resultado))
+    return {ronda.id: (ronda.sede.capacidad, conteos[ronda.id]) for ronda in sesion.query(models.Ronda)}
+
+
+def test_no_sobrevende_y_es_idempotente(entorno):
+    sesion, models, programacion = entorno["sesion"], entorno["models"], entorno["programacion"]
+    capacidad = sum(capacidad for _, capacidad, _ in SEDES.values())
+    demanda = sum(inscritos for _, _, inscritos in SEDES.values()) + SIN_SEDE
+
+    respuesta = programacion.programar(sesion, fechas=[FECHA])
+    sesion.commit()
+    assert respuesta["asignados"] == capacidad
+    assert respuesta["sin_lugar"] == demanda - capacidad
+    assert all(ocupados == tope for tope, ocupados in _ocupacion(sesion, models).values())
+
+    respuesta = programacion.programar(sesion, fechas=[FECHA])
+    sesion.commit()
+    assert respuesta["asignados"] == 0
+    assert respuesta["sin_lugar"] == demanda - capacidad
+    assert sesion.query(models.Resultado).count() == capacidad
+    assert sesion.query(models.Ronda).count() == len(SEDES)
+
+
+def test_replanificar_sede_reparte_sin_sobrecupo(entorno):
+    sesion, models, programacion, sedes = (
+        entorno["sesion"], entorno["models"], entorno["programacion"], entorno["sedes"]
+    )
+    programacion.programar(sesion, fechas=[FECHA])
+    sesion.commit()
+
+    ronda_a = sesion.query(models.Ronda).filter(models.Ronda.sede_id == sedes["A"].id).one()
+    en_a = sesion.query(models.Resultado).filter(models.Resultado.ronda_id == ronda_a.id).all()
+    en_a[0].puntaje = 80
+    pendientes = [resultado.inscrito_id for resultado in en_a[1:]]
+    sesion.add(models.Sede(nombre_sede="D", estado="Querétaro", municipio="Querétaro", capacidad=20))
+    sedes["A"].activo = False
+    sesion.flush()
+
+    respuesta = programacion.replanificar_sede(sesion, sedes["A"].id)
+    sesion.commit()
+    movidos = len(pendientes)
+    assert respuesta == {"movidos": movidos, "rondas_desactivadas": 0, "sin_lugar": 0}
+
+    ocupacion = _ocupacion(sesion, models)
+    assert all(ocupados <= tope for tope, ocupados in ocupacion.values())
+    assert ocupacion[ronda_a.id][1] == 1
+    rondas = {ronda.id: ronda for ronda in sesion.query(models.Ronda)}
+    movidas = sesion.query(models.Resultado).filter(models.Resultado.inscrito_id.in_(pendientes)).all()
+    assert len(movidas) == movidos
+    assert all(rondas[resultado.ronda_id].sede_id != sedes["A"].id for resultado in movidas)
+    assert all(rondas[resultado.ronda_id].fecha == FECHA for resultado in movidas)
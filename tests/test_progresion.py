@@ -0,0 +1,97 @@
+"""
+Progresión de etapas (backend/progresion.py): los N mejores por estado pasan
+a la etapa siguiente contando solo el mejor resultado de cada inscrito, y
+repetir la promoción no duplica resultados ni rondas.
+"""
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+# sede -> estado; cada sede tiene una ronda clasificatoria con POR_RONDA resultados
+SEDES = {"S1": "Querétaro", "S2": "Querétaro", "S3": "Jalisco", "S4": "Jalisco"}
+POR_RONDA = 5
+N = 3
+
+
+@pytest.fixture
+def entorno(sesion):
+    import models
+    import progresion
+
+    rondas, puntajes = [], {}
+    for j, (nombre, estado) in enumerate(SEDES.items()):
+        sede = models.Sede(nombre_sede=nombre, estado=estado, municipio=estado)
+        sesion.add(sede)
+        sesion.flush()
+        ronda = models.Ronda(nombre=f"Clasificatoria {nombre}", fecha=datetime(2025, 1, 1), sede_id=sede.id,
+                             tipo=models.TipoRonda.clasificatoria)
+        sesion.add(ronda)
+        sesion.flush()
+        rondas.append(ronda.id)
+        for i in range(POR_RONDA):
+            inscrito_id = f"{nombre}-{i}"
+            puntaje = 50 + 7 * i + j
+            sesion.add(models.Inscripcion(
+                id=inscrito_id, nombre_completo=f"Participante {inscrito_id}", nombre_artistico=inscrito_id,
+                telefono="4420000000", municipio=estado, sede_id=sede.id,
+                estatus=models.EstatusInscripcion.aprobado,
+            ))
+            sesion.add(models.Resultado(inscrito_id=inscrito_id, ronda_id=ronda.id, puntaje=puntaje))
+            puntajes[inscrito_id] = (estado, puntaje)
+    # El mejor de S1 también compitió en S2 con menos puntaje: solo cuenta una vez
+    sesion.add(models.Resultado(inscrito_id=f"S1-{POR_RONDA - 1}", ronda_id=rondas[1], puntaje=10))
+    sesion.commit()
+    return {"sesion": sesion, "models": models, "progresion": progresion, "rondas": rondas, "puntajes": puntajes}
+
+
+def _esperados(puntajes: dict) -> set:
+    por_estado = {}
+    for inscrito_id, (estado, puntaje) in puntajes.items():
+        por_estado.setdefault(estado, []).append((-puntaje, inscrito_id))
+    return {inscrito_id for filas in por_estado.values() for _, inscrito_id in sorted(filas)[:N]}
+
+
+def _destino(sesion, models) -> list:
+    return sesion.query(models.Resultado).join(models.Ronda).filter(
+        models.Ronda.tipo == models.TipoRonda.interseccion
+    ).all()
+
+
+def test_mejores_por_estado(entorno):
+    sesion, models, progresion = entorno["sesion"], entorno["models"], entorno["progresion"]
+    argumentos = {"criterio": "mejores", "n": N, "agrupar_por": "estado", "fecha": datetime(2025, 2, 1)}
+
+    simulacion = progresion.promover(sesion, entorno["rondas"], dry_run=True, **argumentos)
+    assert simulacion["total"] == N * len(set(SEDES.values()))
+    assert _destino(sesion, models) == []
+
+    respuesta = progresion.promover(sesion, entorno["rondas"], **argumentos)
+    sesion.commit()
+    promovidos = _destino(sesion, models)
+    assert respuesta["creados"] == len(promovidos) == simulacion["total"]
+    assert {resultado.inscrito_id for resultado in promovidos} == _esperados(entorno["puntajes"])
+    assert all(resultado.puntaje == 0 and not resultado.clasificado for resultado in promovidos)
+
+
+def test_repetir_promocion_no_duplica(entorno):
+    sesion, models, progresion = entorno["sesion"], entorno["models"], entorno["progresion"]
+    clasificados = sesion.query(models.Resultado).filter(
+        models.Resultado.ronda_id.in_(entorno["rondas"]), models.Resultado.puntaje >= 70
+    )
+    clasificados.update({"clasificado": True}, synchronize_session=False)
+    sesion.commit()
+    esperados = {resultado.inscrito_id for resultado in clasificados}
+
+    primera = progresion.promover(sesion, entorno["rondas"], fecha=datetime(2025, 2, 1))
+    sesion.commit()
+    rondas = sesion.query(models.Ronda).filter(models.Ronda.tipo == models.TipoRonda.interseccion).count()
+    assert primera["creados"] == len(esperados)
+
+    segunda = progresion.promover(sesion, entorno["rondas"], fecha=datetime(2025, 2, 1))
+    sesion.commit()
+    assert segunda["creados"] == 0
+    assert all(not grupo["nueva"] for grupo in segunda["grupos"])
+    assert sesion.query(models.Ronda).filter(models.Ronda.tipo == models.TipoRonda.interseccion).count() == rondas
+    assert sorted(resultado.inscrito_id for resultado in _destino(sesion, models)) == sorted(esperados)
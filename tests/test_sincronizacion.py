@@ -0,0 +1,118 @@
+"""
+Sincronización de puntajes sin conexión (backend/sincronizacion.py): reenviar
+un lote no vuelve a aplicar nada y devuelve el estado registrado la primera
+vez (los conflictos con el valor actual del servidor), y las capturas de
+rondas inactivas se rechazan sin registrarse.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+
+RUTA = "/api/jurado/puntajes/sincronizar"
+
+
+@pytest.fixture
+def entorno(sesion, cliente, autorizacion):
+    import models
+
+    jurado = models.Usuario(nombre="Jurado", correo="jurado@sync.local", rol=models.RolUsuario.jurado,
+                            contraseña="sin-uso")
+    sede = models.Sede(nombre_sede="Sede", estado="Querétaro", municipio="Querétaro")
+    sesion.add_all([jurado, sede])
+    sesion.flush()
+    activa = models.Ronda(nombre="Activa", fecha=datetime(2025, 1, 1), sede_id=sede.id,
+                          tipo=models.TipoRonda.clasificatoria)
+    inactiva = models.Ronda(nombre="Inactiva", fecha=datetime(2025, 1, 1), sede_id=sede.id,
+                            tipo=models.TipoRonda.clasificatoria, activo=False)
+    inscripcion = models.Inscripcion(
+        id="ins-1", nombre_completo="Participante", nombre_artistico="Artista", telefono="4420000000",
+        municipio="Querétaro", sede_id=sede.id, estatus=models.EstatusInscripcion.aprobado,
+    )
+    sesion.add_all([activa, inactiva, inscripcion])
+    sesion.flush()
+    sesion.add_all([
+        models.Resultado(inscrito_id=inscripcion.id, ronda_id=activa.id, puntaje=0),
+        models.Resultado(inscrito_id=inscripcion.id, ronda_id=inactiva.id, puntaje=0),
+    ])
+    sesion.commit()
+
+    return {
+        "cliente": cliente,
+        "headers": autorizacion(jurado),
+        "sesion": sesion,
+        "models": models,
+        "activa": activa.id,
+        "inactiva": inactiva.id,
+    }
+
+
+def _op(op_id: str, secuencia: int, ronda_id: int, puntaje: str, version_base=None) -> dict:
+    return {
+        "op_id": op_id, "secuencia": secuencia, "ronda_id": ronda_id, "inscrito_id": "ins-1",
+        "puntaje": puntaje, "version_base": version_base, "capturado_en": f"2025-01-01T10:00:{secuencia:02d}Z",
+    }
+
+
+def _sincronizar(entorno, dispositivo: str, operaciones: list) -> dict:
+    respuesta = entorno["cliente"].post(RUTA, json={"dispositivo_id": dispositivo, "operaciones": operaciones},
+                                        headers=entorno["headers"])
+    assert respuesta.status_code == 200, respuesta.text
+    return respuesta.json()
+
+
+def _puntaje(entorno):
+    models = entorno["models"]
+    entorno["sesion"].expire_all()
+    return entorno["sesion"].query(models.PuntajeJurado).filter(
+        models.PuntajeJurado.ronda_id == entorno["activa"]
+    ).one()
+
+
+def test_reenvio_devuelve_el_estado_registrado(entorno):
+    activa = entorno["activa"]
+    aplicada = _op("op-a", 1, activa, "80")
+    conflicto = _op("op-b", 2, activa, "70", version_base=None)
+
+    primera = _sincronizar(entorno, "tableta-1", [aplicada])
+    assert primera["resultados"] == {"op-a": "aplicada"}
+    segunda = _sincronizar(entorno, "tableta-1", [conflicto])
+    assert segunda["resultados"] == {"op-b": "conflicto"}
+    assert Decimal(segunda["conflictos"][0]["puntaje"]) == 80
+
+    # Otro dispositivo corrige el puntaje antes del reenvío
+    otra = _sincronizar(entorno, "tableta-2", [_op("op-c", 1, activa, "90", version_base=1)])
+    assert otra["resultados"] == {"op-c": "aplicada"}
+
+    reenvio = _sincronizar(entorno, "tableta-1", [aplicada, conflicto])
+    assert reenvio["resultados"] == {"op-a": "aplicada", "op-b": "conflicto"}
+    assert reenvio["aplicadas"] == 0
+    assert reenvio["duplicadas"] == 2
+    assert reenvio["aplicados"] == []
+    assert [(c["op_id"], Decimal(c["puntaje"]), c["version"]) for c in reenvio["conflictos"]] == [
+        ("op-b", Decimal("90"), 2)
+    ]
+    assert reenvio["ultima_secuencia"] == 2
+
+    puntaje = _puntaje(entorno)
+    assert (puntaje.puntaje, puntaje.version) == (Decimal("90"), 2)
+    assert entorno["sesion"].query(entorno["models"].OperacionPuntaje).count() == 3
+
+
+def test_ronda_inactiva_se_rechaza_sin_registrar(entorno):
+    models = entorno["models"]
+    respuesta = _sincronizar(entorno, "tableta-1", [
+        _op("op-a", 1, entorno["activa"], "80"),
+        _op("op-x", 2, entorno["inactiva"], "75"),
+    ])
+    assert respuesta["resultados"] == {"op-a": "aplicada", "op-x": "rechazada"}
+    assert (respuesta["aplicadas"], respuesta["rechazadas"]) == (1, 1)
+
+    sesion = entorno["sesion"]
+    assert [op.op_id for op in sesion.query(models.OperacionPuntaje)] == ["op-a"]
+    assert sesion.query(models.PuntajeJurado).filter(
+        models.PuntajeJurado.ronda_id == entorno["inactiva"]
+    ).count() == 0